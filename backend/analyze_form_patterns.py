@@ -1,7 +1,8 @@
-import pdfplumber
 import re
 from pathlib import Path
 
+from chatbot.services.page_text_cache import load_pages, warm_page_cache
+
 def analyze_form_patterns():
     """PDF 파일에서 실제 서식 패턴들을 분석합니다."""
     
@@ -18,59 +19,62 @@ def analyze_form_patterns():
     all_patterns = set()
     form_titles = set()
     
+    # 페이지 텍스트는 서식 분리/인덱서와 같은 캐시를 사용 (없는 파일만 병렬 추출)
+    warm_page_cache(test_files)
+    
     for pdf_path in test_files:
         print(f"\n=== {Path(pdf_path).name} ===")
         
         try:
-            with pdfplumber.open(pdf_path) as pdf:
-                for page_num, page in enumerate(pdf.pages):
-                    text = page.extract_text()
-                    if not text:
-                        continue
-                    
-                    lines = text.split('\n')
+            for page in load_pages(pdf_path):
+                page_num = page['page_no'] - 1
+                text = page['text']
+                if not text:
+                    continue
+                
+                lines = text.split('\n')
+                
+                # 첫 번째 라인에서 서식 패턴 찾기
+                if lines:
+                    first_line = lines[0].strip()
                     
-                    # 첫 번째 라인에서 서식 패턴 찾기
-                    if lines:
-                        first_line = lines[0].strip()
-                        
-                        # 서식 시작 패턴 찾기
-                        if re.search(r'\[별지\s*제\d+호\s*서식\]', first_line):
-                            all_patterns.add('별지 제X호 서식')
-                            print(f"  페이지 {page_num + 1}: {first_line}")
-                            
-                            # 제목 추출
-                            for i in range(1, min(6, len(lines))):
-                                line = lines[i].strip()
-                                if line and len(line) > 2:
-                                    form_titles.add(line)
-                                    print(f"    제목: {line}")
-                                    break
-                        
-                        elif re.search(r'\[별표\s*\d*\]', first_line):
-                            all_patterns.add('별표 X')
-                            print(f"  페이지 {page_num + 1}: {first_line}")
-                            
-                            # 제목 추출
-                            for i in range(1, min(6, len(lines))):
-                                line = lines[i].strip()
-                                if line and len(line) > 2:
-                                    form_titles.add(line)
-                                    print(f"    제목: {line}")
-                                    break
-                        
-                        elif re.search(r'\[부록\s*\d*\]', first_line):
-                            all_patterns.add('부록 X')
-                            print(f"  페이지 {page_num + 1}: {first_line}")
+                    # 서식 시작 패턴 찾기
+                    if re.search(r'\[별지\s*제\d+호\s*서식\]', first_line):
+                        all_patterns.add('별지 제X호 서식')
+                        print(f"  페이지 {page_num + 1}: {first_line}")
                         
-                        elif re.search(r'\[첨부서식\s*\d*\]', first_line):
-                            all_patterns.add('첨부서식 X')
-                            print(f"  페이지 {page_num + 1}: {first_line}")
-                        
-                        elif re.search(r'\[첨부양식\s*\d*\]', first_line):
-                            all_patterns.add('첨부양식 X')
-                            print(f"  페이지 {page_num + 1}: {first_line}")
+                        # 제목 추출
+                        for i in range(1, min(6, len(lines))):
+                            line = lines[i].strip()
+                            if line and len(line) > 2:
+                                form_titles.add(line)
+                                print(f"    제목: {line}")
+                                break
+                    
+                    elif re.search(r'\[별표\s*\d*\]', first_line):
+                        all_patterns.add('별표 X')
+                        print(f"  페이지 {page_num + 1}: {first_line}")
                         
+                        # 제목 추출
+                        for i in range(1, min(6, len(lines))):
+                            line = lines[i].strip()
+                            if line and len(line) > 2:
+                                form_titles.add(line)
+                                print(f"    제목: {line}")
+                                break
+                    
+                    elif re.search(r'\[부록\s*\d*\]', first_line):
+                        all_patterns.add('부록 X')
+                        print(f"  페이지 {page_num + 1}: {first_line}")
+                    
+                    elif re.search(r'\[첨부서식\s*\d*\]', first_line):
+                        all_patterns.add('첨부서식 X')
+                        print(f"  페이지 {page_num + 1}: {first_line}")
+                    
+                    elif re.search(r'\[첨부양식\s*\d*\]', first_line):
+                        all_patterns.add('첨부양식 X')
+                        print(f"  페이지 {page_num + 1}: {first_line}")
+                    
         except Exception as e:
             print(f"  오류: {str(e)}")
     
@@ -0,0 +1,20 @@
+"""
+비밀번호 해시
+Django 기본 Argon2PasswordHasher는 ARGON2_DEFAULT_* 설정을 읽지 않고 클래스 속성
+(parallelism=8)을 그대로 사용합니다. 로그인 요청이 몰리면 해시 계산 스레드가
+웹 워커의 CPU 스레드 예산(config/runtime.py)을 넘어서므로 설정값을 적용한 해셔를 사용합니다.
+
+기존 해시는 파라미터가 해시 문자열에 포함되어 있어 그대로 검증되며,
+파라미터가 다르면 다음 로그인 시 자동으로 재해시됩니다.
+"""
+
+from django.conf import settings
+from django.contrib.auth.hashers import Argon2PasswordHasher
+
+
+class BudgetedArgon2PasswordHasher(Argon2PasswordHasher):
+    """ARGON2_DEFAULT_* 설정을 적용한 Argon2 해셔"""
+
+    time_cost = getattr(settings, 'ARGON2_DEFAULT_TIME_COST', Argon2PasswordHasher.time_cost)
+    memory_cost = getattr(settings, 'ARGON2_DEFAULT_MEMORY_COST', Argon2PasswordHasher.memory_cost)
+    parallelism = getattr(settings, 'ARGON2_DEFAULT_PARALLELISM', Argon2PasswordHasher.parallelism)
@@ -0,0 +1,119 @@
+"""
+도메인 센트로이드 생성 명령
+
+    python manage.py build_domain_centroids [--collection regulations_final]
+    python manage.py build_domain_centroids --calibrate [--questions scripts/retrieval_questions.json]
+
+인덱싱된 청크 벡터를 domain_primary/domain_secondary별로 평균 내어
+질의 시점 도메인 라우팅(chatbot/services/domain_router.py)에 사용할
+센트로이드 파일을 만듭니다. 재인덱싱 후 다시 실행하세요.
+
+--calibrate는 질문 세트(정답 파일명 접두어)를 라우팅해 1위 도메인 점수/1·2위 차이 분포를 보고,
+confident 라우팅 정확도가 --min-precision 이상이면서 가장 많은 질문을 통과시키는
+DOMAIN_ROUTER_MIN_SCORE/MIN_MARGIN을 골라 센트로이드 파일에 기록합니다. 정답 도메인은
+인덱서와 같은 파일명 규칙(classify_domain_by_filename)으로 PDF_DIR의 파일명에서 구합니다.
+"""
+
+import json
+import os
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from qdrant_client import QdrantClient
+
+from chatbot.services.constants import EXISTING_COLLECTION
+from chatbot.services.document_parsing import classify_domain_by_filename
+from chatbot.services.domain_router import (
+    CALIBRATION_MIN_PRECISION, DomainRouter, build_domain_centroids, calibrate_thresholds, save_calibration,
+)
+from chatbot.services.embedding_backends import DEFAULT_MODEL_NAME
+from chatbot.services.embedding_batcher import get_query_embedder
+
+DEFAULT_QUESTIONS = Path(settings.BASE_DIR) / 'scripts' / 'retrieval_questions.json'
+
+
+class Command(BaseCommand):
+    help = '인덱싱된 청크 벡터로 도메인/서브도메인 센트로이드를 생성합니다'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--collection', default=EXISTING_COLLECTION, help='대상 컬렉션')
+        parser.add_argument('--calibrate', action='store_true',
+                            help='질문 세트로 confident 임계값(min_score/min_margin) 보정')
+        parser.add_argument('--skip-build', action='store_true',
+                            help='센트로이드를 다시 만들지 않고 보정만 실행')
+        parser.add_argument('--questions', default=str(DEFAULT_QUESTIONS), help='보정용 질문 세트 JSON')
+        parser.add_argument('--min-precision', type=float, default=CALIBRATION_MIN_PRECISION,
+                            help='confident 라우팅의 최소 도메인 정확도')
+
+    def handle(self, *args, **options):
+        collection = options['collection']
+        client = QdrantClient(
+            host=getattr(settings, 'QDRANT_HOST', 'qdrant'),
+            port=getattr(settings, 'QDRANT_PORT', 6333),
+        )
+        if collection not in [c.name for c in client.get_collections().collections]:
+            raise CommandError(f"컬렉션이 없습니다: {collection}")
+
+        if not options['skip_build']:
+            summary = build_domain_centroids(
+                client, collection, model_name=os.getenv('HF_MODEL', DEFAULT_MODEL_NAME)
+            )
+            if not summary['domains']:
+                self.stdout.write(self.style.WARNING('domain_primary가 있는 청크가 없어 센트로이드를 만들지 못했습니다'))
+                return
+
+            for domain, count in sorted(summary['domains'].items(), key=lambda item: -item[1]):
+                self.stdout.write(f"  {domain}: {count} chunks")
+            self.stdout.write(self.style.SUCCESS(
+                f"센트로이드 저장 완료: {len(summary['domains'])}개 도메인, "
+                f"{summary['subdomains']}개 서브도메인 → {summary['path']}"
+            ))
+
+        if options['calibrate']:
+            self._calibrate(collection, options['questions'], options['min_precision'])
+
+    def _calibrate(self, collection, questions_path, min_precision):
+        """질문 세트 라우팅 점수 분포로 임계값을 골라 센트로이드 파일에 기록"""
+        pdf_files = [path.name for path in Path(getattr(settings, 'PDF_DIR', '')).glob('*.pdf')]
+        if not pdf_files:
+            raise CommandError(f"PDF_DIR에 문서가 없어 정답 도메인을 구할 수 없습니다: {settings.PDF_DIR}")
+        questions = json.loads(Path(questions_path).read_text(encoding='utf-8'))
+
+        router = DomainRouter(collection)
+        if not router.available:
+            raise CommandError(f"'{collection}' 센트로이드가 없습니다")
+        vectors = get_query_embedder().encode([q['question'] for q in questions])
+
+        samples = []
+        for item, vector in zip(questions, vectors):
+            expected = {
+                classify_domain_by_filename(name) for name in pdf_files
+                if any(name.startswith(prefix) for prefix in item['expected'])
+            }
+            routed = router.route(vector)
+            if not expected or routed is None:
+                continue
+            samples.append({'domain': routed['domain'], 'score': routed['score'],
+                            'margin': routed['margin'], 'expected': sorted(expected)})
+            mark = 'O' if routed['domain'] in expected else 'X'
+            self.stdout.write(
+                f"  {mark} score={routed['score']:.4f} margin={routed['margin']:.4f} "
+                f"{routed['domain']} (정답 {'/'.join(sorted(expected))}) {item['question']}"
+            )
+        if not samples:
+            raise CommandError('보정에 사용할 질문이 없습니다')
+
+        calibration = calibrate_thresholds(samples, min_precision=min_precision)
+        calibration['source'] = Path(questions_path).name
+        path = save_calibration(collection, calibration)
+        if not calibration['confident']:
+            self.stdout.write(self.style.WARNING(
+                f"정확도 {min_precision:.0%} 이상인 임계값이 없어 라우팅을 사용하지 않도록 기록했습니다 → {path}"
+            ))
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"임계값 보정: min_score={calibration['min_score']}, min_margin={calibration['min_margin']} "
+            f"(정확도 {calibration['precision']:.0%}, 통과 {calibration['coverage']:.0%}, "
+            f"점수 범위 {calibration['score_range']}) → {path}"
+        ))
@@ -0,0 +1,66 @@
+"""
+시작 시 Qdrant 컬렉션 준비 명령 (scripts/start.sh)
+
+    python manage.py qdrant_init [--collection regulations_final] [--no-restore]
+
+1. alias/컬렉션이 이미 있으면 그대로 사용
+2. 없으면 설정/문서가 맞는 최신 스냅샷을 복원 (QDRANT_RESTORE_ON_START, 재임베딩 없이 수 초)
+3. 복원할 스냅샷이 없으면 빈 컬렉션 생성 (embed_documents.py로 인덱싱 필요)
+
+모델을 로딩하지 않습니다.
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from qdrant_client import QdrantClient
+
+from chatbot.services.index_snapshots import find_restorable_snapshot, resolve_collection
+from chatbot.services.ingestion import create_collection, index_config
+
+from .qdrant_restore import restore_and_report
+
+
+class Command(BaseCommand):
+    help = 'Qdrant 컬렉션을 준비합니다 (없으면 호환되는 스냅샷 복원, 그래도 없으면 빈 컬렉션 생성)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--collection', default=settings.QDRANT_COLLECTION_NAME,
+                            help='대상 alias (검색기가 읽는 컬렉션 이름)')
+        parser.add_argument('--no-restore', action='store_true',
+                            help='스냅샷을 복원하지 않음')
+
+    def handle(self, *args, **options):
+        alias = options['collection']
+        dim = getattr(settings, 'QDRANT_VECTOR_SIZE', 1024)
+        client = QdrantClient(
+            host=getattr(settings, 'QDRANT_HOST', 'qdrant'),
+            port=getattr(settings, 'QDRANT_PORT', 6333),
+            timeout=600,
+        )
+
+        existing = resolve_collection(client, alias)
+        if existing is not None:
+            points = client.count(collection_name=existing, exact=False).count
+            self.stdout.write(f"컬렉션 사용: '{alias}' → {existing} ({points} points)")
+            return
+
+        restore = getattr(settings, 'QDRANT_RESTORE_ON_START', True) and not options['no_restore']
+        if restore:
+            root = getattr(settings, 'QDRANT_SNAPSHOTS_DIR', None)
+            manifest, skipped = find_restorable_snapshot(
+                alias, index_config(embed_dim=dim), getattr(settings, 'PDF_DIR', None), root
+            )
+            for reason in skipped:
+                self.stdout.write(self.style.WARNING(f"  스냅샷 건너뜀: {reason}"))
+            if manifest is not None:
+                try:
+                    restore_and_report(self, client, manifest, root=root)
+                    return
+                except Exception as e:
+                    # 복원에 실패해도 서비스는 시작 (빈 컬렉션 생성 후 재인덱싱 안내)
+                    self.stdout.write(self.style.ERROR(f"스냅샷 복원 실패: {e}"))
+
+        create_collection(client, alias, dim)
+        self.stdout.write(self.style.WARNING(
+            f"빈 컬렉션 '{alias}' 생성 - python embed_documents.py로 인덱싱하세요"
+        ))
@@ -0,0 +1,106 @@
+"""
+인덱스 스냅샷 복원 명령
+
+    python manage.py qdrant_restore                       # 설정/문서가 맞는 최신 스냅샷
+    python manage.py qdrant_restore --location=<스냅샷 또는 매니페스트 경로>
+    python manage.py qdrant_restore --list                # 스냅샷 목록과 호환 여부
+
+스냅샷을 원래 버전 컬렉션 이름으로 복원하고 alias를 전환한 뒤 증분 인덱싱 매니페스트와
+도메인 센트로이드를 갱신합니다. 모델을 로딩하지 않습니다.
+"""
+
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from qdrant_client import QdrantClient
+
+from chatbot.services.domain_router import build_domain_centroids
+from chatbot.services.index_snapshots import (
+    MANIFEST_SUFFIX, check_compatibility, find_restorable_snapshot, list_snapshot_manifests,
+    restore_index_snapshot,
+)
+from chatbot.services.ingestion import index_config
+
+
+def restore_and_report(command: BaseCommand, client: QdrantClient, manifest: dict, root: str = None) -> str:
+    """스냅샷 복원 후 센트로이드 갱신 (qdrant_init에서도 사용)"""
+    collection = restore_index_snapshot(client, manifest, root=root)
+    command.stdout.write(command.style.SUCCESS(
+        f"스냅샷 복원 완료: {manifest['snapshot']['name']} → {collection} "
+        f"('{manifest['alias']}' alias, {manifest['points']} points)"
+    ))
+    try:
+        summary = build_domain_centroids(client, manifest['alias'], model_name=manifest['config'].get('embed_model', ''))
+        command.stdout.write(f"  도메인 센트로이드 갱신: {len(summary['domains'])}개 도메인")
+    except Exception as e:
+        command.stdout.write(command.style.WARNING(
+            f"  도메인 센트로이드 갱신 실패 (manage.py build_domain_centroids로 재시도): {e}"
+        ))
+    return collection
+
+
+class Command(BaseCommand):
+    help = '배포 매니페스트가 현재 설정/문서와 맞는 Qdrant 스냅샷을 복원합니다'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--collection', default=settings.QDRANT_COLLECTION_NAME,
+                            help='대상 alias (검색기가 읽는 컬렉션 이름)')
+        parser.add_argument('--location', default=None,
+                            help='복원할 스냅샷 파일 또는 매니페스트 경로 (기본값: 호환되는 최신 스냅샷)')
+        parser.add_argument('--force', action='store_true',
+                            help='설정/문서가 달라도 복원')
+        parser.add_argument('--list', action='store_true',
+                            help='스냅샷 목록과 호환 여부만 출력')
+
+    def handle(self, *args, **options):
+        alias = options['collection']
+        root = getattr(settings, 'QDRANT_SNAPSHOTS_DIR', None)
+        pdf_dir = getattr(settings, 'PDF_DIR', None)
+        config = index_config(embed_dim=getattr(settings, 'QDRANT_VECTOR_SIZE', 1024))
+        client = QdrantClient(
+            host=getattr(settings, 'QDRANT_HOST', 'qdrant'),
+            port=getattr(settings, 'QDRANT_PORT', 6333),
+            timeout=600,
+        )
+
+        if options['list']:
+            for manifest in list_snapshot_manifests(alias, root):
+                problems, _ = check_compatibility(manifest, config, pdf_dir)
+                mark = 'ok' if not problems else problems[0]
+                self.stdout.write(
+                    f"{manifest['created_at']}  {manifest['snapshot']['path']}  "
+                    f"{manifest['points']} points  [{mark}]"
+                )
+            return
+
+        if options['location']:
+            path = Path(options['location'])
+            if not path.name.endswith(MANIFEST_SUFFIX):
+                path = path.with_name(path.name + MANIFEST_SUFFIX)
+            try:
+                manifest = json.loads(path.read_text(encoding='utf-8'))
+            except (OSError, ValueError) as e:
+                raise CommandError(f"배포 매니페스트를 읽을 수 없습니다: {path} ({e})")
+            problems, notes = check_compatibility(manifest, config, pdf_dir)
+        else:
+            manifest, skipped = find_restorable_snapshot(alias, config, pdf_dir, root)
+            for reason in skipped:
+                self.stdout.write(self.style.WARNING(f"  건너뜀: {reason}"))
+            if manifest is None:
+                raise CommandError(f"'{alias}'에 복원할 수 있는 스냅샷이 없습니다")
+            problems, notes = check_compatibility(manifest, config, pdf_dir)
+
+        for note in notes:
+            self.stdout.write(f"  참고: {note}")
+        if problems:
+            for problem in problems:
+                self.stdout.write(self.style.WARNING(f"  불일치: {problem}"))
+            if not options['force']:
+                raise CommandError("스냅샷이 현재 설정/문서와 맞지 않습니다 (--force로 강제 복원)")
+
+        try:
+            restore_and_report(self, client, manifest, root=root)
+        except ValueError as e:
+            raise CommandError(f"스냅샷 복원 실패: {e}")
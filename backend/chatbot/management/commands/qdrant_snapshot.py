@@ -0,0 +1,57 @@
+"""
+인덱스 스냅샷 생성 명령
+
+    python manage.py qdrant_snapshot [--collection regulations_final] [--keep 3] [--force]
+
+alias가 가리키는 (블루-그린 검증을 통과한) 버전 컬렉션의 Qdrant 스냅샷을 만들고
+인덱싱 설정/문서 해시를 담은 배포 매니페스트를 스냅샷 옆에 저장합니다.
+스냅샷 디렉토리(qdrant_snapshots)를 새 환경에 복사하면 시작 시 qdrant_init이
+재임베딩 없이 복원합니다.
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from qdrant_client import QdrantClient
+
+from chatbot.services.index_snapshots import create_index_snapshot, prune_snapshots
+from chatbot.services.ingestion import index_config
+
+
+class Command(BaseCommand):
+    help = '검증된 컬렉션 버전의 스냅샷과 배포 매니페스트를 생성합니다'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--collection', default=settings.QDRANT_COLLECTION_NAME,
+                            help='대상 alias (검색기가 읽는 컬렉션 이름)')
+        parser.add_argument('--keep', type=int, default=getattr(settings, 'QDRANT_SNAPSHOT_KEEP', 3),
+                            help='남길 최신 스냅샷 수 (0이면 정리하지 않음)')
+        parser.add_argument('--force', action='store_true',
+                            help='매니페스트/포인트 수 검사에 실패해도 스냅샷 생성')
+
+    def handle(self, *args, **options):
+        alias = options['collection']
+        root = getattr(settings, 'QDRANT_SNAPSHOTS_DIR', None)
+        client = QdrantClient(
+            host=getattr(settings, 'QDRANT_HOST', 'qdrant'),
+            port=getattr(settings, 'QDRANT_PORT', 6333),
+            timeout=600,
+        )
+
+        config = index_config(embed_dim=getattr(settings, 'QDRANT_VECTOR_SIZE', 1024))
+        try:
+            manifest = create_index_snapshot(client, alias, config, root=root, force=options['force'])
+        except ValueError as e:
+            raise CommandError(f"스냅샷을 만들 수 없습니다: {e}")
+
+        for warning in manifest['warnings']:
+            self.stdout.write(self.style.WARNING(f"  경고: {warning}"))
+        self.stdout.write(self.style.SUCCESS(
+            f"스냅샷 생성 완료: {manifest['collection']} → {manifest['snapshot']['path']} "
+            f"({manifest['points']} points, {len(manifest['documents'])} documents)"
+        ))
+        self.stdout.write(f"  매니페스트: {manifest['_path']}")
+
+        if options['keep'] > 0:
+            removed = prune_snapshots(client, alias, keep=options['keep'], root=root)
+            if removed:
+                self.stdout.write(f"  이전 스냅샷 정리: {removed}")
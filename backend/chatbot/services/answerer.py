@@ -32,9 +32,10 @@ def make_answer(query: str, contexts: List[Dict[str, Any]], api_key: Optional[st
         domain = ctx.get('domain_primary', '알 수 없음')
         text = ctx.get('text', '내용 없음')
         
-        # 텍스트 길이 제한
-        if len(text) > 500:
-            text = text[:500] + "..."
+        # 텍스트 길이 제한 (인접 청크로 확장된 컨텍스트는 병합된 청크 수만큼 허용)
+        max_chars = 500 * max(1, len(ctx.get('chunk_span') or []))
+        if len(text) > max_chars:
+            text = text[:max_chars] + "..."
         
         formatted_contexts.append(f"[{i}] file={file_name}, pages={pages}, domain={domain}\n{text}")
     
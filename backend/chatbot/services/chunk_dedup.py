@@ -0,0 +1,160 @@
+"""
+MinHash + LSH 기반 준중복 청크 제거
+규정 문서는 부칙, 정의 조항, 서식 머리말 같은 상용구가 문서마다 거의 그대로 반복되어
+같은 내용의 청크가 인덱스 공간을 차지하고 검색 top-k를 밀어냅니다.
+정규화한 청크 텍스트의 문자 shingle로 MinHash 서명을 만들고, LSH 밴드 버킷으로 후보를 찾은 뒤
+서명 일치율(자카드 유사도 추정치)이 임계값 이상이면 먼저 본 청크(대표 청크)의 중복으로 판정합니다.
+
+인덱서에서 사용하므로 Django 설정에 의존하지 않습니다.
+
+    INGEST_DEDUP_THRESHOLD  중복 판정 자카드 임계값 (기본값: 0.9, 0이면 중복 제거 안 함)
+"""
+
+import hashlib
+import os
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .embedding_cache import normalize_text
+
+# 2^31 - 1 (메르센 소수): 32비트 shingle 해시 × 계수가 uint64 범위를 넘지 않음
+_PRIME = np.uint64((1 << 31) - 1)
+
+
+def default_dedup_threshold() -> float:
+    """INGEST_DEDUP_THRESHOLD 환경변수 (기본값: 0.9)"""
+    return float(os.getenv('INGEST_DEDUP_THRESHOLD', '0.9'))
+
+
+def shingles(text: str, size: int = 5) -> List[str]:
+    """정규화 텍스트의 문자 size-gram 목록 (짧은 텍스트는 전체 한 개)"""
+    text = normalize_text(text)
+    if len(text) <= size:
+        return [text] if text else []
+    return [text[i:i + size] for i in range(len(text) - size + 1)]
+
+
+def lsh_bands(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """
+    임계값에 맞는 (밴드 수, 밴드당 행 수)
+
+    후보가 될 확률이 절반이 되는 유사도 (1/b)^(1/r)이 임계값 이하인 것 중 가장 큰 조합을
+    고릅니다. 후보는 서명 일치율로 다시 확인하므로 재현율 쪽으로 치우치게 잡습니다.
+    """
+    best = (num_perm, 1)
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        if (1 / bands) ** (1 / rows) <= threshold:
+            best = (bands, rows)
+    return best
+
+
+class MinHasher:
+    """고정 시드 해시 함수 num_perm개로 MinHash 서명 계산 (실행/프로세스 간 같은 서명)"""
+
+    def __init__(self, num_perm: int = 128, shingle_size: int = 5, seed: int = 1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, int(_PRIME), size=num_perm).astype(np.uint64)
+        self._b = rng.randint(0, int(_PRIME), size=num_perm).astype(np.uint64)
+
+    def signature(self, text: str) -> np.ndarray:
+        """텍스트의 MinHash 서명 (uint64, num_perm)"""
+        grams = set(shingles(text, self.shingle_size))
+        if not grams:
+            return np.full(self.num_perm, _PRIME, dtype=np.uint64)
+        hashes = np.fromiter((zlib.crc32(g.encode('utf-8')) for g in grams), dtype=np.uint64, count=len(grams))
+        return ((np.outer(hashes, self._a) + self._b) % _PRIME).min(axis=0)
+
+
+class ChunkDeduplicator:
+    """
+    스트리밍 준중복 판정기
+
+    사용법:
+        dedup = ChunkDeduplicator(threshold=0.9)
+        canonical = dedup.check(text, ref)   # 중복이면 대표 청크의 ref, 아니면 None (대표로 등록)
+        dedup.check(text, ref, scope=("인사", "인사 규정"))   # 같은 scope 안에서만 중복 판정
+    """
+
+    def __init__(self, threshold: Optional[float] = None, num_perm: int = 128, shingle_size: int = 5):
+        """
+        판정기 초기화
+
+        Args:
+            threshold: 중복 판정 자카드 임계값 (기본값: default_dedup_threshold())
+            num_perm: MinHash 해시 함수 수
+            shingle_size: 문자 shingle 길이
+        """
+        self.threshold = default_dedup_threshold() if threshold is None else threshold
+        self.hasher = MinHasher(num_perm, shingle_size)
+        self.bands, self.rows = lsh_bands(self.threshold, num_perm)
+        self._buckets: List[Dict[Tuple[Any, bytes], List[int]]] = [{} for _ in range(self.bands)]
+        self._signatures: List[np.ndarray] = []
+        self._refs: List[Any] = []
+        self._exact: Dict[Tuple[Any, bytes], int] = {}
+
+        # 통계
+        self.chunks = 0
+        self.duplicates = 0
+        self.exact_duplicates = 0
+        self.candidates = 0
+
+    def check(self, text: str, ref: Any, scope: Any = None) -> Optional[Any]:
+        """
+        청크 중복 여부 확인
+
+        Args:
+            text: 청크 텍스트
+            ref: 대표로 등록될 때 저장할 참조 (포인트 ID 등)
+            scope: 중복 판정 범위 (해시 가능한 값, 같은 scope의 청크끼리만 중복으로 판정)
+
+        Returns:
+            중복이면 대표 청크의 ref, 새 청크면 None (이후 청크의 대표가 됨)
+        """
+        self.chunks += 1
+        digest = (scope, hashlib.sha1(normalize_text(text).encode('utf-8')).digest())
+        index = self._exact.get(digest)
+        if index is not None:
+            self.duplicates += 1
+            self.exact_duplicates += 1
+            return self._refs[index]
+
+        signature = self.hasher.signature(text)
+        keys = [(scope, signature[band * self.rows:(band + 1) * self.rows].tobytes()) for band in range(self.bands)]
+        seen = set()
+        for band, key in enumerate(keys):
+            for candidate in self._buckets[band].get(key, ()):
+                if candidate in seen:
+                    continue
+                seen.add(candidate)
+                self.candidates += 1
+                if np.mean(self._signatures[candidate] == signature) >= self.threshold:
+                    self.duplicates += 1
+                    return self._refs[candidate]
+
+        index = len(self._refs)
+        self._refs.append(ref)
+        self._signatures.append(signature)
+        self._exact[digest] = index
+        for band, key in enumerate(keys):
+            self._buckets[band].setdefault(key, []).append(index)
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        """중복 제거 통계 (removed_ratio: 전체 청크 중 제거 비율)"""
+        return {
+            'threshold': self.threshold,
+            'bands': self.bands,
+            'rows': self.rows,
+            'chunks': self.chunks,
+            'kept': self.chunks - self.duplicates,
+            'duplicates': self.duplicates,
+            'exact_duplicates': self.exact_duplicates,
+            'removed_ratio': round(self.duplicates / self.chunks, 4) if self.chunks else 0.0,
+        }
@@ -0,0 +1,272 @@
+"""
+버전 컬렉션 + alias 기반 블루-그린 재인덱싱
+검색기는 항상 alias 이름(예: regulations_final)으로 읽고, 인덱서는
+"<alias>__v<타임스탬프>" 새 컬렉션에 전체를 쓴 뒤 검증을 통과하면
+alias를 한 번의 update_collection_aliases 호출로 원자적으로 전환합니다.
+이전 버전 N개를 남겨 두어 즉시 롤백할 수 있습니다.
+
+인덱서(embed_documents)에서 사용하므로 Django 설정에 의존하지 않습니다.
+"""
+
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from qdrant_client import QdrantClient, models
+
+from .doc_retrieval import exclude_doc_level
+from .index_manifest import delete_manifest
+from .index_state import bump_collection_version
+from .vector_projection import delete_collection_projection, search_points
+
+logger = logging.getLogger(__name__)
+
+VERSION_SEPARATOR = "__v"
+
+# 새 버전 검증용 질문 세트 ({"question", "expected": [파일명 접두어]} 목록, retrieval_benchmark와 공용)
+DEFAULT_QUESTIONS_FILE = Path(__file__).resolve().parents[2] / 'scripts' / 'retrieval_questions.json'
+
+
+def versioned_name(alias: str, timestamp: Optional[float] = None) -> str:
+    """alias의 새 버전 컬렉션 이름 (예: regulations_final__v20250101T120000)"""
+    stamp = time.strftime('%Y%m%dT%H%M%S', time.localtime(timestamp or time.time()))
+    return f"{alias}{VERSION_SEPARATOR}{stamp}"
+
+
+def list_versions(client: QdrantClient, alias: str) -> List[str]:
+    """alias의 버전 컬렉션 목록 (오래된 순)"""
+    prefix = f"{alias}{VERSION_SEPARATOR}"
+    return sorted(c.name for c in client.get_collections().collections if c.name.startswith(prefix))
+
+
+def current_target(client: QdrantClient, alias: str) -> Optional[str]:
+    """alias가 가리키는 컬렉션 이름 (alias가 없으면 None)"""
+    for description in client.get_aliases().aliases:
+        if description.alias_name == alias:
+            return description.collection_name
+    return None
+
+
+def is_legacy_collection(client: QdrantClient, alias: str) -> bool:
+    """alias 이름과 같은 실제 컬렉션이 있는지 (블루-그린 도입 전 구조)"""
+    return alias in [c.name for c in client.get_collections().collections]
+
+
+def _points_count(client: QdrantClient, collection_name: str) -> int:
+    info = client.get_collection(collection_name)
+    return getattr(info, 'points_count', None) or 0
+
+
+def load_questions(path: Optional[Path] = None) -> List[Dict[str, Any]]:
+    """검증 질문 세트 로딩 (expected가 있는 질문만)"""
+    data = json.loads(Path(path or DEFAULT_QUESTIONS_FILE).read_text(encoding='utf-8'))
+    return [item for item in data if item.get('expected')]
+
+
+def hit_files(payload: Dict[str, Any]) -> List[str]:
+    """포인트가 대표하는 문서 파일명 (본인 + 중복 제거로 합쳐진 출처)"""
+    files = [payload.get('file_name', '')]
+    files += [source.get('file_name', '') for source in payload.get('alt_sources') or []]
+    return files
+
+
+def retrieval_recall(client: QdrantClient, collection_name: str, questions: Sequence[Dict[str, Any]],
+                     vectors: Sequence[Any], top_k: int = 5) -> Dict[str, Any]:
+    """
+    질문 세트 recall@k (top-k 본문 청크 중 expected 접두어로 시작하는 문서가 있으면 적중)
+
+    Returns:
+        {'collection', 'recall', 'hits', 'questions', 'misses'}
+    """
+    hits = 0
+    misses = []
+    for item, vector in zip(questions, vectors):
+        results = search_points(
+            client, collection_name, vector, query_filter=exclude_doc_level(None), limit=top_k,
+            with_payload=['file_name', 'alt_sources'],
+        )
+        found = any(
+            f.startswith(prefix)
+            for hit in results for f in hit_files(hit.payload or {}) for prefix in item['expected']
+        )
+        if found:
+            hits += 1
+        else:
+            misses.append(item['question'])
+    return {
+        'collection': collection_name,
+        'recall': round(hits / len(questions), 4) if questions else 0.0,
+        'hits': hits,
+        'questions': len(questions),
+        'misses': misses,
+    }
+
+
+def validate_collection(client: QdrantClient, collection_name: str, embedder,
+                        live_name: Optional[str] = None,
+                        questions: Optional[Sequence[Dict[str, Any]]] = None,
+                        top_k: int = 5, min_point_ratio: float = 0.9,
+                        min_recall: float = 0.6, max_recall_drop: float = 0.0) -> Dict[str, Any]:
+    """
+    새 버전 컬렉션 검증
+
+    - 포인트 수가 0보다 크고, 현재 서비스 중인 컬렉션의 min_point_ratio 이상
+    - 질문 세트 recall@top_k가 현재 컬렉션보다 max_recall_drop 넘게 낮지 않음
+      (현재 컬렉션이 없거나 같은 임베딩으로 검색할 수 없으면 min_recall 이상)
+
+    유사도 점수 하한은 검증이 되지 않습니다 (KoE5는 관계없는 한국어 문장도 0.3 이상).
+    정답 문서가 정해진 질문으로 실제 검색 결과를 확인합니다.
+
+    Args:
+        client: QdrantClient
+        collection_name: 검증할 컬렉션
+        embedder: 질의 임베딩에 사용할 임베더
+        live_name: 현재 서비스 중인 컬렉션 (없으면 포인트 수 비율/재현율 비교 생략)
+        questions: [{'question', 'expected'}] (기본값: load_questions())
+        top_k: 재현율을 볼 결과 수
+        min_point_ratio: 현재 컬렉션 대비 최소 포인트 수 비율
+        min_recall: 비교 대상이 없을 때 최소 재현율
+        max_recall_drop: 현재 컬렉션 대비 허용하는 재현율 하락폭
+
+    Returns:
+        {'ok', 'points', 'live_points', 'recall', 'live_recall', 'errors'}
+    """
+    errors = []
+    points = _points_count(client, collection_name)
+    live_points = _points_count(client, live_name) if live_name else None
+
+    if points <= 0:
+        errors.append("포인트가 없습니다")
+    elif live_points and points < live_points * min_point_ratio:
+        errors.append(f"포인트 수 부족: {points} < {live_points} × {min_point_ratio}")
+
+    questions = load_questions() if questions is None else list(questions)
+    recall = live_recall = None
+    if questions and points > 0:
+        vectors = embedder.encode([q['question'] for q in questions],
+                                  batch_size=len(questions), show_progress_bar=False)
+        vectors = [v.tolist() if hasattr(v, 'tolist') else list(v) for v in vectors]
+        recall = retrieval_recall(client, collection_name, questions, vectors, top_k)
+        if live_name:
+            try:
+                live_recall = retrieval_recall(client, live_name, questions, vectors, top_k)
+            except Exception as e:
+                # 임베딩 차원/벡터 구성이 바뀐 경우 현재 컬렉션은 같은 질의 벡터로 검색할 수 없음
+                logger.warning(f"현재 컬렉션 '{live_name}' 재현율 측정 불가, 최소 재현율로 검증: {e}")
+
+        if live_recall is not None:
+            if recall['recall'] < live_recall['recall'] - max_recall_drop:
+                errors.append(
+                    f"재현율 하락: recall@{top_k} {recall['recall']} < 현재 {live_recall['recall']}"
+                    f" - {max_recall_drop} (놓친 질문: {recall['misses']})"
+                )
+        elif recall['recall'] < min_recall:
+            errors.append(
+                f"재현율 부족: recall@{top_k} {recall['recall']} < {min_recall} (놓친 질문: {recall['misses']})"
+            )
+    elif points > 0:
+        errors.append("검증 질문 세트가 비어 있습니다")
+
+    return {
+        'ok': not errors,
+        'points': points,
+        'live_points': live_points,
+        'recall': recall,
+        'live_recall': live_recall,
+        'errors': errors,
+    }
+
+
+def switch_alias(client: QdrantClient, alias: str, collection_name: str) -> Optional[str]:
+    """
+    alias를 collection_name으로 원자적으로 전환
+
+    블루-그린 도입 전처럼 alias 이름의 실제 컬렉션이 있으면 alias를 만들 수 없으므로
+    그 컬렉션을 삭제한 직후 alias를 생성합니다. 최초 1회에 한해 짧은 공백이 생깁니다.
+
+    Args:
+        client: QdrantClient
+        alias: alias 이름 (검색기가 사용하는 컬렉션 이름)
+        collection_name: 새로 가리킬 컬렉션
+
+    Returns:
+        이전에 가리키던 컬렉션 이름 (없으면 None)
+    """
+    previous = current_target(client, alias)
+    operations = []
+    if previous is not None:
+        operations.append(models.DeleteAliasOperation(
+            delete_alias=models.DeleteAlias(alias_name=alias)
+        ))
+    elif is_legacy_collection(client, alias):
+        logger.warning(f"기존 단일 컬렉션 '{alias}'을 alias로 교체합니다 (최초 1회)")
+        client.delete_collection(alias)
+
+    operations.append(models.CreateAliasOperation(
+        create_alias=models.CreateAlias(collection_name=collection_name, alias_name=alias)
+    ))
+    client.update_collection_aliases(change_aliases_operations=operations)
+
+    # 검색 캐시 무효화: 웹 워커들은 다음 검색 시 버전 변경을 감지합니다.
+    bump_collection_version(alias)
+    logger.info(f"alias 전환: {alias} → {collection_name} (이전: {previous})")
+    return previous
+
+
+def prune_versions(client: QdrantClient, alias: str, keep: int = 2) -> List[str]:
+    """
+    현재 버전과 직전 keep개 버전만 남기고 오래된 버전 삭제
+
+    Args:
+        client: QdrantClient
+        alias: alias 이름
+        keep: 롤백용으로 남길 이전 버전 수
+
+    Returns:
+        삭제된 컬렉션 이름 목록
+    """
+    current = current_target(client, alias)
+    if current is None:
+        return []
+    # 현재 버전보다 새로운 컬렉션은 진행 중인 빌드일 수 있으므로 건드리지 않음
+    older = [name for name in list_versions(client, alias) if name < current]
+    stale = older[:-keep] if keep > 0 else older
+
+    for name in stale:
+        client.delete_collection(name)
+        delete_manifest(name)
+        delete_collection_projection(name)
+        logger.info(f"이전 버전 컬렉션 삭제: {name}")
+    return stale
+
+
+def rollback(client: QdrantClient, alias: str, to: Optional[str] = None) -> str:
+    """
+    alias를 이전 버전으로 되돌림
+
+    Args:
+        client: QdrantClient
+        alias: alias 이름
+        to: 되돌릴 컬렉션 (기본값: 현재 버전 직전 버전)
+
+    Returns:
+        전환된 컬렉션 이름
+
+    Raises:
+        ValueError: 되돌릴 버전이 없을 때
+    """
+    versions = list_versions(client, alias)
+    current = current_target(client, alias)
+
+    if to is None:
+        older = [name for name in versions if current is None or name < current]
+        if not older:
+            raise ValueError(f"'{alias}'의 이전 버전이 없습니다 (현재: {current})")
+        to = older[-1]
+    elif to not in versions:
+        raise ValueError(f"'{alias}'의 버전이 아닙니다: {to}")
+
+    switch_alias(client, alias, to)
+    return to
@@ -88,6 +88,106 @@ DOMAIN_HINTS = {
     '조직': '경영관리'
 }
 
+# 도메인 확장 키워드 (질문/키워드 기반 도메인 추정용, DOMAIN_CLASSIFICATION 키워드보다 낮은 가중치)
+DOMAIN_KEYWORDS = {
+    '인사관리': [
+        '인사', '급여', '채용', '복무', '교육', '훈련', '휴가', '연차', '출장', 
+        '육아휴직', '성과평가', '승진', '이동', '퇴직', '연금', '복리후생'
+    ],
+    '재무관리': [
+        '회계', '예산', '감사', '재정', '계약', '수수료', '자산', '장부', 
+        '감사인', '계약사무', '비유동자산', '재무제표', '세무', '부채'
+    ],
+    '보안관리': [
+        '보안', '정보보호', '정보보안', '개인정보', '민원', '신고', '보안정책',
+        '접근통제', '암호화', '백업', '복구', '침해대응', '보안사고'
+    ],
+    '기술관리': [
+        '기술', 'IT', '정보화', '전자서명', '시스템', '소프트웨어', '하드웨어',
+        '네트워크', '데이터베이스', '클라우드', 'AI', '빅데이터', '블록체인'
+    ],
+    '행정관리': [
+        '문서', '자료', '기록', '홍보', '문서관리', '자료관리', '기록물',
+        '보존', '폐기', '이관', '공개', '비공개', '기밀'
+    ],
+    '경영관리': [
+        '경영', '성과', '내부통제', '조직', '직제', '이해충돌', '윤리',
+        '지속가능', 'ESG', '리스크', '품질', '혁신', '전략'
+    ]
+}
+
+# 서브도메인 키워드 (도메인별, 앞에서부터 먼저 일치하는 서브도메인 사용)
+SUBDOMAIN_KEYWORDS = {
+    '인사관리': [
+        ('급여관리', ['급여', '봉급', '수당']),
+        ('채용관리', ['채용', '임용']),
+        ('복무관리', ['복무', '근무', '휴가', '육아휴직']),
+        ('교육훈련', ['교육', '훈련']),
+    ],
+    '재무관리': [
+        ('회계관리', ['회계', '장부']),
+        ('감사관리', ['감사', '감사인']),
+        ('계약관리', ['계약', '계약사무']),
+        ('자산관리', ['자산', '비유동자산']),
+    ],
+    '보안관리': [
+        ('정보보호', ['정보보호', '정보보안']),
+        ('개인정보보호', ['개인정보', '개인정보보호']),
+        ('민원신고', ['민원', '신고']),
+    ],
+    '기술관리': [
+        ('정보화관리', ['정보화', '정보시스템']),
+        ('전자서명관리', ['전자서명', '인증']),
+    ],
+    '행정관리': [
+        ('문서관리', ['문서', '문서관리']),
+        ('자료관리', ['자료', '자료관리']),
+        ('기록관리', ['기록', '기록물']),
+    ],
+    '경영관리': [
+        ('성과관리', ['성과', '성과평가']),
+        ('내부통제', ['내부통제', '통제']),
+        ('조직관리', ['조직', '직제']),
+    ],
+}
+
+# 서브도메인 키워드가 없을 때의 기본 서브도메인
+DEFAULT_SUBDOMAINS = {
+    '인사관리': '인사정책',
+    '재무관리': '재무정책',
+    '보안관리': '보안정책',
+    '기술관리': '기술정책',
+    '행정관리': '행정정책',
+    '경영관리': '경영정책',
+}
+
+# 문서 타입 키워드 (질문에서 문서 계층 추정, 타입명은 DOCUMENT_TYPE_PATTERNS와 동일)
+DOCUMENT_TYPE_KEYWORDS = {
+    '정관': ['정관', '기본법', '조직법', '근본법'],
+    '규정': ['규정', '운영규정', '관리규정'],
+    '규칙': ['규칙', '세부규칙', '실행규칙'],
+    '지침': ['지침', '업무지침', '운영지침', '가이드라인']
+}
+
+# 최신성 키워드
+RECENCY_KEYWORDS = ['최신', '최근', '새로운', '업데이트', '변경', '수정']
+
+# 서식 관련 키워드
+FORM_KEYWORDS = [
+    '서식', '양식', '신청서', '제출서', '청구서', '요청서', '보고서', '평가서',
+    '확인서', '서약서', '계약서', '승인서', '통지서', '등록서', '변경서',
+    '관리서', '운영서', '처리서', '대장', '접수증', '일지', '체크리스트',
+    '점검표', '결과표', '검토서', '완료확인서', '취소신청서', '재발급신청서',
+    '인증연장신청서', '윤리서약서', '보안서약서', '직무윤리서약서'
+]
+
+# 서식 요청 패턴
+FORM_REQUEST_PATTERNS = [
+    '서식 주세요', '양식 주세요', '신청서 주세요', '양식 찾아줘',
+    '서식 찾아줘', '신청서 찾아줘', '양식 다운로드', '서식 다운로드',
+    '어떤 서식', '어떤 양식', '필요한 서식', '필요한 양식'
+]
+
 # 최신성 점수 임계값
 RECENCY_THRESHOLDS = {
     'current': 3,      # 현재 연도
@@ -0,0 +1,142 @@
+"""
+문서 단위 2단계 검색
+인덱싱 엔진은 본문 청크와 함께 문서마다 요약 포인트(doc_type=summary, 제목/분류/목적 조문/조문 목록)
+하나와 조문 머리말 포인트(doc_type=heading)를 같은 컬렉션에 넣습니다.
+
+    1단계: 요약/머리말 포인트만 검색해 doc_id별 최고 점수로 상위 M개 문서 선택
+    2단계: 선택된 doc_id로 제한한 본문 청크 검색 (payload 인덱스 doc_id/alt_doc_ids 필터)
+
+"여비규정", "계약사무처리규칙"처럼 규정을 지목하는 질문은 1단계에서 문서가 정해지므로
+다른 규정의 비슷한 문장이 상위 결과를 차지하지 않습니다. 요약/머리말 포인트가 없는
+컬렉션(이전 스키마)에서는 1단계 결과가 비어 전체 청크 검색으로 돌아갑니다.
+
+검색 함수를 인자로 받으므로 Django 설정에 의존하지 않습니다 (벤치마크 스크립트에서도 사용).
+"""
+
+import copy
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# 문서 단위 포인트 종류 (본문 검색에서는 제외)
+DOC_LEVEL_TYPES = ["summary", "heading"]
+
+# search(query_vector, query_filter, limit) → Qdrant ScoredPoint 리스트
+SearchFn = Callable[[Any, Optional[Dict[str, Any]], int], List[Any]]
+
+
+def _conditions(flt: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """필터 딕셔너리 사본 (None이면 빈 필터)"""
+    return copy.deepcopy(dict(flt)) if flt else {}
+
+
+def constrains_doc_type(flt: Optional[Dict[str, Any]]) -> bool:
+    """필터가 이미 doc_type을 지정하는지 (서식 전용 검색 등)"""
+    for clause in ("must", "should", "must_not"):
+        for condition in (flt or {}).get(clause) or []:
+            if isinstance(condition, dict) and condition.get("key") == "doc_type":
+                return True
+    return False
+
+
+def exclude_doc_level(flt: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """본문 검색 필터: 요약/머리말 포인트 제외 (doc_type을 이미 지정한 필터는 그대로)"""
+    if constrains_doc_type(flt):
+        return flt
+    data = _conditions(flt)
+    data.setdefault("must_not", []).append({"key": "doc_type", "match": {"any": DOC_LEVEL_TYPES}})
+    return data
+
+
+def doc_level_filter(flt: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """1단계 필터: 본문 필터의 조건(도메인/문서 타입/최신성은 공통 payload)에 요약/머리말 조건 추가"""
+    data = _conditions(flt)
+    data.setdefault("must", []).append({"key": "doc_type", "match": {"any": DOC_LEVEL_TYPES}})
+    return data
+
+
+def restrict_to_documents(flt: Optional[Dict[str, Any]], doc_ids: Sequence[str]) -> Dict[str, Any]:
+    """
+    2단계 필터: 선택된 문서의 본문 청크만
+
+    중복 제거로 건너뛴 청크는 다른 문서의 대표 청크에만 남고 원래 문서는 alt_doc_ids에
+    기록되므로, doc_id 또는 alt_doc_ids 중 하나가 선택된 문서이면 포함합니다.
+    """
+    data = _conditions(exclude_doc_level(flt))
+    doc_ids = list(doc_ids)
+    data.setdefault("must", []).append({"should": [
+        {"key": "doc_id", "match": {"any": doc_ids}},
+        {"key": "alt_doc_ids", "match": {"any": doc_ids}},
+    ]})
+    return data
+
+
+def rank_documents(hits: Sequence[Any], top_m: int) -> List[Dict[str, Any]]:
+    """
+    요약/머리말 검색 결과를 doc_id별 최고 점수로 묶어 상위 문서 선택
+
+    Args:
+        hits: 1단계 Qdrant ScoredPoint 리스트
+        top_m: 선택할 문서 수
+
+    Returns:
+        [{'doc_id', 'file_name', 'score', 'matched': 'summary'|'heading', 'article'}] (점수순)
+    """
+    documents: Dict[str, Dict[str, Any]] = {}
+    for hit in hits:
+        payload = hit.payload or {}
+        doc_id = payload.get("doc_id")
+        if not doc_id or (doc_id in documents and documents[doc_id]["score"] >= hit.score):
+            continue
+        documents[doc_id] = {
+            "doc_id": doc_id,
+            "file_name": payload.get("file_name", ""),
+            "score": hit.score,
+            "matched": payload.get("doc_type", ""),
+            "article": payload.get("article", ""),
+        }
+    return sorted(documents.values(), key=lambda d: d["score"], reverse=True)[:top_m]
+
+
+def select_documents(search: SearchFn, query_vector: Any, flt: Optional[Dict[str, Any]] = None,
+                     top_m: int = 5, candidates: int = 20) -> List[Dict[str, Any]]:
+    """
+    1단계: 요약/머리말 포인트로 상위 top_m개 문서 선택
+
+    Args:
+        search: 검색 함수 (query_vector, query_filter, limit)
+        query_vector: 질의 벡터
+        flt: 본문 검색에 쓸 필터 (공통 payload 조건을 1단계에도 적용)
+        top_m: 선택할 문서 수
+        candidates: doc_id로 묶기 전에 가져올 요약/머리말 포인트 수
+
+    Returns:
+        rank_documents 결과 (요약/머리말 포인트가 없으면 빈 리스트)
+    """
+    hits = search(query_vector, doc_level_filter(flt), max(candidates, top_m))
+    return rank_documents(hits, top_m)
+
+
+def two_stage_search(search: SearchFn, query_vector: Any, flt: Optional[Dict[str, Any]] = None,
+                     top_k: int = 5, top_m: int = 5,
+                     candidates: int = 20) -> Tuple[List[Any], List[Dict[str, Any]]]:
+    """
+    문서 선택 → 선택 문서 안의 청크 검색
+
+    Args:
+        search: 검색 함수 (query_vector, query_filter, limit)
+        query_vector: 질의 벡터
+        flt: 본문 검색 필터
+        top_k: 반환할 청크 수
+        top_m: 1단계에서 선택할 문서 수
+        candidates: 1단계에서 가져올 요약/머리말 포인트 수
+
+    Returns:
+        (청크 ScoredPoint 리스트, 선택된 문서 목록) - 문서를 고르지 못하면 전체 청크 검색 결과와 빈 목록
+    """
+    if constrains_doc_type(flt):
+        return search(query_vector, flt, top_k), []
+    documents = select_documents(search, query_vector, flt, top_m, candidates)
+    if documents:
+        hits = search(query_vector, restrict_to_documents(flt, [d["doc_id"] for d in documents]), top_k)
+        if hits:
+            return hits, documents
+    return search(query_vector, exclude_doc_level(flt), top_k), []
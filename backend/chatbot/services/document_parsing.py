@@ -0,0 +1,457 @@
+"""
+문서 파싱 단계
+PDF 읽기 → 정제 → 청크 → 서식 페이지 감지와 파일명 기반 메타데이터(등록일, 문서 수준,
+도메인) 추출을 모아 둔 모듈입니다. 통합 인덱싱 엔진(ingestion)의 기본 단계로 사용되며,
+파싱 워커 프로세스에서 실행되므로 작업 함수는 모두 모듈 최상위 함수입니다.
+
+인덱서에서 사용하므로 Django 설정에 의존하지 않습니다.
+
+PDF 읽기는 page_text_cache의 사이드카를 사용하므로 서식 분리/분류 단계에서 이미
+추출한 PDF는 다시 파싱하지 않습니다.
+
+    FORMS_DIR      분리된 서식 PDF 디렉토리 (form_file_uri 계산용)
+    CHUNK_SIZE     청크 길이 (기본값: 1000)
+    CHUNK_OVERLAP  청크 중첩 길이 (기본값: 200)
+"""
+
+import os
+import re
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+from .page_text_cache import read_pages
+
+FORMS_DIR = os.getenv("FORMS_DIR", "/app/documents/kisa_pdf/forms_extracted_v6")
+
+# 청크 설정 (바뀌면 증분 인덱싱에서 모든 문서를 변경으로 취급)
+CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", "1000"))
+CHUNK_OVERLAP = int(os.getenv("CHUNK_OVERLAP", "200"))
+
+KST = timezone(timedelta(hours=9))
+
+# -------------------- 서식 관련 상수 --------------------
+# 서식 시작 패턴 (pdf_form_extractor_v6.py에서 가져옴)
+FORM_START_PATTERNS = [
+    re.compile(r'^\s*\[별지\s*제\d+호\s*서식\]'),
+    re.compile(r'^\s*\[별표\s*\d*\]'),
+    re.compile(r'^\s*\[부록\s*\d*\]'),
+    re.compile(r'^\s*\[첨부서식\s*\d*\]'),
+    re.compile(r'^\s*\[첨부양식\s*\d*\]'),
+]
+
+# 서식 제목 패턴 (pdf_form_extractor_v6.py에서 가져옴)
+FORM_TITLE_PATTERNS = [
+    # 신청/제출 관련
+    r'신청서', r'제출서', r'청구서', r'요청서', r'요구서', r'사유서', r'취소신청서', r'재발급신청서', r'인증연장신청서',
+    # 보고/평가 관련
+    r'보고서', r'평가서', r'평가표', r'점검표', r'체크리스트', r'확인서', r'요약서', r'결과표', r'검토서', r'결과확인서', r'완료확인서',
+    # 서약/계약 관련
+    r'서약서', r'계약서', r'협약서', r'각서', r'조서', r'확약서', r'윤리서약서', r'보안서약서', r'직무윤리서약서',
+    # 승인/통지 관련
+    r'승인서', r'통지서', r'통보서', r'발주서', r'입찰서', r'고지', r'처분서',
+    # 등록/변경 관련
+    r'등록서', r'변경서', r'폐지서', r'정지서', r'회복서', r'작업중지',
+    # 관리/운영 관련
+    r'관리서', r'운영서', r'처리서', r'관리방침', r'전결규정', r'처리내역', r'관리대장', r'출입관리대장',
+    # 대장/접수 관련
+    r'대장', r'접수증', r'접수대장', r'위촉장', r'일지', r'점검일지', r'이력카드', r'키관리대장', r'문서관리대장',
+    # 인사 관련
+    r'자격기준', r'지급기준', r'전형단계', r'사직원', r'휴직원', r'복직원', r'추천서', r'인적사항', r'추천사유', r'심사', r'성과평가표',
+    # 급여 관련
+    r'급여', r'산정기준액', r'수당', r'명예퇴직금', r'직무급', r'자격수당지급신청서',
+    # 안전보건 관련
+    r'안전보건관리체계', r'산업안전보건위원회',
+    # 조직/직무 관련
+    r'조직도', r'직무분장표', r'분류표', r'직호', r'직무명', r'직무구분',
+    # 인증/시험 관련
+    r'인증서', r'시험신청서', r'시험계약서', r'시험결과서', r'인증마크', r'확인마크',
+    # 기타
+    r'명세서', r'내역서', r'현황', r'프로파일', r'동의서', r'요약서', r'결과서', r'의견서', r'통지서', r'처리서', r'관리서', r'운영서', r'처리내역', r'관리방침', r'전결규정', r'처리내역', r'동의서', r'요청서', r'사유서', r'처분서', r'조서', r'일지', r'현황', r'명세서', r'내역서', r'완료확인서', r'취소신청서'
+]
+
+# 동의어 사전 (도메인별)
+SYNONYM_DICT = {
+    '퇴직': ['퇴사', '사직', '퇴직원', '사직원'],
+    '휴직': ['휴가', '휴직원'],
+    '복직': ['복귀', '복직원'],
+    '급여': ['봉급', '임금', '급료'],
+    '채용': ['임용', '고용', '채용원'],
+    '교육': ['훈련', '연수', '교육훈련'],
+    '보안': ['정보보호', '정보보안', '보안관리'],
+    '개인정보': ['개인정보보호', '개인정보관리'],
+    '민원': ['신고', '민원처리'],
+    '회계': ['회계관리', '장부관리'],
+    '감사': ['감사관리', '감사인'],
+    '계약': ['계약관리', '계약사무'],
+    '자산': ['자산관리', '비유동자산'],
+    '정보화': ['정보시스템', '정보화관리'],
+    '전자서명': ['인증', '전자서명관리'],
+    '문서': ['문서관리', '자료관리'],
+    '기록': ['기록물', '기록관리'],
+    '성과': ['성과평가', '성과관리'],
+    '내부통제': ['통제', '내부통제관리'],
+    '조직': ['조직관리', '직제관리']
+}
+
+# -------------------- 유틸 --------------------
+def now_year_kst() -> int:
+    return datetime.now(KST).year
+
+def calculate_recency_score(year: int) -> int:
+    if not year:
+        return 1
+    cy = now_year_kst()
+    if year >= cy:
+        return 3
+    elif year >= cy - 2:
+        return 2
+    else:
+        return 1
+
+def parse_register_date_from_filename(filename: str) -> Dict[str, Any]:
+    """파일명 내 (YYMMDD) → ISO 및 파생값
+    예) 3_16_전자서명... (210809).pdf → 2021-08-09
+    """
+    m = re.search(r"\((\d{6})\)", filename)
+    if not m:
+        return {"register_date_iso": None, "year": 0, "month": 0, "day": 0}
+    y, mo, d = m.group(1)[:2], m.group(1)[2:4], m.group(1)[4:6]
+    year = 2000 + int(y)
+    return {
+        "register_date_iso": f"{year:04d}-{int(mo):02d}-{int(d):02d}",
+        "year": year,
+        "month": int(mo),
+        "day": int(d)
+    }
+
+# 불필요 문자/제어문자 제거
+_DEF_SYMBOLS = "□■○●◆◇▶▷◀◁※☆★•ㆍ∙◦●▪︎▫︎❖✓✔✗✘❌"
+
+def clean_text(text: str) -> str:
+    if not text:
+        return ""
+    # Zero-width & 제어문자 제거
+    text = re.sub(r"[\u200B-\u200D\uFEFF]", "", text)              # zero-width
+    text = re.sub(r"[\x00-\x1f\x7f-\x9f]", " ", text)              # C0/C1 control
+    # 도형/글머리 기호 제거 (필요 시 치환 태깅으로 변경 가능)
+    text = re.sub(f"[{re.escape(_DEF_SYMBOLS)}]", " ", text)
+    # 하이픈 줄바꿈 연결(워드랩 아티팩트)
+    text = re.sub(r"-\s*\n\s*", "", text)
+    # 여러 공백/탭 정규화
+    text = re.sub(r"[ \t]+", " ", text)
+    # 연속 공백 축소
+    text = re.sub(r"\s{2,}", " ", text)
+    return text.strip()
+
+# 머리말 제거 정규식 수정
+_DEF_HEADER_RE = re.compile(r"제\s*\d+\s*(장|조)")
+
+def strip_header(text: str) -> str:
+    m = _DEF_HEADER_RE.search(text or "")
+    return text[m.start():] if m else (text or "")
+
+# 파일명 기반 도메인/서브도메인/문서타입 추정
+
+# 인덱싱 payload(domain_primary/domain_secondary)를 정하는 규칙이므로 검색 시점 키워드 매처
+# (chatbot/services/matcher.py)와 분리해 둡니다. 규칙을 바꾸면 search_by_domain 필터 대상이
+# 바뀌므로 전체 재인덱싱이 필요합니다.
+
+def classify_domain_by_filename(filename: str) -> str:
+    f = filename.casefold()
+    if any(k in f for k in ["인사","급여","채용","복무","교육"]):
+        return "인사관리"
+    if any(k in f for k in ["회계","예산","감사","재정","계약","자산"]):
+        return "재무관리"
+    if any(k in f for k in ["보안","정보보호","개인정보","민원"]):
+        return "보안관리"
+    if any(k in f for k in ["기술","정보화","전자서명","시스템","it"]):
+        return "기술관리"
+    if any(k in f for k in ["문서","자료","기록","홍보"]):
+        return "행정관리"
+    if any(k in f for k in ["경영","성과","내부통제","조직","직제"]):
+        return "경영관리"
+    return "일반"
+
+def extract_subdomain_by_filename(filename: str, domain: str) -> str:
+    f = filename.casefold()
+    if domain == "인사관리":
+        if any(k in f for k in ["급여","봉급"]): return "급여관리"
+        if any(k in f for k in ["채용","임용"]): return "채용관리"
+        if any(k in f for k in ["복무","근무"]): return "복무관리"
+        if any(k in f for k in ["교육","훈련"]): return "교육훈련"
+        return "인사정책"
+    if domain == "재무관리":
+        if any(k in f for k in ["회계","장부"]): return "회계관리"
+        if any(k in f for k in ["감사","감사인"]): return "감사관리"
+        if any(k in f for k in ["계약","계약사무"]): return "계약관리"
+        if any(k in f for k in ["자산","비유동자산"]): return "자산관리"
+        return "재무정책"
+    if domain == "보안관리":
+        if any(k in f for k in ["정보보호","정보보안"]): return "정보보호"
+        if any(k in f for k in ["개인정보","개인정보보호"]): return "개인정보보호"
+        if any(k in f for k in ["민원","신고"]): return "민원신고"
+        return "보안정책"
+    if domain == "기술관리":
+        if any(k in f for k in ["정보화","정보시스템"]): return "정보화관리"
+        if any(k in f for k in ["전자서명","인증"]): return "전자서명관리"
+        return "기술정책"
+    if domain == "행정관리":
+        if any(k in f for k in ["문서","문서관리"]): return "문서관리"
+        if any(k in f for k in ["자료","자료관리"]): return "자료관리"
+        if any(k in f for k in ["기록","기록물"]): return "기록관리"
+        return "행정정책"
+    if domain == "경영관리":
+        if any(k in f for k in ["성과","성과평가"]): return "성과관리"
+        if any(k in f for k in ["내부통제","통제"]): return "내부통제"
+        if any(k in f for k in ["조직","직제"]): return "조직관리"
+        return "경영정책"
+    return "일반"
+
+def infer_doc_level(filename: str) -> str:
+    if filename.startswith("1_"): return "정관"
+    if filename.startswith("2_"): return "규정"
+    if filename.startswith("3_"): return "규칙"
+    if filename.startswith("4_"): return "지침"
+    return "기타"
+
+# -------------------- 서식 관련 함수 --------------------
+
+def is_form_page(text: str) -> bool:
+    """페이지가 서식 페이지인지 확인"""
+    if not text:
+        return False
+    
+    lines = text.split('\n')
+    for line in lines[:5]:  # 처음 5줄만 확인
+        line = line.strip()
+        for pattern in FORM_START_PATTERNS:
+            if pattern.match(line):
+                return True
+    return False
+
+def extract_form_title(text: str) -> str:
+    """서식 페이지에서 제목을 추출"""
+    if not text:
+        return None
+    
+    lines = text.split('\n')
+    
+    # 서식 제목 찾기 (보통 2-5번째 라인에 있음)
+    form_title = None
+    anchor_raw = None
+    
+    # 첫 번째 라인에서 앵커 확인
+    if lines:
+        first_line = lines[0].strip()
+        for pattern in FORM_START_PATTERNS:
+            if pattern.match(first_line):
+                anchor_raw = first_line
+                break
+    
+    # 서식 제목 패턴이 포함된 라인 찾기
+    for i in range(1, min(6, len(lines))):
+        line = lines[i].strip()
+        if line and len(line) > 2:
+            for pattern in FORM_TITLE_PATTERNS:
+                if re.search(pattern, line):
+                    form_title = line
+                    break
+            if form_title:
+                break
+    
+    # 제목이 없으면 첫 번째 라인에서 서식 번호 제외하고 추출
+    if not form_title and lines:
+        first_line = lines[0].strip()
+        # [별지 제1호 서식] 패턴에서 제목 부분만 추출
+        match = re.search(r'\[별지\s*제\d+호\s*서식\]\s*(.+)', first_line)
+        if match and match.group(1).strip():
+            form_title = match.group(1).strip()
+        else:
+            # [별표 1] 제목 패턴에서 제목 부분만 추출
+            match = re.search(r'\[별표\s*\d*\]\s*(.+)', first_line)
+            if match and match.group(1).strip():
+                form_title = match.group(1).strip()
+            else:
+                form_title = first_line
+    
+    # 파일명으로 사용할 수 있도록 정리
+    if form_title:
+        # 특수문자 제거 및 공백 처리
+        form_title = re.sub(r'[^\w\s가-힣]', '', form_title)
+        form_title = re.sub(r'\s+', '_', form_title.strip())
+        # 연속된 언더스코어 제거
+        form_title = re.sub(r'_+', '_', form_title)
+        # 앞뒤 언더스코어 제거
+        form_title = form_title.strip('_')
+        form_title = form_title[:50]  # 길이 제한
+    
+    return form_title, anchor_raw
+
+def generate_form_topics_and_synonyms(form_title: str, domain_primary: str) -> Tuple[List[str], List[str]]:
+    """서식 제목과 도메인을 기반으로 토픽과 동의어 생성"""
+    topics = []
+    synonyms = []
+    
+    if not form_title:
+        return topics, synonyms
+    
+    # 서식 제목에서 키워드 추출
+    form_title_lower = form_title.lower()
+    
+    # 동의어 사전에서 매칭되는 키워드 찾기
+    for keyword, synonym_list in SYNONYM_DICT.items():
+        if keyword in form_title_lower:
+            topics.append(keyword)
+            synonyms.extend(synonym_list)
+    
+    # 서식 제목 자체를 토픽에 추가
+    topics.append(form_title)
+    
+    # 도메인별 기본 토픽 추가
+    if domain_primary in SYNONYM_DICT:
+        topics.append(domain_primary)
+        synonyms.extend(SYNONYM_DICT[domain_primary])
+    
+    # 중복 제거
+    topics = list(set(topics))
+    synonyms = list(set(synonyms))
+    
+    return topics, synonyms
+
+def find_form_file_uri(file_name: str, form_title: str) -> str:
+    """분리된 서식 PDF 파일의 URI 찾기"""
+    if not form_title:
+        return None
+    
+    forms_dir = Path(FORMS_DIR)
+    if not forms_dir.exists():
+        return None
+    
+    # 파일명 패턴: 원본파일명_서식제목.pdf
+    base_name = file_name.replace('.pdf', '')
+    search_pattern = f"{base_name}_{form_title}.pdf"
+    
+    # 정확한 매칭 시도
+    form_file = forms_dir / search_pattern
+    if form_file.exists():
+        return f"s3://company_policy/{search_pattern}"
+    
+    # 부분 매칭 시도
+    for form_file in forms_dir.glob(f"{base_name}_*.pdf"):
+        if form_title in form_file.name:
+            return f"s3://company_policy/{form_file.name}"
+    
+    return None
+
+def read_pdf_by_page(pdf_path: Path) -> List[Tuple[int, str]]:
+    """기본 읽기 단계: 페이지 텍스트 캐시(page_text_cache)를 거쳐 [(페이지 번호, 원문)] 반환"""
+    return read_pages(pdf_path)
+
+def chunk_text(text: str, chunk_size: int = 1000, chunk_overlap: int = 200) -> List[str]:
+    # 간단 슬라이딩 윈도우 (langchain splitter 없이도 충분)
+    if not text:
+        return []
+    chunks = []
+    start = 0
+    n = len(text)
+    while start < n:
+        end = min(n, start + chunk_size)
+        chunks.append(text[start:end])
+        if end == n:
+            break
+        start = max(end - chunk_overlap, start + 1)
+    return chunks
+
+def clean_page_text(raw_text: str) -> str:
+    """기본 정제 단계: 머리말 제거 → 불필요 문자 제거"""
+    return clean_text(strip_header(raw_text))
+
+def chunk_page_text(text: str) -> List[str]:
+    """기본 청크 단계: CHUNK_SIZE/CHUNK_OVERLAP 슬라이딩 윈도우 후 청크별 정제"""
+    return [clean_text(c) for c in chunk_text(text, CHUNK_SIZE, CHUNK_OVERLAP)]
+
+# 조문 머리말: 제5조(정의), 제12조의2(겸직 금지)
+ARTICLE_HEADING_RE = re.compile(r"제\s*(\d+)\s*조(?:\s*의\s*(\d+))?\s*\(([^()]{1,40})\)")
+# 머리말 뒤에 조사가 오면 본문 속 인용("제5조(정의)에 따라")
+_ARTICLE_CITATION_RE = re.compile(r"(에|의|을|를|과|와|및|부터|까지|·|,)")
+# 조문 머리말 벡터에 함께 넣을 본문 길이
+ARTICLE_SNIPPET_CHARS = 150
+
+def extract_article_headings(text: str, snippet_chars: int = ARTICLE_SNIPPET_CHARS) -> List[Dict[str, str]]:
+    """
+    정제된 페이지 텍스트에서 조문 머리말 추출 (본문 속 조문 인용은 제외)
+
+    Args:
+        text: 정제된 페이지 텍스트
+        snippet_chars: 머리말 뒤에 붙일 본문 길이 (다음 조문 전까지)
+
+    Returns:
+        [{'article': '제5조', 'title': '정의', 'text': '제5조(정의) 이 규정에서 ...'}] (페이지 내 조문 순서)
+    """
+    text = text or ""
+    matches = []
+    seen = set()
+    for m in ARTICLE_HEADING_RE.finditer(text):
+        article = f"제{m.group(1)}조" + (f"의{m.group(2)}" if m.group(2) else "")
+        if article in seen or _ARTICLE_CITATION_RE.match(text, m.end()):
+            continue
+        seen.add(article)
+        matches.append((article, m))
+
+    headings = []
+    for i, (article, m) in enumerate(matches):
+        end = matches[i + 1][1].start() if i + 1 < len(matches) else len(text)
+        headings.append({
+            "article": article,
+            "title": m.group(3).strip(),
+            "text": text[m.start():min(end, m.end() + snippet_chars)].strip(),
+        })
+    return headings
+
+def parse_document(pdf_path: Path,
+                   reader: Callable[[Path], List[Tuple[int, str]]] = read_pdf_by_page,
+                   cleaner: Callable[[str], str] = clean_page_text,
+                   chunker: Callable[[str], List[str]] = chunk_page_text) -> Dict[str, Any]:
+    """
+    파싱 워커 작업: PDF 한 개를 페이지별 정제 청크와 서식 정보로 변환
+
+    프로세스 풀에서 실행할 때는 reader/cleaner/chunker도 모듈 최상위 함수여야 합니다.
+
+    Args:
+        pdf_path: PDF 경로
+        reader: 읽기 단계 (경로 → [(페이지 번호, 원문)])
+        cleaner: 정제 단계 (원문 → 정제 텍스트)
+        chunker: 청크 단계 (정제 텍스트 → 청크 리스트)
+
+    Returns:
+        {'total_pages', 'pages': [{'page_no', 'chunks', 'headings', 'is_form', 'form_title', 'form_anchor_raw'}]}
+        (본문이 비어 있는 페이지는 제외)
+    """
+    pages = reader(pdf_path)
+    parsed = []
+    for page_no, raw_text in pages:
+        # 전처리: 헤더 제거 → 불필요문자 제거 → 청크
+        page_text = cleaner(raw_text)
+        if not page_text:
+            continue
+        chunks = chunker(page_text)
+        if not chunks:
+            continue
+
+        is_form = is_form_page(raw_text)
+        form_title, form_anchor_raw = extract_form_title(raw_text) if is_form else (None, None)
+        parsed.append({
+            "page_no": page_no,
+            "chunks": chunks,
+            "headings": extract_article_headings(page_text),
+            "is_form": is_form,
+            "form_title": form_title,
+            "form_anchor_raw": form_anchor_raw,
+        })
+    return {"total_pages": len(pages), "pages": parsed}
+
+
+def parse_pdf_for_index(pdf_path: Path) -> Dict[str, Any]:
+    """기본 단계로 parse_document 실행 (embed_documents와 같은 파싱/청크 결과)"""
+    return parse_document(pdf_path)
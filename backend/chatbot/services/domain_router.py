@@ -0,0 +1,408 @@
+"""
+임베딩 센트로이드 기반 도메인 라우터
+인덱싱된 청크 벡터를 domain_primary/domain_secondary별로 평균 낸 센트로이드를
+오프라인으로 계산해 두고, 질의 시점에는 이미 계산한 질의 임베딩과의 코사인
+유사도로 도메인을 고릅니다. LLM 키워드 추출을 기다리지 않고 도메인 필터 검색을
+시작할 수 있습니다.
+
+센트로이드 파일은 컬렉션 버전 마커와 같은 상태 디렉토리에
+"<컬렉션>.centroids.json"으로 저장됩니다. 인덱서(embed_documents)에서도
+사용하므로 Django 설정에 의존하지 않습니다.
+
+KoE5(e5) 임베딩은 관련 없는 한국어 문장끼리도 코사인 유사도가 높게 나오므로 고정 임계값
+(예: 0.3)은 아무 질의도 거르지 못합니다. confident 임계값(min_score/min_margin)은
+정답 문서가 있는 질문 세트(scripts/retrieval_questions.json)의 라우팅 점수 분포로
+보정하여 센트로이드 파일의 'calibration'에 기록하고(build_domain_centroids --calibrate),
+보정값도 설정값도 없으면 라우팅 결과를 confident로 보지 않습니다 (LLM 키워드 경로).
+"""
+
+import json
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .doc_retrieval import DOC_LEVEL_TYPES
+from .index_state import get_collection_version, index_state_dir
+from .vector_projection import full_vector
+
+logger = logging.getLogger(__name__)
+
+# 센트로이드 계산 시 scroll 페이지 크기
+SCROLL_BATCH_SIZE = 256
+
+# 센트로이드 계산에 포함할 최소 청크 수 (너무 적으면 노이즈가 큼)
+MIN_CHUNKS_PER_CENTROID = 5
+
+# 임계값 보정: confident 라우팅의 최소 정확도와 최소 표본 수
+CALIBRATION_MIN_PRECISION = 0.9
+CALIBRATION_MIN_SUPPORT = 3
+
+
+def centroid_file(collection_name: str) -> Path:
+    """컬렉션의 센트로이드 파일 경로"""
+    return index_state_dir() / f"{collection_name}.centroids.json"
+
+
+def _normalize(vector: np.ndarray) -> np.ndarray:
+    norm = float(np.linalg.norm(vector))
+    return vector / norm if norm > 0 else vector
+
+
+def compute_centroids(client, collection_name: str, model_name: str = '') -> Dict[str, Any]:
+    """
+    컬렉션의 텍스트 청크 벡터로 도메인/서브도메인 센트로이드 계산
+
+    서식 포인트(doc_type=form)와 문서 요약/조문 머리말 포인트는 본문 분포와 달라서 제외합니다.
+
+    Args:
+        client: QdrantClient
+        collection_name: 컬렉션 이름
+        model_name: 벡터를 만든 임베딩 모델 이름 (검증용으로 기록)
+
+    Returns:
+        {'collection', 'model_name', 'dim', 'built_at', 'collection_version',
+         'domains': {도메인: {'count', 'vector'}},
+         'subdomains': {도메인: {서브도메인: {'count', 'vector'}}}}
+    """
+    domain_sums: Dict[str, np.ndarray] = {}
+    domain_counts: Dict[str, int] = {}
+    sub_sums: Dict[tuple, np.ndarray] = {}
+    sub_counts: Dict[tuple, int] = {}
+
+    offset = None
+    while True:
+        points, offset = client.scroll(
+            collection_name=collection_name,
+            limit=SCROLL_BATCH_SIZE,
+            offset=offset,
+            with_payload=['domain_primary', 'domain_secondary', 'doc_type'],
+            with_vectors=True,
+        )
+        for point in points:
+            payload = point.payload or {}
+            domain = payload.get('domain_primary')
+            doc_type = payload.get('doc_type')
+            vector = full_vector(point.vector)
+            if not domain or doc_type == 'form' or doc_type in DOC_LEVEL_TYPES or vector is None:
+                continue
+            vector = np.asarray(vector, dtype=np.float32)
+
+            if domain in domain_sums:
+                domain_sums[domain] += vector
+            else:
+                domain_sums[domain] = vector.copy()
+            domain_counts[domain] = domain_counts.get(domain, 0) + 1
+
+            subdomain = payload.get('domain_secondary')
+            if subdomain:
+                key = (domain, subdomain)
+                if key in sub_sums:
+                    sub_sums[key] += vector
+                else:
+                    sub_sums[key] = vector.copy()
+                sub_counts[key] = sub_counts.get(key, 0) + 1
+        if offset is None:
+            break
+
+    dim = next(iter(domain_sums.values())).shape[0] if domain_sums else 0
+    domains = {
+        domain: {'count': domain_counts[domain], 'vector': _normalize(total).tolist()}
+        for domain, total in domain_sums.items()
+        if domain_counts[domain] >= MIN_CHUNKS_PER_CENTROID
+    }
+    subdomains: Dict[str, Dict[str, Any]] = {}
+    for (domain, subdomain), total in sub_sums.items():
+        if domain in domains and sub_counts[(domain, subdomain)] >= MIN_CHUNKS_PER_CENTROID:
+            subdomains.setdefault(domain, {})[subdomain] = {
+                'count': sub_counts[(domain, subdomain)],
+                'vector': _normalize(total).tolist(),
+            }
+
+    return {
+        'collection': collection_name,
+        'model_name': model_name,
+        'dim': dim,
+        'built_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'collection_version': get_collection_version(collection_name),
+        'domains': domains,
+        'subdomains': subdomains,
+    }
+
+
+def save_centroids(data: Dict[str, Any], collection_name: Optional[str] = None) -> Path:
+    """
+    센트로이드 저장 (임시 파일에 쓴 뒤 교체하여 웹 워커가 부분 파일을 읽지 않도록 함)
+
+    Args:
+        data: compute_centroids 결과
+        collection_name: 컬렉션 이름 (기본값: data['collection'])
+
+    Returns:
+        저장된 파일 경로
+    """
+    path = centroid_file(collection_name or data['collection'])
+    tmp_path = path.with_suffix('.json.tmp')
+    tmp_path.write_text(json.dumps(data, ensure_ascii=False), encoding='utf-8')
+    tmp_path.replace(path)
+    return path
+
+
+def load_centroids(collection_name: str) -> Optional[Dict[str, Any]]:
+    """저장된 센트로이드 파일 (없거나 읽을 수 없으면 None)"""
+    try:
+        return json.loads(centroid_file(collection_name).read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return None
+
+
+def build_domain_centroids(client, collection_name: str, model_name: str = '') -> Dict[str, Any]:
+    """
+    센트로이드 계산 후 저장
+
+    Args:
+        client: QdrantClient
+        collection_name: 컬렉션 이름
+        model_name: 임베딩 모델 이름
+
+    Returns:
+        요약 {'path', 'domains': {도메인: 청크 수}, 'subdomains': 서브도메인 센트로이드 수}
+    """
+    data = compute_centroids(client, collection_name, model_name)
+    # 재생성해도 이전 임계값 보정은 유지 (보정 당시 센트로이드 시각은 calibration에 기록됨)
+    previous = load_centroids(collection_name)
+    if previous and previous.get('calibration'):
+        data['calibration'] = previous['calibration']
+    path = save_centroids(data, collection_name)
+    return {
+        'path': str(path),
+        'domains': {domain: info['count'] for domain, info in data['domains'].items()},
+        'subdomains': sum(len(subs) for subs in data['subdomains'].values()),
+    }
+
+
+def calibrate_thresholds(samples: Sequence[Dict[str, Any]],
+                         min_precision: float = CALIBRATION_MIN_PRECISION,
+                         min_support: int = CALIBRATION_MIN_SUPPORT) -> Dict[str, Any]:
+    """
+    라우팅 점수 분포로 confident 임계값 선택
+
+    confident로 판단한 질문의 도메인 정확도가 min_precision 이상인 (min_score, min_margin)
+    조합 중 confident 비율(coverage)이 가장 큰 것을 고릅니다 (동률이면 더 엄격한 쪽).
+    조건을 만족하는 조합이 없으면 모든 질의를 거르는 임계값을 반환합니다.
+
+    Args:
+        samples: [{'domain': 1위 도메인, 'score', 'margin', 'expected': 정답 도메인 목록}]
+        min_precision: confident 라우팅의 최소 정확도
+        min_support: confident로 판단해야 하는 최소 질문 수
+
+    Returns:
+        {'min_score', 'min_margin', 'precision', 'coverage', 'questions', 'confident',
+         'score_range', 'min_precision'}
+    """
+    correct = [s['domain'] in s['expected'] for s in samples]
+    scores = sorted({s['score'] for s in samples})
+    margins = sorted({s['margin'] for s in samples})
+    best = None
+    for min_score in scores:
+        for min_margin in margins:
+            chosen = [ok for s, ok in zip(samples, correct)
+                      if s['score'] >= min_score and s['margin'] >= min_margin]
+            if len(chosen) < min_support:
+                continue
+            precision = sum(chosen) / len(chosen)
+            key = (len(chosen), min_margin, min_score)
+            if precision >= min_precision and (best is None or key > best[0]):
+                best = (key, min_score, min_margin, precision, len(chosen))
+
+    total = len(samples)
+    result = {
+        'questions': total,
+        'min_precision': min_precision,
+        'accuracy_top1': round(sum(correct) / total, 4) if total else 0.0,
+        'score_range': [round(scores[0], 4), round(scores[-1], 4)] if scores else [],
+    }
+    if best is None:
+        # 어떤 임계값으로도 정확도 목표를 못 맞추면 라우팅을 쓰지 않음
+        result.update({'min_score': 1.0, 'min_margin': 1.0, 'precision': 0.0, 'coverage': 0.0, 'confident': 0})
+        return result
+    _, min_score, min_margin, precision, confident = best
+    result.update({
+        'min_score': round(min_score, 4),
+        'min_margin': round(min_margin, 4),
+        'precision': round(precision, 4),
+        'coverage': round(confident / total, 4),
+        'confident': confident,
+    })
+    return result
+
+
+def save_calibration(collection_name: str, calibration: Dict[str, Any]) -> Path:
+    """센트로이드 파일에 임계값 보정 결과 기록"""
+    data = load_centroids(collection_name)
+    if data is None:
+        raise ValueError(f"'{collection_name}' 센트로이드 파일이 없습니다 (build_domain_centroids 먼저 실행)")
+    data['calibration'] = {
+        **calibration,
+        'calibrated_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'centroids_built_at': data.get('built_at'),
+    }
+    return save_centroids(data, collection_name)
+
+
+class DomainRouter:
+    """
+    센트로이드 코사인 유사도 기반 도메인 라우터
+
+    1위 도메인의 유사도가 min_score 이상이고 2위와의 차이(margin)가
+    min_margin 이상일 때만 confident로 판단합니다. 임계값을 지정하지 않으면 센트로이드 파일의
+    보정값(calibration)을 쓰고, 보정값도 없으면 confident로 판단하지 않습니다.
+    센트로이드 파일이 갱신되면 (수정 시각 변경) 다음 호출 시 다시 읽습니다.
+    """
+
+    def __init__(self, collection_name: str, min_score: Optional[float] = None,
+                 min_margin: Optional[float] = None):
+        """
+        라우터 초기화
+
+        Args:
+            collection_name: 컬렉션 이름
+            min_score: confident 판단 최소 코사인 유사도 (None이면 보정값)
+            min_margin: confident 판단 최소 1·2위 유사도 차이 (None이면 보정값)
+        """
+        self.collection_name = collection_name
+        self.min_score = min_score
+        self.min_margin = min_margin
+
+        self._lock = threading.Lock()
+        self._calibration: Dict[str, Any] = {}
+        self._mtime_ns: Optional[int] = None
+        self._domain_names: List[str] = []
+        self._domain_matrix: Optional[np.ndarray] = None
+        self._subdomains: Dict[str, tuple] = {}
+
+    def _load(self) -> bool:
+        """센트로이드 파일 로딩 (변경 없으면 재사용). 사용 가능 여부 반환"""
+        path = centroid_file(self.collection_name)
+        try:
+            mtime_ns = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return False
+        if mtime_ns == self._mtime_ns:
+            return self._domain_matrix is not None
+
+        with self._lock:
+            if mtime_ns == self._mtime_ns:
+                return self._domain_matrix is not None
+            try:
+                data = json.loads(path.read_text(encoding='utf-8'))
+            except (OSError, ValueError) as e:
+                logger.warning(f"센트로이드 파일 로딩 실패 ({path}): {e}")
+                return self._domain_matrix is not None
+
+            domains = data.get('domains', {})
+            self._domain_names = list(domains)
+            self._domain_matrix = (
+                np.asarray([domains[name]['vector'] for name in self._domain_names], dtype=np.float32)
+                if domains else None
+            )
+            self._subdomains = {
+                domain: (list(subs), np.asarray([info['vector'] for info in subs.values()], dtype=np.float32))
+                for domain, subs in data.get('subdomains', {}).items() if subs
+            }
+            self._calibration = data.get('calibration') or {}
+            self._mtime_ns = mtime_ns
+            logger.info(
+                f"도메인 센트로이드 로딩: {len(self._domain_names)}개 도메인 "
+                f"(built_at={data.get('built_at')})"
+            )
+            return self._domain_matrix is not None
+
+    def thresholds(self) -> Optional[tuple]:
+        """(min_score, min_margin, 출처) - 지정값 우선, 없으면 보정값, 둘 다 없으면 None"""
+        min_score = self.min_score if self.min_score is not None else self._calibration.get('min_score')
+        min_margin = self.min_margin if self.min_margin is not None else self._calibration.get('min_margin')
+        if min_score is None or min_margin is None:
+            return None
+        source = 'settings' if self.min_score is not None and self.min_margin is not None else 'calibration'
+        return min_score, min_margin, source
+
+    @property
+    def available(self) -> bool:
+        """센트로이드 사용 가능 여부"""
+        return self._load()
+
+    def route(self, query_vector: Sequence[float]) -> Optional[Dict[str, Any]]:
+        """
+        질의 벡터로 도메인 선택
+
+        Args:
+            query_vector: 정규화된 질의 임베딩
+
+        Returns:
+            {'domain', 'subdomain', 'score', 'margin', 'confident',
+             'ranked': [(도메인, 유사도), ...]} (센트로이드가 없으면 None)
+        """
+        if not self._load():
+            return None
+
+        query = _normalize(np.asarray(query_vector, dtype=np.float32))
+        matrix = self._domain_matrix
+        if matrix.shape[1] != query.shape[0]:
+            logger.warning(
+                f"센트로이드 차원({matrix.shape[1]})과 질의 차원({query.shape[0]}) 불일치, 라우팅 생략"
+            )
+            return None
+
+        scores = matrix @ query
+        order = np.argsort(-scores)
+        ranked = [(self._domain_names[i], round(float(scores[i]), 4)) for i in order]
+        best_domain, best_score = ranked[0]
+        margin = best_score - ranked[1][1] if len(ranked) > 1 else best_score
+
+        subdomain = None
+        if best_domain in self._subdomains:
+            names, sub_matrix = self._subdomains[best_domain]
+            subdomain = names[int(np.argmax(sub_matrix @ query))]
+
+        thresholds = self.thresholds()
+        return {
+            'domain': best_domain,
+            'subdomain': subdomain,
+            'score': best_score,
+            'margin': round(margin, 4),
+            'confident': (thresholds is not None
+                          and best_score >= thresholds[0] and margin >= thresholds[1]),
+            'thresholds': thresholds,
+            'ranked': ranked,
+        }
+
+
+_routers: Dict[str, DomainRouter] = {}
+_routers_lock = threading.Lock()
+
+
+def get_domain_router(collection_name: str, min_score: Optional[float] = None,
+                      min_margin: Optional[float] = None) -> DomainRouter:
+    """
+    컬렉션별 프로세스 공유 라우터 반환
+
+    Args:
+        collection_name: 컬렉션 이름
+        min_score: confident 판단 최소 코사인 유사도 (None이면 보정값)
+        min_margin: confident 판단 최소 1·2위 유사도 차이 (None이면 보정값)
+
+    Returns:
+        DomainRouter
+    """
+    with _routers_lock:
+        router = _routers.get(collection_name)
+        if router is None:
+            router = DomainRouter(collection_name, min_score, min_margin)
+            _routers[collection_name] = router
+        router.min_score = min_score
+        router.min_margin = min_margin
+        return router
@@ -0,0 +1,405 @@
+"""
+임베딩 백엔드
+KoE5 임베딩 모델을 실행하는 백엔드를 교체할 수 있도록 공통 인터페이스를 제공합니다.
+
+- torch: sentence-transformers(PyTorch) 원본 모델
+- onnx: ONNX Runtime으로 내보낸 모델 (선택적으로 동적 int8 양자화)
+        선택 의존성: pip install -r requirements-onnx.txt (onnxruntime, 내보내기용 onnx)
+
+백엔드는 환경변수로 선택합니다. 인덱싱 스크립트(embed_documents.py)가 Django 밖에서
+실행되므로 이 모듈은 Django 설정에 의존하지 않습니다.
+
+    EMBED_BACKEND        torch | onnx (기본값: torch)
+    EMBED_ONNX_DIR       내보낸 ONNX 모델 디렉토리 (기본값: backend/models/koe5-onnx)
+    EMBED_ONNX_QUANTIZE  true이면 int8 양자화 모델 사용 (기본값: true)
+    EMBED_ONNX_THREADS   ONNX Runtime intra-op 스레드 수 (0이면 런타임 기본값)
+"""
+
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL_NAME = "nlpai-lab/KoE5"
+
+# 기본 ONNX 모델 디렉토리: backend/models/koe5-onnx
+_DEFAULT_ONNX_DIR = Path(__file__).resolve().parent.parent.parent / 'models' / 'koe5-onnx'
+
+ONNX_MODEL_FILE = "model.onnx"
+ONNX_INT8_MODEL_FILE = "model.int8.onnx"
+ONNX_CONFIG_FILE = "embedder_config.json"
+
+# 패리티 검사 기준 (PyTorch 벡터와의 코사인 유사도)
+PARITY_MIN_COSINE = 0.99
+
+
+class EmbeddingBackend:
+    """
+    임베딩 백엔드 공통 인터페이스
+
+    SentenceTransformer.encode와 같은 호출 형태를 유지하므로
+    기존 코드(embedder.encode([query])[0].tolist() 등)를 그대로 사용할 수 있습니다.
+    """
+
+    name = "base"
+    model_name = DEFAULT_MODEL_NAME
+
+    def encode(self, sentences: Sequence[str], batch_size: int = 32,
+               show_progress_bar: bool = False, **kwargs: Any) -> np.ndarray:
+        """
+        문장 임베딩
+
+        Args:
+            sentences: 문장 리스트
+            batch_size: 배치 크기
+            show_progress_bar: 진행률 표시 여부
+
+        Returns:
+            (문장 수, 차원) float32 배열
+        """
+        raise NotImplementedError
+
+    def get_sentence_embedding_dimension(self) -> int:
+        """임베딩 차원 반환"""
+        raise NotImplementedError
+
+    def describe(self) -> Dict[str, Any]:
+        """백엔드 정보 (헬스체크/로그용)"""
+        return {'backend': self.name, 'model': self.model_name}
+
+
+class TorchEmbeddingBackend(EmbeddingBackend):
+    """sentence-transformers(PyTorch) 백엔드"""
+
+    name = "torch"
+
+    def __init__(self, model_name: str = DEFAULT_MODEL_NAME):
+        from sentence_transformers import SentenceTransformer
+
+        self.model_name = model_name
+        self.model = SentenceTransformer(model_name)
+
+    def encode(self, sentences: Sequence[str], batch_size: int = 32,
+               show_progress_bar: bool = False, **kwargs: Any) -> np.ndarray:
+        return self.model.encode(
+            list(sentences),
+            batch_size=batch_size,
+            show_progress_bar=show_progress_bar,
+            **kwargs
+        )
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.model.get_sentence_embedding_dimension()
+
+
+class OnnxEmbeddingBackend(EmbeddingBackend):
+    """
+    ONNX Runtime 백엔드
+
+    export_onnx()로 내보낸 디렉토리(토크나이저 + model.onnx/model.int8.onnx +
+    embedder_config.json)를 읽어 SentenceTransformer와 같은 풀링/정규화를 적용합니다.
+    """
+
+    name = "onnx"
+
+    def __init__(self, model_dir: Optional[str] = None, quantized: bool = True,
+                 num_threads: int = 0):
+        """
+        ONNX 백엔드 초기화
+
+        Args:
+            model_dir: export_onnx()로 내보낸 디렉토리
+            quantized: int8 양자화 모델 사용 여부
+            num_threads: intra-op 스레드 수 (0이면 런타임 기본값)
+        """
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        self.model_dir = Path(model_dir or _DEFAULT_ONNX_DIR)
+        config_path = self.model_dir / ONNX_CONFIG_FILE
+        if not config_path.exists():
+            raise FileNotFoundError(
+                f"ONNX 임베딩 모델이 없습니다: {self.model_dir} "
+                f"(scripts/embedding_benchmark.py --export 로 먼저 내보내세요)"
+            )
+
+        self.config = json.loads(config_path.read_text(encoding='utf-8'))
+        self.model_name = self.config.get('model_name', DEFAULT_MODEL_NAME)
+        self.pooling = self.config.get('pooling', 'mean')
+        self.normalize = self.config.get('normalize', True)
+        self.max_seq_length = self.config.get('max_seq_length', 512)
+        self.dimension = self.config.get('dimension', 1024)
+
+        model_file = ONNX_INT8_MODEL_FILE if quantized else ONNX_MODEL_FILE
+        model_path = self.model_dir / model_file
+        if not model_path.exists():
+            raise FileNotFoundError(f"ONNX 모델 파일이 없습니다: {model_path}")
+        self.quantized = quantized
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads > 0:
+            options.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(
+            str(model_path), sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        self._input_names = {i.name for i in self.session.get_inputs()}
+        self.tokenizer = AutoTokenizer.from_pretrained(str(self.model_dir))
+
+    def _pool(self, token_embeddings: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+        """토큰 임베딩 풀링 (SentenceTransformer Pooling 모듈과 동일)"""
+        if self.pooling == 'cls':
+            pooled = token_embeddings[:, 0]
+        else:
+            mask = attention_mask[..., None].astype(np.float32)
+            summed = (token_embeddings * mask).sum(axis=1)
+            counts = np.clip(mask.sum(axis=1), 1e-9, None)
+            pooled = summed / counts
+
+        if self.normalize:
+            norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+            pooled = pooled / np.clip(norms, 1e-12, None)
+        return pooled.astype(np.float32)
+
+    def encode(self, sentences: Sequence[str], batch_size: int = 32,
+               show_progress_bar: bool = False, **kwargs: Any) -> np.ndarray:
+        sentences = list(sentences)
+        if not sentences:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+
+        # 길이순으로 정렬해 배치 내 패딩을 줄이고, 결과는 원래 순서로 복원
+        order = np.argsort([-len(s) for s in sentences], kind='stable')
+        outputs: List[Optional[np.ndarray]] = [None] * len(sentences)
+
+        for start in range(0, len(sentences), batch_size):
+            batch_idx = order[start:start + batch_size]
+            batch = [sentences[i] for i in batch_idx]
+            encoded = self.tokenizer(
+                batch,
+                padding=True,
+                truncation=True,
+                max_length=self.max_seq_length,
+                return_tensors='np',
+            )
+            feeds = {
+                k: v.astype(np.int64) for k, v in encoded.items() if k in self._input_names
+            }
+            token_embeddings = self.session.run(None, feeds)[0]
+            pooled = self._pool(token_embeddings, encoded['attention_mask'])
+            for i, vec in zip(batch_idx, pooled):
+                outputs[i] = vec
+
+        return np.vstack(outputs)
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dimension
+
+    def describe(self) -> Dict[str, Any]:
+        info = super().describe()
+        info.update({'model_dir': str(self.model_dir), 'quantized': self.quantized})
+        return info
+
+
+def build_embedder(backend: Optional[str] = None, model_name: Optional[str] = None) -> EmbeddingBackend:
+    """
+    설정(환경변수)에 따라 임베딩 백엔드 생성
+
+    ONNX 백엔드를 사용할 수 없으면(모델 미내보내기, onnxruntime 미설치)
+    경고를 남기고 PyTorch 백엔드로 대체합니다.
+
+    Args:
+        backend: torch | onnx (기본값: EMBED_BACKEND)
+        model_name: 모델 이름 (기본값: HF_MODEL 또는 nlpai-lab/KoE5)
+
+    Returns:
+        임베딩 백엔드
+    """
+    backend = (backend or os.getenv('EMBED_BACKEND', 'torch')).lower()
+    model_name = model_name or os.getenv('HF_MODEL', DEFAULT_MODEL_NAME)
+
+    if backend == 'onnx':
+        try:
+            embedder = OnnxEmbeddingBackend(
+                model_dir=os.getenv('EMBED_ONNX_DIR') or None,
+                quantized=os.getenv('EMBED_ONNX_QUANTIZE', 'true').lower() == 'true',
+                num_threads=int(os.getenv('EMBED_ONNX_THREADS', 0)),
+            )
+            if embedder.model_name != model_name:
+                logger.warning(
+                    f"ONNX 모델({embedder.model_name})과 설정 모델({model_name})이 다릅니다"
+                )
+            logger.info(f"임베딩 백엔드: {embedder.describe()}")
+            return embedder
+        except (ImportError, FileNotFoundError) as e:
+            logger.warning(f"ONNX 임베딩 백엔드 사용 불가, PyTorch로 대체: {e}")
+    elif backend != 'torch':
+        logger.warning(f"알 수 없는 EMBED_BACKEND '{backend}', PyTorch 사용")
+
+    embedder = TorchEmbeddingBackend(model_name)
+    logger.info(f"임베딩 백엔드: {embedder.describe()}")
+    return embedder
+
+
+def export_onnx(model_name: str = DEFAULT_MODEL_NAME, output_dir: Optional[str] = None,
+                quantize: bool = True, opset: int = 17) -> Path:
+    """
+    SentenceTransformer 모델을 ONNX로 내보내기
+
+    트랜스포머 본체만 내보내고 풀링/정규화는 OnnxEmbeddingBackend에서 수행합니다.
+    KoE5(XLM-R large)는 fp32 가중치가 2GB를 넘으므로 외부 데이터 형식으로 저장합니다.
+
+    Args:
+        model_name: 원본 모델 이름
+        output_dir: 저장 디렉토리 (기본값: EMBED_ONNX_DIR 또는 backend/models/koe5-onnx)
+        quantize: 동적 int8 양자화 모델도 함께 생성할지 여부
+        opset: ONNX opset 버전
+
+    Returns:
+        저장 디렉토리 경로
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    # 양자화는 onnx 패키지가 필요하므로 긴 내보내기 전에 확인
+    if quantize:
+        try:
+            import onnx  # noqa: F401
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+        except ImportError as e:
+            raise ImportError(f"ONNX 양자화 의존성 없음 (pip install -r requirements-onnx.txt): {e}") from e
+
+    out = Path(output_dir or os.getenv('EMBED_ONNX_DIR') or _DEFAULT_ONNX_DIR)
+    out.mkdir(parents=True, exist_ok=True)
+
+    st_model = SentenceTransformer(model_name, device='cpu')
+    transformer = st_model[0].auto_model.eval()
+    tokenizer = st_model.tokenizer
+
+    # 풀링/정규화 구성 추출
+    pooling = 'mean'
+    normalize = False
+    for module in st_model:
+        module_type = type(module).__name__
+        if module_type == 'Pooling' and getattr(module, 'pooling_mode_cls_token', False):
+            pooling = 'cls'
+        elif module_type == 'Normalize':
+            normalize = True
+
+    dummy = tokenizer(["임베딩 내보내기 예시 문장"], return_tensors='pt')
+    input_names = [n for n in ('input_ids', 'attention_mask', 'token_type_ids') if n in dummy]
+    dynamic_axes = {n: {0: 'batch', 1: 'sequence'} for n in input_names}
+    dynamic_axes['last_hidden_state'] = {0: 'batch', 1: 'sequence'}
+
+    model_path = out / ONNX_MODEL_FILE
+    logger.info(f"ONNX 내보내기 시작: {model_name} -> {model_path}")
+    with torch.no_grad():
+        torch.onnx.export(
+            transformer,
+            tuple(dummy[n] for n in input_names),
+            str(model_path),
+            input_names=input_names,
+            output_names=['last_hidden_state'],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset,
+            do_constant_folding=True,
+        )
+
+    if quantize:
+        logger.info("동적 int8 양자화 중...")
+        quantize_dynamic(
+            str(model_path),
+            str(out / ONNX_INT8_MODEL_FILE),
+            weight_type=QuantType.QInt8,
+            use_external_data_format=True,
+        )
+
+    tokenizer.save_pretrained(str(out))
+    config = {
+        'model_name': model_name,
+        'pooling': pooling,
+        'normalize': normalize,
+        'max_seq_length': st_model.get_max_seq_length() or 512,
+        'dimension': st_model.get_sentence_embedding_dimension(),
+        'opset': opset,
+        'quantized_available': quantize,
+    }
+    (out / ONNX_CONFIG_FILE).write_text(
+        json.dumps(config, ensure_ascii=False, indent=2), encoding='utf-8'
+    )
+    logger.info(f"ONNX 내보내기 완료: {out}")
+    return out
+
+
+def check_parity(reference: EmbeddingBackend, candidate: EmbeddingBackend,
+                 sentences: Sequence[str], min_cosine: float = PARITY_MIN_COSINE) -> Dict[str, Any]:
+    """
+    두 백엔드의 출력 벡터 패리티 검사
+
+    Args:
+        reference: 기준 백엔드 (PyTorch)
+        candidate: 비교 백엔드 (ONNX)
+        sentences: 검사 문장
+        min_cosine: 허용 최소 코사인 유사도
+
+    Returns:
+        {'passed', 'min_cosine', 'mean_cosine', 'threshold', 'count'}
+    """
+    ref = np.asarray(reference.encode(sentences), dtype=np.float32)
+    cand = np.asarray(candidate.encode(sentences), dtype=np.float32)
+    ref = ref / np.clip(np.linalg.norm(ref, axis=1, keepdims=True), 1e-12, None)
+    cand = cand / np.clip(np.linalg.norm(cand, axis=1, keepdims=True), 1e-12, None)
+    cosines = (ref * cand).sum(axis=1)
+
+    return {
+        'passed': bool(cosines.min() >= min_cosine),
+        'min_cosine': float(cosines.min()),
+        'mean_cosine': float(cosines.mean()),
+        'threshold': min_cosine,
+        'count': len(sentences),
+    }
+
+
+def benchmark_backend(embedder: EmbeddingBackend, sentences: Sequence[str],
+                      batch_size: int = 32, repeats: int = 3) -> Dict[str, Any]:
+    """
+    단일 질의/배치 인코딩 지연시간과 처리량 측정
+
+    Args:
+        embedder: 측정할 백엔드
+        sentences: 측정 문장
+        batch_size: 배치 인코딩 크기
+        repeats: 배치 측정 반복 횟수
+
+    Returns:
+        단일 질의 p50/p95(ms)와 배치 처리량(문장/초)
+    """
+    sentences = list(sentences)
+    # 워밍업 (세션/스레드 풀 초기화)
+    embedder.encode(sentences[:1])
+
+    single_ms = []
+    for sentence in sentences:
+        started = time.perf_counter()
+        embedder.encode([sentence], batch_size=1)
+        single_ms.append((time.perf_counter() - started) * 1000)
+
+    batch_elapsed = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        embedder.encode(sentences, batch_size=batch_size)
+        batch_elapsed.append(time.perf_counter() - started)
+
+    best = min(batch_elapsed)
+    return {
+        **embedder.describe(),
+        'single_p50_ms': round(float(np.percentile(single_ms, 50)), 2),
+        'single_p95_ms': round(float(np.percentile(single_ms, 95)), 2),
+        'batch_size': batch_size,
+        'batch_sentences_per_sec': round(len(sentences) / best, 1) if best else 0.0,
+    }
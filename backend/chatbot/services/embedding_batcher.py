@@ -0,0 +1,209 @@
+"""
+마이크로 배칭 임베딩 실행기
+동시 요청의 질의 임베딩을 짧은 시간 모아 한 번의 배치로 인코딩합니다.
+
+요청 스레드마다 encode([query])를 배치 크기 1로 호출하면 트랜스포머의 배치 효율을
+살리지 못하고 torch intra-op 스레드를 서로 경합합니다. 워커 프로세스당 하나의 실행
+스레드가 최대 max_wait_ms 동안 요청을 모아 최대 max_batch_size 문장씩 인코딩하고,
+결과 벡터를 Future로 각 요청에 나눠 돌려줍니다.
+"""
+
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from django.conf import settings
+
+from .embedding_backends import EmbeddingBackend
+from .model_registry import get_embedder, get_registry
+
+logger = logging.getLogger(__name__)
+
+# 배치 결과 대기 최대 시간(초) - 실행 스레드 이상 시 요청이 무한 대기하지 않도록
+RESULT_TIMEOUT_SECONDS = 60
+
+
+class MicroBatchEmbedder(EmbeddingBackend):
+    """
+    마이크로 배칭 임베딩 래퍼
+
+    EmbeddingBackend와 같은 encode 인터페이스를 제공하므로 기존 임베더 자리에
+    그대로 사용할 수 있습니다. 한 번에 max_batch_size보다 많은 문장을 요청하거나
+    추가 인코딩 옵션을 넘기면 배칭 없이 백엔드를 직접 호출합니다.
+    """
+
+    def __init__(self, backend: EmbeddingBackend, max_batch_size: int = 32,
+                 max_wait_ms: float = 5.0):
+        """
+        실행기 초기화
+
+        Args:
+            backend: 실제 인코딩을 수행할 임베딩 백엔드
+            max_batch_size: 한 배치의 최대 문장 수
+            max_wait_ms: 첫 요청 이후 추가 요청을 기다리는 최대 시간(ms)
+        """
+        self.backend = backend
+        self.name = backend.name
+        self.model_name = backend.model_name
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+
+        self._lock = threading.Lock()
+        self._pid: Optional[int] = None
+        self._queue: "queue.Queue[Tuple[List[str], Future]]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+
+        # 통계
+        self.requests = 0
+        self.batches = 0
+        self.sentences = 0
+        self.max_observed_batch = 0
+
+    def _ensure_worker(self) -> None:
+        """실행 스레드 시작 (fork 이후 자식 프로세스에서는 새로 시작)"""
+        pid = os.getpid()
+        if self._worker is not None and self._pid == pid and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is not None and self._pid == pid and self._worker.is_alive():
+                return
+            # fork로 복사된 큐/스레드 상태는 사용할 수 없으므로 새로 만든다
+            self._pid = pid
+            self._queue = queue.Queue()
+            self._worker = threading.Thread(
+                target=self._run, name="embedding-batcher", daemon=True
+            )
+            self._worker.start()
+            logger.info(
+                f"임베딩 마이크로 배칭 시작 (pid={pid}, max_batch={self.max_batch_size}, "
+                f"max_wait={self.max_wait * 1000:.1f}ms)"
+            )
+
+    def _collect(self) -> List[Tuple[List[str], Future]]:
+        """첫 요청을 기다린 뒤 max_wait 동안 배치 크기까지 요청 수집"""
+        first = self._queue.get()
+        pending = [first]
+        size = len(first[0])
+        deadline = time.monotonic() + self.max_wait
+
+        while size < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            pending.append(item)
+            size += len(item[0])
+        return pending
+
+    def _run(self) -> None:
+        """실행 스레드 루프"""
+        while True:
+            pending = self._collect()
+            texts = [text for sentences, _ in pending for text in sentences]
+            try:
+                vectors = np.asarray(
+                    self.backend.encode(texts, batch_size=len(texts), show_progress_bar=False)
+                )
+            except Exception as e:
+                logger.error(f"배치 임베딩 실패 ({len(texts)}문장): {e}")
+                for _, future in pending:
+                    future.set_exception(e)
+                continue
+
+            offset = 0
+            for sentences, future in pending:
+                future.set_result(vectors[offset:offset + len(sentences)])
+                offset += len(sentences)
+
+            with self._lock:
+                self.batches += 1
+                self.requests += len(pending)
+                self.sentences += len(texts)
+                self.max_observed_batch = max(self.max_observed_batch, len(texts))
+
+    def submit(self, sentences: Sequence[str]) -> Future:
+        """
+        인코딩 요청 제출
+
+        Args:
+            sentences: 문장 리스트
+
+        Returns:
+            (문장 수, 차원) 배열을 결과로 갖는 Future
+        """
+        self._ensure_worker()
+        future: Future = Future()
+        self._queue.put((list(sentences), future))
+        return future
+
+    def encode(self, sentences: Sequence[str], batch_size: int = 32,
+               show_progress_bar: bool = False, **kwargs: Any) -> np.ndarray:
+        sentences = list(sentences)
+        if kwargs or not sentences or len(sentences) > self.max_batch_size:
+            # 대량 인코딩/특수 옵션은 배칭 없이 직접 처리
+            return self.backend.encode(
+                sentences, batch_size=batch_size, show_progress_bar=show_progress_bar, **kwargs
+            )
+        return self.submit(sentences).result(timeout=RESULT_TIMEOUT_SECONDS)
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.backend.get_sentence_embedding_dimension()
+
+    def describe(self) -> Dict[str, Any]:
+        info = self.backend.describe()
+        info.update({'micro_batching': True, 'max_batch_size': self.max_batch_size})
+        return info
+
+    def stats(self) -> Dict[str, Any]:
+        """배칭 통계 반환"""
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'batches': self.batches,
+                'sentences': self.sentences,
+                'avg_batch_size': round(self.sentences / self.batches, 2) if self.batches else 0.0,
+                'max_observed_batch': self.max_observed_batch,
+                'max_batch_size': self.max_batch_size,
+                'max_wait_ms': self.max_wait * 1000,
+            }
+
+
+# 모델 레지스트리 키
+QUERY_EMBEDDER_KEY = "query_embedder"
+
+
+def _build_query_embedder() -> EmbeddingBackend:
+    """공유 임베딩 백엔드를 (설정 시) 마이크로 배칭 실행기로 감싸기"""
+    backend = get_embedder()
+    if not getattr(settings, 'EMBED_MICRO_BATCHING', True):
+        return backend
+    return MicroBatchEmbedder(
+        backend,
+        max_batch_size=getattr(settings, 'EMBED_BATCH_MAX_SIZE', 32),
+        max_wait_ms=getattr(settings, 'EMBED_BATCH_MAX_WAIT_MS', 5.0),
+    )
+
+
+def get_query_embedder() -> EmbeddingBackend:
+    """
+    질의용 공유 임베더 반환 (최초 호출 시 모델 레지스트리에서 로딩)
+
+    EMBED_MICRO_BATCHING이 켜져 있으면 마이크로 배칭 실행기로 감싸서 반환합니다.
+    """
+    return get_registry().get(QUERY_EMBEDDER_KEY, _build_query_embedder)
+
+
+def get_batcher_stats() -> Optional[Dict[str, Any]]:
+    """마이크로 배칭 통계 (배칭 미사용/미초기화 시 None)"""
+    embedder = get_registry().peek(QUERY_EMBEDDER_KEY)
+    if isinstance(embedder, MicroBatchEmbedder):
+        return embedder.stats()
+    return None
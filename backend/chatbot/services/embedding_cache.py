@@ -0,0 +1,324 @@
+"""
+내용 주소 기반 디스크 임베딩 캐시
+재인덱싱 중 상당수는 도메인 분류, recency_score, 서식 토픽/동의어 같은 payload만
+바뀌고 청크 텍스트는 그대로입니다. sha256(모델 식별자 + 정규화한 청크 텍스트)를 키로
+벡터를 디스크에 남겨 두면 이런 재인덱싱은 모델 호출 없이 읽기만으로 끝납니다.
+
+저장 구조 (모델 식별자별 디렉토리):
+    vectors.f16  float16 벡터를 행 단위로 이어 붙인 append-only 파일 (np.memmap으로 읽음)
+    keys.bin     32바이트 sha256 키를 같은 순서로 이어 붙인 파일 (키의 위치 = 벡터 행 번호)
+    meta.json    모델 식별자/차원
+
+쓰기는 벡터 → 키 순서로 하므로 키가 있는 행은 항상 벡터가 완전히 기록되어 있습니다.
+중간에 끊겨 키 없이 남은 벡터 꼬리는 다음에 열 때 잘라냅니다.
+
+인덱서에서 사용하므로 Django 설정에 의존하지 않습니다.
+
+    EMBED_CACHE_ENABLED  false이면 캐시 미사용 (기본값: true)
+    EMBED_CACHE_DIR      캐시 루트 디렉토리 (기본값: <인덱스 상태 디렉토리>/embedding_cache)
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import unicodedata
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .index_state import index_state_dir
+
+try:
+    import fcntl
+except ImportError:  # Windows: 프로세스 간 잠금 없이 동작
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+KEY_SIZE = 32
+VECTORS_FILE = "vectors.f16"
+KEYS_FILE = "keys.bin"
+META_FILE = "meta.json"
+LOCK_FILE = ".lock"
+
+_DTYPE = np.dtype('<f2')
+
+
+def normalize_text(text: str) -> str:
+    """
+    캐시 키용 텍스트 정규화 (NFC + 공백 연속 축약)
+
+    KoE5(XLM-R sentencepiece) 토크나이저도 연속 공백을 하나로 취급하므로
+    공백만 다른 청크는 같은 벡터를 갖습니다.
+    """
+    return ' '.join(unicodedata.normalize('NFC', text).split())
+
+
+def embedder_model_id(embedder) -> str:
+    """
+    임베더의 캐시 식별자 (백엔드 + 모델 + 양자화 여부)
+
+    같은 모델이라도 ONNX int8 양자화 벡터는 PyTorch 벡터와 다르므로 구분합니다.
+    """
+    info = embedder.describe() if hasattr(embedder, 'describe') else {}
+    backend = info.get('backend', getattr(embedder, 'name', 'unknown'))
+    model = info.get('model', getattr(embedder, 'model_name', 'unknown'))
+    model_id = f"{backend}:{model}"
+    if info.get('quantized'):
+        model_id += ":int8"
+    return model_id
+
+
+def cache_key(model_id: str, text: str) -> bytes:
+    """sha256(모델 식별자 + 정규화 텍스트) 키"""
+    digest = hashlib.sha256(model_id.encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(normalize_text(text).encode('utf-8'))
+    return digest.digest()
+
+
+def default_cache_root() -> Path:
+    """캐시 루트 디렉토리 (EMBED_CACHE_DIR, 기본값: 상태 디렉토리 하위 embedding_cache)"""
+    configured = os.getenv('EMBED_CACHE_DIR')
+    return Path(configured) if configured else index_state_dir() / 'embedding_cache'
+
+
+class EmbeddingCache:
+    """
+    모델별 append-only float16 임베딩 캐시
+
+    사용법:
+        cache = EmbeddingCache(model_id, dim)
+        vectors = cache.get_many(keys)      # 없는 키는 None
+        cache.put_many(miss_keys, miss_vectors)
+    """
+
+    def __init__(self, model_id: str, dim: int, root: Optional[Path] = None):
+        """
+        캐시 열기 (없으면 생성)
+
+        Args:
+            model_id: 임베더 식별자 (embedder_model_id)
+            dim: 임베딩 차원
+            root: 캐시 루트 디렉토리 (기본값: default_cache_root())
+        """
+        self.model_id = model_id
+        self.dim = dim
+        slug = re.sub(r'[^0-9A-Za-z._-]+', '_', model_id).strip('_')
+        suffix = hashlib.sha256(f"{model_id}:{dim}".encode('utf-8')).hexdigest()[:8]
+        self.path = Path(root or default_cache_root()) / f"{slug}-{dim}-{suffix}"
+        self.path.mkdir(parents=True, exist_ok=True)
+
+        self._row_bytes = dim * _DTYPE.itemsize
+        self._lock = threading.Lock()
+        self._index: Dict[bytes, int] = {}
+        self._rows = 0
+        self._mmap: Optional[np.memmap] = None
+        self._mmap_rows = 0
+
+        # 통계
+        self.hits = 0
+        self.misses = 0
+
+        with self._file_lock():
+            self._write_meta()
+            self._repair()
+            self._read_new_keys()
+
+    # ---- 파일 ----
+
+    @property
+    def vectors_path(self) -> Path:
+        return self.path / VECTORS_FILE
+
+    @property
+    def keys_path(self) -> Path:
+        return self.path / KEYS_FILE
+
+    @contextmanager
+    def _file_lock(self):
+        """프로세스 간 쓰기 잠금 (웹 워커의 문서 추가와 인덱서가 동시에 쓰는 경우)"""
+        with open(self.path / LOCK_FILE, 'a') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _write_meta(self) -> None:
+        meta_path = self.path / META_FILE
+        if not meta_path.exists():
+            meta_path.write_text(json.dumps(
+                {'model_id': self.model_id, 'dim': self.dim, 'dtype': 'float16'}, ensure_ascii=False
+            ), encoding='utf-8')
+
+    def _size(self, path: Path) -> int:
+        try:
+            return path.stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    def _repair(self) -> None:
+        """중단된 쓰기로 어긋난 두 파일의 길이를 맞춤 (잠금 안에서 호출)"""
+        key_rows = self._size(self.keys_path) // KEY_SIZE
+        vector_rows = self._size(self.vectors_path) // self._row_bytes
+        rows = min(key_rows, vector_rows)
+        if self._size(self.keys_path) != rows * KEY_SIZE:
+            with open(self.keys_path, 'ab') as f:
+                f.truncate(rows * KEY_SIZE)
+        if self._size(self.vectors_path) != rows * self._row_bytes:
+            logger.warning(f"임베딩 캐시 꼬리 정리: {self.path} ({rows}행)")
+            with open(self.vectors_path, 'ab') as f:
+                f.truncate(rows * self._row_bytes)
+
+    def _read_new_keys(self) -> None:
+        """다른 프로세스가 추가한 키까지 인덱스에 반영"""
+        total = self._size(self.keys_path) // KEY_SIZE
+        if total <= self._rows:
+            return
+        with open(self.keys_path, 'rb') as f:
+            f.seek(self._rows * KEY_SIZE)
+            data = f.read((total - self._rows) * KEY_SIZE)
+        for i in range(len(data) // KEY_SIZE):
+            self._index.setdefault(data[i * KEY_SIZE:(i + 1) * KEY_SIZE], self._rows + i)
+        self._rows += len(data) // KEY_SIZE
+
+    def _matrix(self) -> np.memmap:
+        """현재 행 수만큼 매핑한 읽기 전용 memmap (파일이 늘어나면 다시 매핑)"""
+        if self._mmap is None or self._mmap_rows != self._rows:
+            self._mmap = np.memmap(self.vectors_path, dtype=_DTYPE, mode='r', shape=(self._rows, self.dim))
+            self._mmap_rows = self._rows
+        return self._mmap
+
+    # ---- 조회/추가 ----
+
+    def __len__(self) -> int:
+        return self._rows
+
+    def get_many(self, keys: Sequence[bytes]) -> List[Optional[np.ndarray]]:
+        """
+        키 목록 조회
+
+        Args:
+            keys: cache_key 결과 목록
+
+        Returns:
+            키 순서대로 float32 벡터 (없으면 None)
+        """
+        with self._lock:
+            self._read_new_keys()
+            rows = [self._index.get(key) for key in keys]
+            found = [i for i, row in enumerate(rows) if row is not None]
+            results: List[Optional[np.ndarray]] = [None] * len(keys)
+            if found:
+                matrix = self._matrix()
+                vectors = np.asarray(matrix[[rows[i] for i in found]], dtype=np.float32)
+                for i, vector in zip(found, vectors):
+                    results[i] = vector
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return results
+
+    def put_many(self, keys: Sequence[bytes], vectors: np.ndarray) -> None:
+        """
+        새 벡터 추가 (이미 있는 키는 건너뜀)
+
+        Args:
+            keys: cache_key 결과 목록
+            vectors: (키 수, dim) 벡터
+        """
+        vectors = np.asarray(vectors)
+        if len(keys) != len(vectors):
+            raise ValueError(f"키 수({len(keys)})와 벡터 수({len(vectors)})가 다릅니다")
+        if len(keys) and vectors.shape[1] != self.dim:
+            raise ValueError(f"캐시 차원({self.dim})과 벡터 차원({vectors.shape[1]})이 다릅니다")
+
+        with self._lock, self._file_lock():
+            self._read_new_keys()
+            new_keys: List[bytes] = []
+            new_rows: List[int] = []
+            seen = set()
+            for i, key in enumerate(keys):
+                if key in self._index or key in seen:
+                    continue
+                seen.add(key)
+                new_keys.append(key)
+                new_rows.append(i)
+            if not new_keys:
+                return
+
+            # 벡터를 먼저 기록해야 키가 보이는 순간 읽을 수 있음
+            with open(self.vectors_path, 'ab') as f:
+                f.write(np.ascontiguousarray(vectors[new_rows], dtype=_DTYPE).tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            with open(self.keys_path, 'ab') as f:
+                f.write(b''.join(new_keys))
+            self._read_new_keys()
+
+    def stats(self) -> Dict[str, Any]:
+        """캐시 통계 (이 프로세스의 조회 적중률 포함)"""
+        lookups = self.hits + self.misses
+        return {
+            'path': str(self.path),
+            'rows': self._rows,
+            'size_mb': round(self._rows * self._row_bytes / (1024 * 1024), 1),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+def to_cached_precision(vectors: np.ndarray) -> np.ndarray:
+    """
+    float16 저장 정밀도로 반올림한 float32 벡터
+
+    새로 인코딩한 벡터도 캐시에서 읽은 벡터와 같은 값으로 업서트하여
+    캐시 적중 여부와 관계없이 같은 입력이면 같은 포인트가 만들어지도록 합니다.
+    """
+    return np.asarray(vectors, dtype=np.float32).astype(_DTYPE).astype(np.float32)
+
+
+def cache_enabled() -> bool:
+    """EMBED_CACHE_ENABLED 환경변수 (기본값: true)"""
+    return os.getenv('EMBED_CACHE_ENABLED', 'true').lower() == 'true'
+
+
+_caches: Dict[tuple, EmbeddingCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_embedding_cache(embedder) -> Optional[EmbeddingCache]:
+    """
+    임베더에 맞는 프로세스 공유 캐시 반환
+
+    Args:
+        embedder: 임베딩 백엔드
+
+    Returns:
+        EmbeddingCache (비활성화되었거나 열 수 없으면 None)
+    """
+    if not cache_enabled():
+        return None
+    try:
+        model_id = embedder_model_id(embedder)
+        dim = int(embedder.get_sentence_embedding_dimension())
+        root = default_cache_root()
+        key = (str(root), model_id, dim)
+        with _caches_lock:
+            cache = _caches.get(key)
+            if cache is None:
+                cache = EmbeddingCache(model_id, dim, root)
+                _caches[key] = cache
+                logger.info(f"임베딩 캐시 열기: {cache.path} ({len(cache)}행)")
+            return cache
+    except Exception as e:
+        logger.warning(f"임베딩 캐시를 열 수 없어 캐시 없이 인코딩합니다: {e}")
+        return None
@@ -0,0 +1,235 @@
+"""
+길이 버킷 기반 코퍼스 임베딩 큐
+인덱서가 페이지마다 encode(chunks)를 호출하면 배치가 작고 길이가 제각각이라
+패딩 낭비가 큽니다. 페이지/문서 경계와 관계없이 청크를 전역 버퍼에 모았다가
+길이순으로 정렬해 비슷한 길이끼리 큰 고정 크기 배치로 인코딩하고,
+각 벡터를 넣을 때 함께 받은 항목(포인트 ID/payload 등)에 다시 연결해 돌려줍니다.
+디스크 임베딩 캐시(embedding_cache)에 있는 청크는 인코딩하지 않고 읽어 옵니다.
+
+인덱서에서 사용하므로 Django 설정에 의존하지 않습니다.
+"""
+
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .embedding_backends import EmbeddingBackend
+from .embedding_cache import EmbeddingCache, cache_key, get_embedding_cache, to_cached_precision
+
+logger = logging.getLogger(__name__)
+
+# cache 인자를 생략했을 때 환경변수 설정에 따라 캐시를 여는 표시
+_DEFAULT_CACHE = object()
+
+
+class EncodeError(RuntimeError):
+    """
+    버퍼 인코딩 실패
+
+    버퍼는 여러 문서의 항목을 함께 담고 있고 실패한 flush의 항목은 버려지므로,
+    호출측이 해당 항목의 출처를 모두 실패로 처리할 수 있도록 items를 함께 전달합니다.
+    """
+
+    def __init__(self, items: List[Any], error: Exception):
+        super().__init__(str(error))
+        self.items = items
+        self.error = error
+
+
+class BucketedEncoder:
+    """
+    전역 버퍼 + 길이 버킷 배치 인코더
+
+    사용법:
+        encoder = BucketedEncoder(embedder)
+        for text, item in ...:
+            for item, vector in encoder.add(text, item):
+                ...  # 벡터가 준비된 항목 처리
+        for item, vector in encoder.flush():
+            ...
+    """
+
+    def __init__(self, embedder: EmbeddingBackend, batch_size: Optional[int] = None,
+                 buffer_size: Optional[int] = None, cache: Any = _DEFAULT_CACHE):
+        """
+        인코더 초기화
+
+        Args:
+            embedder: 임베딩 백엔드
+            batch_size: 한 번에 인코딩할 문장 수 (기본값: EMBED_INDEX_BATCH_SIZE 또는 128)
+            buffer_size: 정렬/인코딩 전 모아 둘 문장 수 (기본값: EMBED_INDEX_BUFFER 또는 batch_size × 8)
+            cache: 디스크 임베딩 캐시 (기본값: get_embedding_cache(embedder), None이면 미사용)
+        """
+        self.embedder = embedder
+        self.cache: Optional[EmbeddingCache] = (
+            get_embedding_cache(embedder) if cache is _DEFAULT_CACHE else cache
+        )
+        self._model_id = self.cache.model_id if self.cache is not None else ''
+
+        self.batch_size = max(1, batch_size or int(os.getenv('EMBED_INDEX_BATCH_SIZE', 128)))
+        self.buffer_size = max(
+            self.batch_size,
+            buffer_size or int(os.getenv('EMBED_INDEX_BUFFER', 0)) or self.batch_size * 8,
+        )
+        self._texts: List[str] = []
+        self._items: List[Any] = []
+
+        # 통계
+        self.chunks = 0
+        self.encoded = 0
+        self.cache_hits = 0
+        self.batches = 0
+        self.encode_seconds = 0.0
+        self.started_at = time.perf_counter()
+
+    def add(self, text: str, item: Any) -> List[Tuple[Any, Any]]:
+        """
+        문장 추가 (버퍼가 차면 인코딩)
+
+        Args:
+            text: 인코딩할 문장
+            item: 벡터와 함께 돌려받을 항목
+
+        Returns:
+            인코딩이 끝난 (항목, 벡터) 리스트 (버퍼가 차지 않았으면 빈 리스트)
+
+        Raises:
+            EncodeError: 버퍼 인코딩 실패 (버퍼의 모든 항목 포함)
+        """
+        self._texts.append(text)
+        self._items.append(item)
+        if len(self._texts) >= self.buffer_size:
+            return self.flush()
+        return []
+
+    def flush(self) -> List[Tuple[Any, Any]]:
+        """
+        버퍼의 모든 문장을 캐시 조회 후 나머지만 길이순 배치로 인코딩하여 (항목, 벡터) 반환
+
+        Raises:
+            EncodeError: 인코딩 실패 (버퍼는 비워지고 버려진 항목 전체가 예외에 담김)
+        """
+        if not self._texts:
+            return []
+        texts, items = self._texts, self._items
+        self._texts, self._items = [], []
+        try:
+            return self._encode(texts, items)
+        except Exception as e:
+            raise EncodeError(items, e) from e
+
+    def _encode(self, texts: List[str], items: List[Any]) -> List[Tuple[Any, Any]]:
+
+        vectors: List[Optional[Any]] = [None] * len(texts)
+        keys: List[bytes] = []
+        if self.cache is not None:
+            keys = [cache_key(self._model_id, text) for text in texts]
+            vectors = self.cache.get_many(keys)
+            self.cache_hits += sum(1 for vector in vectors if vector is not None)
+
+        # 캐시에 없는 문장만 인코딩 (버퍼 안의 중복 청크는 한 번만)
+        first_index: Dict[Any, int] = {}
+        pending: List[int] = []
+        for i, vector in enumerate(vectors):
+            if vector is not None:
+                continue
+            dedup_key = keys[i] if keys else texts[i]
+            if dedup_key not in first_index:
+                first_index[dedup_key] = i
+                pending.append(i)
+
+        order = sorted(pending, key=lambda i: len(texts[i]))
+        for start in range(0, len(order), self.batch_size):
+            bucket = order[start:start + self.batch_size]
+            started = time.perf_counter()
+            encoded = self.embedder.encode(
+                [texts[i] for i in bucket], batch_size=len(bucket), show_progress_bar=False
+            )
+            self.encode_seconds += time.perf_counter() - started
+            self.batches += 1
+            if self.cache is not None:
+                encoded = to_cached_precision(encoded)
+                self.cache.put_many([keys[i] for i in bucket], encoded)
+            for i, vector in zip(bucket, encoded):
+                vectors[i] = vector
+        self.encoded += len(pending)
+
+        for i, vector in enumerate(vectors):
+            if vector is None:
+                vectors[i] = vectors[first_index[keys[i] if keys else texts[i]]]
+
+        self.chunks += len(texts)
+        return list(zip(items, vectors))
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        처리량 통계
+
+        chunks/sec는 실제로 인코딩한 청크의 인코딩 시간 기준과 전체 청크의 경과 시간 기준이며,
+        cache_hit_rate는 전체 청크 중 디스크 캐시에서 읽은 비율입니다.
+        """
+        wall = time.perf_counter() - self.started_at
+        return {
+            'chunks': self.chunks,
+            'encoded': self.encoded,
+            'cache_hits': self.cache_hits,
+            'cache_hit_rate': round(self.cache_hits / self.chunks, 4) if self.chunks else 0.0,
+            'batches': self.batches,
+            'avg_batch_size': round(self.encoded / self.batches, 1) if self.batches else 0.0,
+            'encode_seconds': round(self.encode_seconds, 2),
+            'encode_chunks_per_sec': round(self.encoded / self.encode_seconds, 1) if self.encode_seconds else 0.0,
+            'wall_seconds': round(wall, 2),
+            'wall_chunks_per_sec': round(self.chunks / wall, 1) if wall else 0.0,
+        }
+
+
+def compare_batching(embedder: EmbeddingBackend, pages: Sequence[Sequence[str]],
+                     per_page_batch_size: int = 32, batch_size: Optional[int] = None) -> Dict[str, Any]:
+    """
+    페이지 단위 인코딩(기존 방식)과 길이 버킷 전역 배치 인코딩의 처리량 비교
+
+    Args:
+        embedder: 임베딩 백엔드
+        pages: 페이지별 청크 리스트
+        per_page_batch_size: 기존 방식의 encode batch_size
+        batch_size: 버킷 배치 크기
+
+    Returns:
+        {'chunks', 'per_page': {...}, 'bucketed': {...}, 'speedup'}
+    """
+    pages = [list(chunks) for chunks in pages if chunks]
+    total = sum(len(chunks) for chunks in pages)
+    embedder.encode(pages[0][:1])  # 워밍업
+
+    started = time.perf_counter()
+    calls = 0
+    for chunks in pages:
+        embedder.encode(chunks, batch_size=per_page_batch_size, show_progress_bar=False)
+        calls += 1
+    per_page_seconds = time.perf_counter() - started
+
+    encoder = BucketedEncoder(embedder, batch_size=batch_size, buffer_size=total, cache=None)
+    started = time.perf_counter()
+    for chunks in pages:
+        for chunk in chunks:
+            encoder.add(chunk, None)
+    encoder.flush()
+    bucketed_seconds = time.perf_counter() - started
+
+    return {
+        'chunks': total,
+        'per_page': {
+            'encode_calls': calls,
+            'avg_batch_size': round(total / calls, 1) if calls else 0.0,
+            'seconds': round(per_page_seconds, 2),
+            'chunks_per_sec': round(total / per_page_seconds, 1) if per_page_seconds else 0.0,
+        },
+        'bucketed': {
+            'encode_calls': encoder.batches,
+            'avg_batch_size': round(total / encoder.batches, 1) if encoder.batches else 0.0,
+            'seconds': round(bucketed_seconds, 2),
+            'chunks_per_sec': round(total / bucketed_seconds, 1) if bucketed_seconds else 0.0,
+        },
+        'speedup': round(per_page_seconds / bucketed_seconds, 2) if bucketed_seconds else 0.0,
+    }
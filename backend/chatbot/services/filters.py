@@ -6,33 +6,9 @@
 from typing import List, Dict, Any, Optional
 import re
 
-# 도메인 분류 키워드 (새로운 메타데이터 구조에 맞게 업데이트)
-DOMAIN_KEYWORDS = {
-    '인사관리': [
-        '인사', '급여', '채용', '복무', '교육', '훈련', '휴가', '연차', '출장', 
-        '육아휴직', '성과평가', '승진', '이동', '퇴직', '연금', '복리후생'
-    ],
-    '재무관리': [
-        '회계', '예산', '감사', '재정', '계약', '수수료', '자산', '장부', 
-        '감사인', '계약사무', '비유동자산', '재무제표', '세무', '부채'
-    ],
-    '보안관리': [
-        '보안', '정보보호', '정보보안', '개인정보', '민원', '신고', '보안정책',
-        '접근통제', '암호화', '백업', '복구', '침해대응', '보안사고'
-    ],
-    '기술관리': [
-        '기술', 'IT', '정보화', '전자서명', '시스템', '소프트웨어', '하드웨어',
-        '네트워크', '데이터베이스', '클라우드', 'AI', '빅데이터', '블록체인'
-    ],
-    '행정관리': [
-        '문서', '자료', '기록', '홍보', '문서관리', '자료관리', '기록물',
-        '보존', '폐기', '이관', '공개', '비공개', '기밀'
-    ],
-    '경영관리': [
-        '경영', '성과', '내부통제', '조직', '직제', '이해충돌', '윤리',
-        '지속가능', 'ESG', '리스크', '품질', '혁신', '전략'
-    ]
-}
+# 도메인 분류 키워드는 constants에서 관리하고, 매칭은 matcher의 공유 오토마톤 사용
+from .constants import DOMAIN_KEYWORDS
+from .matcher import match_keywords, match_text
 
 def guess_domains_from_keywords(keywords: List[str]) -> List[str]:
     """
@@ -47,21 +23,8 @@ def guess_domains_from_keywords(keywords: List[str]) -> List[str]:
     if not keywords:
         return []
     
-    domain_scores = {}
-    
-    for keyword in keywords:
-        keyword_lower = keyword.lower()
-        
-        for domain, domain_keywords in DOMAIN_KEYWORDS.items():
-            for domain_keyword in domain_keywords:
-                if domain_keyword in keyword_lower:
-                    domain_scores[domain] = domain_scores.get(domain, 0) + 1
-    
-    # 점수 순으로 정렬
-    sorted_domains = sorted(domain_scores.items(), key=lambda x: x[1], reverse=True)
-    
-    # 점수가 0보다 큰 도메인만 반환
-    return [domain for domain, score in sorted_domains if score > 0]
+    # 키워드 전체를 한 번에 스캔해 가중치 점수 순으로 정렬
+    return match_keywords(keywords).ranked_domains()
 
 def get_domain_keywords(domain: str) -> List[str]:
     """
@@ -146,7 +109,7 @@ def build_advanced_filter(query: str,
     Returns:
         고급 필터 딕셔너리
     """
-    query_lower = query.lower()
+    query_match = match_text(query)
     
     # 1. 도메인 기반 필터
     domain_filter = None
@@ -159,25 +122,16 @@ def build_advanced_filter(query: str,
     
     # 2. 문서 타입 기반 필터
     type_filter = None
-    doc_type_patterns = {
-        '정관': ['정관', '기본법', '조직법'],
-        '규정': ['규정', '운영규정', '관리규정'],
-        '규칙': ['규칙', '세부규칙', '실행규칙'],
-        '지침': ['지침', '업무지침', '운영지침']
-    }
-    
-    for doc_type, keywords in doc_type_patterns.items():
-        if any(keyword in query_lower for keyword in keywords):
-            type_filter = {
-                "key": "document_type",
-                "match": {"value": doc_type}
-            }
-            break
+    doc_type = query_match.top_doc_type()
+    if doc_type:
+        type_filter = {
+            "key": "document_type",
+            "match": {"value": doc_type}
+        }
     
     # 3. 최신성 기반 필터
     recency_filter = None
-    recency_keywords = ['최신', '최근', '새로운', '업데이트', '변경', '수정']
-    if any(keyword in query_lower for keyword in recency_keywords):
+    if query_match.recency:
         recency_filter = {
             "key": "recency_score",
             "range": {"gte": 2}  # 최신성 점수 2 이상
@@ -253,21 +207,11 @@ def suggest_filters(query: str, keywords: List[str]) -> Dict[str, Any]:
         suggestions['confidence'] = 'medium' if len(estimated_domains) == 1 else 'low'
     
     # 문서 타입 제안
-    query_lower = query.lower()
-    doc_type_keywords = {
-        '정관': ['정관', '기본법', '조직법'],
-        '규정': ['규정', '운영규정', '관리규정'],
-        '규칙': ['규칙', '세부규칙', '실행규칙'],
-        '지침': ['지침', '업무지침', '운영지침']
-    }
-    
-    for doc_type, type_keywords in doc_type_keywords.items():
-        if any(keyword in query_lower for keyword in type_keywords):
-            suggestions['file_types'].append(doc_type)
+    query_match = match_text(query)
+    suggestions['file_types'].extend(query_match.ranked_doc_types())
     
     # 최신성 제안
-    recency_keywords = ['최신', '최근', '새로운', '업데이트', '변경', '수정']
-    if any(keyword in query_lower for keyword in recency_keywords):
+    if query_match.recency:
         suggestions['recency'] = 2
     
     # 연도 범위 제안 (키워드에서 연도 추출)
@@ -0,0 +1,294 @@
+"""
+메모리 서식 카탈로그
+서식은 수백 개뿐이므로 컬렉션의 서식 포인트(doc_type=form) payload를 한 번 읽어
+제목/토픽/동의어의 문자 2-gram 역색인을 메모리에 만들어 둡니다.
+
+    - "휴가신청서 양식 주세요"처럼 서식 이름을 (거의) 그대로 말하는 요청은 Qdrant 검색 없이 응답
+    - 채팅 입력창 서식 이름 자동완성 (토큰 경계 접두어 → 부족하면 2-gram 유사 매칭)
+
+한국어는 띄어쓰기/밑줄이 제각각이라 소문자 + 공백/기호 제거로 정규화한 뒤 비교합니다.
+카탈로그는 컬렉션 버전 마커가 바뀌면(인덱서가 쓰면) 다음 조회 때 다시 만듭니다.
+Django 설정에 의존하지 않습니다.
+"""
+
+import bisect
+import logging
+import re
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .index_state import get_collection_version
+
+logger = logging.getLogger(__name__)
+
+# 카탈로그 로딩 시 scroll 페이지 크기
+SCROLL_BATCH_SIZE = 256
+
+# 필드별 가중치 (토픽/동의어는 도메인 공통 키워드가 섞여 있어 완전 일치해도 제목 일치보다 낮게)
+FIELD_WEIGHTS = {'title': 1.0, 'topic': 0.7, 'synonym': 0.6}
+
+# 서식 요청 문장에서 서식 이름이 아닌 표현 (정규화된 질의 토큰 끝에서 제거)
+REQUEST_SUFFIXES = (
+    '보내주세요', '찾아주세요', '알려주세요', '필요합니다', '필요해요', '있나요', '있어요',
+    '주세요', '다운로드', '양식', '서식', '파일', '좀', '줘',
+)
+REQUEST_WORDS = {'어디', '어디서', '어디에', '받을', '수', '있을까요', '부탁드립니다', '부탁해요'}
+JOSA_SUFFIXES = ('을', '를', '이', '가', '은', '는', '의')
+
+_NORMALIZE_RE = re.compile(r'[\W_]+', re.UNICODE)
+_TOKEN_RE = re.compile(r'[^\W_]+', re.UNICODE)
+
+
+def normalize(text: str) -> str:
+    """비교용 정규화 (소문자, 공백/밑줄/기호 제거)"""
+    return _NORMALIZE_RE.sub('', (text or '').lower())
+
+
+def bigrams(text: str) -> set:
+    """정규화 문자열의 문자 2-gram 집합 (한 글자면 그 글자)"""
+    if len(text) < 2:
+        return {text} if text else set()
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+def form_query_key(query: str) -> str:
+    """서식 요청 문장에서 서식 이름 부분만 남긴 정규화 키 ("휴가신청서를 주세요" → "휴가신청서")"""
+    tokens = []
+    for token in _TOKEN_RE.findall((query or '').lower()):
+        if token in REQUEST_WORDS:
+            continue
+        if len(token) > 2 and token.endswith(JOSA_SUFFIXES):
+            token = token[:-1]
+        stripped = True
+        while stripped and token:
+            stripped = False
+            for suffix in REQUEST_SUFFIXES:
+                if token.endswith(suffix):
+                    token = token[:-len(suffix)]
+                    stripped = True
+                    break
+        if token:
+            tokens.append(token)
+    return ''.join(tokens)
+
+
+def form_result(point_id: Any, payload: Dict[str, Any], score: float,
+                relevance_score: float) -> Dict[str, Any]:
+    """서식 포인트 payload → 서식 검색 결과 형식 (벡터 검색 재순위화와 카탈로그 공용)"""
+    return {
+        'id': str(point_id),
+        'score': score,
+        'relevance_score': relevance_score,
+        'text': payload.get('text', ''),
+        'file_name': payload.get('doc_title', ''),
+        'pages': payload.get('page', ''),
+        'source': payload.get('source', ''),
+
+        # 서식 관련 메타데이터
+        'form_title': payload.get('form_title', ''),
+        'form_page': payload.get('form_page', ''),
+        'form_file_uri': payload.get('form_file_uri', ''),
+        'topics': payload.get('topics', []),
+        'synonyms': payload.get('synonyms', []),
+        'anchor_refs': payload.get('anchor_refs', []),
+
+        # 기존 메타데이터
+        'document_level': payload.get('document_level', ''),
+        'document_type': payload.get('document_type', ''),
+        'domain_primary': payload.get('domain_primary', ''),
+        'domain_secondary': payload.get('domain_secondary', ''),
+        'year': payload.get('year', 0),
+        'recency_score': payload.get('recency_score', 1),
+        'file_path': payload.get('file_path', ''),
+        'doc_id': payload.get('doc_id', ''),
+    }
+
+
+def _match_score(query: str, query_grams: set, key: str, key_grams: set) -> float:
+    """정규화 질의와 키의 유사도 (0~1): 완전 일치 1, 포함 관계는 길이 비율 반영, 그 외 2-gram Dice"""
+    if query == key:
+        return 1.0
+    score = 2 * len(query_grams & key_grams) / (len(query_grams) + len(key_grams))
+    if len(query) >= 2 and query in key:
+        score = max(score, 0.6 + 0.4 * len(query) / len(key))
+    elif len(key) >= 2 and key in query:
+        score = max(score, 0.6 + 0.4 * len(key) / len(query))
+    return score
+
+
+class FormCatalog:
+    """
+    서식 카탈로그 (제목/토픽/동의어 2-gram 역색인 + 토큰 경계 접두어 목록)
+
+    사용법:
+        catalog = FormCatalog.from_points(points)
+        catalog.lookup("휴가신청서 양식 주세요")      # [(점수, 항목)]
+        catalog.autocomplete("휴가")                  # [항목]
+    """
+
+    def __init__(self, entries: Sequence[Dict[str, Any]]):
+        """
+        카탈로그 생성
+
+        Args:
+            entries: [{'id', 'payload'}] (payload는 서식 포인트 payload)
+        """
+        self.entries: List[Dict[str, Any]] = []
+        self._keys: List[Tuple[str, set, int, float]] = []
+        self._postings: Dict[str, List[int]] = {}
+        self._prefixes: List[Tuple[str, int]] = []
+
+        seen = set()
+        for entry in entries:
+            payload = entry['payload']
+            title = payload.get('form_title') or ''
+            # 같은 서식이 여러 문서 버전/페이지에 있으면 파일 URI(없으면 문서+페이지) 기준 하나만
+            identity = payload.get('form_file_uri') or (payload.get('doc_id'), payload.get('form_page'))
+            if not normalize(title) or identity in seen:
+                continue
+            seen.add(identity)
+            index = len(self.entries)
+            self.entries.append({'id': entry['id'], 'payload': payload, 'title': title.replace('_', ' ')})
+            fields = [('title', title)]
+            fields += [('topic', topic) for topic in payload.get('topics') or []]
+            fields += [('synonym', synonym) for synonym in payload.get('synonyms') or []]
+            for field, text in fields:
+                self._add_key(field, text, index)
+
+        self._prefixes.sort()
+
+    def _add_key(self, field: str, text: str, index: int) -> None:
+        key = normalize(text)
+        if not key:
+            return
+        key_index = len(self._keys)
+        grams = bigrams(key)
+        self._keys.append((key, grams, index, FIELD_WEIGHTS[field]))
+        for gram in grams:
+            self._postings.setdefault(gram, []).append(key_index)
+        # 자동완성: "연차 휴가 신청서"는 "휴가", "신청서"로 시작하는 입력에도 걸리도록 토큰 경계마다 등록
+        tokens = _TOKEN_RE.findall(text.lower())
+        for start in range(len(tokens)):
+            self._prefixes.append((''.join(tokens[start:]), key_index))
+
+    @classmethod
+    def from_points(cls, points: Sequence[Any]) -> 'FormCatalog':
+        """Qdrant 포인트(payload 포함) 목록으로 카탈로그 생성"""
+        return cls([{'id': point.id, 'payload': point.payload or {}} for point in points])
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def lookup(self, query: str, limit: int = 10, min_score: float = 0.0) -> List[Tuple[float, Dict[str, Any]]]:
+        """
+        서식 요청 문장으로 서식 찾기
+
+        Args:
+            query: 사용자 질문 ("휴가신청서 양식 주세요")
+            limit: 최대 결과 수
+            min_score: 최소 점수 (0~1)
+
+        Returns:
+            [(점수, 항목)] (점수순, 서식별 최고 점수 필드 기준)
+        """
+        key = form_query_key(query)
+        if len(key) < 2:
+            return []
+        grams = bigrams(key)
+        candidates = set()
+        for gram in grams:
+            candidates.update(self._postings.get(gram, ()))
+
+        best: Dict[int, float] = {}
+        for key_index in candidates:
+            text, key_grams, index, weight = self._keys[key_index]
+            score = weight * _match_score(key, grams, text, key_grams)
+            if score >= min_score and score > best.get(index, 0.0):
+                best[index] = score
+        ranked = sorted(best.items(), key=lambda item: (-item[1], len(self.entries[item[0]]['title'])))
+        return [(round(score, 4), self.entries[index]) for index, score in ranked[:limit]]
+
+    def autocomplete(self, prefix: str, limit: int = 8) -> List[Dict[str, Any]]:
+        """
+        입력 중인 서식 이름 자동완성
+
+        제목/토픽/동의어의 토큰 경계 접두어 일치를 먼저(제목, 짧은 이름 순), 모자라면
+        2-gram 유사 매칭으로 채웁니다.
+
+        Args:
+            prefix: 입력 문자열
+            limit: 최대 결과 수
+
+        Returns:
+            항목 목록 ({'id', 'payload', 'title'})
+        """
+        key = normalize(prefix)
+        if not key:
+            return []
+        matches: Dict[int, Tuple[float, int]] = {}
+        position = bisect.bisect_left(self._prefixes, (key, -1))
+        while position < len(self._prefixes) and self._prefixes[position][0].startswith(key):
+            _, _, index, weight = self._keys[self._prefixes[position][1]]
+            rank = (-weight, len(self.entries[index]['title']))
+            if index not in matches or rank < matches[index]:
+                matches[index] = rank
+            position += 1
+
+        ordered = [index for index, _ in sorted(matches.items(), key=lambda item: item[1])]
+        results = [self.entries[index] for index in ordered[:limit]]
+        if len(results) < limit:
+            chosen = {entry['id'] for entry in results}
+            for _, entry in self.lookup(prefix, limit=limit, min_score=0.3):
+                if len(results) >= limit:
+                    break
+                if entry['id'] not in chosen:
+                    results.append(entry)
+        return results
+
+
+def load_form_points(client, collection_name: str) -> List[Any]:
+    """컬렉션의 서식 포인트(payload만) 전체 조회"""
+    points: List[Any] = []
+    offset = None
+    while True:
+        batch, offset = client.scroll(
+            collection_name=collection_name,
+            scroll_filter={"must": [{"key": "doc_type", "match": {"value": "form"}}]},
+            limit=SCROLL_BATCH_SIZE,
+            offset=offset,
+            with_payload=True,
+            with_vectors=False,
+        )
+        points += batch
+        if offset is None:
+            return points
+
+
+_CATALOGS: Dict[str, Tuple[int, FormCatalog]] = {}
+_LOCK = threading.Lock()
+
+
+def get_form_catalog(client, collection_name: str) -> Optional[FormCatalog]:
+    """
+    컬렉션의 서식 카탈로그 (컬렉션 버전이 바뀌면 다시 로딩, 실패하면 None)
+
+    Args:
+        client: QdrantClient
+        collection_name: 컬렉션 또는 alias
+
+    Returns:
+        FormCatalog 또는 None
+    """
+    version = get_collection_version(collection_name)
+    with _LOCK:
+        cached = _CATALOGS.get(collection_name)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        try:
+            catalog = FormCatalog.from_points(load_form_points(client, collection_name))
+        except Exception as e:
+            logger.warning(f"서식 카탈로그 로딩 실패 ({collection_name}): {e}")
+            return cached[1] if cached is not None else None
+        _CATALOGS[collection_name] = (version, catalog)
+    logger.info(f"서식 카탈로그 로딩: {collection_name} 서식 {len(catalog)}개 (버전 {version})")
+    return catalog
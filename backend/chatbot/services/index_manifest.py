@@ -0,0 +1,137 @@
+"""
+증분 인덱싱 매니페스트
+컬렉션별로 인덱싱한 파일의 (크기, mtime, sha256, 청크 설정, 모델)을 기록해 두고
+다음 실행 때 새로 추가/변경/삭제된 문서만 골라냅니다.
+
+매니페스트는 실제(버전) 컬렉션 단위로 상태 디렉토리에
+"<컬렉션>.manifest.json"으로 저장됩니다. alias를 롤백하면 그 버전의
+매니페스트가 그대로 사용됩니다. 인덱서에서 사용하므로 Django 설정에 의존하지 않습니다.
+"""
+
+import hashlib
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from .index_state import index_state_dir
+
+# 해시 계산 시 읽기 단위
+_HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def manifest_file(collection_name: str) -> Path:
+    """컬렉션의 매니페스트 파일 경로"""
+    return index_state_dir() / f"{collection_name}.manifest.json"
+
+
+def file_sha256(path: Path) -> str:
+    """파일 내용 sha256"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class IndexManifest:
+    """
+    컬렉션별 인덱싱 매니페스트
+
+    files: 파일명 → {'size', 'mtime_ns', 'sha256', 'doc_id', 'points', 'config', 'indexed_at'}
+    config: 청크 크기/중첩, 임베딩 모델/백엔드 등 벡터에 영향을 주는 설정.
+        설정이 바뀐 파일은 내용이 같아도 변경으로 취급합니다.
+    """
+
+    def __init__(self, collection_name: str, files: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.collection_name = collection_name
+        self.files: Dict[str, Dict[str, Any]] = files or {}
+
+    @classmethod
+    def load(cls, collection_name: str) -> 'IndexManifest':
+        """매니페스트 로딩 (없거나 손상되었으면 빈 매니페스트)"""
+        path = manifest_file(collection_name)
+        try:
+            data = json.loads(path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return cls(collection_name)
+        return cls(collection_name, data.get('files', {}))
+
+    def save(self) -> Path:
+        """매니페스트 저장 (임시 파일에 쓴 뒤 교체)"""
+        path = manifest_file(self.collection_name)
+        tmp_path = path.with_suffix('.json.tmp')
+        tmp_path.write_text(json.dumps({
+            'collection': self.collection_name,
+            'updated_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'files': self.files,
+        }, ensure_ascii=False, indent=1), encoding='utf-8')
+        tmp_path.replace(path)
+        return path
+
+    def _is_unchanged(self, path: Path, entry: Dict[str, Any], config: Dict[str, Any]) -> bool:
+        """기록과 같은 파일인지 (크기+mtime이 같으면 해시 생략)"""
+        if entry.get('config') != config:
+            return False
+        stat = path.stat()
+        if stat.st_size != entry.get('size'):
+            return False
+        if stat.st_mtime_ns == entry.get('mtime_ns'):
+            return True
+        # 복사/체크아웃으로 mtime만 바뀐 경우: 내용이 같으면 mtime만 갱신
+        if file_sha256(path) == entry.get('sha256'):
+            entry['mtime_ns'] = stat.st_mtime_ns
+            return True
+        return False
+
+    def diff(self, paths: Iterable[Path], config: Dict[str, Any],
+             skipped: Iterable[str] = ()) -> Dict[str, List]:
+        """
+        현재 파일 목록과 매니페스트 비교
+
+        Args:
+            paths: 인덱싱 대상 PDF 경로
+            config: 현재 인덱싱 설정
+            skipped: 디렉토리에는 있지만 이번 실행에서 제외한 파일명 (삭제로 보지 않음)
+
+        Returns:
+            {'added': [Path], 'changed': [Path], 'unchanged': [Path], 'removed': [파일명]}
+        """
+        result: Dict[str, List] = {'added': [], 'changed': [], 'unchanged': [], 'removed': []}
+        seen = set(skipped)
+        for path in paths:
+            seen.add(path.name)
+            entry = self.files.get(path.name)
+            if entry is None:
+                result['added'].append(path)
+            elif self._is_unchanged(path, entry, config):
+                result['unchanged'].append(path)
+            else:
+                result['changed'].append(path)
+        result['removed'] = sorted(name for name in self.files if name not in seen)
+        return result
+
+    def record(self, path: Path, doc_id: str, points: int, config: Dict[str, Any]) -> None:
+        """인덱싱 완료한 파일 기록"""
+        stat = path.stat()
+        self.files[path.name] = {
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha256': file_sha256(path),
+            'doc_id': doc_id,
+            'points': points,
+            'config': config,
+            'indexed_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        }
+
+    def remove(self, filename: str) -> Optional[Dict[str, Any]]:
+        """파일 기록 삭제"""
+        return self.files.pop(filename, None)
+
+
+def delete_manifest(collection_name: str) -> None:
+    """컬렉션 매니페스트 삭제 (컬렉션 삭제/재생성 시)"""
+    try:
+        manifest_file(collection_name).unlink()
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,297 @@
+"""
+Qdrant 스냅샷 기반 인덱스 배포
+검증을 통과한 버전 컬렉션을 한 번 임베딩해 스냅샷으로 만들고, 새 환경은 재임베딩 대신
+스냅샷을 복원합니다. 스냅샷 파일 옆에 매니페스트(<스냅샷>.manifest.json)를 남겨
+인덱싱 설정(스키마/청크/모델)과 문서별 sha256을 기록하고, 복원 전에 현재 설정/문서와
+비교하여 맞는 스냅샷만 사용합니다.
+
+    <스냅샷 디렉토리>/<버전 컬렉션>/<스냅샷 이름>                 Qdrant가 만든 스냅샷
+    <스냅샷 디렉토리>/<버전 컬렉션>/<스냅샷 이름>.manifest.json   배포 매니페스트
+    <스냅샷 디렉토리>/<버전 컬렉션>/<스냅샷 이름>.projection.npz  축소 벡터 투영 (있을 때만)
+
+스냅샷 디렉토리는 Qdrant(QDRANT__STORAGE__SNAPSHOTS_PATH)와 백엔드가 같은 경로로
+마운트해야 합니다. 복원은 Qdrant 서버가 file:// 경로로 직접 읽습니다.
+
+인덱서에서도 사용할 수 있도록 Django 설정에 의존하지 않습니다.
+
+    QDRANT_SNAPSHOTS_DIR  스냅샷 디렉토리 (기본값: /qdrant/snapshots)
+"""
+
+import json
+import logging
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from qdrant_client import QdrantClient
+
+from .collection_versions import current_target, is_legacy_collection, switch_alias, versioned_name
+from .index_manifest import IndexManifest, file_sha256
+from .vector_projection import collection_projection_file
+
+logger = logging.getLogger(__name__)
+
+# 매니페스트 형식이 바뀌면 올림 (다른 형식의 스냅샷은 복원 대상에서 제외)
+SNAPSHOT_MANIFEST_FORMAT = 1
+MANIFEST_SUFFIX = ".manifest.json"
+PROJECTION_SUFFIX = ".projection.npz"
+
+
+def snapshots_dir(path: Optional[str] = None) -> Path:
+    """스냅샷 디렉토리 (QDRANT_SNAPSHOTS_DIR, 기본값: /qdrant/snapshots)"""
+    return Path(path or os.getenv('QDRANT_SNAPSHOTS_DIR', '/qdrant/snapshots'))
+
+
+def resolve_collection(client: QdrantClient, alias: str) -> Optional[str]:
+    """alias가 가리키는 컬렉션 (블루-그린 도입 전 단일 컬렉션이면 그 이름, 없으면 None)"""
+    target = current_target(client, alias)
+    if target is None and is_legacy_collection(client, alias):
+        target = alias
+    return target
+
+
+def _exact_count(client: QdrantClient, collection_name: str) -> int:
+    return client.count(collection_name=collection_name, exact=True).count
+
+
+def create_index_snapshot(client: QdrantClient, alias: str, config: Dict[str, Any],
+                          root: Optional[str] = None, force: bool = False) -> Dict[str, Any]:
+    """
+    alias가 가리키는 컬렉션의 스냅샷과 배포 매니페스트 생성
+
+    블루-그린 재인덱싱은 검증을 통과한 버전만 alias로 전환하므로 alias 대상을 스냅샷합니다.
+    추가로 증분 인덱싱 매니페스트의 포인트 수 합계가 실제 포인트 수와 같은지 확인하여
+    인덱싱이 중간에 끊긴 컬렉션은 배포하지 않습니다.
+
+    Args:
+        client: QdrantClient
+        alias: 검색기가 읽는 컬렉션 이름
+        config: 현재 인덱싱 설정 (ingestion.index_config)
+        root: 스냅샷 디렉토리 (기본값: snapshots_dir())
+        force: 매니페스트 검사 실패를 무시
+
+    Returns:
+        저장한 매니페스트 (+ '_path')
+
+    Raises:
+        ValueError: 컬렉션이 없거나 검사에 실패했을 때
+    """
+    collection = resolve_collection(client, alias)
+    if collection is None:
+        raise ValueError(f"'{alias}' 컬렉션이 없습니다")
+
+    manifest = IndexManifest.load(collection)
+    points = _exact_count(client, collection)
+    recorded = sum(entry.get('points', 0) for entry in manifest.files.values())
+    problems = []
+    if points <= 0:
+        problems.append("포인트가 없습니다")
+    if not manifest.files:
+        problems.append(f"'{collection}'의 인덱싱 매니페스트가 없습니다 (embed_documents.py로 만든 컬렉션만 배포)")
+    elif recorded != points:
+        problems.append(f"매니페스트 포인트 수({recorded})와 컬렉션 포인트 수({points})가 다릅니다")
+    configs = {json.dumps(entry.get('config'), sort_keys=True) for entry in manifest.files.values()}
+    if manifest.files and configs != {json.dumps(config, sort_keys=True)}:
+        problems.append("현재 인덱싱 설정과 다른 설정으로 인덱싱된 문서가 있습니다")
+    if problems and not force:
+        raise ValueError("; ".join(problems))
+
+    root_path = snapshots_dir(root)
+    if not root_path.is_dir():
+        raise ValueError(f"스냅샷 디렉토리가 없습니다: {root_path} (Qdrant와 같은 경로로 마운트 필요)")
+
+    started = time.perf_counter()
+    description = client.create_snapshot(collection_name=collection, wait=True)
+    snapshot_path = root_path / collection / description.name
+    projection = None
+    source = collection_projection_file(collection)
+    if source.exists():
+        # 축소 벡터가 있는 컬렉션은 검색에 투영이 필요하므로 스냅샷과 함께 배포
+        target = snapshot_path.with_name(description.name + PROJECTION_SUFFIX)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(source, target)
+        projection = {'path': str(target.relative_to(root_path)), 'sha256': file_sha256(target)}
+    data = {
+        'format': SNAPSHOT_MANIFEST_FORMAT,
+        'alias': alias,
+        'collection': collection,
+        'snapshot': {
+            'name': description.name,
+            'path': str(snapshot_path.relative_to(root_path)),
+            'size': description.size,
+            'checksum': getattr(description, 'checksum', None),
+            'creation_time': description.creation_time,
+        },
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'points': points,
+        'config': config,
+        'projection': projection,
+        'documents': {name: {'sha256': entry.get('sha256'), 'doc_id': entry.get('doc_id'),
+                             'points': entry.get('points')}
+                      for name, entry in sorted(manifest.files.items())},
+        'index_manifest': manifest.files,
+        'warnings': problems,
+    }
+    path = snapshot_path.with_name(description.name + MANIFEST_SUFFIX)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix('.tmp')
+    tmp_path.write_text(json.dumps(data, ensure_ascii=False, indent=1), encoding='utf-8')
+    tmp_path.replace(path)
+    logger.info(f"스냅샷 생성: {snapshot_path} ({points} points, {time.perf_counter() - started:.1f}s)")
+    data['_path'] = str(path)
+    return data
+
+
+def list_snapshot_manifests(alias: str, root: Optional[str] = None) -> List[Dict[str, Any]]:
+    """alias의 배포 매니페스트 목록 (최신순, 스냅샷 파일이 없는 항목 제외)"""
+    root_path = snapshots_dir(root)
+    manifests = []
+    if not root_path.is_dir():
+        return manifests
+    for path in root_path.glob(f"*/*{MANIFEST_SUFFIX}"):
+        try:
+            data = json.loads(path.read_text(encoding='utf-8'))
+        except (OSError, ValueError) as e:
+            logger.warning(f"스냅샷 매니페스트를 읽을 수 없습니다: {path} ({e})")
+            continue
+        if data.get('format') != SNAPSHOT_MANIFEST_FORMAT or data.get('alias') != alias:
+            continue
+        if not (root_path / data['snapshot']['path']).exists():
+            continue
+        projection = data.get('projection')
+        if projection and not (root_path / projection['path']).exists():
+            continue
+        data['_path'] = str(path)
+        manifests.append(data)
+    manifests.sort(key=lambda data: data.get('created_at', ''), reverse=True)
+    return manifests
+
+
+def check_compatibility(manifest: Dict[str, Any], config: Dict[str, Any],
+                        pdf_dir: Optional[str] = None) -> Tuple[List[str], List[str]]:
+    """
+    스냅샷이 현재 환경에 맞는지 확인
+
+    Args:
+        manifest: 배포 매니페스트
+        config: 현재 인덱싱 설정
+        pdf_dir: 현재 문서 디렉토리 (없거나 비어 있으면 문서 비교 생략)
+
+    Returns:
+        (문제 목록, 참고 목록) - 문제가 없어야 복원. 스냅샷에 없는 새 문서는 참고로만 알리고
+        복원 후 증분 인덱싱(embed_documents.py)으로 추가합니다.
+    """
+    problems, notes = [], []
+    for key, value in config.items():
+        if manifest.get('config', {}).get(key) != value:
+            problems.append(f"설정 불일치 {key}: 스냅샷 {manifest.get('config', {}).get(key)!r} ≠ 현재 {value!r}")
+
+    pdf_path = Path(pdf_dir) if pdf_dir else None
+    if pdf_path is None or not pdf_path.is_dir() or not any(pdf_path.glob("*.pdf")):
+        notes.append("문서 디렉토리가 없어 문서 해시 비교를 생략했습니다")
+        return problems, notes
+
+    current = {path.name: path for path in pdf_path.glob("*.pdf")}
+    for name, entry in manifest.get('documents', {}).items():
+        path = current.get(name)
+        if path is None:
+            problems.append(f"스냅샷 문서가 현재 문서 디렉토리에 없습니다: {name}")
+        elif file_sha256(path) != entry.get('sha256'):
+            problems.append(f"문서 내용이 다릅니다: {name}")
+    added = sorted(set(current) - set(manifest.get('documents', {})))
+    if added:
+        notes.append(f"스냅샷에 없는 문서 {len(added)}개는 복원 후 증분 인덱싱으로 추가하세요")
+    return problems, notes
+
+
+def find_restorable_snapshot(alias: str, config: Dict[str, Any], pdf_dir: Optional[str] = None,
+                             root: Optional[str] = None) -> Tuple[Optional[Dict[str, Any]], List[str]]:
+    """
+    현재 설정/문서와 맞는 가장 최신 스냅샷
+
+    Returns:
+        (매니페스트 또는 None, 건너뛴 스냅샷별 사유)
+    """
+    skipped = []
+    for manifest in list_snapshot_manifests(alias, root):
+        problems, _ = check_compatibility(manifest, config, pdf_dir)
+        if not problems:
+            return manifest, skipped
+        skipped.append(f"{manifest['snapshot']['name']}: {problems[0]}")
+    return None, skipped
+
+
+def restore_index_snapshot(client: QdrantClient, manifest: Dict[str, Any],
+                           root: Optional[str] = None) -> str:
+    """
+    스냅샷을 원래 버전 컬렉션 이름으로 복원하고 alias를 전환
+
+    복원된 컬렉션의 증분 인덱싱 매니페스트도 함께 기록하므로 이후 embed_documents.py는
+    바뀐 문서만 다시 임베딩합니다.
+
+    Args:
+        client: QdrantClient
+        manifest: 배포 매니페스트 (list_snapshot_manifests/find_restorable_snapshot 결과)
+        root: 스냅샷 디렉토리
+
+    Returns:
+        복원한 컬렉션 이름
+    """
+    alias = manifest['alias']
+    collection = manifest['collection']
+    if collection == alias:
+        # 블루-그린 도입 전 단일 컬렉션의 스냅샷도 버전 컬렉션으로 복원하여 alias로 서비스
+        collection = versioned_name(alias)
+
+    existing = [c.name for c in client.get_collections().collections]
+    # 이전 복원이 중간에 끊겨 포인트 수가 다르면 스냅샷으로 다시 덮어씀
+    if collection not in existing or _exact_count(client, collection) != manifest.get('points'):
+        location = (snapshots_dir(root) / manifest['snapshot']['path']).absolute().as_uri()
+        started = time.perf_counter()
+        client.recover_snapshot(
+            collection_name=collection,
+            location=location,
+            checksum=manifest['snapshot'].get('checksum'),
+            wait=True,
+        )
+        logger.info(f"스냅샷 복원: {location} → {collection} ({time.perf_counter() - started:.1f}s)")
+
+    points = _exact_count(client, collection)
+    if points != manifest.get('points'):
+        raise ValueError(f"복원한 포인트 수({points})가 매니페스트({manifest.get('points')})와 다릅니다")
+
+    projection = manifest.get('projection')
+    if projection:
+        source = snapshots_dir(root) / projection['path']
+        if file_sha256(source) != projection.get('sha256'):
+            raise ValueError(f"투영 파일 해시가 매니페스트와 다릅니다: {source}")
+        shutil.copyfile(source, collection_projection_file(collection))
+
+    IndexManifest(collection, manifest.get('index_manifest', {})).save()
+    switch_alias(client, alias, collection)
+    return collection
+
+
+def prune_snapshots(client: QdrantClient, alias: str, keep: int = 3, root: Optional[str] = None) -> List[str]:
+    """
+    alias의 최신 keep개 스냅샷만 남기고 삭제
+
+    Returns:
+        삭제한 스냅샷 이름 목록
+    """
+    removed = []
+    for manifest in list_snapshot_manifests(alias, root)[keep:]:
+        name = manifest['snapshot']['name']
+        try:
+            client.delete_snapshot(collection_name=manifest['collection'], snapshot_name=name, wait=True)
+        except Exception as e:
+            # 컬렉션이 이미 삭제되었으면 Qdrant API로 지울 수 없으므로 파일을 직접 삭제
+            logger.info(f"스냅샷 API 삭제 실패, 파일 삭제: {name} ({e})")
+            (snapshots_dir(root) / manifest['snapshot']['path']).unlink(missing_ok=True)
+        if manifest.get('projection'):
+            (snapshots_dir(root) / manifest['projection']['path']).unlink(missing_ok=True)
+        Path(manifest['_path']).unlink(missing_ok=True)
+        removed.append(name)
+    return removed
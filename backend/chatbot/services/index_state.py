@@ -0,0 +1,65 @@
+"""
+인덱스 상태 관리
+인덱서(embed_documents, rag_indexer, QdrantService)와 검색기가 공유하는
+컬렉션 버전 마커를 관리합니다.
+
+인덱서는 Django 밖에서 단독 스크립트로도 실행되므로 이 모듈은
+Django 설정에 의존하지 않고 환경변수(RAG_INDEX_STATE_DIR)만 사용합니다.
+"""
+
+import os
+import time
+from pathlib import Path
+
+# 기본 상태 디렉토리: backend/index_state
+_DEFAULT_STATE_DIR = Path(__file__).resolve().parent.parent.parent / 'index_state'
+
+
+def index_state_dir() -> Path:
+    """
+    인덱스 상태 파일을 저장하는 디렉토리 반환 (없으면 생성)
+
+    Returns:
+        상태 디렉토리 경로
+    """
+    path = Path(os.getenv('RAG_INDEX_STATE_DIR', str(_DEFAULT_STATE_DIR)))
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _version_file(collection_name: str) -> Path:
+    return index_state_dir() / f"{collection_name}.version"
+
+
+def get_collection_version(collection_name: str) -> int:
+    """
+    컬렉션 버전 조회
+
+    버전 마커 파일의 수정 시각(ns)을 버전으로 사용하므로
+    다른 프로세스(인덱싱 스크립트)에서 갱신한 내용도 stat 한 번으로 감지됩니다.
+
+    Args:
+        collection_name: 컬렉션 이름
+
+    Returns:
+        컬렉션 버전 (마커가 없으면 0)
+    """
+    try:
+        return _version_file(collection_name).stat().st_mtime_ns
+    except FileNotFoundError:
+        return 0
+
+
+def bump_collection_version(collection_name: str) -> int:
+    """
+    컬렉션 버전 갱신 (인덱서가 컬렉션에 쓰기 작업을 한 뒤 호출)
+
+    Args:
+        collection_name: 컬렉션 이름
+
+    Returns:
+        갱신된 컬렉션 버전
+    """
+    path = _version_file(collection_name)
+    path.write_text(str(time.time_ns()), encoding='utf-8')
+    return path.stat().st_mtime_ns
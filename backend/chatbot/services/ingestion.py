@@ -0,0 +1,850 @@
+"""
+통합 스트리밍 인덱싱 엔진
+embed_documents, rag_indexer, QdrantService.add_document가 모두 이 엔진을 사용하여
+같은 단계, 같은 포인트 ID 규칙, 같은 payload 스키마로 인덱싱합니다.
+
+    읽기 → 정제 → 청크     (파싱 워커 프로세스, document_parsing 기본 단계)
+    → 분류                 (메인 프로세스, 도메인/카테고리 등 문서 메타데이터)
+    → 중복 제거            (ChunkDeduplicator: 검색 필터 payload가 같은 문서끼리 MinHash/LSH
+                            준중복 청크는 대표 청크의 alt_sources로)
+    → 문서 단위 포인트     (문서 요약 1개 + 조문 머리말, doc_retrieval 2단계 검색의 1단계용)
+    → 임베딩               (BucketedEncoder: 길이 버킷 배치 + 디스크 임베딩 캐시)
+    → 축소 벡터            (컬렉션에 reduced 보조 벡터가 있으면 묶인 PCA 투영으로 계산)
+    → 업서트               (AsyncUpserter: 동시 진행 배치 수 제한, wait=False 파이프라인)
+
+각 단계는 생성자 인자로 교체할 수 있습니다. 검색기는 normalize_payload로
+엔진 도입 전 스키마(source/path, document_name/pdf_path)의 포인트도 같은 형태로 읽습니다.
+
+인덱서에서 사용하므로 Django 설정에 의존하지 않습니다.
+
+    INGEST_UPSERT_BATCH   업서트 배치 크기 (기본값: 256)
+    INGEST_MAX_IN_FLIGHT  동시에 진행하는 업서트 요청 수 (기본값: 2)
+    INGEST_DEDUP_THRESHOLD  준중복 청크 판정 임계값 (기본값: 0.9, 0이면 중복 제거 안 함)
+    INGEST_DOC_VECTORS    문서 요약/조문 머리말 포인트 생성 (기본값: true)
+    INGEST_REDUCED_VECTORS  새 컬렉션에 PCA 축소 보조 벡터 추가 (기본값: false, vector_projection 참고)
+"""
+
+import functools
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, List, Mapping, Optional, Sequence, Set, Tuple
+
+from qdrant_client import QdrantClient
+from qdrant_client.models import (
+    Distance, FieldCondition, Filter, FilterSelector, IsEmptyCondition, MatchAny, MatchValue,
+    PayloadField, PointStruct, SetPayload, SetPayloadOperation, VectorParams,
+)
+
+from .chunk_dedup import ChunkDeduplicator, default_dedup_threshold
+
+from .document_parsing import (
+    CHUNK_OVERLAP, CHUNK_SIZE, calculate_recency_score, chunk_page_text, classify_domain_by_filename, clean_page_text,
+    extract_subdomain_by_filename, find_form_file_uri, generate_form_topics_and_synonyms,
+    infer_doc_level, parse_document, parse_register_date_from_filename, read_pdf_by_page,
+)
+from .embedding_backends import DEFAULT_MODEL_NAME
+from .embedding_queue import BucketedEncoder, EncodeError
+from .pdf_parsing import parse_in_parallel
+from .vector_projection import (
+    FULL_VECTOR, REDUCED_VECTOR, bind_projection, desired_projection, point_vectors, vector_layout,
+)
+from .point_ids import chunk_point_id, form_point_id, heading_point_id, stable_doc_id, summary_point_id
+
+logger = logging.getLogger(__name__)
+
+# payload 인덱스 (컬렉션 생성 시 한 번 만듦)
+PAYLOAD_INDEXES = [
+    ("document_type", "keyword"), ("document_level", "keyword"),
+    ("domain_primary", "keyword"), ("domain_secondary", "keyword"),
+    ("year", "integer"), ("recency_score", "integer"),
+    ("page", "integer"), ("chunk_index", "integer"),
+    ("register_date_iso", "datetime"), ("doc_title", "keyword"),
+    ("doc_type", "keyword"), ("doc_id", "keyword"), ("file_name", "keyword"),
+    ("category", "keyword"),
+    # 서식 관련 인덱스
+    ("form_title", "keyword"), ("form_page", "integer"),
+    ("topics", "keyword"), ("synonyms", "keyword"),
+    ("form_file_uri", "keyword"), ("anchor_refs", "keyword"),
+    # 중복 제거로 대표 청크에 합쳐진 문서 (문서 단위 2단계 검색에서 doc_id와 함께 매칭)
+    ("alt_doc_ids", "keyword"),
+]
+
+# 검색 필터가 쓰는 payload (중복 제거는 이 값이 모두 같은 문서끼리만: 대표 청크가 빠진 청크와
+# 같은 도메인/카테고리/문서 타입/최신성 필터를 통과하도록)
+DEDUP_SCOPE_FIELDS = ("domain_primary", "category", "document_type", "recency_score")
+
+# payload/청크 로직을 바꿀 때 올리면 다음 실행에서 전체 재인덱싱 (스냅샷 복원도 거부)
+INDEX_SCHEMA_VERSION = 5
+
+# 문서 요약 포인트 텍스트 최대 길이 (임베딩 모델 입력 한도 안쪽)
+SUMMARY_MAX_CHARS = 800
+
+
+def default_doc_vectors() -> bool:
+    """INGEST_DOC_VECTORS 환경변수 (기본값: true)"""
+    return os.getenv("INGEST_DOC_VECTORS", "true").lower() == "true"
+
+
+def index_config(embed_model: Optional[str] = None, embed_dim: int = 1024) -> Dict[str, Any]:
+    """
+    벡터/청크에 영향을 주는 인덱싱 설정 (증분 인덱싱 매니페스트와 스냅샷 매니페스트 비교용)
+
+    Args:
+        embed_model: 임베딩 모델 (기본값: HF_MODEL 환경변수 또는 KoE5)
+        embed_dim: 임베딩 차원
+    """
+    projection = desired_projection()
+    if projection is not None and projection.input_dim != embed_dim:
+        projection = None
+    return {
+        "schema": INDEX_SCHEMA_VERSION,
+        "chunk_size": CHUNK_SIZE,
+        "chunk_overlap": CHUNK_OVERLAP,
+        "embed_model": embed_model or os.getenv("HF_MODEL", DEFAULT_MODEL_NAME),
+        "embed_backend": os.getenv("EMBED_BACKEND", "torch").lower(),
+        "embed_dim": embed_dim,
+        "dedup_threshold": default_dedup_threshold(),
+        "doc_vectors": default_doc_vectors(),
+        # 축소 보조 벡터에 쓰는 투영 (바꾸면 새 컬렉션으로 전체 재인덱싱)
+        "reduced_vectors": projection.sha256 if projection is not None else None,
+    }
+
+
+# -------------------- 컬렉션 --------------------
+
+def create_collection(client: QdrantClient, collection_name: str, dim: int) -> bool:
+    """
+    컬렉션이 없으면 payload 인덱스와 함께 생성
+
+    INGEST_REDUCED_VECTORS가 켜져 있고 학습한 투영이 있으면 전체 차원(full)과
+    축소(reduced) 이름 있는 벡터로 만들고 투영 파일을 컬렉션에 묶습니다.
+
+    Args:
+        client: QdrantClient
+        collection_name: 컬렉션 이름
+        dim: 벡터 차원
+
+    Returns:
+        새로 생성했으면 True
+    """
+    existing = [c.name for c in client.get_collections().collections]
+    if collection_name in existing:
+        return False
+    projection = desired_projection()
+    if projection is not None and projection.input_dim != dim:
+        logger.warning(f"투영 입력 차원({projection.input_dim})이 벡터 차원({dim})과 달라 축소 벡터 없이 생성합니다")
+        projection = None
+    if projection is None:
+        vectors_config = VectorParams(size=dim, distance=Distance.COSINE)
+    else:
+        bind_projection(collection_name, projection)
+        vectors_config = {
+            FULL_VECTOR: VectorParams(size=dim, distance=Distance.COSINE),
+            REDUCED_VECTOR: VectorParams(size=projection.dim, distance=Distance.COSINE),
+        }
+    client.create_collection(
+        collection_name=collection_name,
+        vectors_config=vectors_config,
+    )
+    for field, schema in PAYLOAD_INDEXES:
+        try:
+            client.create_payload_index(collection_name, field_name=field, field_schema=schema)
+        except Exception as e:
+            logger.warning(f"payload 인덱스 생성 실패 ({field}): {e}")
+    return True
+
+
+def delete_doc_points(client: QdrantClient, collection_name: str, doc_id: str) -> None:
+    """
+    doc_id의 모든 포인트(청크+서식) 삭제 (이후 업서트보다 먼저 반영되도록 wait=True)
+
+    다른 문서의 대표 청크에 합쳐진 이 문서의 출처(alt_sources/alt_doc_ids)도 함께 지웁니다.
+    """
+    client.delete(
+        collection_name=collection_name,
+        points_selector=FilterSelector(
+            filter=Filter(must=[FieldCondition(key="doc_id", match=MatchValue(value=doc_id))])
+        ),
+        wait=True,
+    )
+    detach_alternates(client, collection_name, [doc_id])
+
+
+def detach_alternates(client: QdrantClient, collection_name: str, doc_ids: Sequence[str]) -> int:
+    """
+    대표 청크 payload의 alt_sources/alt_doc_ids에서 doc_ids 출처 제거
+
+    중복 제거로 건너뛴 문서를 다시 인덱싱하거나 삭제하면, 그 문서를 가리키던 다른 문서의
+    대표 청크 기록이 남아 2단계 검색이 삭제된 문서로 매칭되고 인용도 그 문서를 가리킵니다.
+
+    Returns:
+        수정한 대표 청크 수
+    """
+    doc_ids = set(doc_ids)
+    if not doc_ids:
+        return 0
+    query = Filter(must=[FieldCondition(key="alt_doc_ids", match=MatchAny(any=sorted(doc_ids)))])
+    operations = []
+    offset = None
+    while True:
+        points, offset = client.scroll(
+            collection_name=collection_name, scroll_filter=query, limit=256, offset=offset,
+            with_payload=["alt_sources"], with_vectors=False,
+        )
+        for point in points:
+            sources = [
+                source for source in (point.payload or {}).get("alt_sources") or []
+                if source.get("doc_id") not in doc_ids
+            ]
+            operations.append(SetPayloadOperation(set_payload=SetPayload(
+                payload=alternate_payload(sources), points=[point.id],
+            )))
+        if offset is None:
+            break
+    for start in range(0, len(operations), 256):
+        client.batch_update_points(
+            collection_name=collection_name, update_operations=operations[start:start + 256], wait=True
+        )
+    return len(operations)
+
+
+def dependent_documents(client: QdrantClient, collection_name: str, doc_ids: Sequence[str]) -> Dict[str, str]:
+    """
+    doc_ids의 대표 청크에 본문이 합쳐진 다른 문서 (doc_ids의 포인트를 지우면 함께 다시 인덱싱해야 함)
+
+    중복 제거로 건너뛴 청크는 대표 청크의 alt_sources에만 남으므로, 대표 청크를 가진 문서를
+    교체/삭제할 때 그 문서들도 다시 인덱싱하지 않으면 해당 본문이 인덱스에서 사라집니다.
+
+    Returns:
+        파일명 → 파일 경로 (doc_ids에 속한 문서 제외)
+    """
+    doc_ids = list(doc_ids)
+    if not doc_ids:
+        return {}
+    query = Filter(
+        must=[FieldCondition(key="doc_id", match=MatchAny(any=doc_ids))],
+        must_not=[IsEmptyCondition(is_empty=PayloadField(key="alt_sources"))],
+    )
+    dependents: Dict[str, str] = {}
+    offset = None
+    while True:
+        points, offset = client.scroll(
+            collection_name=collection_name, scroll_filter=query, limit=256, offset=offset,
+            with_payload=["alt_sources"], with_vectors=False,
+        )
+        for point in points:
+            for source in (point.payload or {}).get("alt_sources") or []:
+                if source.get("doc_id") not in doc_ids:
+                    dependents.setdefault(source["file_name"], source.get("file_path", ""))
+        if offset is None:
+            return dependents
+
+
+# -------------------- payload 스키마 --------------------
+
+def classify_document(file_name: str, parsed: Dict[str, Any]) -> Dict[str, Any]:
+    """기본 분류 단계: 파일명 기반 도메인/서브도메인"""
+    domain_primary = classify_domain_by_filename(file_name)
+    return {
+        "domain_primary": domain_primary,
+        "domain_secondary": extract_subdomain_by_filename(file_name, domain_primary),
+    }
+
+
+def document_payload(path: Path, file_name: str, total_pages: int, embedder,
+                     metadata: Mapping[str, Any]) -> Dict[str, Any]:
+    """
+    문서 공통 payload
+
+    Args:
+        path: PDF 경로
+        file_name: 문서 파일명 (doc_id/제목 기준)
+        total_pages: 전체 페이지 수
+        embedder: 임베딩 백엔드 (모델/백엔드 기록용)
+        metadata: 분류 단계 결과 (domain_primary, domain_secondary, 선택적으로 category 등)
+
+    Returns:
+        모든 포인트에 공통으로 들어가는 payload
+    """
+    title = file_name[:-4] if file_name.lower().endswith(".pdf") else file_name
+    meta_date = parse_register_date_from_filename(file_name)
+    payload = {
+        "doc_id": stable_doc_id(file_name),
+        "doc_title": title,
+        "file_name": file_name,
+        "file_path": str(path),
+        "source": title,
+        "document_level": infer_doc_level(file_name),
+        "document_type": infer_doc_level(file_name),
+        "domain_primary": None,
+        "domain_secondary": None,
+        "register_date_iso": meta_date["register_date_iso"],
+        "year": meta_date["year"],
+        "month": meta_date["month"],
+        "day": meta_date["day"],
+        "recency_score": calculate_recency_score(meta_date["year"]),
+        "total_pages": total_pages,
+        "file_size": path.stat().st_size,
+        "embed_backend": getattr(embedder, "name", ""),
+        "embed_model": getattr(embedder, "model_name", ""),
+        "embed_dim": embedder.get_sentence_embedding_dimension(),
+    }
+    payload.update(metadata)
+    return payload
+
+
+def chunk_payload(common: Mapping[str, Any], text: str, page_no: int,
+                  chunk_index: int, total_chunks: int) -> Dict[str, Any]:
+    """본문 청크 payload"""
+    return {
+        **common,
+        "text": text,
+        "page": page_no,
+        "chunk_index": chunk_index,
+        "total_chunks": total_chunks,
+        "chunk_char_len": len(text),
+        "doc_type": "text",
+    }
+
+
+def dedup_scope(common: Mapping[str, Any]) -> Tuple[Any, ...]:
+    """문서의 중복 제거 범위 (DEDUP_SCOPE_FIELDS 값)"""
+    return tuple(common.get(field) for field in DEDUP_SCOPE_FIELDS)
+
+
+def alternate_payload(sources: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """대표 청크에 기록할 중복 출처 payload"""
+    return {
+        "alt_sources": sources,
+        "alt_count": len(sources),
+        "alt_doc_ids": sorted({source["doc_id"] for source in sources}),
+    }
+
+
+def alt_source(common: Mapping[str, Any], page_no: int, chunk_index: int) -> Dict[str, Any]:
+    """중복 제거된 청크의 출처 (대표 청크 payload의 alt_sources 항목)"""
+    return {
+        "doc_id": common["doc_id"],
+        "doc_title": common["doc_title"],
+        "file_name": common["file_name"],
+        "file_path": common["file_path"],
+        "page": page_no,
+        "chunk_index": chunk_index,
+    }
+
+
+def document_summary_text(common: Mapping[str, Any], parsed: Dict[str, Any],
+                          max_chars: int = SUMMARY_MAX_CHARS) -> str:
+    """
+    문서 요약 포인트 텍스트: 제목, 문서 수준/도메인, 목적 조문, 조문 제목 목록
+
+    Args:
+        common: 문서 공통 payload
+        parsed: parse_document 결과
+        max_chars: 최대 길이
+
+    Returns:
+        요약 텍스트 (조문 머리말이 없으면 첫 청크 앞부분 사용)
+    """
+    headings = [h for page in parsed["pages"] for h in page.get("headings", [])]
+    lines = [f"{common['doc_title']} ({common['document_level']}, "
+             f"{common['domain_primary']}/{common['domain_secondary']})"]
+    if headings:
+        lines.append(headings[0]["text"])
+        titles = list(dict.fromkeys(h["title"] for h in headings[1:]))
+        if titles:
+            lines.append("조문: " + ", ".join(titles))
+    elif parsed["pages"]:
+        lines.append(parsed["pages"][0]["chunks"][0][:300])
+    return "\n".join(lines)[:max_chars]
+
+
+def summary_payload(common: Mapping[str, Any], text: str) -> Dict[str, Any]:
+    """문서 요약 payload (문서당 하나)"""
+    return {
+        **common,
+        "text": text,
+        "page": 0,
+        "chunk_index": 0,
+        "total_chunks": 1,
+        "chunk_char_len": len(text),
+        "doc_type": "summary",
+    }
+
+
+def heading_payload(common: Mapping[str, Any], heading: Mapping[str, str], page_no: int,
+                    heading_index: int) -> Dict[str, Any]:
+    """조문 머리말 payload (머리말 + 조문 앞부분)"""
+    text = f"{common['doc_title']} {heading['text']}"
+    return {
+        **common,
+        "text": text,
+        "page": page_no,
+        "chunk_index": heading_index,
+        "total_chunks": 1,
+        "chunk_char_len": len(text),
+        "doc_type": "heading",
+        "article": heading["article"],
+        "article_title": heading["title"],
+    }
+
+
+def form_payload(common: Mapping[str, Any], headnote_text: str, page_no: int, form_title: str,
+                 form_anchor_raw: Optional[str], form_file_uri: Optional[str],
+                 topics: List[str], synonyms: List[str]) -> Dict[str, Any]:
+    """서식 헤드노트 payload (서식 페이지당 하나)"""
+    return {
+        **common,
+        "text": headnote_text,
+        "page": page_no,
+        "chunk_index": 0,
+        "total_chunks": 1,
+        "chunk_char_len": len(headnote_text),
+        "doc_type": "form",
+        "form_title": form_title,
+        "form_page": page_no,
+        "form_file_uri": form_file_uri,
+        "form_anchor_raw": form_anchor_raw,
+        "topics": topics,
+        "synonyms": synonyms,
+        "anchor_refs": [f"{common['doc_id']}#제{page_no}조"] if page_no > 0 else [],
+    }
+
+
+def normalize_payload(payload: Optional[Mapping[str, Any]]) -> Dict[str, Any]:
+    """
+    엔진 도입 전 스키마의 payload를 통합 스키마 필드로 보완
+
+    - rag_indexer: source(파일명), path
+    - QdrantService: document_name, pdf_path, register_date(YYMMDD)
+
+    Args:
+        payload: 포인트 payload
+
+    Returns:
+        통합 스키마 필드(file_name, doc_title, source, file_path, register_date_iso 등)가 채워진 사본
+    """
+    data = dict(payload or {})
+    file_name = data.get("file_name") or data.get("document_name")
+    if not file_name and str(data.get("source", "")).lower().endswith(".pdf"):
+        file_name = data["source"]
+    if file_name:
+        title = file_name[:-4] if file_name.lower().endswith(".pdf") else file_name
+        data.setdefault("file_name", file_name)
+        data.setdefault("doc_title", title)
+        if not data.get("source") or data["source"] == file_name:
+            data["source"] = title
+        data.setdefault("doc_id", stable_doc_id(file_name))
+    data.setdefault("file_path", data.get("path") or data.get("pdf_path") or "")
+    if "register_date_iso" not in data and str(data.get("register_date", "")).isdigit():
+        data.update({
+            key: value for key, value in
+            parse_register_date_from_filename(f"({data['register_date']})").items()
+        })
+    data.setdefault("page", 0)
+    data.setdefault("chunk_index", 0)
+    data.setdefault("doc_type", "text")
+    return data
+
+
+# -------------------- 업서트 --------------------
+
+class AsyncUpserter:
+    """
+    파이프라인 업서트
+
+    배치를 백그라운드 스레드에서 wait=False로 보내고, 동시에 진행하는 요청은
+    max_in_flight개로 제한합니다(가장 오래된 요청이 끝나야 다음 배치 제출).
+    마지막 배치는 보류했다가 close()에서 wait=True로 보냅니다. Qdrant는 컬렉션의
+    업데이트를 순서대로 적용하므로 마지막 요청이 반영되면 앞선 요청도 모두 반영된 상태라,
+    close() 이후의 검증/센트로이드 계산/캐시 무효화가 완료된 데이터를 봅니다.
+
+    실패한 배치에 포함된 문서는 failed에 기록됩니다 (매니페스트에 기록하지 않고 다음 실행에서 재시도).
+    """
+
+    def __init__(self, client: QdrantClient, collection_name: str,
+                 batch_size: Optional[int] = None, max_in_flight: Optional[int] = None):
+        """
+        업서터 초기화
+
+        Args:
+            client: QdrantClient
+            collection_name: 컬렉션 이름
+            batch_size: 업서트 배치 크기 (기본값: INGEST_UPSERT_BATCH 또는 256)
+            max_in_flight: 동시에 진행하는 업서트 요청 수 (기본값: INGEST_MAX_IN_FLIGHT 또는 2)
+        """
+        self.client = client
+        self.collection_name = collection_name
+        self.batch_size = max(1, batch_size or int(os.getenv('INGEST_UPSERT_BATCH', 256)))
+        self.max_in_flight = max(1, max_in_flight or int(os.getenv('INGEST_MAX_IN_FLIGHT', 2)))
+        self._executor = ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix='qdrant-upsert')
+        self._in_flight: Deque[Tuple[Future, Set[str], int]] = deque()
+        self._points: List[PointStruct] = []
+        self._sources: Set[str] = set()
+        self._held: Optional[Tuple[List[PointStruct], Set[str]]] = None
+        self.failed: Dict[str, str] = {}
+
+        # 통계
+        self.points = 0
+        self.batches = 0
+        self.blocked_seconds = 0.0
+
+    def add(self, point: PointStruct, source: str) -> None:
+        """
+        포인트 추가 (배치가 차면 제출)
+
+        Args:
+            point: 업서트할 포인트
+            source: 포인트가 속한 문서 (실패 시 기록용)
+        """
+        self._points.append(point)
+        self._sources.add(source)
+        if len(self._points) >= self.batch_size:
+            self._cut()
+
+    def _cut(self) -> None:
+        batch = (self._points, self._sources)
+        self._points, self._sources = [], set()
+        if self._held is not None:
+            self._submit(*self._held)
+        self._held = batch
+
+    def _submit(self, points: List[PointStruct], sources: Set[str]) -> None:
+        while len(self._in_flight) >= self.max_in_flight:
+            self._reap_oldest()
+        future = self._executor.submit(
+            self.client.upsert, collection_name=self.collection_name, points=points, wait=False
+        )
+        self._in_flight.append((future, sources, len(points)))
+
+    def _reap_oldest(self) -> None:
+        future, sources, count = self._in_flight.popleft()
+        started = time.perf_counter()
+        try:
+            future.result()
+        except Exception as e:
+            self._fail(sources, e)
+        else:
+            self.points += count
+            self.batches += 1
+        finally:
+            self.blocked_seconds += time.perf_counter() - started
+
+    def _fail(self, sources: Set[str], error: Exception) -> None:
+        logger.error(f"업서트 실패 ({len(sources)}개 문서): {error}")
+        for source in sources:
+            self.failed.setdefault(source, str(error))
+
+    def close(self) -> Dict[str, str]:
+        """
+        남은 배치를 모두 보내고 반영될 때까지 대기
+
+        Returns:
+            실패한 문서 → 오류 메시지
+        """
+        try:
+            if self._points:
+                self._cut()
+            while self._in_flight:
+                self._reap_oldest()
+            if self._held is not None:
+                points, sources = self._held
+                self._held = None
+                started = time.perf_counter()
+                try:
+                    self.client.upsert(collection_name=self.collection_name, points=points, wait=True)
+                except Exception as e:
+                    self._fail(sources, e)
+                else:
+                    self.points += len(points)
+                    self.batches += 1
+                finally:
+                    self.blocked_seconds += time.perf_counter() - started
+        finally:
+            self._executor.shutdown(wait=True)
+        return self.failed
+
+    def stats(self) -> Dict[str, Any]:
+        """업서트 통계 (blocked_seconds: 메인 루프가 업서트 완료를 기다린 시간)"""
+        return {
+            'points': self.points,
+            'batches': self.batches,
+            'max_in_flight': self.max_in_flight,
+            'blocked_seconds': round(self.blocked_seconds, 2),
+            'failed_documents': len(self.failed),
+        }
+
+
+# -------------------- 엔진 --------------------
+
+class IngestionEngine:
+    """
+    PDF → 청크/서식 포인트 스트리밍 인덱싱
+
+    사용법:
+        engine = IngestionEngine(client, embedder, "regulations_final")
+        result = engine.run(pdf_files)
+        result['indexed']   # 파일명 → 포인트 수 (성공한 문서만)
+    """
+
+    def __init__(self, client: QdrantClient, embedder, collection_name: str,
+                 reader: Callable[[Path], List[Tuple[int, str]]] = read_pdf_by_page,
+                 cleaner: Callable[[str], str] = clean_page_text,
+                 chunker: Callable[[str], List[str]] = chunk_page_text,
+                 classifier: Callable[[str, Dict[str, Any]], Dict[str, Any]] = classify_document,
+                 batch_size: Optional[int] = None, max_in_flight: Optional[int] = None,
+                 parse_workers: Optional[int] = None, replace_existing: bool = False,
+                 dedup_threshold: Optional[float] = None, doc_vectors: Optional[bool] = None,
+                 progress: bool = False):
+        """
+        엔진 초기화
+
+        Args:
+            client: QdrantClient
+            embedder: 임베딩 백엔드
+            collection_name: 업서트할 컬렉션
+            reader: 읽기 단계 (모듈 최상위 함수, 파싱 워커에서 실행)
+            cleaner: 정제 단계 (모듈 최상위 함수, 파싱 워커에서 실행)
+            chunker: 청크 단계 (모듈 최상위 함수, 파싱 워커에서 실행)
+            classifier: 분류 단계 (파일명, 파싱 결과) → 문서 메타데이터 (메인 프로세스에서 실행)
+            batch_size: 업서트 배치 크기
+            max_in_flight: 동시에 진행하는 업서트 요청 수
+            parse_workers: 파싱 워커 수 (기본값: default_parse_workers(), 0이면 순차)
+            replace_existing: True면 문서마다 같은 doc_id의 기존 포인트를 먼저 삭제
+                (대표 청크에 본문이 합쳐져 있던 다른 문서도 함께 다시 인덱싱)
+            dedup_threshold: 준중복 청크 판정 임계값 (기본값: INGEST_DEDUP_THRESHOLD 또는 0.9, 0이면 끔)
+            doc_vectors: 문서 요약/조문 머리말 포인트 생성 여부 (기본값: INGEST_DOC_VECTORS 또는 True)
+            progress: tqdm 진행률 표시 여부
+        """
+        self.client = client
+        self.embedder = embedder
+        self.collection_name = collection_name
+        self.reader = reader
+        self.cleaner = cleaner
+        self.chunker = chunker
+        self.classifier = classifier
+        self.batch_size = batch_size
+        self.max_in_flight = max_in_flight
+        self.parse_workers = parse_workers
+        self.replace_existing = replace_existing
+        self.dedup_threshold = default_dedup_threshold() if dedup_threshold is None else dedup_threshold
+        self.doc_vectors = default_doc_vectors() if doc_vectors is None else doc_vectors
+        self.progress = progress
+
+    def run(self, pdf_files: Sequence[Path],
+            file_names: Optional[Mapping[Path, str]] = None) -> Dict[str, Any]:
+        """
+        PDF 목록 인덱싱
+
+        Args:
+            pdf_files: PDF 경로 목록
+            file_names: 경로 → 문서 파일명 (업로드처럼 저장 경로와 원래 이름이 다를 때)
+
+        Returns:
+            {'indexed': {파일명: 포인트 수}, 'failed': {파일명: 오류},
+             'embedding': BucketedEncoder 통계, 'upsert': AsyncUpserter 통계,
+             'dedup': ChunkDeduplicator 통계 (중복 제거를 끈 경우 None)}
+        """
+        file_names = dict(file_names or {})
+        pdf_files = list(pdf_files)
+        indexed: Dict[str, int] = {}
+        failed: Dict[str, str] = {}
+
+        if self.replace_existing:
+            pdf_files += self._dependent_files(pdf_files, file_names)
+
+        # 페이지/문서 경계와 관계없이 청크를 모아 길이순 큰 배치로 인코딩
+        encoder = BucketedEncoder(self.embedder)
+        upserter = AsyncUpserter(self.client, self.collection_name, self.batch_size, self.max_in_flight)
+        # 컬렉션 벡터 구성(이름 없는 벡터 / full / full+reduced)에 맞춰 업서트
+        layout = vector_layout(self.client, self.collection_name)
+        dedup = ChunkDeduplicator(self.dedup_threshold) if self.dedup_threshold > 0 else None
+        # 대표 청크 포인트 ID → (대표 문서, 중복 청크 출처 목록)
+        alternates: Dict[str, Tuple[str, List[Dict[str, Any]]]] = {}
+
+        def emit(ready) -> None:
+            """인코딩이 끝난 포인트를 업서트 파이프라인에 추가"""
+            if not ready:
+                return
+            vectors = point_vectors(layout, [vec for _, vec in ready])
+            for ((point_id, payload, source), _), vector in zip(ready, vectors):
+                upserter.add(PointStruct(id=point_id, vector=vector, payload=payload), source)
+
+        # 파싱은 프로세스 풀에서 미리 진행하고, 여기서는 분류/임베딩/업서트만 함
+        task = functools.partial(parse_document, reader=self.reader, cleaner=self.cleaner, chunker=self.chunker)
+        parsed_files = parse_in_parallel(pdf_files, task, workers=self.parse_workers)
+        if self.progress:
+            from tqdm import tqdm
+            parsed_files = tqdm(parsed_files, total=len(pdf_files), desc="Index PDFs")
+
+        try:
+            for pdf_path, parsed, parse_error in parsed_files:
+                file_name = file_names.get(pdf_path, pdf_path.name)
+                try:
+                    if parse_error is not None:
+                        raise parse_error
+                    if self.replace_existing:
+                        delete_doc_points(self.client, self.collection_name, stable_doc_id(file_name))
+                    indexed[file_name] = self._emit_document(
+                        encoder, emit, pdf_path, file_name, parsed, dedup, alternates
+                    )
+                except EncodeError as e:
+                    failed[file_name] = str(e)
+                    self._fail_encoded_sources(e, failed)
+                except Exception as e:
+                    logger.error(f"인덱싱 실패 {file_name}: {e}")
+                    failed[file_name] = str(e)
+            try:
+                emit(encoder.flush())
+            except EncodeError as e:
+                self._fail_encoded_sources(e, failed)
+        finally:
+            failed.update(upserter.close())
+
+        if alternates:
+            self._apply_alternates(alternates, failed)
+
+        for file_name in failed:
+            indexed.pop(file_name, None)
+        return {
+            'indexed': indexed,
+            'failed': failed,
+            'embedding': encoder.stats(),
+            'upsert': upserter.stats(),
+            'dedup': {**dedup.stats(), 'canonical_points': len(alternates)} if dedup is not None else None,
+        }
+
+    @staticmethod
+    def _fail_encoded_sources(error: EncodeError, failed: Dict[str, str]) -> None:
+        """
+        인코딩에 실패한 버퍼의 모든 출처 문서를 실패로 기록
+
+        버퍼는 여러 문서의 청크를 함께 담으므로 flush를 일으킨 문서만이 아니라 이전 문서의
+        버려진 청크도 업서트되지 않았습니다. 이 문서들이 매니페스트에 기록되면 다음 실행에서
+        건너뛰므로 모두 실패로 처리합니다 (다음 실행에서 기존 포인트 삭제 후 재인덱싱).
+        """
+        sources = sorted({source for (_, _, source) in error.items})
+        logger.error(f"임베딩 배치 실패, 문서 {len(sources)}개 실패 처리: {error}")
+        for source in sources:
+            failed.setdefault(source, f"임베딩 실패: {error}")
+
+    def _dependent_files(self, pdf_files: List[Path], file_names: Dict[Path, str]) -> List[Path]:
+        """교체할 문서의 대표 청크에 본문이 합쳐진 다른 문서 경로 (함께 다시 인덱싱)"""
+        names = {file_names.get(path, path.name) for path in pdf_files}
+        try:
+            dependents = dependent_documents(
+                self.client, self.collection_name, [stable_doc_id(name) for name in names]
+            )
+        except Exception as e:
+            logger.warning(f"중복 제거 의존 문서 조회 실패: {e}")
+            return []
+
+        extra = []
+        for name, file_path in sorted(dependents.items()):
+            path = Path(file_path) if file_path else None
+            if name in names or path is None or not path.exists():
+                if name not in names:
+                    logger.warning(f"본문이 합쳐진 문서를 찾을 수 없어 다시 인덱싱하지 못합니다: {name}")
+                continue
+            file_names[path] = name
+            extra.append(path)
+        if extra:
+            logger.info(f"대표 청크를 공유하는 문서 {len(extra)}개를 함께 다시 인덱싱합니다")
+        return extra
+
+    def _apply_alternates(self, alternates: Dict[str, Tuple[str, List[Dict[str, Any]]]],
+                          failed: Dict[str, str]) -> None:
+        """
+        중복 청크 출처를 대표 청크 payload(alt_sources, alt_doc_ids)에 기록
+
+        대표 청크를 가진 문서가 실패했으면 그 본문에 합쳐진 문서도 실패로 처리하여
+        다음 실행에서 다시 인덱싱되도록 합니다.
+        """
+        for canonical_file, sources in alternates.values():
+            if canonical_file in failed:
+                for source in sources:
+                    failed.setdefault(source["file_name"], f"대표 청크 문서 실패: {canonical_file}")
+
+        operations = [
+            SetPayloadOperation(set_payload=SetPayload(
+                payload=alternate_payload(sources), points=[point_id],
+            ))
+            for point_id, (canonical_file, sources) in alternates.items()
+            if canonical_file not in failed
+        ]
+        for start in range(0, len(operations), 256):
+            batch = operations[start:start + 256]
+            try:
+                self.client.batch_update_points(
+                    collection_name=self.collection_name, update_operations=batch, wait=True
+                )
+            except Exception as e:
+                logger.error(f"alt_sources 기록 실패: {e}")
+                for operation in batch:
+                    for source in alternates[operation.set_payload.points[0]][1]:
+                        failed.setdefault(source["file_name"], str(e))
+
+    def _emit_document(self, encoder: BucketedEncoder, emit, pdf_path: Path,
+                       file_name: str, parsed: Dict[str, Any],
+                       dedup: Optional[ChunkDeduplicator] = None,
+                       alternates: Optional[Dict[str, Tuple[str, List[Dict[str, Any]]]]] = None) -> int:
+        """문서 하나의 요약/머리말/서식/청크 포인트를 인코더에 추가하고 포인트 수 반환 (중복 청크 제외)"""
+        common = document_payload(
+            pdf_path, file_name, parsed["total_pages"], self.embedder, self.classifier(file_name, parsed)
+        )
+        doc_id = common["doc_id"]
+        scope = dedup_scope(common)
+        points = 0
+        articles = set()
+
+        if self.doc_vectors and parsed["pages"]:
+            summary = document_summary_text(common, parsed)
+            emit(encoder.add(summary, (summary_point_id(doc_id), summary_payload(common, summary), file_name)))
+            points += 1
+
+        for page in parsed["pages"]:
+            page_no = page["page_no"]
+            chunks = page["chunks"]
+
+            # 서식 포인트 (서식 제목을 헤드노트로 임베딩, 페이지당 한 번만)
+            form_title = page["form_title"]
+            if page["is_form"] and form_title:
+                form_anchor_raw = page["form_anchor_raw"]
+                topics, synonyms = generate_form_topics_and_synonyms(form_title, common["domain_primary"])
+                headnote_text = f"{form_anchor_raw} {form_title}" if form_anchor_raw else f"[서식] {form_title}"
+                payload = form_payload(
+                    common, headnote_text, page_no, form_title, form_anchor_raw,
+                    find_form_file_uri(file_name, form_title), topics, synonyms,
+                )
+                emit(encoder.add(headnote_text, (form_point_id(doc_id, page_no), payload, file_name)))
+                points += 1
+
+            # 조문 머리말 포인트 (부칙 등에서 같은 조문/제목이 반복되면 처음 것만)
+            for idx, heading in enumerate(page.get("headings", []) if self.doc_vectors else []):
+                key = (heading["article"], heading["title"])
+                if key in articles:
+                    continue
+                articles.add(key)
+                payload = heading_payload(common, heading, page_no, idx)
+                emit(encoder.add(payload["text"], (heading_point_id(doc_id, page_no, idx), payload, file_name)))
+                points += 1
+
+            for idx, chunk in enumerate(chunks):
+                point_id = chunk_point_id(doc_id, page_no, idx)
+                if dedup is not None:
+                    canonical = dedup.check(chunk, (point_id, file_name), scope=scope)
+                    if canonical is not None:
+                        # 준중복 청크는 임베딩/업서트하지 않고 대표 청크의 출처 목록에만 추가
+                        canonical_id, canonical_file = canonical
+                        alternates.setdefault(canonical_id, (canonical_file, []))[1].append(
+                            alt_source(common, page_no, idx)
+                        )
+                        continue
+                payload = chunk_payload(common, chunk, page_no, idx, len(chunks))
+                emit(encoder.add(chunk, (point_id, payload, file_name)))
+                points += 1
+        return points
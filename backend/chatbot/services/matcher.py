@@ -0,0 +1,339 @@
+"""
+다중 패턴 키워드 매처
+도메인/문서 타입/서식/최신성 키워드를 하나의 Aho-Corasick 오토마톤으로 컴파일해
+텍스트를 한 번만 훑어서 가중치 점수를 계산합니다.
+
+filters, rag_service, pipeline, embed_documents가 모두 이 모듈을 사용하므로
+같은 텍스트에 대해 같은 도메인/문서 타입 판단을 내립니다.
+Django 설정에 의존하지 않으므로 단독 인덱싱 스크립트에서도 사용할 수 있습니다.
+"""
+
+from collections import deque
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .constants import (
+    DEFAULT_SUBDOMAINS,
+    DOCUMENT_TYPE_KEYWORDS,
+    DOCUMENT_TYPE_PATTERNS,
+    DOMAIN_CLASSIFICATION,
+    DOMAIN_HINTS,
+    DOMAIN_KEYWORDS,
+    FORM_KEYWORDS,
+    FORM_REQUEST_PATTERNS,
+    RECENCY_KEYWORDS,
+    SUBDOMAIN_KEYWORDS,
+)
+
+# 매칭 카테고리
+CATEGORY_DOMAIN = 'domain'
+CATEGORY_SUBDOMAIN = 'subdomain'
+CATEGORY_DOC_TYPE = 'doc_type'
+CATEGORY_FORM = 'form'
+CATEGORY_FORM_REQUEST = 'form_request'
+CATEGORY_RECENCY = 'recency'
+
+# 키워드 출처별 가중치
+WEIGHT_DOMAIN_CORE = 2.0      # DOMAIN_CLASSIFICATION 대표 키워드
+WEIGHT_DOMAIN_HINT = 1.5      # DOMAIN_HINTS
+WEIGHT_DOMAIN_EXTENDED = 1.0  # DOMAIN_KEYWORDS 확장 키워드
+
+# 점수 동률 시 우선순위 (DOMAIN_CLASSIFICATION 정의 순서)
+DOMAIN_ORDER = {domain: i for i, domain in enumerate(DOMAIN_CLASSIFICATION)}
+DOC_TYPE_ORDER = {doc_type: i for i, doc_type in enumerate(DOCUMENT_TYPE_KEYWORDS)}
+
+
+class AhoCorasick:
+    """
+    Aho-Corasick 다중 문자열 매칭 오토마톤
+
+    패턴마다 (카테고리, 라벨, 가중치) 값을 붙여 두고, 텍스트를 한 번 훑으면서
+    겹치는 매칭까지 모두 (시작, 끝, 패턴, 값 목록)으로 돌려줍니다.
+    """
+
+    def __init__(self, entries: Iterable[Tuple[str, Tuple[str, str, float]]]):
+        """
+        오토마톤 생성
+
+        Args:
+            entries: (패턴, (카테고리, 라벨, 가중치)) 목록. 패턴은 casefold하여 비교
+        """
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[str, Tuple[str, str, float]]]] = [[]]
+
+        for pattern, value in entries:
+            pattern = pattern.casefold()
+            if pattern:
+                self._add(pattern, value)
+        self._build()
+
+    def _add(self, pattern: str, value: Tuple[str, str, float]) -> None:
+        state = 0
+        for ch in pattern:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = nxt
+        self._output[state].append((pattern, value))
+
+    def _build(self) -> None:
+        """실패 링크 계산 (BFS)"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                # 실패 링크 상태의 출력을 합쳐 두어 매칭 시 체인을 따라가지 않도록 함
+                self._output[nxt] = self._output[nxt] + self._output[self._fail[nxt]]
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, str, Tuple[str, str, float]]]:
+        """
+        텍스트의 모든 매칭 (겹침 포함)
+
+        Yields:
+            (시작 위치, 끝 위치, 패턴, (카테고리, 라벨, 가중치))
+        """
+        state = 0
+        for i, ch in enumerate(text.casefold()):
+            while state and ch not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(ch, 0)
+            for pattern, value in self._output[state]:
+                yield i - len(pattern) + 1, i + 1, pattern, value
+
+
+class TextMatch:
+    """
+    한 번의 스캔 결과
+
+    Attributes:
+        domains: 도메인 → 가중치 점수
+        subdomains: (도메인, 서브도메인) → 매칭 수
+        doc_types: 문서 타입 → 매칭 수
+        form_score: 서식 키워드 매칭 수
+        form_request: 서식 요청 패턴 포함 여부
+        recency: 최신성 키워드 포함 여부
+        terms: 카테고리 → 매칭된 키워드 목록 (등장 순서, 중복 제거)
+    """
+
+    def __init__(self):
+        self.domains: Dict[str, float] = {}
+        self.subdomains: Dict[Tuple[str, str], int] = {}
+        self.doc_types: Dict[str, int] = {}
+        self.form_score = 0
+        self.form_request = False
+        self.recency = False
+        self.terms: Dict[str, List[str]] = {}
+
+    def ranked_domains(self) -> List[str]:
+        """점수 순 도메인 목록 (동률은 DOMAIN_CLASSIFICATION 순서)"""
+        return sorted(
+            (d for d, score in self.domains.items() if score > 0),
+            key=lambda d: (-self.domains[d], DOMAIN_ORDER.get(d, len(DOMAIN_ORDER)))
+        )
+
+    def top_domain(self) -> Optional[str]:
+        """가장 점수가 높은 도메인 (없으면 None)"""
+        ranked = self.ranked_domains()
+        return ranked[0] if ranked else None
+
+    def ranked_doc_types(self) -> List[str]:
+        """문서 타입 목록 (DOCUMENT_TYPE_KEYWORDS 순서)"""
+        return sorted(self.doc_types, key=lambda t: DOC_TYPE_ORDER.get(t, len(DOC_TYPE_ORDER)))
+
+    def top_doc_type(self) -> Optional[str]:
+        """첫 번째 문서 타입 (없으면 None)"""
+        ranked = self.ranked_doc_types()
+        return ranked[0] if ranked else None
+
+    def subdomain_for(self, domain: str) -> str:
+        """
+        도메인의 서브도메인 (SUBDOMAIN_KEYWORDS 순서상 처음 일치한 것, 없으면 기본값)
+        """
+        for subdomain, _ in SUBDOMAIN_KEYWORDS.get(domain, []):
+            if (domain, subdomain) in self.subdomains:
+                return subdomain
+        return DEFAULT_SUBDOMAINS.get(domain, '일반')
+
+    @property
+    def is_form_related(self) -> bool:
+        """서식 관련 텍스트 여부"""
+        return self.form_score > 0 or self.form_request
+
+
+def _build_entries() -> List[Tuple[str, Tuple[str, str, float]]]:
+    """constants의 키워드 사전을 오토마톤 패턴 목록으로 변환"""
+    entries = []
+
+    # 같은 (도메인, 키워드)는 가장 높은 가중치 하나만 사용
+    domain_weights: Dict[Tuple[str, str], float] = {}
+    for domain, keywords in DOMAIN_KEYWORDS.items():
+        for kw in keywords:
+            key = (domain, kw.casefold())
+            domain_weights[key] = max(domain_weights.get(key, 0), WEIGHT_DOMAIN_EXTENDED)
+    for kw, domain in DOMAIN_HINTS.items():
+        key = (domain, kw.casefold())
+        domain_weights[key] = max(domain_weights.get(key, 0), WEIGHT_DOMAIN_HINT)
+    for domain, info in DOMAIN_CLASSIFICATION.items():
+        for kw in info['keywords']:
+            key = (domain, kw.casefold())
+            domain_weights[key] = max(domain_weights.get(key, 0), WEIGHT_DOMAIN_CORE)
+
+    for (domain, kw), weight in domain_weights.items():
+        entries.append((kw, (CATEGORY_DOMAIN, domain, weight)))
+
+    for domain, rules in SUBDOMAIN_KEYWORDS.items():
+        for subdomain, keywords in rules:
+            for kw in keywords:
+                entries.append((kw, (CATEGORY_SUBDOMAIN, f"{domain}/{subdomain}", 1.0)))
+
+    for doc_type, keywords in DOCUMENT_TYPE_KEYWORDS.items():
+        for kw in keywords:
+            entries.append((kw, (CATEGORY_DOC_TYPE, doc_type, 1.0)))
+
+    for kw in FORM_KEYWORDS:
+        entries.append((kw, (CATEGORY_FORM, kw, 1.0)))
+    for pattern in FORM_REQUEST_PATTERNS:
+        entries.append((pattern, (CATEGORY_FORM_REQUEST, pattern, 1.0)))
+    for kw in RECENCY_KEYWORDS:
+        entries.append((kw, (CATEGORY_RECENCY, kw, 1.0)))
+
+    return entries
+
+
+@lru_cache(maxsize=1)
+def get_matcher() -> AhoCorasick:
+    """공유 오토마톤 (최초 호출 시 한 번 컴파일)"""
+    return AhoCorasick(_build_entries())
+
+
+def _merge_contained(matches: List[Tuple[int, int, str, Tuple[str, str, float]]]
+                     ) -> List[Tuple[str, str, str, float]]:
+    """
+    같은 카테고리·라벨의 더 긴 매칭 안에 포함된 짧은 매칭을 합침
+    (예: '운영규정' 안의 '규정', '정보보안' 안의 '보안'이 중복 집계되지 않도록)
+    남는 긴 매칭은 포함된 매칭 중 가장 높은 가중치를 가집니다.
+
+    Returns:
+        (패턴, 카테고리, 라벨, 가중치) 목록 (등장 순서)
+    """
+    def contains(outer, inner) -> bool:
+        return (
+            outer is not inner
+            and outer[3][:2] == inner[3][:2]
+            and outer[0] <= inner[0] and inner[1] <= outer[1]
+            and (outer[1] - outer[0]) > (inner[1] - inner[0])
+        )
+
+    merged = []
+    for m in matches:
+        if any(contains(o, m) for o in matches):
+            continue
+        weight = max([m[3][2]] + [o[3][2] for o in matches if contains(m, o)])
+        merged.append((m[2], m[3][0], m[3][1], weight))
+    return merged
+
+
+@lru_cache(maxsize=4096)
+def match_text(text: str) -> TextMatch:
+    """
+    텍스트를 한 번 스캔해 도메인/서브도메인/문서 타입/서식/최신성 점수 계산
+
+    같은 문자열(파일명, 자주 반복되는 질문)은 결과를 캐싱합니다.
+    반환 객체는 공유되므로 수정하지 마세요.
+
+    Args:
+        text: 질문, 파일명 또는 키워드를 이어 붙인 문자열
+
+    Returns:
+        TextMatch
+    """
+    result = TextMatch()
+    if not text:
+        return result
+
+    matches = _merge_contained(list(get_matcher().iter_matches(text)))
+    for pattern, category, label, weight in matches:
+        terms = result.terms.setdefault(category, [])
+        if pattern not in terms:
+            terms.append(pattern)
+
+        if category == CATEGORY_DOMAIN:
+            result.domains[label] = result.domains.get(label, 0.0) + weight
+        elif category == CATEGORY_SUBDOMAIN:
+            domain, subdomain = label.split('/', 1)
+            key = (domain, subdomain)
+            result.subdomains[key] = result.subdomains.get(key, 0) + 1
+        elif category == CATEGORY_DOC_TYPE:
+            result.doc_types[label] = result.doc_types.get(label, 0) + 1
+        elif category == CATEGORY_FORM:
+            result.form_score += 1
+        elif category == CATEGORY_FORM_REQUEST:
+            result.form_request = True
+        elif category == CATEGORY_RECENCY:
+            result.recency = True
+
+    return result
+
+
+@lru_cache(maxsize=4096)
+def names_document(text: str) -> bool:
+    """
+    질문이 특정 규정/지침을 이름으로 가리키는지 여부
+
+    문서 타입 키워드가 다른 단어에 붙어 복합어를 이룰 때만 문서 이름으로 봅니다.
+    ('여비규정', '정보보안지침', '취업규칙'은 해당, '관련 규정이 있나요'는 해당 없음)
+
+    Args:
+        text: 질문
+
+    Returns:
+        문서 이름 포함 여부
+    """
+    folded = text.casefold()
+    for start, _, _, (category, _, _) in get_matcher().iter_matches(text):
+        if category == CATEGORY_DOC_TYPE and start > 0 and folded[start - 1].isalnum():
+            return True
+    return False
+
+
+def match_keywords(keywords: Iterable[str]) -> TextMatch:
+    """키워드 목록을 한 번에 스캔 (키워드 경계를 넘는 매칭이 생기지 않도록 줄바꿈으로 연결)"""
+    return match_text("\n".join(k for k in keywords if k))
+
+
+def document_type_from_filename(filename: str) -> Optional[str]:
+    """파일명 접두어(1_, 2_, ...)로 문서 타입 판단 (DOCUMENT_TYPE_PATTERNS)"""
+    for prefix, info in DOCUMENT_TYPE_PATTERNS.items():
+        if filename.startswith(prefix):
+            return info['type']
+    return None
+
+
+@lru_cache(maxsize=1024)
+def classify_filename(filename: str) -> Dict[str, str]:
+    """
+    파일명 기반 도메인/서브도메인/문서 타입 분류 (인덱서와 검색기 공통)
+
+    Args:
+        filename: 파일명
+
+    Returns:
+        {'domain', 'subdomain', 'document_type'} (도메인 미확인 시 '일반')
+    """
+    m = match_text(filename)
+    domain = m.top_domain()
+    return {
+        'domain': domain or '일반',
+        'subdomain': m.subdomain_for(domain) if domain else '일반',
+        'document_type': document_type_from_filename(filename) or '기타',
+    }
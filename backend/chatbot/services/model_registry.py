@@ -0,0 +1,240 @@
+"""
+모델 레지스트리
+프로세스 안의 모든 소비자(RagSearcher, rag_service, QdrantService, 인덱서)가
+같은 임베딩 모델 인스턴스를 공유하도록 지연 로딩 + 캐싱합니다.
+
+- 최초 사용 시점에 한 번만 로딩 (import 시점에는 로딩하지 않음)
+- 서버 시작 시 명시적으로 호출하는 워밍업 훅 (warm_up)
+- 로딩된 모델과 프로세스 메모리 사용량 보고 (memory_report)
+- migrate/collectstatic 등 관리 명령에서는 모델 로딩을 차단 (MODEL_FREE_COMMANDS)
+
+단독 인덱싱 스크립트(embed_documents.py)에서도 사용하므로 Django 설정이
+없으면 환경변수/기본값으로 동작합니다.
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from .embedding_backends import DEFAULT_MODEL_NAME, EmbeddingBackend, build_embedder
+
+logger = logging.getLogger(__name__)
+
+# 모델이 필요 없는 관리 명령 기본값 (MODEL_FREE_COMMANDS로 변경 가능)
+DEFAULT_MODEL_FREE_COMMANDS = [
+    'migrate', 'makemigrations', 'collectstatic', 'check', 'createsuperuser',
+    'showmigrations', 'sqlmigrate', 'qdrant_init', 'qdrant_snapshot', 'qdrant_restore',
+]
+
+
+class ModelLoadBlocked(RuntimeError):
+    """모델 로딩이 허용되지 않은 프로세스에서 로딩을 시도한 경우"""
+
+
+def _setting(name: str, default: Any) -> Any:
+    """Django 설정값 조회 (Django 미설정 환경에서는 기본값)"""
+    try:
+        from django.conf import settings
+        if settings.configured:
+            return getattr(settings, name, default)
+    except ImportError:
+        pass
+    return default
+
+
+def _current_management_command() -> Optional[str]:
+    """manage.py로 실행 중이면 관리 명령 이름 반환"""
+    if len(sys.argv) >= 2 and os.path.basename(sys.argv[0]) == 'manage.py':
+        return sys.argv[1]
+    return None
+
+
+def _process_rss_mb() -> Optional[float]:
+    """현재 프로세스 RSS(MB)"""
+    try:
+        with open('/proc/self/status', encoding='utf-8') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    try:
+        import resource
+        # Linux 기준 KB 단위 최대 RSS
+        return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    except (ImportError, AttributeError):
+        return None
+
+
+def _estimate_weights_mb(model: Any) -> Optional[float]:
+    """PyTorch 모델 가중치 크기 추정(MB), 그 외 백엔드는 None"""
+    backend = getattr(model, 'backend', model)  # MicroBatchEmbedder 래퍼 해제
+    st_model = getattr(backend, 'model', None)
+    if st_model is None or not hasattr(st_model, 'parameters'):
+        return None
+    total = sum(p.numel() * p.element_size() for p in st_model.parameters())
+    return round(total / (1024 * 1024), 1)
+
+
+class ModelRegistry:
+    """
+    프로세스 단위 모델 레지스트리 (스레드 안전)
+    """
+
+    def __init__(self):
+        self._models: Dict[str, Any] = {}
+        self._load_seconds: Dict[str, float] = {}
+        self._rss_delta_mb: Dict[str, Optional[float]] = {}
+        # 래퍼 모델의 loader가 다른 모델을 get()할 수 있으므로 재진입 가능 락 사용
+        self._lock = threading.RLock()
+
+    def _check_allowed(self, key: str) -> None:
+        """관리 명령 프로세스에서의 모델 로딩 차단"""
+        command = _current_management_command()
+        if command is None:
+            return
+        blocked = _setting('MODEL_FREE_COMMANDS', DEFAULT_MODEL_FREE_COMMANDS)
+        if command in blocked:
+            raise ModelLoadBlocked(
+                f"관리 명령 '{command}'에서는 모델({key})을 로딩하지 않습니다 (MODEL_FREE_COMMANDS)"
+            )
+
+    def get(self, key: str, loader: Callable[[], Any]) -> Any:
+        """
+        모델 조회 (없으면 loader로 한 번만 로딩)
+
+        Args:
+            key: 모델 키
+            loader: 모델 생성 함수
+
+        Returns:
+            공유 모델 인스턴스
+        """
+        model = self._models.get(key)
+        if model is not None:
+            return model
+
+        with self._lock:
+            model = self._models.get(key)
+            if model is not None:
+                return model
+
+            self._check_allowed(key)
+            rss_before = _process_rss_mb()
+            started = time.perf_counter()
+            model = loader()
+            elapsed = time.perf_counter() - started
+            rss_after = _process_rss_mb()
+
+            self._models[key] = model
+            self._load_seconds[key] = round(elapsed, 2)
+            if rss_before is not None and rss_after is not None:
+                self._rss_delta_mb[key] = round(rss_after - rss_before, 1)
+            logger.info(f"모델 로딩 완료: {key} ({elapsed:.1f}s, RSS {rss_after}MB)")
+            return model
+
+    def peek(self, key: str) -> Optional[Any]:
+        """로딩하지 않고 조회 (없으면 None)"""
+        return self._models.get(key)
+
+    def loaded_keys(self) -> List[str]:
+        """로딩된 모델 키 목록"""
+        return list(self._models)
+
+    def memory_report(self) -> Dict[str, Any]:
+        """
+        메모리 사용량 보고
+
+        Returns:
+            프로세스 RSS와 로딩된 모델별 로딩 시간/RSS 증가량/가중치 크기 추정치
+        """
+        models = []
+        for key, model in list(self._models.items()):
+            info = {
+                'key': key,
+                'load_seconds': self._load_seconds.get(key),
+                # 로딩 전후 RSS 차이 (래퍼처럼 다른 모델을 재사용하면 0에 가까움)
+                'rss_delta_mb': self._rss_delta_mb.get(key),
+            }
+            if isinstance(model, EmbeddingBackend):
+                info.update(model.describe())
+            try:
+                info['weights_mb'] = _estimate_weights_mb(model)
+            except Exception as e:
+                logger.debug(f"모델 크기 추정 실패 ({key}): {e}")
+                info['weights_mb'] = None
+            models.append(info)
+
+        return {
+            'pid': os.getpid(),
+            'rss_mb': _process_rss_mb(),
+            'models': models,
+        }
+
+
+_REGISTRY = ModelRegistry()
+
+
+def get_registry() -> ModelRegistry:
+    """프로세스 전역 모델 레지스트리 반환"""
+    return _REGISTRY
+
+
+def get_embedder(model_name: Optional[str] = None, backend: Optional[str] = None) -> EmbeddingBackend:
+    """
+    공유 임베딩 백엔드 반환 (최초 호출 시 로딩)
+
+    Args:
+        model_name: 모델 이름 (기본값: HF_MODEL 또는 nlpai-lab/KoE5)
+        backend: torch | onnx (기본값: EMBED_BACKEND)
+
+    Returns:
+        임베딩 백엔드
+    """
+    model_name = model_name or os.getenv('HF_MODEL', DEFAULT_MODEL_NAME)
+    backend = (backend or os.getenv('EMBED_BACKEND', 'torch')).lower()
+    return _REGISTRY.get(
+        f"embedder:{backend}:{model_name}",
+        lambda: build_embedder(backend=backend, model_name=model_name),
+    )
+
+
+def warm_up(encode: bool = True) -> Dict[str, Any]:
+    """
+    서버 시작 시 모델 워밍업
+
+    질의 임베더를 로딩하고 한 번 인코딩해 첫 요청의 지연을 없앱니다.
+
+    Args:
+        encode: 추론까지 수행할지 여부 (fork 전 마스터 프로세스에서는 False로
+            가중치만 로딩하고, 추론 스레드 풀은 워커에서 초기화)
+
+    Returns:
+        메모리 사용량 보고
+    """
+    from .embedding_batcher import get_query_embedder
+
+    started = time.perf_counter()
+    embedder = get_query_embedder()
+    if encode:
+        # 배칭 실행 스레드는 fork 이후 자식에서 시작되도록 백엔드를 직접 호출
+        getattr(embedder, 'backend', embedder).encode(["워밍업"], batch_size=1)
+    report = _REGISTRY.memory_report()
+    logger.info(f"모델 워밍업 완료 ({time.perf_counter() - started:.1f}s): {report}")
+    return report
+
+
+def warm_up_if_enabled() -> None:
+    """MODEL_WARMUP_ON_START 설정이 켜져 있으면 워밍업 (ASGI/WSGI 진입점에서 호출)"""
+    if not _setting('MODEL_WARMUP_ON_START', False):
+        return
+    try:
+        warm_up(encode=_setting('MODEL_WARMUP_ENCODE', True))
+    except ModelLoadBlocked as e:
+        logger.info(str(e))
+    except Exception as e:
+        # 워밍업 실패로 서버가 뜨지 않는 일은 없도록 하고, 첫 요청에서 다시 로딩
+        logger.error(f"모델 워밍업 실패: {e}")
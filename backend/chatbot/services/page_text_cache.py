@@ -0,0 +1,211 @@
+"""
+PDF 페이지 텍스트 추출 캐시
+서식 분리(pdf_form_extractor_v6), 서식 패턴 분석(analyze_form_patterns), 카테고리 분류,
+인덱서(embed_documents, rag_indexer, QdrantService)가 같은 PDF의 페이지 텍스트를 각자
+다시 추출하던 것을 PDF당 한 번으로 줄입니다. 페이지별 원문과 간단한 레이아웃 힌트를
+PDF 내용 sha256을 키로 한 사이드카 JSON에 저장하고, 이후에는 파일 해시만 계산해 읽어 옵니다.
+
+사이드카는 <캐시 디렉토리>/<sha256 앞 2자리>/<sha256>.<추출기>.json 에 저장되며
+임시 파일에 쓴 뒤 교체하므로 파싱 워커 여러 개가 동시에 써도 깨지지 않습니다.
+
+인덱서에서 사용하므로 Django 설정에 의존하지 않습니다.
+
+    PAGE_CACHE_ENABLED    false이면 캐시 없이 매번 추출 (기본값: true)
+    PAGE_CACHE_DIR        캐시 디렉토리 (기본값: <인덱스 상태 디렉토리>/page_text)
+    PAGE_TEXT_EXTRACTOR   텍스트 추출기 pypdf2 | pdfplumber (기본값: pypdf2, 인덱서와 같은 텍스트)
+"""
+
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .index_manifest import file_sha256
+from .index_state import index_state_dir
+from .pdf_parsing import parse_in_parallel
+
+logger = logging.getLogger(__name__)
+
+# 사이드카 형식/추출 방식이 바뀌면 올림 (이전 사이드카는 무시되고 다시 추출)
+PAGE_CACHE_VERSION = 1
+
+EXTRACTORS = ('pypdf2', 'pdfplumber')
+
+# 레이아웃 힌트에 남길 앞부분 줄 수 (서식 시작 앵커/제목 탐색 범위)
+HEAD_LINES = 6
+
+
+def default_extractor() -> str:
+    """PAGE_TEXT_EXTRACTOR 환경변수 (기본값: pypdf2)"""
+    extractor = os.getenv('PAGE_TEXT_EXTRACTOR', 'pypdf2').lower()
+    if extractor not in EXTRACTORS:
+        raise ValueError(f"지원하지 않는 PAGE_TEXT_EXTRACTOR: {extractor} ({', '.join(EXTRACTORS)})")
+    return extractor
+
+
+def page_cache_enabled() -> bool:
+    """PAGE_CACHE_ENABLED 환경변수 (기본값: true)"""
+    return os.getenv('PAGE_CACHE_ENABLED', 'true').lower() == 'true'
+
+
+def page_cache_dir() -> Path:
+    """사이드카 디렉토리 (PAGE_CACHE_DIR, 기본값: 상태 디렉토리 하위 page_text)"""
+    configured = os.getenv('PAGE_CACHE_DIR')
+    return Path(configured) if configured else index_state_dir() / 'page_text'
+
+
+def layout_hints(text: str, width: float = None, height: float = None) -> Dict[str, Any]:
+    """
+    페이지 레이아웃 힌트
+
+    서식 페이지 판별/제목 추출은 앞부분 몇 줄만 보므로 원문을 다시 나누지 않고
+    바로 쓸 수 있도록 비어 있지 않은 앞부분 줄을 함께 저장합니다.
+    """
+    lines = text.split('\n') if text else []
+    head = [line.strip() for line in lines if line.strip()][:HEAD_LINES]
+    return {
+        'head_lines': head,
+        'line_count': len(lines),
+        'char_count': len(text or ''),
+        'width': round(float(width), 1) if width else None,
+        'height': round(float(height), 1) if height else None,
+    }
+
+
+def extract_pages(pdf_path: Path, extractor: str = 'pypdf2') -> List[Dict[str, Any]]:
+    """
+    PDF 한 번 읽기로 모든 페이지의 원문과 레이아웃 힌트 추출 (캐시 미사용)
+
+    Args:
+        pdf_path: PDF 경로
+        extractor: pypdf2 | pdfplumber
+
+    Returns:
+        [{'page_no', 'text', 'hints'}] (페이지 번호는 1부터)
+    """
+    pages = []
+    if extractor == 'pdfplumber':
+        import pdfplumber
+        with pdfplumber.open(str(pdf_path)) as pdf:
+            for i, page in enumerate(pdf.pages, start=1):
+                text = page.extract_text() or ""
+                pages.append({'page_no': i, 'text': text,
+                              'hints': layout_hints(text, page.width, page.height)})
+        return pages
+
+    from PyPDF2 import PdfReader
+    reader = PdfReader(str(pdf_path))
+    for i, page in enumerate(reader.pages, start=1):
+        text = page.extract_text() or ""
+        box = page.mediabox
+        pages.append({'page_no': i, 'text': text,
+                      'hints': layout_hints(text, box.width, box.height)})
+    return pages
+
+
+def sidecar_path(sha256: str, extractor: str) -> Path:
+    """PDF 해시/추출기에 해당하는 사이드카 경로"""
+    return page_cache_dir() / sha256[:2] / f"{sha256}.{extractor}.json"
+
+
+def _read_sidecar(path: Path, extractor: str) -> Optional[List[Dict[str, Any]]]:
+    try:
+        data = json.loads(path.read_text(encoding='utf-8'))
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning(f"페이지 캐시를 읽을 수 없어 다시 추출합니다: {path} ({e})")
+        return None
+    if data.get('version') != PAGE_CACHE_VERSION or data.get('extractor') != extractor:
+        return None
+    return data['pages']
+
+
+def _write_sidecar(path: Path, sha256: str, extractor: str, pdf_path: Path,
+                   pages: List[Dict[str, Any]]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = {
+        'version': PAGE_CACHE_VERSION,
+        'extractor': extractor,
+        'sha256': sha256,
+        'file_name': Path(pdf_path).name,
+        'total_pages': len(pages),
+        'pages': pages,
+    }
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix='.tmp-', suffix='.json')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def _load(pdf_path: Path, extractor: Optional[str] = None) -> Tuple[List[Dict[str, Any]], bool]:
+    """(페이지 목록, 캐시 적중 여부)"""
+    extractor = extractor or default_extractor()
+    if not page_cache_enabled():
+        return extract_pages(pdf_path, extractor), False
+
+    sha256 = file_sha256(Path(pdf_path))
+    path = sidecar_path(sha256, extractor)
+    pages = _read_sidecar(path, extractor)
+    if pages is not None:
+        return pages, True
+
+    pages = extract_pages(pdf_path, extractor)
+    try:
+        _write_sidecar(path, sha256, extractor, pdf_path, pages)
+    except OSError as e:
+        logger.warning(f"페이지 캐시를 저장하지 못했습니다: {path} ({e})")
+    return pages, False
+
+
+def load_pages(pdf_path: Path, extractor: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    PDF 페이지 목록 (사이드카가 있으면 읽고, 없으면 한 번 추출해 저장)
+
+    Args:
+        pdf_path: PDF 경로
+        extractor: pypdf2 | pdfplumber (기본값: default_extractor())
+
+    Returns:
+        [{'page_no', 'text', 'hints': {'head_lines', 'line_count', 'char_count', 'width', 'height'}}]
+    """
+    return _load(pdf_path, extractor)[0]
+
+
+def read_pages(pdf_path: Path) -> List[Tuple[int, str]]:
+    """인덱서 읽기 단계 형식의 페이지 목록 [(페이지 번호, 원문)]"""
+    return [(page['page_no'], page['text']) for page in load_pages(pdf_path)]
+
+
+def _warm_one(pdf_path: Path) -> bool:
+    """파싱 워커 작업: 사이드카 생성 (캐시 적중 여부 반환)"""
+    return _load(pdf_path)[1]
+
+
+def warm_page_cache(pdf_paths: Iterable[Path], workers: Optional[int] = None) -> Dict[str, Any]:
+    """
+    여러 PDF의 사이드카를 프로세스 풀에서 미리 생성
+
+    Args:
+        pdf_paths: PDF 경로 목록
+        workers: 워커 프로세스 수 (기본값: default_parse_workers(), 0이면 순차 처리)
+
+    Returns:
+        {'cached', 'extracted', 'failed': {파일명: 오류}}
+    """
+    result: Dict[str, Any] = {'cached': 0, 'extracted': 0, 'failed': {}}
+    for pdf_path, hit, error in parse_in_parallel(list(pdf_paths), _warm_one, workers=workers):
+        if error is not None:
+            result['failed'][Path(pdf_path).name] = str(error)
+        elif hit:
+            result['cached'] += 1
+        else:
+            result['extracted'] += 1
+    return result
@@ -0,0 +1,97 @@
+"""
+병렬 PDF 파싱 파이프라인
+PDF 텍스트 추출/정제는 CPU 바운드라 임베딩과 같은 루프에서 돌리면 파서와 모델이
+번갈아 쉬게 됩니다. 프로세스 풀이 파일 단위로 파싱을 미리 진행하고, 메인 프로세스는
+완료된 결과를 받아 임베딩/업서트만 수행합니다 (생산자/소비자).
+
+미리 파싱해 두는 파일 수는 max_pending으로 제한하여(백프레셔) 임베딩이 느릴 때
+파싱 결과가 메모리에 무한정 쌓이지 않도록 합니다.
+
+작업 함수는 프로세스 간에 전달되므로 모듈 최상위 함수여야 합니다.
+인덱서에서 사용하므로 Django 설정에 의존하지 않습니다.
+"""
+
+import logging
+import multiprocessing as mp
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+
+def default_parse_workers() -> int:
+    """
+    파싱 워커 수 (PDF_PARSE_WORKERS 환경변수, 기본값은 인덱서 스레드 예산의 parse_workers)
+    """
+    configured = os.getenv('PDF_PARSE_WORKERS')
+    if configured is not None:
+        return max(0, int(configured))
+    from config.runtime import ROLE_INDEXER, compute_thread_budget
+    return compute_thread_budget(ROLE_INDEXER)['parse_workers']
+
+
+def _context():
+    # torch/OpenMP 스레드 풀이 떠 있는 프로세스를 fork하면 자식이 멈출 수 있으므로 기본은 spawn
+    return mp.get_context(os.getenv('PDF_PARSE_START_METHOD', 'spawn'))
+
+
+def parse_in_parallel(items: Iterable[T], task: Callable[[T], Any],
+                      workers: Optional[int] = None,
+                      max_pending: Optional[int] = None,
+                      ordered: bool = False) -> Iterator[Tuple[T, Any, Optional[BaseException]]]:
+    """
+    items를 프로세스 풀에서 task로 처리하고 완료 순서대로 결과 반환
+
+    Args:
+        items: 처리할 항목 (예: PDF 경로)
+        task: 모듈 최상위 작업 함수 (항목 → 파싱 결과)
+        workers: 워커 프로세스 수 (기본값: default_parse_workers(), 0이면 현재 프로세스에서 순차 처리)
+        max_pending: 동시에 제출/보관하는 최대 항목 수 (기본값: PDF_PARSE_QUEUE 또는 workers × 2)
+        ordered: True면 완료 순서 대신 입력 순서대로 반환
+
+    Yields:
+        (항목, 결과, 예외) - 작업이 실패하면 결과는 None, 예외가 채워짐
+    """
+    if workers is None:
+        workers = default_parse_workers()
+
+    if workers <= 0:
+        for item in items:
+            try:
+                yield item, task(item), None
+            except Exception as e:
+                yield item, None, e
+        return
+
+    if max_pending is None:
+        max_pending = int(os.getenv('PDF_PARSE_QUEUE', 0)) or workers * 2
+    max_pending = max(max_pending, workers)
+
+    iterator = iter(items)
+    pending: Dict[Future, T] = {}
+    with ProcessPoolExecutor(max_workers=workers, mp_context=_context()) as pool:
+        def fill() -> None:
+            while len(pending) < max_pending:
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                pending[pool.submit(task, item)] = item
+
+        fill()
+        while pending:
+            if ordered:
+                # dict는 제출 순서를 유지하므로 가장 먼저 제출한 항목을 기다림
+                done = [next(iter(pending))]
+                wait(done)
+            else:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                item = pending.pop(future)
+                error = future.exception()
+                yield item, (None if error else future.result()), error
+            # 소비자가 결과를 처리한 뒤에만 새 항목을 제출 (백프레셔)
+            fill()
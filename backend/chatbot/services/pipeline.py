@@ -8,7 +8,13 @@ from typing import List, Dict, Any, Optional
 from django.conf import settings
 from .keyword_extractor import extract_keywords
 from .filters import guess_domains_from_keywords
+from .matcher import match_keywords, match_text
+from .domain_router import get_domain_router
 from .rag_search import RagSearcher
+from .search_cache import get_retrieval_cache
+from .embedding_batcher import get_batcher_stats
+from .model_registry import get_registry
+from config.runtime import get_applied_budget
 from .answerer import make_answer, format_context_for_display, validate_answer_quality
 import datetime
 import re
@@ -695,36 +701,68 @@ def answer_query(query: str, openai_api_key: str = None, explicit_domain: str =
         logger.info("복잡한 질문 감지, 전체 RAG 파이프라인 실행")
         print(f"DEBUG: 복잡한 질문 감지, 전체 RAG 파이프라인 실행")
         
-        # 1단계: 키워드 추출
-        logger.info("1단계: 키워드 추출 시작")
-        keywords_start = time.time()
-        try:
-            keywords = extract_keywords(query, openai_api_key)
-            logger.info(f"키워드 추출 완료 (소요시간: {time.time() - keywords_start:.2f}초)")
-            print(f"DEBUG: 추출된 키워드: {keywords}")
-        except Exception as e:
-            logger.error(f"키워드 추출 실패: {e}")
+        searcher = RagSearcher()
+        
+        # 0단계: 임베딩 센트로이드 도메인 라우팅 (질의 벡터만으로 도메인 결정)
+        # 서식 질문은 서식 전용 검색을 타야 하므로 라우팅하지 않음
+        routed = None
+        query_vector = None
+        if (not explicit_domain and getattr(settings, 'DOMAIN_ROUTER_ENABLED', True)
+                and not match_text(query).is_form_related):
+            try:
+                router = get_domain_router(
+                    searcher.collection_name,
+                    min_score=getattr(settings, 'DOMAIN_ROUTER_MIN_SCORE', None),
+                    min_margin=getattr(settings, 'DOMAIN_ROUTER_MIN_MARGIN', None),
+                )
+                if router.available:
+                    query_vector = searcher.embed_query(query)
+                    routed = router.route(query_vector)
+                    if routed:
+                        logger.info(
+                            f"센트로이드 도메인 라우팅: {routed['domain']}/{routed['subdomain']} "
+                            f"(score={routed['score']}, margin={routed['margin']}, confident={routed['confident']})"
+                        )
+            except Exception as e:
+                logger.error(f"센트로이드 도메인 라우팅 실패: {e}")
+                routed = None
+        
+        if routed and routed['confident']:
+            # 도메인이 확정되면 LLM 키워드 추출을 기다리지 않고 바로 도메인 필터 검색
             keywords = []
-            print(f"WARNING: 키워드 추출 실패, 빈 리스트 사용: {e}")
+            estimated_domains = [routed['domain']]
+            print(f"DEBUG: 센트로이드 라우팅 도메인: {routed['domain']} (margin={routed['margin']})")
+        else:
+            # 1단계: 키워드 추출
+            logger.info("1단계: 키워드 추출 시작")
+            keywords_start = time.time()
+            try:
+                keywords = extract_keywords(query, openai_api_key)
+                logger.info(f"키워드 추출 완료 (소요시간: {time.time() - keywords_start:.2f}초)")
+                print(f"DEBUG: 추출된 키워드: {keywords}")
+            except Exception as e:
+                logger.error(f"키워드 추출 실패: {e}")
+                keywords = []
+                print(f"WARNING: 키워드 추출 실패, 빈 리스트 사용: {e}")
         
-        # 2단계: 도메인 추정
-        logger.info("2단계: 도메인 추정 시작")
-        domain_start = time.time()
-        try:
-            if explicit_domain:
-                # 명시적으로 지정된 도메인 우선
-                estimated_domains = [explicit_domain]
-                logger.info(f"명시적 도메인 사용: {explicit_domain}")
-                print(f"DEBUG: 명시적 도메인 사용: {explicit_domain}")
-            else:
-                # 키워드 기반 도메인 추정
-                estimated_domains = guess_domains_from_keywords(keywords)
-                logger.info(f"도메인 추정 완료 (소요시간: {time.time() - domain_start:.2f}초)")
-                print(f"DEBUG: 추정된 도메인: {estimated_domains}")
-        except Exception as e:
-            logger.error(f"도메인 추정 실패: {e}")
-            estimated_domains = []
-            print(f"WARNING: 도메인 추정 실패, 빈 리스트 사용: {e}")
+            # 2단계: 도메인 추정
+            logger.info("2단계: 도메인 추정 시작")
+            domain_start = time.time()
+            try:
+                if explicit_domain:
+                    # 명시적으로 지정된 도메인 우선
+                    estimated_domains = [explicit_domain]
+                    logger.info(f"명시적 도메인 사용: {explicit_domain}")
+                    print(f"DEBUG: 명시적 도메인 사용: {explicit_domain}")
+                else:
+                    # 키워드 기반 도메인 추정
+                    estimated_domains = guess_domains_from_keywords(keywords)
+                    logger.info(f"도메인 추정 완료 (소요시간: {time.time() - domain_start:.2f}초)")
+                    print(f"DEBUG: 추정된 도메인: {estimated_domains}")
+            except Exception as e:
+                logger.error(f"도메인 추정 실패: {e}")
+                estimated_domains = []
+                print(f"WARNING: 도메인 추정 실패, 빈 리스트 사용: {e}")
         
         # 3단계: 향상된 RAG 검색 (새로운 메타데이터 구조 활용)
         logger.info("3단계: RAG 검색 시작")
@@ -732,44 +770,56 @@ def answer_query(query: str, openai_api_key: str = None, explicit_domain: str =
         
         try:
             # 검색 전략 결정
-            search_strategy = _determine_search_strategy(query, keywords, estimated_domains)
+            if routed and routed['confident']:
+                search_strategy = {
+                    'type': 'domain_specific',
+                    'domain': routed['domain'],
+                    'confidence': 'high',
+                    'router': 'centroid',
+                    'score': routed['score'],
+                    'margin': routed['margin'],
+                }
+            else:
+                search_strategy = _determine_search_strategy(query, keywords, estimated_domains)
             logger.info(f"검색 전략 결정: {search_strategy}")
             print(f"DEBUG: 검색 전략: {search_strategy}")
             
-            # 전략에 따른 검색 실행
+            # 전략에 따른 검색 실행 (본문 검색은 MMR이 고를 후보 수만큼 가져옴)
+            search_top_k = 10
+            if getattr(settings, 'RAG_MMR_ENABLED', True):
+                search_top_k = max(search_top_k, getattr(settings, 'RAG_MMR_CANDIDATES', 20))
             if search_strategy['type'] == 'form_specific':
                 # 서식 전용 검색
-                searcher = RagSearcher()
                 search_results = searcher.search_forms(query=query, top_k=10)
                 logger.info(f"서식 전용 검색 실행 - 결과 수: {len(search_results)}")
                 print(f"DEBUG: 서식 전용 검색 실행 - 결과 수: {len(search_results)}")
             elif search_strategy['type'] == 'domain_specific':
-                search_results = RagSearcher().search_by_domain(
+                search_results = searcher.search_by_domain(
                     query=query, 
                     domain=search_strategy['domain'], 
-                    top_k=10
+                    top_k=search_top_k,
+                    query_vector=query_vector
                 )
             elif search_strategy['type'] == 'file_type_specific':
-                search_results = RagSearcher().search_by_file_type(
+                search_results = searcher.search_by_file_type(
                     query=query, 
                     file_type=search_strategy['file_type'], 
-                    top_k=10
+                    top_k=search_top_k
                 )
             elif search_strategy['type'] == 'recency_aware':
-                search_results = RagSearcher().search_by_recency(
+                search_results = searcher.search_by_recency(
                     query=query, 
                     min_recency=search_strategy['min_recency'], 
-                    top_k=10
+                    top_k=search_top_k
                 )
             else:
                 # 하이브리드 검색 (기본)
-                searcher = RagSearcher()
                 search_results = searcher.hybrid_search(
                     query=query,
                     domain_list=estimated_domains if estimated_domains else None,
                     file_types=search_strategy.get('file_types'),
                     min_recency=search_strategy.get('min_recency'),
-                    top_k=10
+                    top_k=search_top_k
                 )
             
             # 사용자 부서에 맞게 검색 결과 우선순위 조정
@@ -810,8 +860,11 @@ def answer_query(query: str, openai_api_key: str = None, explicit_domain: str =
                 if search_strategy['type'] == 'form_specific':
                     answer = _generate_form_response(query, search_results[:5])
                 else:
-                    # 일반 답변 생성
-                    contexts = [result['text'] for result in search_results[:5]]
+                    # 중복 청크 대신 서로 다른 근거가 상위 5개에 오도록 MMR 재배치
+                    search_results = searcher.select_mmr(search_results, top_k=5)
+                    
+                    # 일반 답변 생성: 상위 결과의 앞뒤 인접 청크를 붙여 컨텍스트 확장
+                    contexts = searcher.expand_neighbors(search_results[:5])
                     
                     # 시스템 및 사용자 프롬프트 로드
                     system_prompt, user_prompt = _init_prompts()
@@ -819,7 +872,7 @@ def answer_query(query: str, openai_api_key: str = None, explicit_domain: str =
                     # 답변 생성 (올바른 인자로 호출)
                     answer = make_answer(
                         query=query,
-                        contexts=search_results[:5],  # 전체 결과 객체 전달
+                        contexts=contexts,  # 인접 청크로 확장된 결과 객체 전달
                         api_key=None,  # 환경변수에서 자동으로 가져옴
                         conversation_history=conversation_history, # 대화 히스토리 전달
                         user_info=existing_user_info  # 사용자 정보 전달
@@ -916,39 +969,10 @@ def _is_form_related_query(query: str, keywords: List[str]) -> bool:
     Returns:
         서식 관련 질문 여부
     """
-    query_lower = query.lower()
-    
-    # 서식 관련 키워드 패턴
-    form_keywords = [
-        '서식', '양식', '신청서', '제출서', '청구서', '요청서', '보고서', '평가서',
-        '확인서', '서약서', '계약서', '승인서', '통지서', '등록서', '변경서',
-        '관리서', '운영서', '처리서', '대장', '접수증', '일지', '체크리스트',
-        '점검표', '결과표', '검토서', '완료확인서', '취소신청서', '재발급신청서',
-        '인증연장신청서', '윤리서약서', '보안서약서', '직무윤리서약서'
-    ]
-    
-    # 질문에 서식 관련 키워드가 포함되어 있는지 확인
-    for keyword in form_keywords:
-        if keyword in query_lower:
-            return True
-    
-    # 키워드 리스트에서도 확인
-    for keyword in keywords:
-        if any(form_kw in keyword.lower() for form_kw in form_keywords):
-            return True
-    
-    # 서식 요청 패턴 확인
-    form_request_patterns = [
-        '서식 주세요', '양식 주세요', '신청서 주세요', '양식 찾아줘',
-        '서식 찾아줘', '신청서 찾아줘', '양식 다운로드', '서식 다운로드',
-        '어떤 서식', '어떤 양식', '필요한 서식', '필요한 양식'
-    ]
-    
-    for pattern in form_request_patterns:
-        if pattern in query_lower:
-            return True
-    
-    return False
+    # 질문(서식 키워드/요청 패턴)과 추출 키워드를 공유 매처로 한 번씩 스캔
+    if match_text(query).is_form_related:
+        return True
+    return match_keywords(keywords).form_score > 0
 
 def _determine_search_strategy(query: str, keywords: List[str], estimated_domains: List[str]) -> Dict[str, Any]:
     """
@@ -962,7 +986,7 @@ def _determine_search_strategy(query: str, keywords: List[str], estimated_domain
     Returns:
         검색 전략 딕셔너리
     """
-    query_lower = query.lower()
+    query_match = match_text(query)
     
     # 0. 서식 관련 질문 우선 검사
     if _is_form_related_query(query, keywords):
@@ -981,24 +1005,16 @@ def _determine_search_strategy(query: str, keywords: List[str], estimated_domain
         }
     
     # 2. 문서 타입 특정 검색 전략
-    doc_type_keywords = {
-        '정관': ['정관', '기본법', '조직법'],
-        '규정': ['규정', '운영규정', '관리규정'],
-        '규칙': ['규칙', '세부규칙', '실행규칙'],
-        '지침': ['지침', '업무지침', '운영지침']
-    }
-    
-    for doc_type, type_keywords in doc_type_keywords.items():
-        if any(keyword in query_lower for keyword in type_keywords):
-            return {
-                'type': 'file_type_specific',
-                'file_type': doc_type,
-                'confidence': 'medium'
-            }
+    doc_type = query_match.top_doc_type()
+    if doc_type:
+        return {
+            'type': 'file_type_specific',
+            'file_type': doc_type,
+            'confidence': 'medium'
+        }
     
     # 3. 최신성 인식 검색 전략
-    recency_keywords = ['최신', '최근', '새로운', '업데이트', '변경', '수정']
-    if any(keyword in query_lower for keyword in recency_keywords):
+    if query_match.recency:
         return {
             'type': 'recency_aware',
             'min_recency': 2,  # 최신성 점수 2 이상
@@ -1219,6 +1235,10 @@ def health_check() -> Dict[str, Any]:
             'qdrant_connection': qdrant_health,
             'collection_info': collection_info,
             'keyword_extraction': bool(keyword_test),
+            'retrieval_cache': get_retrieval_cache().stats(),
+            'embedding_batcher': get_batcher_stats(),
+            'models': get_registry().memory_report(),
+            'thread_budget': get_applied_budget(),
             'timestamp': datetime.datetime.now().isoformat()
         }
         
@@ -0,0 +1,39 @@
+"""
+Qdrant 포인트 ID 규칙
+인덱서와 검색기가 같은 규칙으로 결정적(uuid5) ID를 계산하도록 한 곳에 모아둡니다.
+Django 설정에 의존하지 않으므로 단독 인덱싱 스크립트에서도 사용할 수 있습니다.
+"""
+
+from uuid import uuid5, NAMESPACE_URL
+
+
+def stable_doc_id(file_name: str) -> str:
+    """파일명 기반 문서 ID"""
+    return str(uuid5(NAMESPACE_URL, f"doc::{file_name}"))
+
+
+def chunk_point_id(doc_id: str, page: int, chunk_index: int) -> str:
+    """
+    본문 청크 포인트 ID
+
+    Args:
+        doc_id: 문서 ID
+        page: 페이지 번호 (1부터)
+        chunk_index: 페이지 내 청크 순번 (0부터)
+    """
+    return str(uuid5(NAMESPACE_URL, f"{doc_id}:{page}:t:{chunk_index}"))
+
+
+def form_point_id(doc_id: str, page: int) -> str:
+    """서식 헤드노트 포인트 ID (서식 페이지당 하나)"""
+    return str(uuid5(NAMESPACE_URL, f"{doc_id}:{page}:f:0"))
+
+
+def summary_point_id(doc_id: str) -> str:
+    """문서 요약 포인트 ID (문서당 하나, 2단계 검색의 문서 선택용)"""
+    return str(uuid5(NAMESPACE_URL, f"{doc_id}:0:s:0"))
+
+
+def heading_point_id(doc_id: str, page: int, heading_index: int) -> str:
+    """조문 머리말 포인트 ID (페이지 내 조문 순번)"""
+    return str(uuid5(NAMESPACE_URL, f"{doc_id}:{page}:h:{heading_index}"))
@@ -6,24 +6,66 @@ RAG 검색기
 
 from typing import List, Dict, Any, Optional
 from qdrant_client import QdrantClient
-from sentence_transformers import SentenceTransformer
 from django.conf import settings
 from .constants import RAG_CONFIG, EXISTING_COLLECTION
 from .filters import build_qdrant_filter, build_advanced_filter
+from .search_cache import cached_search
+from .doc_retrieval import exclude_doc_level, two_stage_search
+from .point_ids import chunk_point_id
+from .embedding_batcher import get_query_embedder
+from .vector_projection import full_vector
+from .form_catalog import form_result, get_form_catalog
+from .matcher import names_document
 import logging
 import os
+import threading
+
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
-# 🚀 모듈 수준에서 즉시 모델 로딩 (강력한 캐싱)
-print("🔥 SentenceTransformer 모델 모듈 로딩 시작...")
-_GLOBAL_EMBEDDER = SentenceTransformer("nlpai-lab/KoE5")
-print("🔥 SentenceTransformer 모델 모듈 로딩 완료!")
+# 인접 청크 병합 시 검사할 최대 중첩 길이 (인덱싱 chunk_overlap=200 + 여유)
+_MAX_CHUNK_OVERLAP = 300
 
 def get_global_embedder():
-    """전역 임베딩 모델 반환 (이미 로딩됨)"""
-    logger.info("캐싱된 SentenceTransformer 모델 사용")
-    return _GLOBAL_EMBEDDER
+    """프로세스 공유 임베딩 모델 반환 (최초 호출 시 모델 레지스트리에서 지연 로딩)"""
+    return get_query_embedder()
+
+_catalog_client = None
+_catalog_client_lock = threading.Lock()
+
+def autocomplete_forms(prefix: str, limit: int = 8) -> List[Dict[str, Any]]:
+    """
+    채팅 입력창 서식 이름 자동완성 (메모리 서식 카탈로그, 임베딩/벡터 검색 없음)
+
+    Args:
+        prefix: 입력 중인 문자열
+        limit: 최대 결과 수
+
+    Returns:
+        [{'title', 'form_title', 'form_page', 'form_file_uri', 'file_name', 'doc_id'}]
+    """
+    global _catalog_client
+    with _catalog_client_lock:
+        if _catalog_client is None:
+            _catalog_client = QdrantClient(
+                host=getattr(settings, 'QDRANT_HOST', 'qdrant'),
+                port=getattr(settings, 'QDRANT_PORT', 6333),
+            )
+    catalog = get_form_catalog(_catalog_client, EXISTING_COLLECTION)
+    if catalog is None:
+        return []
+    return [
+        {
+            'title': entry['title'],
+            'form_title': entry['payload'].get('form_title', ''),
+            'form_page': entry['payload'].get('form_page', ''),
+            'form_file_uri': entry['payload'].get('form_file_uri', ''),
+            'file_name': entry['payload'].get('doc_title', ''),
+            'doc_id': entry['payload'].get('doc_id', ''),
+        }
+        for entry in catalog.autocomplete(prefix, limit=limit)
+    ]
 
 class RagSearcher:
     """
@@ -47,13 +89,40 @@ class RagSearcher:
         
         self.client = QdrantClient(host=self.qdrant_host, port=self.qdrant_port)
         
-        # 전역 캐싱된 임베딩 모델 사용
+        # 프로세스 공유 임베딩 모델 사용
         self.embedder = get_global_embedder()
         
         # 검색 설정
         self.default_top_k = RAG_CONFIG.get('CHUNK_SIZE', 5)  # 5로 수정
     
-    def search(self, query: str, flt: Optional[Dict[str, Any]] = None, top_k: int = None) -> List[Dict[str, Any]]:
+    def embed_query(self, query: str) -> List[float]:
+        """
+        질문 임베딩 (도메인 라우팅과 검색에서 같은 벡터를 재사용할 때 사용)
+        
+        Args:
+            query: 검색 질문
+        
+        Returns:
+            질의 벡터
+        """
+        return self.embedder.encode([query])[0].tolist()
+    
+    def _search_points(self, query_vector: List[float], query_filter: Optional[Dict[str, Any]],
+                       limit: int) -> List[Any]:
+        """Qdrant 검색 (동일 벡터/필터/top_k 반복 검색은 캐시에서 응답)"""
+        return cached_search(
+            self.client,
+            self.collection_name,
+            query_vector,
+            query_filter=query_filter,
+            limit=limit,
+            with_payload=True,
+            with_vectors=False
+        )
+
+    def search(self, query: str, flt: Optional[Dict[str, Any]] = None, top_k: int = None,
+               query_vector: Optional[List[float]] = None,
+               hierarchical: Optional[bool] = None) -> List[Dict[str, Any]]:
         """
         질문에 대한 검색 수행 (새로운 메타데이터 구조 활용)
         
@@ -61,26 +130,37 @@ class RagSearcher:
             query: 검색 질문
             flt: Qdrant 필터
             top_k: 반환할 결과 수
+            query_vector: 미리 계산한 질의 벡터 (없으면 임베딩)
+            hierarchical: 문서 요약/조문 머리말로 상위 문서를 먼저 고른 뒤 그 안에서 청크 검색
+                (기본값: settings.RAG_HIERARCHICAL_ENABLED이고 질문이 규정/지침 이름을 포함할 때만)
         
         Returns:
             검색 결과 리스트
         """
         if top_k is None:
             top_k = self.default_top_k
+        if hierarchical is None:
+            # 2단계 검색은 질의당 검색 2~3회라 문서를 이름으로 가리킨 질문에만 사용
+            hierarchical = getattr(settings, 'RAG_HIERARCHICAL_ENABLED', True) and names_document(query)
         
         try:
             # 질문 임베딩
-            query_vector = self.embedder.encode([query])[0].tolist()
+            if query_vector is None:
+                query_vector = self.embed_query(query)
             
-            # Qdrant 검색
-            search_results = self.client.search(
-                collection_name=self.collection_name,
-                query_vector=query_vector,
-                query_filter=flt,
-                limit=top_k,
-                with_payload=True,
-                with_vectors=False
-            )
+            if hierarchical:
+                # 1단계 문서 선택 → 2단계 선택 문서 안의 청크 검색 (문서를 못 고르면 전체 검색)
+                search_results, documents = two_stage_search(
+                    self._search_points, query_vector, flt, top_k=top_k,
+                    top_m=getattr(settings, 'RAG_DOC_TOP_M', 5),
+                    candidates=getattr(settings, 'RAG_DOC_CANDIDATES', 20),
+                )
+                if documents:
+                    logger.info(
+                        "문서 선택: " + ", ".join(f"{d['file_name']}({d['score']:.3f})" for d in documents)
+                    )
+            else:
+                search_results = self._search_points(query_vector, exclude_doc_level(flt), top_k)
             
             # 새로운 메타데이터 구조에 맞게 결과 포맷팅
             formatted_results = []
@@ -95,8 +175,11 @@ class RagSearcher:
                     'file_name': payload.get('doc_title', ''),
                     'pages': payload.get('page', ''),
                     'source': payload.get('source', ''),
+                    # 같은 본문이 반복되는 다른 문서 (인덱싱 시 준중복 청크 제거)
+                    'alt_sources': payload.get('alt_sources', []),
                     
                     # 새로운 메타데이터 필드들
+                    'doc_type': payload.get('doc_type', 'text'),
                     'document_level': payload.get('document_level', ''),
                     'document_type': payload.get('document_type', ''),
                     'domain_primary': payload.get('domain_primary', ''),
@@ -124,7 +207,249 @@ class RagSearcher:
             print(f"검색 오류: {e}")
             return []
     
-    def search_by_domain(self, query: str, domain: str, top_k: int = None) -> List[Dict[str, Any]]:
+    @staticmethod
+    def _is_text_chunk(result: Dict[str, Any]) -> bool:
+        """인접 청크 확장 대상인 본문 청크 결과인지 (서식 포인트는 chunk_index=0이라도 본문 위치가 아님)"""
+        return (
+            result.get('doc_type', 'text') == 'text'
+            and bool(result.get('doc_id'))
+            and isinstance(result.get('pages'), int)
+            and bool(result.get('total_chunks'))
+        )
+
+    def expand_neighbors(self, results: List[Dict[str, Any]], window: int = None) -> List[Dict[str, Any]]:
+        """
+        상위 검색 결과의 앞뒤 인접 청크(±window)를 붙여 컨텍스트 확장
+
+        결정적 포인트 ID(doc_id, page, chunk_index)로 이웃 청크를 계산해
+        한 번의 retrieve 호출로 가져오며, 추가 벡터 검색은 하지 않습니다.
+        서로 이어지는 청크는 중첩 구간을 제거하고 하나의 구간으로 병합합니다.
+        페이지 경계는 다음 페이지의 앞 청크 방향으로만 넘어갑니다.
+
+        Args:
+            results: search 계열 메서드의 결과 (순위순, 재정렬을 거쳤으면 그 순서)
+            window: 앞뒤로 붙일 청크 수 (기본값: settings.RAG_NEIGHBOR_WINDOW)
+
+        Returns:
+            병합된 구간 단위 결과 리스트 (text, pages, chunk_span 갱신)
+        """
+        if window is None:
+            window = getattr(settings, 'RAG_NEIGHBOR_WINDOW', 1)
+        if window <= 0 or not results:
+            return results
+
+        # 1. 확장 대상 위치 계산: (doc_id, page, chunk_index)
+        wanted_ids = {}
+        for result in results:
+            if not self._is_text_chunk(result):
+                continue
+            doc_id = result.get('doc_id')
+            page = result.get('pages')
+            total = result.get('total_chunks')
+
+            idx = result.get('chunk_index', 0)
+            for j in range(idx - window, idx + window + 1):
+                if 0 <= j < total:
+                    pos = (doc_id, page, j)
+                elif j >= total:
+                    pos = (doc_id, page + 1, j - total)
+                else:
+                    continue
+                wanted_ids[chunk_point_id(*pos)] = pos
+
+        if not wanted_ids:
+            return results
+
+        # 2. 이웃 청크 일괄 조회 (1회 호출)
+        try:
+            points = self.client.retrieve(
+                collection_name=self.collection_name,
+                ids=list(wanted_ids.keys()),
+                with_payload=True,
+                with_vectors=False
+            )
+        except Exception as e:
+            logger.warning(f"인접 청크 조회 실패, 원본 결과 사용: {e}")
+            return results
+
+        chunks = {}
+        for point in points:
+            pos = wanted_ids.get(str(point.id))
+            if pos is not None:
+                chunks[pos] = {
+                    'text': point.payload.get('text', ''),
+                    'total_chunks': point.payload.get('total_chunks', 0),
+                }
+
+        # 3. 결과별 구간 생성 후 이어지는 구간 병합
+        spans = []
+        passthrough = []
+        for rank, result in enumerate(results):
+            # 서식/문서 요약 등 본문 청크가 아닌 결과는 위치 개념이 없으므로 그대로 유지
+            if not self._is_text_chunk(result):
+                passthrough.append((rank, result))
+                continue
+            doc_id = result.get('doc_id')
+            page = result.get('pages')
+            hit_pos = (doc_id, page, result.get('chunk_index', 0))
+            chunks.setdefault(hit_pos, {'text': result.get('text', ''),
+                                        'total_chunks': result.get('total_chunks', 0)})
+            spans.append({'rank': rank, 'result': result, 'positions': {hit_pos}})
+
+        for span in spans:
+            doc_id, page, idx = next(iter(span['positions']))
+            # 앞쪽 (같은 페이지 안에서만)
+            for j in range(idx - 1, idx - window - 1, -1):
+                if (doc_id, page, j) not in chunks:
+                    break
+                span['positions'].add((doc_id, page, j))
+            # 뒤쪽 (다음 페이지 앞 청크까지)
+            pos = (doc_id, page, idx)
+            for _ in range(window):
+                pos = self._next_position(pos, chunks)
+                if pos is None:
+                    break
+                span['positions'].add(pos)
+
+        merged = self._merge_spans(spans, chunks)
+
+        expanded = []
+        for rank, positions, hit in merged:
+            ordered = sorted(positions, key=lambda p: (p[1], p[2]))
+            text = ''
+            for pos in ordered:
+                text = self._join_overlapping(text, chunks[pos]['text'])
+            pages = sorted({p[1] for p in ordered})
+
+            item = dict(hit)
+            item['text'] = text
+            item['pages'] = pages[0] if len(pages) == 1 else f"{pages[0]}-{pages[-1]}"
+            item['chunk_span'] = [[p[1], p[2]] for p in ordered]
+            expanded.append((rank, item))
+
+        expanded.extend(passthrough)
+        expanded.sort(key=lambda x: x[0])
+        return [item for _, item in expanded]
+
+    @staticmethod
+    def _next_position(pos, chunks):
+        """같은 페이지의 다음 청크, 페이지 끝이면 다음 페이지 첫 청크"""
+        doc_id, page, idx = pos
+        total = chunks.get(pos, {}).get('total_chunks', 0)
+        nxt = (doc_id, page, idx + 1) if idx + 1 < total else (doc_id, page + 1, 0)
+        return nxt if nxt in chunks else None
+
+    def _merge_spans(self, spans, chunks):
+        """서로 겹치거나 이어지는 구간을 병합 (가장 높은 순위 결과 기준)"""
+        spans = sorted(spans, key=lambda s: s['rank'])
+        merged = []
+        for span in spans:
+            target = None
+            for existing in merged:
+                if self._is_contiguous(existing[1], span['positions'], chunks):
+                    target = existing
+                    break
+            if target is None:
+                merged.append([span['rank'], set(span['positions']), span['result']])
+            else:
+                target[1] |= span['positions']
+        return merged
+
+    def _is_contiguous(self, a, b, chunks) -> bool:
+        """두 위치 집합이 겹치거나 맞닿아 있는지 확인"""
+        if a & b:
+            return True
+        for pos in a:
+            nxt = self._next_position(pos, chunks)
+            if nxt in b:
+                return True
+        for pos in b:
+            nxt = self._next_position(pos, chunks)
+            if nxt in a:
+                return True
+        return False
+
+    @staticmethod
+    def _join_overlapping(left: str, right: str) -> str:
+        """슬라이딩 윈도우 청크의 중첩 구간을 제거하며 이어붙이기"""
+        if not left:
+            return right
+        max_k = min(len(left), len(right), _MAX_CHUNK_OVERLAP)
+        for k in range(max_k, 19, -1):
+            if left.endswith(right[:k]):
+                return left + right[k:]
+        return f"{left}\n{right}"
+
+    def select_mmr(self, results: List[Dict[str, Any]], top_k: int = 5, lambda_mult: float = None,
+                   candidates: int = None) -> List[Dict[str, Any]]:
+        """
+        MMR(Maximal Marginal Relevance)로 서로 다른 근거를 담은 결과를 우선 선택
+
+        중첩 청크는 점수가 비슷해 상위 결과가 같은 페이지로 몰리기 쉽습니다.
+        상위 candidates개 결과의 벡터만 한 번의 retrieve로 가져와
+        relevance(입력 순위)와 이미 선택한 결과와의 최대 코사인 유사도를
+        lambda_mult로 절충해 top_k개를 고릅니다. relevance를 벡터 점수가 아니라 순위로
+        두어 도메인/최신성 가중치(final_score)나 부서별 우선순위로 정한 순서를 따릅니다.
+
+        Args:
+            results: search 계열 메서드의 결과 (순위순, 재정렬을 거쳤으면 그 순서)
+            top_k: 선택할 결과 수
+            lambda_mult: 1이면 관련도만, 0이면 다양성만 (기본값: settings.RAG_MMR_LAMBDA)
+            candidates: MMR 후보 수 (기본값: settings.RAG_MMR_CANDIDATES)
+
+        Returns:
+            선택된 top_k개를 앞에 두고 나머지를 원래 순서로 이어 붙인 결과 리스트
+            (비활성/벡터 조회 실패 시 원본 그대로)
+        """
+        if not getattr(settings, 'RAG_MMR_ENABLED', True) or len(results) <= 1:
+            return results
+        if lambda_mult is None:
+            lambda_mult = getattr(settings, 'RAG_MMR_LAMBDA', 0.7)
+        if candidates is None:
+            candidates = getattr(settings, 'RAG_MMR_CANDIDATES', 20)
+
+        pool = [r for r in results[:max(candidates, top_k)] if r.get('id')]
+        if len(pool) <= 1:
+            return results
+
+        try:
+            points = self.client.retrieve(
+                collection_name=self.collection_name,
+                ids=[r['id'] for r in pool],
+                with_payload=False,
+                with_vectors=True,
+            )
+        except Exception as e:
+            logger.warning(f"MMR 후보 벡터 조회 실패, 원래 순위 사용: {e}")
+            return results
+
+        vectors_by_id = {str(p.id): full_vector(p.vector) for p in points}
+        vectors_by_id = {pid: vec for pid, vec in vectors_by_id.items() if vec is not None}
+        pool = [r for r in pool if r['id'] in vectors_by_id]
+        if len(pool) <= 1:
+            return results
+
+        vectors = np.asarray([vectors_by_id[r['id']] for r in pool], dtype=np.float32)
+        vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        similarity = vectors @ vectors.T
+        # 순위 기반 관련도: 1등 1.0에서 candidates 기준으로 선형 감소 (결과 수와 관계없이 같은 간격)
+        relevance = 1.0 - np.arange(len(pool), dtype=np.float32) / max(candidates, top_k, len(pool))
+
+        selected = [int(np.argmax(relevance))]
+        max_similarity = similarity[selected[0]].copy()
+        while len(selected) < min(top_k, len(pool)):
+            mmr = lambda_mult * relevance - (1.0 - lambda_mult) * max_similarity
+            mmr[selected] = -np.inf
+            best = int(np.argmax(mmr))
+            selected.append(best)
+            np.maximum(max_similarity, similarity[best], out=max_similarity)
+
+        chosen = [pool[i] for i in selected]
+        chosen_ids = {r['id'] for r in chosen}
+        return chosen + [r for r in results if r.get('id') not in chosen_ids]
+
+    def search_by_domain(self, query: str, domain: str, top_k: int = None,
+                         query_vector: Optional[List[float]] = None) -> List[Dict[str, Any]]:
         """
         특정 도메인으로 제한된 검색
         
@@ -132,6 +457,7 @@ class RagSearcher:
             query: 검색 질문
             domain: 도메인 (예: '인사관리', '재무관리')
             top_k: 반환할 결과 수
+            query_vector: 미리 계산한 질의 벡터 (없으면 임베딩)
         
         Returns:
             도메인별 검색 결과
@@ -146,7 +472,7 @@ class RagSearcher:
             ]
         }
         
-        return self.search(query, flt=domain_filter, top_k=top_k)
+        return self.search(query, flt=domain_filter, top_k=top_k, query_vector=query_vector)
     
     def search_by_file_type(self, query: str, file_type: str, top_k: int = None) -> List[Dict[str, Any]]:
         """
@@ -199,6 +525,10 @@ class RagSearcher:
     def search_forms(self, query: str, top_k: int = None) -> List[Dict[str, Any]]:
         """
         서식 전용 검색 (form_title, topics, synonyms 활용)
+
+        서식 이름을 (거의) 그대로 말하는 요청은 Qdrant 검색 없이 메모리 서식 카탈로그에서
+        응답하고, 카탈로그 최고 점수가 RAG_FORM_CATALOG_MIN_SCORE 미만이면 벡터 검색 +
+        재순위화로 찾습니다.
         
         Args:
             query: 검색 질문
@@ -211,39 +541,72 @@ class RagSearcher:
             top_k = self.default_top_k
         
         try:
-            # 질문 임베딩
-            query_vector = self.embedder.encode([query])[0].tolist()
-            
-            # 서식 전용 필터 (doc_type이 "form"인 것만)
-            form_filter = {
-                "must": [
-                    {
-                        "key": "doc_type",
-                        "match": {"value": "form"}
-                    }
-                ]
-            }
-            
-            # Qdrant 검색
-            search_results = self.client.search(
-                collection_name=self.collection_name,
-                query_vector=query_vector,
-                query_filter=form_filter,
-                limit=top_k * 2,  # 더 많이 검색해서 재순위화
-                with_payload=True,
-                with_vectors=False
-            )
-            
-            # 서식 메타데이터를 활용한 재순위화
-            reranked_results = self._rerank_forms(search_results, query)
-            
-            # 상위 결과만 반환
-            return reranked_results[:top_k]
+            # 카탈로그 정확/근접 일치 (Qdrant 검색 없음)
+            catalog_results = self._catalog_forms(query, top_k)
+            if catalog_results:
+                return catalog_results
+
+            return self._vector_forms(query, top_k)
             
         except Exception as e:
             print(f"서식 검색 오류: {e}")
             return []
-    
+
+    def _vector_forms(self, query: str, top_k: int) -> List[Dict[str, Any]]:
+        """서식 포인트 벡터 검색 + 서식 메타데이터 재순위화 (상위 top_k개)"""
+        # 질문 임베딩
+        query_vector = self.embedder.encode([query])[0].tolist()
+        
+        # 서식 전용 필터 (doc_type이 "form"인 것만)
+        form_filter = {
+            "must": [
+                {
+                    "key": "doc_type",
+                    "match": {"value": "form"}
+                }
+            ]
+        }
+        
+        # Qdrant 검색
+        search_results = cached_search(
+            self.client,
+            self.collection_name,
+            query_vector,
+            query_filter=form_filter,
+            limit=top_k * 2,  # 더 많이 검색해서 재순위화
+            with_payload=True,
+            with_vectors=False
+        )
+        
+        # 서식 메타데이터를 활용한 재순위화
+        reranked_results = self._rerank_forms(search_results, query)
+        
+        # 상위 결과만 반환
+        return reranked_results[:top_k]
+
+    def _catalog_forms(self, query: str, top_k: int) -> List[Dict[str, Any]]:
+        """
+        메모리 서식 카탈로그 조회
+
+        Args:
+            query: 검색 질문
+            top_k: 반환할 결과 수
+
+        Returns:
+            최고 점수가 최소 점수 이상이면 카탈로그 후보 상위 top_k개 (답변 단계는 결과가
+            3개 미만이면 되묻기 때문에 최소 점수 미만 후보로 채움), 아니면 빈 리스트
+        """
+        if not getattr(settings, 'RAG_FORM_CATALOG_ENABLED', True):
+            return []
+        catalog = get_form_catalog(self.client, self.collection_name)
+        if catalog is None:
+            return []
+        matches = catalog.lookup(query, limit=top_k, min_score=0.0)
+        if not matches or matches[0][0] < getattr(settings, 'RAG_FORM_CATALOG_MIN_SCORE', 0.75):
+            return []
+        logger.info(f"서식 카탈로그 응답: {[entry['title'] for _, entry in matches]}")
+        return [form_result(entry['id'], entry['payload'], score, score) for score, entry in matches]
+
     def _rerank_forms(self, results: List, query: str) -> List[Dict[str, Any]]:
         """
         서식 검색 결과 재순위화 (form_title, topics, synonyms 활용)
@@ -287,33 +650,7 @@ class RagSearcher:
             relevance_score += result.score * 2
             
             # 새로운 메타데이터 구조에 맞게 결과 포맷팅
-            formatted_result = {
-                'id': str(result.id),
-                'score': result.score,
-                'relevance_score': relevance_score,
-                'text': payload.get('text', ''),
-                'file_name': payload.get('doc_title', ''),
-                'pages': payload.get('page', ''),
-                'source': payload.get('source', ''),
-                
-                # 서식 관련 메타데이터
-                'form_title': form_title,
-                'form_page': payload.get('form_page', ''),
-                'form_file_uri': payload.get('form_file_uri', ''),
-                'topics': topics,
-                'synonyms': synonyms,
-                'anchor_refs': payload.get('anchor_refs', []),
-                
-                # 기존 메타데이터
-                'document_level': payload.get('document_level', ''),
-                'document_type': payload.get('document_type', ''),
-                'domain_primary': payload.get('domain_primary', ''),
-                'domain_secondary': payload.get('domain_secondary', ''),
-                'year': payload.get('year', 0),
-                'recency_score': payload.get('recency_score', 1),
-                'file_path': payload.get('file_path', ''),
-                'doc_id': payload.get('doc_id', ''),
-            }
+            formatted_result = form_result(result.id, payload, result.score, relevance_score)
             
             reranked.append(formatted_result)
         
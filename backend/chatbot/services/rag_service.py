@@ -1,10 +1,18 @@
 import os
 import re
-from typing import List, Dict, Tuple
+from functools import lru_cache
+from typing import List, Dict, Optional, Tuple
 from django.conf import settings
 from qdrant_client import QdrantClient
-from sentence_transformers import SentenceTransformer
+from qdrant_client.models import QueryRequest
 from openai import OpenAI
+from .search_cache import cached_query_batch
+from .doc_retrieval import exclude_doc_level
+from .vector_projection import vector_layout, vector_request
+from .embedding_batcher import get_query_embedder
+from .constants import DOMAIN_CLASSIFICATION
+from .matcher import match_text, classify_filename
+from .ingestion import normalize_payload
 
 # 프롬프트 로더 직접 구현
 def load_prompt(path: str, *, default: str = "") -> str:
@@ -29,7 +37,6 @@ except FileNotFoundError:
 
 # QdrantClient를 전역으로 생성 (연결 재사용)
 _qdrant_client = None
-_embedder = None
 
 def _get_qdrant_client():
     global _qdrant_client
@@ -38,10 +45,8 @@ def _get_qdrant_client():
     return _qdrant_client
 
 def _get_embedder():
-    global _embedder
-    if _embedder is None:
-        _embedder = SentenceTransformer("nlpai-lab/KoE5")
-    return _embedder
+    # 모델 레지스트리의 프로세스 공유 인스턴스 (RagSearcher와 동일)
+    return get_query_embedder()
 
 def _extract_keywords(query: str) -> List[str]:
     """질문에서 키워드 추출"""
@@ -54,28 +59,23 @@ def _extract_keywords(query: str) -> List[str]:
 
 def _extract_document_type(query: str) -> str:
     """질문에서 문서 유형 추출"""
-    query_lower = query.lower()
+    query_match = match_text(query)
     
-    # 문서 유형 매핑
-    type_mapping = {
-        '정관': ['정관', '기본법', '근본법'],
-        '규정': ['규정', '운영규정', '관리규정'],
-        '규칙': ['규칙', '세부규칙', '실행규칙'],
-        '지침': ['지침', '가이드라인', '운영지침'],
-        '인사': ['인사', '채용', '급여', '휴가', '육아휴직', '연차'],
-        '회계': ['회계', '예산', '감사', '재정'],
-        '보안': ['보안', '정보보호', '개인정보'],
-        '기술': ['기술', 'IT', '정보화', '시스템']
-    }
+    # 문서 계층(정관/규정/규칙/지침) 우선, 없으면 업무 도메인 약칭
+    doc_type = query_match.top_doc_type()
+    if doc_type:
+        return doc_type
     
-    for doc_type, keywords in type_mapping.items():
-        if any(keyword in query_lower for keyword in keywords):
-            return doc_type
+    domain_types = {'인사관리': '인사', '재무관리': '회계', '보안관리': '보안', '기술관리': '기술'}
+    domain = query_match.top_domain()
+    if domain in domain_types:
+        return domain_types[domain]
     
     return "일반"
 
+@lru_cache(maxsize=1024)
 def _classify_document_by_domain(filename: str) -> Dict[str, str]:
-    """파일명 기반으로 업무 도메인을 정교하게 분류"""
+    """파일명 기반으로 업무 도메인을 정교하게 분류 (같은 문서의 청크가 반복되므로 파일명별 캐시, 읽기 전용)"""
     
     filename_lower = filename.lower()
     
@@ -121,91 +121,10 @@ def _classify_document_by_domain(filename: str) -> Dict[str, str]:
         document_level = '기타'
         level_description = '기타'
     
-    # 2차 분류: 업무 도메인 (상세)
-    domain = '일반업무'
-    subdomain = '기타'
-    
-    # 인사관리 도메인
-    if any(keyword in filename_lower for keyword in ['인사', '급여', '취업', '출장', '채용', '복무', '교육', '훈련']):
-        domain = '인사관리'
-        if '인사' in filename_lower:
-            subdomain = '인사정책'
-        elif '급여' in filename_lower:
-            subdomain = '급여관리'
-        elif '취업' in filename_lower:
-            subdomain = '취업관리'
-        elif '출장' in filename_lower:
-            subdomain = '출장관리'
-        elif '채용' in filename_lower:
-            subdomain = '채용관리'
-        elif '복무' in filename_lower:
-            subdomain = '복무관리'
-        elif '교육' in filename_lower or '훈련' in filename_lower:
-            subdomain = '교육훈련'
-    
-    # 재무관리 도메인
-    elif any(keyword in filename_lower for keyword in ['회계', '감사', '자산', '계약', '수수료', '예산', '재정']):
-        domain = '재무관리'
-        if '회계' in filename_lower:
-            subdomain = '회계관리'
-        elif '감사' in filename_lower:
-            subdomain = '감사관리'
-        elif '자산' in filename_lower:
-            subdomain = '자산관리'
-        elif '계약' in filename_lower:
-            subdomain = '계약관리'
-        elif '수수료' in filename_lower:
-            subdomain = '수수료관리'
-    
-    # 보안관리 도메인
-    elif any(keyword in filename_lower for keyword in ['보안', '정보보호', '개인정보', '민원', '신고']):
-        domain = '보안관리'
-        if '보안' in filename_lower:
-            subdomain = '보안정책'
-        elif '정보보호' in filename_lower:
-            subdomain = '정보보호'
-        elif '개인정보' in filename_lower:
-            subdomain = '개인정보보호'
-        elif '민원' in filename_lower or '신고' in filename_lower:
-            subdomain = '민원신고'
-    
-    # 기술관리 도메인
-    elif any(keyword in filename_lower for keyword in ['기술', 'IT', '정보화', '전자서명', '시스템']):
-        domain = '기술관리'
-        if '기술' in filename_lower:
-            subdomain = '기술정책'
-        elif 'IT' in filename_lower or '정보화' in filename_lower:
-            subdomain = '정보화관리'
-        elif '전자서명' in filename_lower:
-            subdomain = '전자서명관리'
-        elif '시스템' in filename_lower:
-            subdomain = '시스템관리'
-    
-    # 행정관리 도메인
-    elif any(keyword in filename_lower for keyword in ['문서', '자료', '기록', '홍보']):
-        domain = '행정관리'
-        if '문서' in filename_lower:
-            subdomain = '문서관리'
-        elif '자료' in filename_lower:
-            subdomain = '자료관리'
-        elif '기록' in filename_lower:
-            subdomain = '기록관리'
-        elif '홍보' in filename_lower:
-            subdomain = '홍보관리'
-    
-    # 경영관리 도메인
-    elif any(keyword in filename_lower for keyword in ['경영', '성과', '내부통제', '이해충돌', '조직', '직제']):
-        domain = '경영관리'
-        if '경영' in filename_lower:
-            subdomain = '경영정책'
-        elif '성과' in filename_lower:
-            subdomain = '성과관리'
-        elif '내부통제' in filename_lower:
-            subdomain = '내부통제'
-        elif '이해충돌' in filename_lower:
-            subdomain = '이해충돌방지'
-        elif '조직' in filename_lower or '직제' in filename_lower:
-            subdomain = '조직관리'
+    # 2차 분류: 업무 도메인 (인덱서와 같은 공유 매처 사용)
+    classification = classify_filename(filename)
+    domain = classification['domain'] if classification['domain'] != '일반' else '일반업무'
+    subdomain = classification['subdomain'] if classification['domain'] != '일반' else '기타'
     
     # 3차 분류: 최신성 (등록일자 추출)
     try:
@@ -240,110 +159,77 @@ def _classify_document_by_domain(filename: str) -> Dict[str, str]:
         'filename': filename
     }
 
-def _smart_search(query: str, top_k: int = 10) -> List[Dict]:
-    """스마트 검색 (메타데이터 기반 정확한 필터링)"""
-    client = _get_qdrant_client()
-    
-    # 질문에서 도메인 추출
-    query_lower = query.lower()
-    target_domain = None
-    
-    if any(keyword in query_lower for keyword in ['인사', '채용', '급여', '휴가', '육아휴직', '연차', '출장']):
-        target_domain = '인사관리'
-    elif any(keyword in query_lower for keyword in ['회계', '예산', '감사', '재정', '계약', '수수료']):
-        target_domain = '재무관리'
-    elif any(keyword in query_lower for keyword in ['보안', '정보보호', '개인정보', '보안업무']):
-        target_domain = '보안관리'
-    elif any(keyword in query_lower for keyword in ['기술', 'IT', '정보화', '시스템', '전자서명']):
-        target_domain = '기술관리'
-    elif any(keyword in query_lower for keyword in ['문서', '기록', '자료', '관리']):
-        target_domain = '행정관리'
-    
-    try:
-        if target_domain:
-            # 도메인 기반 필터링 (파일명 패턴으로)
-            domain_keywords = {
-                '인사관리': ['인사', '급여', '취업', '출장', '휴가'],
-                '재무관리': ['회계', '예산', '감사', '계약', '수수료'],
-                '보안관리': ['보안', '정보보호', '개인정보'],
-                '기술관리': ['기술', 'IT', '정보화', '전자서명'],
-                '행정관리': ['문서', '기록', '자료', '관리']
-            }
-            
-            keywords = domain_keywords.get(target_domain, [])
-            if keywords:
-                # 여러 키워드 중 하나라도 포함된 문서 검색
-                filter_conditions = []
-                for keyword in keywords:
-                    filter_conditions.append({
-                        "key": "source",
-                        "match": {"text": keyword}
-                    })
-                
-                results = client.scroll(
-                    collection_name=settings.QDRANT_COLLECTION_NAME,
-                    scroll_filter={
-                        "should": filter_conditions  # OR 조건으로 검색
-                    },
-                    limit=top_k
-                )[0]
-                return results
-        
-        # 도메인을 특정할 수 없는 경우 빈 결과 반환
-        return []
-        
-    except Exception as e:
-        print(f"스마트 검색 오류: {e}")
-        return []
+def _query_features(query: str) -> Dict:
+    """질문에서 한 번만 계산하는 검색 특징 (키워드, 매처 결과, 도메인 키워드, 질의 벡터)"""
+    query_match = match_text(query)
+    target_domain = query_match.top_domain()
+    return {
+        'keywords': _extract_keywords(query),
+        'match': query_match,
+        'domain_keywords': DOMAIN_CLASSIFICATION.get(target_domain, {}).get('keywords', []) if target_domain else [],
+        'vector': _get_embedder().encode([query])[0].tolist(),
+    }
 
-def _keyword_search(query: str, top_k: int = 10) -> List[Dict]:
-    """키워드 기반 검색"""
-    keywords = _extract_keywords(query)
-    if not keywords:
-        return []
-    
-    client = _get_qdrant_client()
-    
-    # 키워드가 포함된 문서 검색
-    keyword_results = []
-    for keyword in keywords:
-        try:
-            # payload에서 text 필드에 키워드가 포함된 문서 검색
-            results = client.scroll(
-                collection_name=settings.QDRANT_COLLECTION_NAME,
-                scroll_filter={
-                    "must": [
-                        {
-                            "key": "text",
-                            "match": {"text": keyword}
-                        }
-                    ]
-                },
-                limit=top_k // len(keywords)
-            )[0]
-            keyword_results.extend(results)
-        except Exception as e:
-            print(f"키워드 검색 오류 ({keyword}): {e}")
-            continue
-    
-    return keyword_results
-
-def _vector_search(query: str, top_k: int = 10) -> List[Dict]:
-    """벡터 기반 검색"""
+def _smart_request(features: Dict, top_k: int) -> Optional[QueryRequest]:
+    """스마트 검색 요청 (질문 도메인 키워드가 파일명에 들어간 문서, 질의 없이 필터만 = scroll과 같음)"""
+    if not features['domain_keywords']:
+        return None
+    # 여러 키워드 중 하나라도 포함된 문서 (OR 조건)
+    return QueryRequest(
+        filter=exclude_doc_level({
+            "should": [{"key": "source", "match": {"text": keyword}} for keyword in features['domain_keywords']]
+        }),
+        limit=max(top_k, 1),
+        with_payload=True,
+    )
+
+def _keyword_requests(features: Dict, top_k: int) -> List[QueryRequest]:
+    """키워드 검색 요청 (키워드마다 본문에 키워드가 포함된 청크, 필터만 = scroll과 같음)"""
+    keywords = features['keywords']
+    return [
+        QueryRequest(
+            filter=exclude_doc_level({"must": [{"key": "text", "match": {"text": keyword}}]}),
+            limit=max(top_k // len(keywords), 1),
+            with_payload=True,
+        )
+        for keyword in keywords
+    ]
+
+def _batched_lookup(features: Dict, top_k: int) -> Tuple[List, List, List]:
+    """
+    스마트/벡터/키워드 조회를 query_batch_points 한 번으로 실행
+
+    Args:
+        features: _query_features 결과
+        top_k: 벡터 검색 결과 수 (스마트 검색은 절반, 키워드 검색은 키워드 수로 나눔)
+
+    Returns:
+        (스마트 검색 결과, 벡터 검색 결과, 키워드 검색 결과)
+    """
     client = _get_qdrant_client()
-    embedder = _get_embedder()
-    qvec = embedder.encode([query])[0].tolist()
+    smart = _smart_request(features, top_k // 2)
+    keyword = _keyword_requests(features, top_k)
 
     try:
-        results = client.search(
-            collection_name=settings.QDRANT_COLLECTION_NAME,
-            query_vector=qvec,
+        # 벡터 요청은 컬렉션 벡터 구성에 맞춤 (축소 보조 벡터가 있으면 prefetch + 전체 차원 재점수)
+        requests = [vector_request(
+            vector_layout(client, settings.QDRANT_COLLECTION_NAME),
+            features['vector'],
+            query_filter=exclude_doc_level(None),
             limit=top_k,
+            with_payload=True,
+        )] + ([smart] if smart else []) + keyword
+        responses = cached_query_batch(
+            client, settings.QDRANT_COLLECTION_NAME, features['vector'], requests
         )
-        return results
     except Exception as e:
-        print(f"벡터 검색 오류: {e}")
-        return []
+        print(f"배치 검색 오류: {e}")
+        return [], [], []
+
+    vector_results = responses[0]
+    smart_results = responses[1] if smart else []
+    keyword_results = [point for response in responses[1 + bool(smart):] for point in response]
+    return smart_results, vector_results, keyword_results
 
 def _rerank_results(vector_results: List[Dict], keyword_results: List[Dict], query: str) -> List[Dict]:
     """검색 결과 재순위화"""
@@ -351,7 +237,7 @@ def _rerank_results(vector_results: List[Dict], keyword_results: List[Dict], que
     
     # 벡터 검색 결과 처리
     for i, result in enumerate(vector_results):
-        doc_id = result.payload.get("path", "") + "_" + str(result.payload.get("page", ""))
+        doc_id = normalize_payload(result.payload)["file_path"] + "_" + str(result.payload.get("page", ""))
         if doc_id not in all_results:
             all_results[doc_id] = {
                 "result": result,
@@ -362,7 +248,7 @@ def _rerank_results(vector_results: List[Dict], keyword_results: List[Dict], que
     
     # 키워드 검색 결과 처리
     for result in keyword_results:
-        doc_id = result.payload.get("path", "") + "_" + str(result.payload.get("page", ""))
+        doc_id = normalize_payload(result.payload)["file_path"] + "_" + str(result.payload.get("page", ""))
         if doc_id in all_results:
             all_results[doc_id]["keyword_score"] = 1.0
             all_results[doc_id]["combined_score"] += 1.0
@@ -384,11 +270,15 @@ def _estimate_tokens(text: str) -> int:
     words = text.split()
     return int(len(words) * 1.3)
 
-def _optimize_context(documents: List[Dict], max_tokens: int = 4000, query: str = "") -> List[Dict]:
-    """컨텍스트 길이 최적화 (질문 기반 우선순위)"""
+def _optimize_context(documents: List[Dict], max_tokens: int = 4000, query: str = "",
+                      keywords: Optional[List[str]] = None) -> List[Dict]:
+    """컨텍스트 길이 최적화 (질문 기반 우선순위, keywords가 없으면 query에서 한 번 추출)"""
     if not documents:
         return []
     
+    if keywords is None:
+        keywords = _extract_keywords(query) if query else []
+    
     # 질문과의 관련성 점수 계산
     scored_docs = []
     for doc in documents:
@@ -396,11 +286,9 @@ def _optimize_context(documents: List[Dict], max_tokens: int = 4000, query: str
         relevance_score = 0
         
         # 질문 키워드가 문서에 포함된 정도로 점수 계산
-        if query:
-            query_keywords = _extract_keywords(query)
-            for keyword in query_keywords:
-                if keyword in text:
-                    relevance_score += 1
+        for keyword in keywords:
+            if keyword in text:
+                relevance_score += 1
         
         # 벡터 점수도 고려
         if hasattr(doc, 'score'):
@@ -455,13 +343,19 @@ def _build_context(chunks: List[Dict]) -> str:
     
     return "\n\n".join(lines)
 
-def _enhance_search_with_domain_classification(query: str, documents: List[Dict]) -> List[Dict]:
-    """도메인 분류를 활용하여 검색 결과 품질 향상"""
+def _enhance_search_with_domain_classification(query: str, documents: List[Dict],
+                                                query_match=None) -> List[Dict]:
+    """도메인 분류를 활용하여 검색 결과 품질 향상 (query_match: 이미 스캔한 질문 매칭 결과)"""
     if not documents:
         return documents
     
     enhanced_docs = []
     
+    # 질문은 한 번만 스캔
+    if query_match is None:
+        query_match = match_text(query)
+    query_domain = query_match.top_domain()
+    
     for doc in documents:
         # 메타데이터에서 문서 분류 정보 추출
         source = doc.payload.get("source", "")
@@ -474,38 +368,14 @@ def _enhance_search_with_domain_classification(query: str, documents: List[Dict]
         relevance_score = 0
         
         # 1. 도메인 일치 점수 (높은 가중치)
-        query_lower = query.lower()
-        
-        # 인사 관련 질문
-        if any(keyword in query_lower for keyword in ['인사', '채용', '급여', '휴가', '육아휴직', '연차', '출장']):
-            if domain_classification['domain'] == '인사관리':
-                relevance_score += 5
-                if any(keyword in query_lower for keyword in ['급여', '수당']):
-                    if domain_classification['subdomain'] == '급여관리':
-                        relevance_score += 3
-                elif any(keyword in query_lower for keyword in ['육아휴직', '휴가']):
-                    if domain_classification['subdomain'] in ['인사정책', '복무관리']:
-                        relevance_score += 3
-        
-        # 재무 관련 질문
-        elif any(keyword in query_lower for keyword in ['회계', '예산', '감사', '재정', '계약', '수수료']):
-            if domain_classification['domain'] == '재무관리':
-                relevance_score += 5
-                if '감사' in query_lower and domain_classification['subdomain'] == '감사관리':
-                    relevance_score += 3
-        
-        # 보안 관련 질문
-        elif any(keyword in query_lower for keyword in ['보안', '정보보호', '개인정보']):
-            if domain_classification['domain'] == '보안관리':
-                relevance_score += 5
-        
-        # 기술 관련 질문
-        elif any(keyword in query_lower for keyword in ['기술', 'IT', '정보화', '시스템']):
-            if domain_classification['domain'] == '기술관리':
-                relevance_score += 5
+        if query_domain and domain_classification['domain'] == query_domain:
+            relevance_score += 5
+            # 질문이 가리키는 서브도메인과도 일치하면 추가 점수
+            if (query_domain, domain_classification['subdomain']) in query_match.subdomains:
+                relevance_score += 3
         
         # 2. 문서 계층 점수
-        if '규정' in query_lower or '규칙' in query_lower:
+        if '규정' in query_match.doc_types or '규칙' in query_match.doc_types:
             if domain_classification['document_level'] in ['규정', '규칙']:
                 relevance_score += 2
         
@@ -535,17 +405,11 @@ def hybrid_search(question: str, top_k: int = None) -> List[Dict]:
     """하이브리드 검색 (벡터 + 키워드 + 메타데이터 기반 스마트)"""
     top_k = top_k or settings.RAG_TOP_K
     
-    # 스마트 검색 (메타데이터 기반)
-    smart_results = _smart_search(question, top_k=top_k//2)
-    
-    # 벡터 검색
-    vector_results = _vector_search(question, top_k=top_k)
-    
-    # 키워드 검색
-    keyword_results = _keyword_search(question, top_k=top_k)
+    # 질문 특징(키워드/도메인/질의 벡터)은 한 번만 계산
+    features = _query_features(question)
     
-    # 모든 결과 통합
-    all_results = smart_results + vector_results + keyword_results
+    # 스마트(메타데이터) + 벡터 + 키워드 조회를 Qdrant 왕복 한 번으로
+    smart_results, vector_results, keyword_results = _batched_lookup(features, top_k)
     
     # 결과 재순위화
     combined_results = _rerank_results(vector_results, keyword_results, question)
@@ -553,15 +417,20 @@ def hybrid_search(question: str, top_k: int = None) -> List[Dict]:
     # 스마트 검색 결과를 우선순위로 추가
     if smart_results:
         # 스마트 검색 결과를 맨 앞에 배치
-        final_results = smart_results + [r for r in combined_results if r not in smart_results]
+        smart_ids = {r.id for r in smart_results}
+        final_results = smart_results + [r for r in combined_results if r.id not in smart_ids]
     else:
         final_results = combined_results
     
     # 메타데이터 기반 검색 결과 품질 향상
-    enhanced_results = _enhance_search_with_domain_classification(question, final_results)
+    enhanced_results = _enhance_search_with_domain_classification(
+        question, final_results, query_match=features['match']
+    )
     
     # 컨텍스트 최적화 (질문 기반)
-    optimized_results = _optimize_context(enhanced_results, max_tokens=4000, query=question)
+    optimized_results = _optimize_context(
+        enhanced_results, max_tokens=4000, query=question, keywords=features['keywords']
+    )
     
     return optimized_results
 
@@ -609,7 +478,7 @@ def generate_answer(question: str, retrieved: List[Dict]) -> Dict:
         {
             "source": r.payload.get("source", "알 수 없음"),
             "page": r.payload.get("page", "알 수 없음"),
-            "path": r.payload.get("path", "알 수 없음"),
+            "path": normalize_payload(r.payload)["file_path"] or "알 수 없음",
         }
         for r in retrieved
     ]
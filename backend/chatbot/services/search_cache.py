@@ -0,0 +1,293 @@
+"""
+검색 결과 캐시
+RagSearcher 하위에서 Qdrant 검색 결과를 캐싱합니다.
+
+캐시 키: (컬렉션, 양자화된 질의 벡터 해시, 정규화된 필터, top_k, 컬렉션 버전)
+- LRU + TTL 기반 만료
+- 인덱서가 컬렉션에 쓰면 컬렉션 버전이 바뀌어 이전 결과는 자동으로 무효화됩니다.
+"""
+
+import copy
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from django.conf import settings
+
+from .index_state import get_collection_version, bump_collection_version
+from .vector_projection import search_points
+
+logger = logging.getLogger(__name__)
+
+# 벡터 양자화 소수점 자리수 (같은 질문의 부동소수점 미세 오차 흡수)
+VECTOR_QUANTIZE_DECIMALS = 4
+
+
+class RetrievalCache:
+    """
+    LRU + TTL 검색 결과 캐시 (프로세스 단위, 스레드 안전)
+    """
+
+    def __init__(self, max_entries: int = 2048, ttl_seconds: int = 600):
+        """
+        캐시 초기화
+
+        Args:
+            max_entries: 최대 보관 항목 수
+            ttl_seconds: 항목 유효 시간(초)
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple) -> Optional[Any]:
+        """캐시 조회 (만료된 항목은 제거 후 None 반환)"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at < now:
+                del self._entries[key]
+                self.misses += 1
+                return None
+
+            # 최근 사용 항목으로 이동
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Tuple, value: Any) -> None:
+        """캐시 저장 (용량 초과 시 가장 오래 사용하지 않은 항목 제거)"""
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, collection_name: Optional[str] = None) -> int:
+        """
+        캐시 무효화
+
+        Args:
+            collection_name: 대상 컬렉션 (None이면 전체)
+
+        Returns:
+            제거된 항목 수
+        """
+        with self._lock:
+            if collection_name is None:
+                removed = len(self._entries)
+                self._entries.clear()
+                return removed
+
+            keys = [k for k in self._entries if k[0] == collection_name]
+            for k in keys:
+                del self._entries[k]
+            return len(keys)
+
+    def stats(self) -> Dict[str, Any]:
+        """캐시 통계 반환"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / total, 4) if total else 0.0,
+            }
+
+
+def _vector_fingerprint(vector: Any) -> str:
+    """질의 벡터를 양자화한 뒤 해시"""
+    arr = np.round(np.asarray(vector, dtype=np.float32), VECTOR_QUANTIZE_DECIMALS)
+    # -0.0과 0.0을 같은 값으로 취급
+    arr = arr + np.float32(0.0)
+    return hashlib.blake2b(arr.tobytes(), digest_size=16).hexdigest()
+
+
+def _json_default(obj: Any) -> Any:
+    """Qdrant 모델 객체(Filter 등)를 JSON 직렬화 가능한 형태로 변환"""
+    if hasattr(obj, 'model_dump'):
+        return obj.model_dump(exclude_none=True)
+    if hasattr(obj, 'dict'):
+        return obj.dict(exclude_none=True)
+    return str(obj)
+
+
+def _canonical_filter(flt: Any) -> str:
+    """필터를 키 순서와 무관한 정규 문자열로 변환"""
+    if not flt:
+        return ''
+    return json.dumps(flt, sort_keys=True, ensure_ascii=False, default=_json_default)
+
+
+def make_cache_key(collection_name: str, query_vector: Any, flt: Any, top_k: int,
+                   version: int, **extra: Any) -> Tuple:
+    """
+    검색 캐시 키 생성
+
+    Args:
+        collection_name: 컬렉션 이름
+        query_vector: 질의 벡터
+        flt: Qdrant 필터 (dict 또는 Filter)
+        top_k: 결과 수
+        version: 컬렉션 버전
+        extra: 결과에 영향을 주는 기타 검색 인자 (with_payload 등)
+
+    Returns:
+        캐시 키 튜플 (첫 요소는 항상 컬렉션 이름)
+    """
+    return (
+        collection_name,
+        _vector_fingerprint(query_vector),
+        _canonical_filter(flt),
+        int(top_k),
+        version,
+        _canonical_filter(extra),
+    )
+
+
+# 프로세스 전역 캐시
+_RETRIEVAL_CACHE: Optional[RetrievalCache] = None
+_CACHE_INIT_LOCK = threading.Lock()
+
+
+def get_retrieval_cache() -> RetrievalCache:
+    """전역 검색 결과 캐시 반환 (최초 호출 시 생성)"""
+    global _RETRIEVAL_CACHE
+    if _RETRIEVAL_CACHE is None:
+        with _CACHE_INIT_LOCK:
+            if _RETRIEVAL_CACHE is None:
+                _RETRIEVAL_CACHE = RetrievalCache(
+                    max_entries=getattr(settings, 'RAG_CACHE_MAX_ENTRIES', 2048),
+                    ttl_seconds=getattr(settings, 'RAG_CACHE_TTL_SECONDS', 600),
+                )
+    return _RETRIEVAL_CACHE
+
+
+def cached_search(client, collection_name: str, query_vector: Any, query_filter: Any = None,
+                  limit: int = 10, **search_kwargs: Any) -> List[Any]:
+    """
+    캐시를 거치는 Qdrant 벡터 검색
+
+    캐시 적중 시 Qdrant를 호출하지 않습니다. 호출측이 결과 payload를
+    수정하는 경우가 있으므로 항상 복사본을 반환합니다. 축소 보조 벡터가 있는 컬렉션은
+    축소 벡터 후보 + 전체 차원 재점수로 검색합니다 (vector_projection.search_points).
+
+    Args:
+        client: QdrantClient
+        collection_name: 컬렉션 이름
+        query_vector: 질의 벡터
+        query_filter: Qdrant 필터
+        limit: 결과 수
+        search_kwargs: 검색에 그대로 전달할 기타 인자 (with_payload 등)
+
+    Returns:
+        Qdrant ScoredPoint 리스트
+    """
+    if not getattr(settings, 'RAG_CACHE_ENABLED', True):
+        return search_points(
+            client,
+            collection_name,
+            query_vector,
+            query_filter=query_filter,
+            limit=limit,
+            **search_kwargs
+        )
+
+    cache = get_retrieval_cache()
+    key = make_cache_key(
+        collection_name, query_vector, query_filter, limit,
+        get_collection_version(collection_name), **search_kwargs
+    )
+
+    cached = cache.get(key)
+    if cached is not None:
+        logger.debug(f"검색 캐시 적중: {collection_name} (top_k={limit})")
+        return copy.deepcopy(cached)
+
+    results = search_points(
+        client,
+        collection_name,
+        query_vector,
+        query_filter=query_filter,
+        limit=limit,
+        **search_kwargs
+    )
+    cache.set(key, results)
+    return copy.deepcopy(results)
+
+
+def cached_query_batch(client, collection_name: str, query_vector: Any,
+                       requests: List[Any]) -> List[List[Any]]:
+    """
+    캐시를 거치는 Qdrant 배치 질의 (query_batch_points 한 번으로 여러 검색/필터 조회)
+
+    캐시 키는 질의 벡터 지문과 각 요청의 벡터를 뺀 나머지(필터/limit 등)로 만듭니다.
+
+    Args:
+        client: QdrantClient
+        collection_name: 컬렉션 이름
+        query_vector: 요청들이 공유하는 질의 벡터 (캐시 키용)
+        requests: QueryRequest 리스트
+
+    Returns:
+        요청 순서대로 ScoredPoint 리스트의 리스트
+    """
+    def run() -> List[List[Any]]:
+        responses = client.query_batch_points(collection_name=collection_name, requests=requests)
+        return [response.points for response in responses]
+
+    if not getattr(settings, 'RAG_CACHE_ENABLED', True):
+        return run()
+
+    # 요청에 들어 있는 벡터는 지문(query_vector)으로 대신하므로 키에서 제외
+    specs = []
+    for request in requests:
+        spec = _json_default(request)
+        specs.append({k: v for k, v in spec.items() if k != 'query'} if isinstance(spec, dict) else spec)
+
+    cache = get_retrieval_cache()
+    key = make_cache_key(
+        collection_name, query_vector, None, len(requests),
+        get_collection_version(collection_name), requests=specs,
+    )
+
+    cached = cache.get(key)
+    if cached is not None:
+        logger.debug(f"배치 검색 캐시 적중: {collection_name} ({len(requests)}개 요청)")
+        return copy.deepcopy(cached)
+
+    results = run()
+    cache.set(key, results)
+    return copy.deepcopy(results)
+
+
+def invalidate_collection(collection_name: str) -> None:
+    """
+    컬렉션 쓰기 후 캐시 무효화 (인덱서에서 호출)
+
+    버전 마커를 갱신하므로 다른 워커 프로세스의 캐시도 다음 조회 시 무효화됩니다.
+
+    Args:
+        collection_name: 컬렉션 이름
+    """
+    bump_collection_version(collection_name)
+    if _RETRIEVAL_CACHE is not None:
+        removed = _RETRIEVAL_CACHE.invalidate(collection_name)
+        logger.info(f"검색 캐시 무효화: {collection_name} ({removed}개 항목 제거)")
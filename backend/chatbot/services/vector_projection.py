@@ -0,0 +1,364 @@
+"""
+PCA 차원 축소 보조 벡터
+KoE5 1024차원 벡터를 코퍼스에서 오프라인으로 학습한 PCA 투영으로 256차원으로 줄여
+같은 포인트에 이름 있는 보조 벡터(reduced)로 함께 저장합니다. 검색은 작은 벡터로
+oversampling 배수만큼 후보를 뽑고(prefetch) 전체 차원 벡터(full)로 다시 점수를 매깁니다.
+
+    학습    scripts/fit_projection.py → index_state/projection.npz (VECTOR_PROJECTION_FILE)
+    인덱싱  INGEST_REDUCED_VECTORS=true면 새로 만드는 컬렉션을 full/reduced 이름 있는 벡터로 만들고
+            투영 파일을 인덱싱 매니페스트 옆(<컬렉션>.projection.npz)에 복사해 컬렉션과 묶음
+    검색    search_points가 컬렉션 벡터 구성을 보고 이름 없는 벡터 / full / prefetch+rescore 중 선택
+
+질의는 그 컬렉션에 묶인 투영 행렬로 투영하므로 나중에 투영을 다시 학습해도
+기존 버전 컬렉션(롤백 대상 포함)의 검색은 그대로 동작합니다.
+인덱서에서 사용하므로 Django 설정에 의존하지 않습니다.
+
+    VECTOR_PROJECTION_FILE       학습한 투영 파일 (기본값: index_state/projection.npz)
+    INGEST_REDUCED_VECTORS       새 컬렉션에 축소 보조 벡터 추가 (기본값: false)
+    VECTOR_RESCORE_OVERSAMPLING  축소 벡터 1단계 후보 배수 (기본값: 4)
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from qdrant_client import QdrantClient
+from qdrant_client.models import Prefetch, QueryRequest
+
+from .index_state import get_collection_version, index_state_dir
+
+logger = logging.getLogger(__name__)
+
+FULL_VECTOR = "full"
+REDUCED_VECTOR = "reduced"
+
+
+def projection_file() -> Path:
+    """학습한 투영 파일 경로 (VECTOR_PROJECTION_FILE, 기본값: index_state/projection.npz)"""
+    path = os.getenv('VECTOR_PROJECTION_FILE')
+    return Path(path) if path else index_state_dir() / 'projection.npz'
+
+
+def reduced_vectors_enabled() -> bool:
+    """INGEST_REDUCED_VECTORS 환경변수 (기본값: false)"""
+    return os.getenv('INGEST_REDUCED_VECTORS', 'false').lower() == 'true'
+
+
+def default_oversampling() -> float:
+    """VECTOR_RESCORE_OVERSAMPLING 환경변수 (기본값: 4)"""
+    return float(os.getenv('VECTOR_RESCORE_OVERSAMPLING', '4'))
+
+
+def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+
+class VectorProjection:
+    """
+    PCA 투영 (평균 + 상위 주성분)
+
+    사용법:
+        projection = VectorProjection.fit(vectors, dim=256)
+        reduced = projection.project(vectors)     # (n, 256), L2 정규화
+        projection.save(projection_file())
+    """
+
+    def __init__(self, mean: np.ndarray, components: np.ndarray,
+                 explained_variance_ratio: float = 0.0, meta: Optional[Dict[str, Any]] = None):
+        self.mean = np.asarray(mean, dtype=np.float32)
+        self.components = np.asarray(components, dtype=np.float32)
+        self.explained_variance_ratio = float(explained_variance_ratio)
+        self.meta = dict(meta or {})
+
+    @property
+    def dim(self) -> int:
+        """축소 차원"""
+        return self.components.shape[0]
+
+    @property
+    def input_dim(self) -> int:
+        """원본 차원"""
+        return self.components.shape[1]
+
+    @property
+    def sha256(self) -> str:
+        """투영 행렬 해시 (인덱싱 설정/컬렉션 묶음 비교용)"""
+        digest = hashlib.sha256()
+        digest.update(self.mean.tobytes())
+        digest.update(self.components.tobytes())
+        return digest.hexdigest()
+
+    @classmethod
+    def fit(cls, vectors: np.ndarray, dim: int = 256, **meta: Any) -> 'VectorProjection':
+        """
+        코퍼스 벡터로 PCA 학습 (코사인 검색이므로 L2 정규화 후 공분산 고유분해)
+
+        Args:
+            vectors: (n, d) 임베딩
+            dim: 축소 차원
+            meta: 함께 저장할 정보 (원본 컬렉션, 모델 등)
+
+        Returns:
+            학습한 투영
+        """
+        data = _normalize_rows(np.asarray(vectors, dtype=np.float32))
+        if data.shape[0] <= dim:
+            raise ValueError(f"학습 벡터 수({data.shape[0]})가 축소 차원({dim})보다 많아야 합니다")
+        mean = data.mean(axis=0)
+        centered = (data - mean).astype(np.float64)
+        covariance = centered.T @ centered / (data.shape[0] - 1)
+        eigenvalues, eigenvectors = np.linalg.eigh(covariance)
+        order = np.argsort(eigenvalues)[::-1][:dim]
+        explained = float(eigenvalues[order].sum() / max(eigenvalues.sum(), 1e-12))
+        meta = {'samples': int(data.shape[0]), 'fitted_at': time.strftime('%Y-%m-%dT%H:%M:%S'), **meta}
+        return cls(mean, eigenvectors[:, order].T, explained, meta)
+
+    def project(self, vectors: Any) -> np.ndarray:
+        """(n, d) 또는 (d,) 벡터를 (n, dim) 축소 벡터로 투영 (L2 정규화)"""
+        data = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        return _normalize_rows((data - self.mean) @ self.components.T)
+
+    def describe(self) -> Dict[str, Any]:
+        """투영 요약 (로그/매니페스트용)"""
+        return {
+            'dim': self.dim,
+            'input_dim': self.input_dim,
+            'explained_variance_ratio': round(self.explained_variance_ratio, 4),
+            'sha256': self.sha256,
+            **self.meta,
+        }
+
+    def save(self, path: Path) -> Path:
+        """npz로 원자적 저장"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            np.savez(
+                f, mean=self.mean, components=self.components,
+                explained=np.float64(self.explained_variance_ratio),
+                meta=np.array(json.dumps(self.meta, ensure_ascii=False)),
+            )
+        tmp_path.replace(path)
+        return path
+
+    @classmethod
+    def load(cls, path: Path) -> 'VectorProjection':
+        """npz 로딩"""
+        with np.load(path) as data:
+            return cls(data['mean'], data['components'], float(data['explained']),
+                       json.loads(str(data['meta'])))
+
+
+# -------------------- 투영 파일 캐시 --------------------
+
+_PROJECTIONS: Dict[str, Tuple[int, VectorProjection]] = {}
+_LAYOUTS: Dict[Tuple[str, int], Dict[str, Any]] = {}
+_LOCK = threading.Lock()
+
+
+def _load_cached(path: Path) -> Optional[VectorProjection]:
+    """파일 수정 시각 기준으로 캐시한 투영 (파일이 없으면 None)"""
+    try:
+        mtime = path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+    with _LOCK:
+        cached = _PROJECTIONS.get(str(path))
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+    projection = VectorProjection.load(path)
+    with _LOCK:
+        _PROJECTIONS[str(path)] = (mtime, projection)
+    return projection
+
+
+def desired_projection() -> Optional[VectorProjection]:
+    """새 컬렉션에 쓸 투영 (INGEST_REDUCED_VECTORS가 켜져 있고 학습 파일이 있을 때)"""
+    if not reduced_vectors_enabled():
+        return None
+    projection = _load_cached(projection_file())
+    if projection is None:
+        logger.warning(f"INGEST_REDUCED_VECTORS=true지만 투영 파일이 없습니다: {projection_file()} "
+                       f"(scripts/fit_projection.py로 학습)")
+    return projection
+
+
+def collection_projection_file(collection_name: str) -> Path:
+    """컬렉션에 묶인 투영 파일 (인덱싱 매니페스트 옆)"""
+    return index_state_dir() / f"{collection_name}.projection.npz"
+
+
+def bind_projection(collection_name: str, projection: VectorProjection) -> Path:
+    """투영을 컬렉션에 묶음 (컬렉션 생성 시)"""
+    return projection.save(collection_projection_file(collection_name))
+
+
+def load_collection_projection(collection_name: str) -> Optional[VectorProjection]:
+    """컬렉션에 묶인 투영 (없으면 None)"""
+    return _load_cached(collection_projection_file(collection_name))
+
+
+def delete_collection_projection(collection_name: str) -> None:
+    """컬렉션 삭제 시 묶인 투영 파일도 삭제"""
+    collection_projection_file(collection_name).unlink(missing_ok=True)
+
+
+# -------------------- 컬렉션 벡터 구성 --------------------
+
+def _physical_collection(client: QdrantClient, collection_name: str) -> str:
+    """alias면 가리키는 실제 컬렉션 이름"""
+    for description in client.get_aliases().aliases:
+        if description.alias_name == collection_name:
+            return description.collection_name
+    return collection_name
+
+
+def vector_layout(client: QdrantClient, collection_name: str) -> Dict[str, Any]:
+    """
+    컬렉션 벡터 구성 (컬렉션 버전 마커가 바뀔 때까지 프로세스 내 캐시)
+
+    Args:
+        client: QdrantClient
+        collection_name: 컬렉션 또는 alias
+
+    Returns:
+        {'collection': 실제 컬렉션, 'named': 이름 있는 벡터 여부,
+         'reduced': 축소 보조 벡터 여부, 'projection': 묶인 투영 또는 None}
+    """
+    key = (collection_name, get_collection_version(collection_name))
+    with _LOCK:
+        cached = _LAYOUTS.get(key)
+    if cached is not None:
+        return cached
+
+    vectors = client.get_collection(collection_name).config.params.vectors
+    named = isinstance(vectors, dict)
+    reduced = named and REDUCED_VECTOR in vectors
+    physical = _physical_collection(client, collection_name)
+    layout = {
+        'collection': physical,
+        'named': named,
+        'reduced': reduced,
+        'projection': load_collection_projection(physical) if reduced else None,
+    }
+    if reduced and layout['projection'] is None:
+        logger.warning(f"'{physical}'에 묶인 투영 파일이 없어 전체 차원 벡터로만 검색합니다")
+    with _LOCK:
+        _LAYOUTS[key] = layout
+    return layout
+
+
+def layout_matches(client: QdrantClient, collection_name: str,
+                   projection: Optional[VectorProjection] = None) -> bool:
+    """기존 컬렉션 벡터 구성이 현재 설정(desired_projection)과 같은지 (제자리 증분 인덱싱 가능 여부)"""
+    if projection is None:
+        projection = desired_projection()
+    layout = vector_layout(client, collection_name)
+    if projection is None:
+        return not layout['reduced']
+    return layout['projection'] is not None and layout['projection'].sha256 == projection.sha256
+
+
+def point_vectors(layout: Dict[str, Any], vectors: Sequence[Any]) -> List[Any]:
+    """
+    업서트할 포인트 벡터 (이름 없는 벡터 / {full} / {full, reduced})
+
+    Args:
+        layout: vector_layout 결과
+        vectors: 전체 차원 벡터 목록
+
+    Returns:
+        PointStruct.vector 값 목록
+    """
+    full = [v.tolist() if hasattr(v, 'tolist') else list(v) for v in vectors]
+    if not layout['named']:
+        return full
+    if not layout['reduced']:
+        return [{FULL_VECTOR: v} for v in full]
+    if layout['projection'] is None:
+        raise ValueError(f"'{layout['collection']}'에 묶인 투영 파일이 없어 축소 벡터를 만들 수 없습니다")
+    reduced = layout['projection'].project(np.asarray(full, dtype=np.float32))
+    return [{FULL_VECTOR: v, REDUCED_VECTOR: r.tolist()} for v, r in zip(full, reduced)]
+
+
+def full_vector(vector: Any) -> Any:
+    """조회한 포인트 벡터에서 전체 차원 벡터 (이름 있는 벡터면 full)"""
+    if isinstance(vector, dict):
+        return vector.get(FULL_VECTOR)
+    return vector
+
+
+# -------------------- 검색 --------------------
+
+def search_points(client: QdrantClient, collection_name: str, query_vector: Any,
+                  query_filter: Any = None, limit: int = 10, oversampling: Optional[float] = None,
+                  **search_kwargs: Any) -> List[Any]:
+    """
+    컬렉션 벡터 구성에 맞는 벡터 검색
+
+    축소 보조 벡터가 있으면 축소 벡터로 limit × oversampling개 후보를 뽑고(prefetch)
+    전체 차원 벡터로 다시 점수를 매겨 상위 limit개를 반환합니다.
+
+    Args:
+        client: QdrantClient
+        collection_name: 컬렉션 또는 alias
+        query_vector: 전체 차원 질의 벡터
+        query_filter: Qdrant 필터 (1단계 후보와 최종 결과 모두에 적용)
+        limit: 결과 수
+        oversampling: 1단계 후보 배수 (기본값: default_oversampling())
+        search_kwargs: with_payload, with_vectors 등
+
+    Returns:
+        Qdrant ScoredPoint 리스트
+    """
+    vector = query_vector.tolist() if hasattr(query_vector, 'tolist') else list(query_vector)
+    layout = vector_layout(client, collection_name)
+    if not layout['named']:
+        return client.search(collection_name=collection_name, query_vector=vector,
+                             query_filter=query_filter, limit=limit, **search_kwargs)
+    if layout['projection'] is None:
+        return client.search(collection_name=collection_name, query_vector=(FULL_VECTOR, vector),
+                             query_filter=query_filter, limit=limit, **search_kwargs)
+    return client.query_points(
+        collection_name=collection_name,
+        prefetch=_reduced_prefetch(layout, vector, query_filter, limit, oversampling),
+        query=vector,
+        using=FULL_VECTOR,
+        query_filter=query_filter,
+        limit=limit,
+        **search_kwargs
+    ).points
+
+
+def _reduced_prefetch(layout: Dict[str, Any], vector: List[float], query_filter: Any,
+                      limit: int, oversampling: Optional[float]) -> Prefetch:
+    """축소 벡터 1단계 후보 (limit × oversampling개)"""
+    if oversampling is None:
+        oversampling = default_oversampling()
+    return Prefetch(
+        query=layout['projection'].project(vector)[0].tolist(),
+        using=REDUCED_VECTOR,
+        filter=query_filter,
+        limit=max(int(limit * oversampling), limit),
+    )
+
+
+def vector_request(layout: Dict[str, Any], query_vector: Any, query_filter: Any = None,
+                   limit: int = 10, oversampling: Optional[float] = None, **kwargs: Any) -> QueryRequest:
+    """query_batch_points용 벡터 검색 요청 (search_points와 같은 구성 규칙)"""
+    vector = query_vector.tolist() if hasattr(query_vector, 'tolist') else list(query_vector)
+    if not layout['named']:
+        return QueryRequest(query=vector, filter=query_filter, limit=limit, **kwargs)
+    if layout['projection'] is None:
+        return QueryRequest(query=vector, using=FULL_VECTOR, filter=query_filter, limit=limit, **kwargs)
+    return QueryRequest(
+        prefetch=_reduced_prefetch(layout, vector, query_filter, limit, oversampling),
+        query=vector, using=FULL_VECTOR, filter=query_filter, limit=limit, **kwargs
+    )
@@ -0,0 +1,384 @@
+import os
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from chatbot.services import pipeline
+from chatbot.services.chunk_dedup import ChunkDeduplicator, lsh_bands
+from chatbot.services.collection_versions import validate_collection
+from chatbot.services.doc_retrieval import restrict_to_documents
+from chatbot.services.form_catalog import FormCatalog
+from chatbot.services.index_manifest import IndexManifest
+from chatbot.services.ingestion import alternate_payload, detach_alternates
+from chatbot.services.matcher import AhoCorasick, _merge_contained, classify_filename, match_text, names_document
+from chatbot.services.rag_search import RagSearcher
+
+
+def _form_payload(title, uri):
+    return {'doc_type': 'form', 'form_title': title, 'form_file_uri': uri, 'doc_title': '서식 모음'}
+
+
+FORMS = {
+    'f1': _form_payload('보안서약서', 'forms/보안서약서.hwp'),
+    'f2': _form_payload('정보보안 점검표', 'forms/정보보안점검표.hwp'),
+    'f3': _form_payload('보안 서약 확인서', 'forms/보안서약확인서.hwp'),
+    'f4': _form_payload('휴가신청서', 'forms/휴가신청서.hwp'),
+}
+
+
+@override_settings(DOMAIN_ROUTER_ENABLED=False, RAG_FORM_CATALOG_ENABLED=True, RAG_FORM_CATALOG_MIN_SCORE=0.75)
+class FormRequestPipelineTest(TestCase):
+    """서식 이름을 그대로 말하는 요청의 파이프라인 경로 테스트"""
+
+    def setUp(self):
+        self.searcher = RagSearcher.__new__(RagSearcher)
+        self.searcher.client = mock.Mock()
+        self.searcher.collection_name = 'test_collection'
+        self.searcher.embedder = mock.Mock()
+        self.searcher.default_top_k = 5
+        self.catalog = FormCatalog([{'id': point_id, 'payload': payload} for point_id, payload in FORMS.items()])
+
+    def test_catalog_hits_are_padded_from_catalog(self):
+        """최소 점수 이상 일치가 하나뿐이어도 카탈로그의 낮은 점수 후보로 채우고 Qdrant는 검색하지 않음"""
+        with mock.patch('chatbot.services.rag_search.get_form_catalog', return_value=self.catalog), \
+                mock.patch('chatbot.services.rag_search.cached_search') as search:
+            results = self.searcher.search_forms("보안서약서 양식 주세요", top_k=10)
+
+        self.assertEqual([r['id'] for r in results], ['f1', 'f3', 'f2'])
+        self.assertEqual(results[0]['score'], 1.0)
+        search.assert_not_called()
+        self.searcher.embedder.encode.assert_not_called()
+
+    def test_weak_catalog_match_falls_back_to_vector_search(self):
+        """카탈로그 최고 점수가 최소 점수 미만이면 벡터 검색"""
+        self.searcher.embedder.encode.return_value = [mock.Mock(tolist=lambda: [0.0] * 4)]
+        hits = [SimpleNamespace(id='f2', payload=FORMS['f2'], score=0.5)]
+        with mock.patch('chatbot.services.rag_search.get_form_catalog', return_value=self.catalog), \
+                mock.patch('chatbot.services.rag_search.cached_search', return_value=hits) as search:
+            results = self.searcher.search_forms("정보 점검 양식", top_k=10)
+
+        search.assert_called_once()
+        self.assertEqual([r['id'] for r in results], ['f2'])
+
+    def test_exact_form_request_gets_form_answer(self):
+        """정확한 서식 요청은 '질문을 명확하게' 안내가 아니라 서식 목록으로 답변"""
+        with mock.patch.object(pipeline, 'RagSearcher', return_value=self.searcher), \
+                mock.patch.object(pipeline, 'analyze_user_input', return_value={'is_simple_greeting': False}), \
+                mock.patch.object(pipeline, 'extract_keywords', return_value=['보안서약서']), \
+                mock.patch.object(pipeline, 'analyze_question_level', return_value={'level': '중급'}), \
+                mock.patch('chatbot.services.rag_search.get_form_catalog', return_value=self.catalog), \
+                mock.patch('chatbot.services.rag_search.cached_search') as search:
+            result = pipeline.answer_query("보안서약서 양식 주세요")
+
+        self.assertEqual(result['search_strategy']['type'], 'form_specific')
+        self.assertNotEqual(result['answer'], "질문을 조금 더 명확하게 해주시면 감사합니다.")
+        self.assertIn('보안서약서', result['answer'])
+        self.assertEqual(result['top_docs'][0]['id'], 'f1')
+        search.assert_not_called()
+
+
+class DocumentRestrictionTest(TestCase):
+    """문서 단위 2단계 검색 필터 테스트"""
+
+    def test_matches_documents_merged_into_canonical_chunks(self):
+        """중복 제거로 다른 문서의 대표 청크에 합쳐진 본문도 선택된 문서로 검색"""
+        flt = restrict_to_documents({'must': [{'key': 'domain_primary', 'match': {'value': '인사'}}]}, ['a', 'b'])
+
+        self.assertIn({'key': 'domain_primary', 'match': {'value': '인사'}}, flt['must'])
+        self.assertIn({'should': [
+            {'key': 'doc_id', 'match': {'any': ['a', 'b']}},
+            {'key': 'alt_doc_ids', 'match': {'any': ['a', 'b']}},
+        ]}, flt['must'])
+
+
+class IndexManifestDiffTest(TestCase):
+    """증분 인덱싱 매니페스트 비교 테스트"""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+        state = mock.patch.dict(os.environ, {'RAG_INDEX_STATE_DIR': str(self.root / 'state')})
+        state.start()
+        self.addCleanup(state.stop)
+        self.config = {'schema': 1, 'chunk_size': 800}
+
+    def _pdf(self, name, content):
+        path = self.root / name
+        path.write_bytes(content)
+        return path
+
+    def test_diff_classifies_files(self):
+        """추가/변경/mtime만 바뀐 파일/삭제 파일 구분"""
+        same = self._pdf('a.pdf', b'aaa')
+        touched = self._pdf('b.pdf', b'bbb')
+        edited = self._pdf('c.pdf', b'ccc')
+        manifest = IndexManifest('test')
+        for path in (same, touched, edited):
+            manifest.record(path, path.stem, 1, self.config)
+        manifest.files['gone.pdf'] = {'doc_id': 'gone'}
+
+        stat = touched.stat()
+        os.utime(touched, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        edited.write_bytes(b'cccc')
+        added = self._pdf('d.pdf', b'ddd')
+
+        plan = manifest.diff([same, touched, edited, added], self.config)
+
+        self.assertEqual(plan['unchanged'], [same, touched])
+        self.assertEqual(plan['changed'], [edited])
+        self.assertEqual(plan['added'], [added])
+        self.assertEqual(plan['removed'], ['gone.pdf'])
+        # mtime만 바뀐 파일은 내용 해시로 확인한 뒤 기록을 갱신
+        self.assertEqual(manifest.files['b.pdf']['mtime_ns'], touched.stat().st_mtime_ns)
+
+    def test_config_change_marks_changed(self):
+        """인덱싱 설정이 바뀌면 내용이 같아도 변경"""
+        path = self._pdf('a.pdf', b'aaa')
+        manifest = IndexManifest('test')
+        manifest.record(path, 'a', 1, self.config)
+
+        plan = manifest.diff([path], {**self.config, 'chunk_size': 500})
+
+        self.assertEqual(plan['changed'], [path])
+
+    def test_skipped_files_are_not_removed(self):
+        """--limit으로 이번 실행에서 뺀 파일은 삭제 목록에 넣지 않음"""
+        first = self._pdf('a.pdf', b'aaa')
+        second = self._pdf('b.pdf', b'bbb')
+        manifest = IndexManifest('test')
+        for path in (first, second):
+            manifest.record(path, path.stem, 1, self.config)
+
+        plan = manifest.diff([first], self.config, skipped=['b.pdf'])
+
+        self.assertEqual(plan['unchanged'], [first])
+        self.assertEqual(plan['removed'], [])
+
+
+@override_settings(RAG_MMR_ENABLED=True, RAG_MMR_LAMBDA=0.7, RAG_MMR_CANDIDATES=20)
+class MMRSelectionTest(TestCase):
+    """답변 컨텍스트 MMR 다양화 테스트"""
+
+    def setUp(self):
+        self.searcher = RagSearcher.__new__(RagSearcher)
+        self.searcher.client = mock.Mock()
+        self.searcher.collection_name = 'test_collection'
+
+    def _retrieve(self, vectors):
+        self.searcher.client.retrieve.return_value = [
+            SimpleNamespace(id=point_id, vector=vector) for point_id, vector in vectors.items()
+        ]
+
+    def test_duplicate_chunks_are_diversified(self):
+        """같은 벡터의 중첩 청크 대신 다른 근거를 두 번째로 선택"""
+        self._retrieve({'a': [1.0, 0.0], 'a2': [1.0, 0.0], 'a3': [1.0, 0.0], 'b': [0.0, 1.0]})
+        results = [{'id': point_id, 'score': 0.9} for point_id in ('a', 'a2', 'a3', 'b')]
+
+        selected = self.searcher.select_mmr(results, top_k=2)
+
+        self.assertEqual([r['id'] for r in selected], ['a', 'b', 'a2', 'a3'])
+
+    def test_relevance_follows_input_order(self):
+        """벡터 점수가 아니라 재정렬된 입력 순서(final_score/부서 우선순위)를 관련도로 사용"""
+        self._retrieve({'a': [1.0, 0.0], 'b': [0.0, 1.0]})
+        # 도메인 가중치로 점수가 낮은 b가 앞에 온 결과
+        results = [{'id': 'b', 'score': 0.5, 'final_score': 2.5}, {'id': 'a', 'score': 0.9, 'final_score': 0.9}]
+
+        selected = self.searcher.select_mmr(results, top_k=2)
+
+        self.assertEqual([r['id'] for r in selected], ['b', 'a'])
+
+
+BOILERPLATE = "부칙 제1조(시행일) 이 규정은 공포한 날부터 시행한다. 제2조(경과조치) 이 규정 시행 당시 종전의 규정에 따라 처리한 사항은 이 규정에 따라 처리한 것으로 본다."
+
+
+class ChunkDeduplicatorTest(TestCase):
+    """MinHash/LSH 준중복 청크 판정 테스트"""
+
+    def test_lsh_bands(self):
+        """(밴드 수 × 행 수)가 서명 길이와 같고, 후보 확률 절반 지점이 임계값 이하"""
+        for threshold in (0.5, 0.8, 0.9):
+            bands, rows = lsh_bands(threshold, 128)
+            self.assertEqual(bands * rows, 128)
+            self.assertLessEqual((1 / bands) ** (1 / rows), threshold)
+        self.assertGreater(lsh_bands(0.9, 128)[1], lsh_bands(0.5, 128)[1])
+
+    def test_exact_and_near_duplicates(self):
+        """완전 중복/공백만 다른 중복/한 글자 다른 준중복은 대표 청크 참조, 다른 내용은 새 대표"""
+        dedup = ChunkDeduplicator(threshold=0.8)
+
+        self.assertIsNone(dedup.check(BOILERPLATE, 'a'))
+        self.assertEqual(dedup.check(BOILERPLATE, 'b'), 'a')
+        self.assertEqual(dedup.check("  " + BOILERPLATE.replace(" ", "  "), 'c'), 'a')
+        self.assertEqual(dedup.check(BOILERPLATE.replace("공포한", "공표한"), 'd'), 'a')
+        self.assertIsNone(dedup.check("제3조(목적) 이 규정은 여비 지급에 필요한 사항을 정함을 목적으로 한다.", 'e'))
+
+        stats = dedup.stats()
+        self.assertEqual((stats['chunks'], stats['kept'], stats['duplicates']), (5, 2, 3))
+
+    def test_scope_separates_documents(self):
+        """scope(도메인/카테고리 등)가 다르면 같은 내용이어도 중복으로 보지 않음"""
+        dedup = ChunkDeduplicator(threshold=0.8)
+
+        self.assertIsNone(dedup.check(BOILERPLATE, 'a', scope=('인사', '인사 규정')))
+        self.assertIsNone(dedup.check(BOILERPLATE, 'b', scope=('재무', '회계 규정')))
+        self.assertEqual(dedup.check(BOILERPLATE, 'c', scope=('재무', '회계 규정')), 'b')
+
+
+class DetachAlternatesTest(TestCase):
+    """중복 출처 정리 테스트 (문서 재인덱싱/삭제 시)"""
+
+    def test_removes_only_detached_documents(self):
+        """대표 청크에서 지운 문서의 출처만 빼고 alt_doc_ids/alt_count를 다시 계산"""
+        sources = [{'doc_id': 'a', 'file_name': 'a.pdf'}, {'doc_id': 'b', 'file_name': 'b.pdf'}]
+        client = mock.Mock()
+        client.scroll.return_value = ([SimpleNamespace(id='p1', payload={'alt_sources': sources})], None)
+
+        self.assertEqual(detach_alternates(client, 'test', ['a']), 1)
+
+        operation = client.batch_update_points.call_args.kwargs['update_operations'][0]
+        self.assertEqual(operation.set_payload.points, ['p1'])
+        self.assertEqual(operation.set_payload.payload, alternate_payload([sources[1]]))
+        self.assertEqual(operation.set_payload.payload['alt_doc_ids'], ['b'])
+
+
+QUESTIONS = [
+    {'question': '출장 여비는 어떻게 정산하나요?', 'expected': ['여비규정']},
+    {'question': '연차휴가는 며칠인가요?', 'expected': ['취업규칙']},
+]
+
+
+class ValidateCollectionTest(TestCase):
+    """새 버전 컬렉션 검증 테스트 (질문 세트 재현율)"""
+
+    def setUp(self):
+        self.client = mock.Mock()
+        self.embedder = mock.Mock()
+        self.embedder.encode.return_value = [[0.1], [0.2]]
+
+    def _validate(self, results, counts, live_name='live'):
+        """컬렉션별 검색 결과 파일명(질문 순서대로)으로 validate_collection 실행"""
+        calls = {name: iter(files) for name, files in results.items()}
+
+        def search(client, collection_name, vector, **kwargs):
+            return [SimpleNamespace(payload={'file_name': f}) for f in next(calls[collection_name])]
+
+        with mock.patch('chatbot.services.collection_versions.search_points', side_effect=search), \
+                mock.patch('chatbot.services.collection_versions._points_count', side_effect=lambda client, name: counts.get(name, 0)):
+            return validate_collection(self.client, 'new', self.embedder, live_name=live_name,
+                                       questions=QUESTIONS, min_recall=0.5)
+
+    def test_recall_drop_fails(self):
+        """점수는 충분해도 정답 문서를 놓치면 현재 컬렉션보다 재현율이 낮아 실패"""
+        report = self._validate(
+            {'new': [['여비규정_2024.pdf'], ['복무규정.pdf']],
+             'live': [['여비규정_2023.pdf'], ['취업규칙.pdf']]},
+            {'new': 100, 'live': 100},
+        )
+        self.assertFalse(report['ok'])
+        self.assertEqual((report['recall']['recall'], report['live_recall']['recall']), (0.5, 1.0))
+        self.assertEqual(report['recall']['misses'], ['연차휴가는 며칠인가요?'])
+
+    def test_equal_recall_passes(self):
+        """정답 접두어가 top-k 안에 있으면 적중 (중복 출처 포함)"""
+        report = self._validate(
+            {'new': [['여비규정_2024.pdf'], ['복무규정.pdf', '취업규칙.pdf']],
+             'live': [['여비규정_2023.pdf'], ['취업규칙.pdf']]},
+            {'new': 100, 'live': 100},
+        )
+        self.assertTrue(report['ok'], report['errors'])
+
+    def test_min_recall_without_live(self):
+        """현재 컬렉션이 없으면 최소 재현율로 검증"""
+        report = self._validate({'new': [['복무규정.pdf'], ['복무규정.pdf']]}, {'new': 100}, live_name=None)
+        self.assertFalse(report['ok'])
+        self.assertIsNone(report['live_recall'])
+
+
+class NamesDocumentTest(TestCase):
+    """2단계 검색 사용 여부 (질문이 문서를 이름으로 가리키는지) 테스트"""
+
+    def test_compound_document_names(self):
+        cases = [
+            ('출장규칙에서 숙박비 상한액은 얼마인가요?', True),
+            ('회계규정에서 정한 결산 절차는?', True),
+            ('정보보안지침 알려줘', True),
+            ('규정을 제정하거나 개정할 때 거쳐야 하는 절차는?', False),
+            ('관련 지침이 있나요?', False),
+            ('연차휴가는 며칠인가요?', False),
+        ]
+        for query, expected in cases:
+            with self.subTest(query=query):
+                self.assertEqual(names_document(query), expected)
+
+
+class MatcherTest(TestCase):
+    """Aho-Corasick 키워드 매처 테이블 테스트"""
+
+    def test_aho_corasick_overlapping_matches(self):
+        """겹치는/접미어 패턴을 모두 찾고, 같은 패턴의 여러 값과 대소문자 무시"""
+        automaton = AhoCorasick([
+            ('he', ('a', 'he', 1.0)), ('she', ('a', 'she', 1.0)),
+            ('his', ('a', 'his', 1.0)), ('hers', ('a', 'hers', 1.0)),
+            ('HIS', ('b', 'HIS', 2.0)), ('', ('a', 'empty', 1.0)),
+        ])
+        cases = [
+            ('ushers', [(1, 4, 'she'), (2, 4, 'he'), (2, 6, 'hers')]),
+            ('This', [(1, 4, 'his'), (1, 4, 'his')]),
+            ('xyz', []),
+            ('', []),
+        ]
+        for text, expected in cases:
+            with self.subTest(text=text):
+                matches = [(start, end, pattern) for start, end, pattern, _ in automaton.iter_matches(text)]
+                self.assertEqual(matches, expected)
+
+    def test_merge_contained(self):
+        """같은 카테고리·라벨의 긴 매칭 안의 짧은 매칭만 합치고, 가중치는 최댓값"""
+        outer = (0, 4, '정보보안', ('domain', '보안관리', 1.0))
+        inner = (2, 4, '보안', ('domain', '보안관리', 2.0))
+        other_label = (2, 4, '보안', ('domain', '정보화', 1.5))
+        overlap = (3, 6, '안관리', ('domain', '보안관리', 1.0))
+        cases = [
+            ([outer, inner], [('정보보안', 'domain', '보안관리', 2.0)]),
+            ([outer, other_label], [('정보보안', 'domain', '보안관리', 1.0), ('보안', 'domain', '정보화', 1.5)]),
+            ([outer, overlap], [('정보보안', 'domain', '보안관리', 1.0), ('안관리', 'domain', '보안관리', 1.0)]),
+            ([inner], [('보안', 'domain', '보안관리', 2.0)]),
+            ([], []),
+        ]
+        for matches, expected in cases:
+            with self.subTest(matches=[m[2] for m in matches]):
+                self.assertEqual(_merge_contained(matches), expected)
+
+    def test_match_text(self):
+        """포함된 키워드('운영규정' 안의 '규정', '정보보안' 안의 '보안')는 한 번만 집계"""
+        cases = [
+            ('정보보안 운영규정', {'domains': {'보안관리': 2.0}, 'doc_types': {'규정': 1}, 'recency': False}),
+            ('인사규정 최신 개정', {'domains': {'인사관리': 2.0}, 'doc_types': {'규정': 1}, 'recency': True}),
+            ('여비 지급 지침', {'domains': {}, 'doc_types': {'지침': 1}, 'recency': False}),
+            ('', {'domains': {}, 'doc_types': {}, 'recency': False}),
+        ]
+        for text, expected in cases:
+            with self.subTest(text=text):
+                m = match_text(text)
+                self.assertEqual({'domains': m.domains, 'doc_types': m.doc_types, 'recency': m.recency}, expected)
+
+        form = match_text('보안서약서 서식 주세요')
+        self.assertTrue(form.form_request)
+        self.assertTrue(form.is_form_related)
+        self.assertEqual(form.top_domain(), '보안관리')
+
+    def test_classify_filename(self):
+        """파일명 접두어로 문서 타입, 키워드로 도메인/서브도메인 (미확인 시 기본값)"""
+        cases = [
+            ('2_05_인사규정.pdf', {'domain': '인사관리', 'subdomain': '인사정책', 'document_type': '규정'}),
+            ('3_13_문서관리규칙.pdf', {'domain': '행정관리', 'subdomain': '문서관리', 'document_type': '규칙'}),
+            ('1_01_정관.pdf', {'domain': '일반', 'subdomain': '일반', 'document_type': '정관'}),
+            ('메모.pdf', {'domain': '일반', 'subdomain': '일반', 'document_type': '기타'}),
+        ]
+        for filename, expected in cases:
+            with self.subTest(filename=filename):
+                self.assertEqual(classify_filename(filename), expected)
@@ -8,7 +8,8 @@ from .views import (
     ChatHistoryView,
     ChatStatusView,
     ChatReportView,
-    FormDownloadView
+    FormDownloadView,
+    FormAutocompleteView
 )
 
 urlpatterns = [
@@ -20,4 +21,5 @@ urlpatterns = [
     path('<uuid:conversation_id>/status/', ChatStatusView.as_view(), name='chat-status'),
     path('<uuid:chat_id>/report/', ChatReportView.as_view(), name='chat-report'),
     path('form/download/', FormDownloadView.as_view(), name='form-download'),
+    path('form/autocomplete/', FormAutocompleteView.as_view(), name='form-autocomplete'),
 ]
\ No newline at end of file
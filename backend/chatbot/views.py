@@ -9,6 +9,8 @@ from .models import Conversation, ChatMessage, ChatReport
 from .serializers import ConversationSerializer, ChatMessageSerializer, ChatQuerySerializer, ChatReportSerializer
 from .services.rag_service import rag_answer
 from .services.pipeline import rag_answer_enhanced
+from .services.rag_search import autocomplete_forms
+from django.conf import settings
 from django.http import JsonResponse, HttpResponse
 import boto3
 import os
@@ -568,3 +570,34 @@ class FormDownloadView(generics.GenericAPIView):
                 'message': '파일 다운로드 중 오류가 발생했습니다.'
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+class FormAutocompleteView(generics.GenericAPIView):
+    """
+    채팅 입력창 서식 이름 자동완성 API (메모리 서식 카탈로그)
+    """
+    authentication_classes = []  # 인증 클래스 제외
+    permission_classes = [AllowAny]  # 개발 단계에서는 인증 우회
+
+    def get(self, request, *args, **kwargs):
+        """
+        입력 중인 문자열(q)로 시작하거나 비슷한 서식 목록 반환
+        """
+        prefix = request.query_params.get('q', '').strip()
+        if not prefix:
+            return Response({'success': True, 'query': prefix, 'results': []})
+
+        max_limit = getattr(settings, 'FORM_AUTOCOMPLETE_LIMIT', 8)
+        try:
+            limit = min(int(request.query_params.get('limit', max_limit)), max_limit)
+        except ValueError:
+            limit = max_limit
+
+        try:
+            results = autocomplete_forms(prefix, limit=max(limit, 1))
+        except Exception as e:
+            logger.error(f"서식 자동완성 오류: {e}")
+            return Response({
+                'success': False,
+                'message': '서식 자동완성 중 오류가 발생했습니다.'
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        return Response({'success': True, 'query': prefix, 'results': results})
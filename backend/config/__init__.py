@@ -1,5 +1,4 @@
-# Django 앱 시작 시 Celery 앱 로드
-# Celery 설정이 완료될 때까지 주석 처리
-# from .celery import app as celery_app
+# Django 앱 시작 시 Celery 앱 로드 (@shared_task가 이 앱의 브로커 설정을 사용하도록)
+from .celery import app as celery_app
 
-# __all__ = ('celery_app',)
+__all__ = ('celery_app',)
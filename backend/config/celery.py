@@ -1,7 +1,13 @@
 import os
 from celery import Celery
+from celery.signals import worker_init, worker_process_init
 from django.conf import settings
 
+from config.runtime import ROLE_CELERY, apply_thread_budget
+
+# 전체 문서 인덱싱 작업 큐
+INGESTION_QUEUE = os.getenv('CELERY_INGESTION_QUEUE', 'ingestion')
+
 # Django 설정 모듈 설정
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
@@ -41,6 +47,12 @@ app.conf.update(
     task_default_queue='default',
     task_default_exchange='default',
     task_default_routing_key='default',
+
+    # 전체 문서 인덱싱은 KoE5 임베딩을 하므로 OCR(default 큐)과 분리된 전용 워커에서 실행
+    #   celery -A config worker -Q ingestion --pool=solo  (RUNTIME_ROLE=indexer)
+    task_routes={
+        'qdrant.tasks.run_ingestion_job': {'queue': INGESTION_QUEUE},
+    },
     
     # Worker 설정
     worker_prefetch_multiplier=1,
@@ -55,6 +67,22 @@ app.conf.update(
     task_send_sent_event=True,
 )
 
+@worker_init.connect
+def _apply_worker_thread_env(sender=None, **kwargs):
+    """워커 메인 프로세스: 풀 프로세스 fork 전에 스레드 환경변수 설정"""
+    concurrency = getattr(sender, 'concurrency', None)
+    if concurrency:
+        # 풀 프로세스가 같은 동시 실행 수로 예산을 계산하도록 전달
+        os.environ.setdefault('CELERY_WORKER_CONCURRENCY', str(concurrency))
+    apply_thread_budget(os.getenv('RUNTIME_ROLE', ROLE_CELERY))
+
+
+@worker_process_init.connect
+def _apply_pool_thread_budget(**kwargs):
+    """풀 프로세스: OpenCV/torch 스레드 수 적용"""
+    apply_thread_budget(os.getenv('RUNTIME_ROLE', ROLE_CELERY))
+
+
 @app.task(bind=True)
 def debug_task(self):
     print(f'Request: {self.request!r}')
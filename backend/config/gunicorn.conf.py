@@ -0,0 +1,122 @@
+"""
+운영 서버 설정 (gunicorn + UvicornWorker)
+
+    gunicorn -c config/gunicorn.conf.py config.asgi:application
+
+- 워커 수: CPU/메모리(cgroup 제한 포함)로 계산, GUNICORN_WORKERS로 고정 가능
+- preload_app: 임베딩 모델/토크나이저를 마스터에서 로딩한 뒤 fork하여
+  워커들이 가중치 페이지를 copy-on-write로 공유 (워커를 늘려도 모델 크기만큼 RAM이 늘지 않음)
+- max_requests + jitter로 워커 주기적 재시작 (메모리 누수/단편화 방지)
+- 타임아웃은 nginx proxy_read_timeout(300s)에 맞춤
+"""
+
+import gc
+import os
+
+from config.runtime import ROLE_WEB, apply_thread_budget, available_cpus
+
+# 마스터에서는 가중치만 로딩하고, 추론 워밍업은 fork 이후 각 워커에서 수행
+# (fork 전에 torch/OpenMP 스레드 풀을 띄우면 자식 프로세스에서 멈출 수 있음)
+os.environ.setdefault("MODEL_WARMUP_ON_START", "true")
+os.environ.setdefault("MODEL_WARMUP_ENCODE", "false")
+
+
+def _memory_limit_mb() -> int:
+    """사용 가능한 메모리(MB) (cgroup memory.max 우선, 없으면 MemTotal)"""
+    total_mb = 0
+    try:
+        with open("/proc/meminfo", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("MemTotal:"):
+                    total_mb = int(line.split()[1]) // 1024
+                    break
+    except OSError:
+        pass
+
+    try:
+        with open("/sys/fs/cgroup/memory.max", encoding="utf-8") as f:
+            limit = f.read().strip()
+        if limit != "max":
+            limit_mb = int(limit) // (1024 * 1024)
+            total_mb = min(total_mb, limit_mb) if total_mb else limit_mb
+    except (OSError, ValueError):
+        pass
+    return total_mb
+
+
+def _default_workers() -> int:
+    """
+    워커 수 계산
+
+    LLM 호출 대기가 대부분이라 CPU당 2개까지 허용하되, 공유 모델(1회) +
+    워커별 개별 메모리가 전체 메모리의 80%를 넘지 않도록 제한합니다.
+    """
+    cpus = available_cpus()
+    by_cpu = cpus * 2
+
+    memory_mb = _memory_limit_mb()
+    if not memory_mb:
+        return max(1, by_cpu)
+
+    model_mb = int(os.getenv("GUNICORN_MODEL_MEMORY_MB", 2300))
+    worker_mb = int(os.getenv("GUNICORN_WORKER_MEMORY_MB", 400))
+    by_memory = int((memory_mb * 0.8 - model_mb) // worker_mb)
+    return max(1, min(by_cpu, by_memory))
+
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+worker_class = "uvicorn.workers.UvicornWorker"
+workers = int(os.getenv("GUNICORN_WORKERS", 0)) or _default_workers()
+
+# 워커 수 기준 스레드 예산: 마스터에서 torch import 전에 OMP/MKL 환경변수를 맞춰 두고
+# (asgi.py는 WEB_CONCURRENCY로 같은 예산을 계산), fork 후 post_fork에서 다시 적용
+os.environ["WEB_CONCURRENCY"] = str(workers)
+apply_thread_budget(ROLE_WEB, workers)
+
+# ONNX Runtime 세션은 fork 안전하지 않으므로 onnx 백엔드는 워커별로 로딩
+preload_app = os.getenv("EMBED_BACKEND", "torch").lower() != "onnx"
+
+# 워커 재시작 (동시에 재시작되지 않도록 jitter)
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", 1000))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", 100))
+
+# nginx proxy_read_timeout 300s 기준: nginx가 먼저 끊도록 조금 길게
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 310))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", 300))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", 5))
+
+accesslog = "-"
+errorlog = "-"
+loglevel = os.getenv("GUNICORN_LOG_LEVEL", "info")
+
+
+def when_ready(server):
+    """preload 완료 후(fork 전) 호출: 로딩된 객체를 GC 대상에서 제외해 CoW 공유 유지"""
+    gc.collect()
+    if hasattr(gc, "freeze"):
+        gc.freeze()
+    server.log.info(
+        f"gunicorn ready: workers={workers}, preload={preload_app}, "
+        f"torch_threads/worker={max(1, available_cpus() // workers)}, "
+        f"cpus={available_cpus()}, memory={_memory_limit_mb()}MB"
+    )
+
+
+def post_fork(server, worker):
+    """fork 직후 워커 프로세스에 스레드 예산 적용 (preload로 이미 import된 torch 포함)"""
+    budget = apply_thread_budget(ROLE_WEB, workers)
+    worker.log.info(
+        f"워커 스레드 예산: torch={budget['torch_threads']}, blas={budget['blas_threads']}, "
+        f"opencv={budget['opencv_threads']}"
+    )
+
+
+def post_worker_init(worker):
+    """워커 시작 후 추론 워밍업 (첫 요청 지연 제거)"""
+    if os.getenv("MODEL_WARMUP_ON_START", "true").lower() != "true":
+        return
+    try:
+        from chatbot.services.model_registry import warm_up
+        warm_up(encode=True)
+    except Exception as e:
+        worker.log.error(f"워커 워밍업 실패: {e}")
@@ -0,0 +1,185 @@
+"""
+CPU 스레드 예산 관리
+torch(KoE5), OpenCV(영수증 OCR 전처리), BLAS, ONNX Runtime이 각자 모든 코어를
+사용하려고 하면 부하 시 스레드가 과다 생성되어 지연시간이 급격히 나빠집니다.
+프로세스 역할별로 코어 수와 워커 수에 맞춰 스레드 수를 한 곳에서 정합니다.
+
+역할:
+    web      gunicorn/uvicorn 웹 워커 - 워커당 코어 몫만큼 torch/BLAS, OpenCV는 1
+    celery   Celery OCR 워커(default 큐) - 프로세스당 코어 몫만큼 OpenCV, torch/BLAS는 1
+    indexer  단독 인덱싱(embed_documents), Celery ingestion 큐 워커(RUNTIME_ROLE=indexer,
+             --pool=solo) - 코어 1/4은 PDF 파싱 프로세스, 나머지는 torch/BLAS
+
+OMP/MKL/OPENBLAS 환경변수는 해당 라이브러리가 처음 import될 때 읽히므로
+가능한 한 이른 시점(gunicorn 설정, asgi/wsgi, Celery worker_init)에 호출해야 합니다.
+사용자가 직접 지정한 환경변수는 덮어쓰지 않습니다.
+
+Django 설정에 의존하지 않으므로 gunicorn 설정 파일과 단독 스크립트에서도 사용할 수 있습니다.
+"""
+
+import logging
+import math
+import os
+import sys
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+ROLE_WEB = 'web'
+ROLE_CELERY = 'celery'
+ROLE_INDEXER = 'indexer'
+
+# 스레드 수를 제어하는 환경변수
+BLAS_ENV_VARS = ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'NUMEXPR_NUM_THREADS')
+
+# 모듈 import 시점에 사용자가 이미 지정한 환경변수 (덮어쓰지 않음)
+_USER_ENV = {
+    name for name in BLAS_ENV_VARS + ('EMBED_ONNX_THREADS', 'OPENCV_FOR_THREADS_NUM', 'TOKENIZERS_PARALLELISM')
+    if name in os.environ
+}
+
+_APPLIED_BUDGET: Optional[Dict[str, Any]] = None
+
+
+def available_cpus() -> int:
+    """사용 가능한 CPU 수 (affinity, cgroup cpu.max 반영)"""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+
+    try:
+        with open('/sys/fs/cgroup/cpu.max', encoding='utf-8') as f:
+            quota, period = f.read().split()
+        if quota != 'max':
+            cpus = min(cpus, max(1, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+
+def compute_thread_budget(role: str, workers: int = 1, cpus: Optional[int] = None) -> Dict[str, Any]:
+    """
+    역할별 스레드 예산 계산
+
+    Args:
+        role: web | celery | indexer
+        workers: 같은 노드에서 이 역할로 동시에 실행되는 프로세스 수
+        cpus: 사용 가능한 CPU 수 (기본값: 자동 감지)
+
+    Returns:
+        {'role', 'cpus', 'workers', 'torch_threads', 'torch_interop_threads',
+         'blas_threads', 'opencv_threads', 'onnx_threads', 'parse_workers'}
+    """
+    cpus = cpus or available_cpus()
+    workers = max(1, workers)
+    share = max(1, cpus // workers)
+
+    parse_workers = 0
+    if role == ROLE_INDEXER:
+        # PDF 파싱 프로세스와 임베딩이 코어를 나눠 쓰도록 (1코어면 순차 파싱)
+        parse_workers = cpus // 4 if cpus >= 4 else (1 if cpus > 1 else 0)
+        torch_threads = blas_threads = max(1, cpus - parse_workers)
+        opencv_threads = 1
+    elif role == ROLE_CELERY:
+        # OCR 전처리(OpenCV) 위주, 모델 추론은 하지 않음 (임베딩하는 인덱싱 작업은 indexer 역할 워커)
+        torch_threads, blas_threads, opencv_threads = 1, 1, share
+    else:
+        if role != ROLE_WEB:
+            logger.warning(f"알 수 없는 런타임 역할 '{role}', web 예산 사용")
+            role = ROLE_WEB
+        torch_threads, blas_threads, opencv_threads = share, share, 1
+
+    return {
+        'role': role,
+        'cpus': cpus,
+        'workers': workers,
+        'torch_threads': torch_threads,
+        'torch_interop_threads': 1,
+        'blas_threads': blas_threads,
+        'opencv_threads': opencv_threads,
+        'onnx_threads': torch_threads,
+        'parse_workers': parse_workers,
+    }
+
+
+def _set_env(name: str, value: Any) -> None:
+    """사용자가 지정하지 않은 환경변수만 설정"""
+    if name not in _USER_ENV:
+        os.environ[name] = str(value)
+
+
+def _apply_torch(budget: Dict[str, Any]) -> None:
+    """이미 import된 torch에 스레드 수 적용"""
+    torch = sys.modules.get('torch')
+    if torch is None:
+        # 아직 import 전이면 OMP/MKL 환경변수로 초기 스레드 수가 정해짐
+        return
+    torch.set_num_threads(budget['torch_threads'])
+    try:
+        torch.set_num_interop_threads(budget['torch_interop_threads'])
+    except RuntimeError:
+        # inter-op 풀은 병렬 작업 시작 전 한 번만 설정 가능 (fork 이전 설정이 유지됨)
+        pass
+
+
+def _apply_opencv(budget: Dict[str, Any]) -> None:
+    """이미 import된 OpenCV에 스레드 수 적용 (웹 워커에서 cv2를 불필요하게 import하지 않음)"""
+    cv2 = sys.modules.get('cv2')
+    if cv2 is None:
+        # import 전이면 OPENCV_FOR_THREADS_NUM 환경변수로 적용됨
+        return
+    cv2.setNumThreads(budget['opencv_threads'])
+
+
+def apply_thread_budget(role: Optional[str] = None, workers: Optional[int] = None) -> Dict[str, Any]:
+    """
+    현재 프로세스에 스레드 예산 적용
+
+    Args:
+        role: web | celery | indexer (기본값: RUNTIME_ROLE 환경변수 또는 web)
+        workers: 동시 프로세스 수 (기본값: web은 WEB_CONCURRENCY,
+            celery는 CELERY_WORKER_CONCURRENCY, indexer는 1)
+
+    Returns:
+        적용된 예산
+    """
+    global _APPLIED_BUDGET
+
+    role = role or os.getenv('RUNTIME_ROLE', ROLE_WEB)
+    if workers is None:
+        if role == ROLE_WEB:
+            workers = int(os.getenv('WEB_CONCURRENCY', 1))
+        elif role == ROLE_CELERY:
+            workers = int(os.getenv('CELERY_WORKER_CONCURRENCY', 0)) or available_cpus()
+        else:
+            workers = 1
+
+    budget = compute_thread_budget(role, workers)
+
+    for name in BLAS_ENV_VARS:
+        _set_env(name, budget['blas_threads'] if name != 'OMP_NUM_THREADS' else budget['torch_threads'])
+    _set_env('EMBED_ONNX_THREADS', budget['onnx_threads'])
+    _set_env('OPENCV_FOR_THREADS_NUM', budget['opencv_threads'])
+    # HF tokenizers의 자체 스레드 풀은 fork 후 경고/경합을 일으키므로 인덱서 외에는 끔
+    _set_env('TOKENIZERS_PARALLELISM', 'true' if budget['role'] == ROLE_INDEXER else 'false')
+
+    _apply_torch(budget)
+    _apply_opencv(budget)
+
+    budget['pid'] = os.getpid()
+    budget['env'] = {name: os.environ.get(name) for name in BLAS_ENV_VARS}
+    _APPLIED_BUDGET = budget
+    report_thread_budget()
+    return budget
+
+
+def report_thread_budget() -> None:
+    """적용된 스레드 예산을 로그로 보고 (로깅 설정 이후 다시 호출해도 됨)"""
+    if _APPLIED_BUDGET is not None:
+        logger.info(f"CPU 스레드 예산 적용: {_APPLIED_BUDGET}")
+
+
+def get_applied_budget() -> Optional[Dict[str, Any]]:
+    """현재 프로세스에 적용된 스레드 예산 (미적용 시 None)"""
+    return _APPLIED_BUDGET
@@ -119,6 +119,64 @@ QDRANT_COLLECTION_NAME = os.getenv('QDRANT_COLLECTION_NAME', 'regulations_final'
 QDRANT_VECTOR_SIZE = int(os.getenv('QDRANT_VECTOR_SIZE', 1024))
 RAG_TOP_K = int(os.getenv('RAG_TOP_K', 5))
 
+# Qdrant 스냅샷 배포 (qdrant_snapshot/qdrant_restore/qdrant_init)
+# 스냅샷 디렉토리는 Qdrant의 QDRANT__STORAGE__SNAPSHOTS_PATH와 같은 경로로 마운트
+QDRANT_SNAPSHOTS_DIR = os.getenv('QDRANT_SNAPSHOTS_DIR', '/qdrant/snapshots')
+QDRANT_SNAPSHOT_KEEP = int(os.getenv('QDRANT_SNAPSHOT_KEEP', 3))
+# 컬렉션이 없는 새 환경에서 시작할 때 설정/문서가 맞는 스냅샷을 복원
+QDRANT_RESTORE_ON_START = os.getenv('QDRANT_RESTORE_ON_START', 'true').lower() == 'true'
+# 스냅샷 문서 해시 비교 대상 (embed_documents.py의 PDF_DIR과 같은 디렉토리)
+PDF_DIR = os.getenv('PDF_DIR', '/app/documents/kisa_pdf')
+
+# RAG 검색 결과 캐시 (LRU + TTL, 컬렉션 버전 변경 시 무효화)
+RAG_CACHE_ENABLED = os.getenv('RAG_CACHE_ENABLED', 'true').lower() == 'true'
+RAG_CACHE_MAX_ENTRIES = int(os.getenv('RAG_CACHE_MAX_ENTRIES', 2048))
+RAG_CACHE_TTL_SECONDS = int(os.getenv('RAG_CACHE_TTL_SECONDS', 600))
+
+# 답변 컨텍스트 확장: 상위 청크의 앞뒤 인접 청크 수 (0이면 비활성)
+RAG_NEIGHBOR_WINDOW = int(os.getenv('RAG_NEIGHBOR_WINDOW', 1))
+
+# 답변 컨텍스트 MMR 다양화 (lambda: 1=관련도만, 0=다양성만)
+RAG_MMR_ENABLED = os.getenv('RAG_MMR_ENABLED', 'true').lower() == 'true'
+RAG_MMR_LAMBDA = float(os.getenv('RAG_MMR_LAMBDA', 0.7))
+RAG_MMR_CANDIDATES = int(os.getenv('RAG_MMR_CANDIDATES', 20))
+
+# 2단계 검색: 문서 요약/조문 머리말 포인트로 상위 M개 문서를 고른 뒤 그 문서의 청크만 검색
+# (질문이 '여비규정', '취업규칙'처럼 문서를 이름으로 가리킬 때만 사용)
+RAG_HIERARCHICAL_ENABLED = os.getenv('RAG_HIERARCHICAL_ENABLED', 'true').lower() == 'true'
+RAG_DOC_TOP_M = int(os.getenv('RAG_DOC_TOP_M', 5))
+RAG_DOC_CANDIDATES = int(os.getenv('RAG_DOC_CANDIDATES', 20))
+
+# 메모리 서식 카탈로그: 서식 이름 정확/근접 일치 요청은 벡터 검색 없이 응답, 입력창 자동완성
+RAG_FORM_CATALOG_ENABLED = os.getenv('RAG_FORM_CATALOG_ENABLED', 'true').lower() == 'true'
+RAG_FORM_CATALOG_MIN_SCORE = float(os.getenv('RAG_FORM_CATALOG_MIN_SCORE', 0.75))
+FORM_AUTOCOMPLETE_LIMIT = int(os.getenv('FORM_AUTOCOMPLETE_LIMIT', 8))
+
+# 임베딩 센트로이드 도메인 라우터 (build_domain_centroids로 센트로이드 생성 필요)
+DOMAIN_ROUTER_ENABLED = os.getenv('DOMAIN_ROUTER_ENABLED', 'true').lower() == 'true'
+# confident 임계값: 비워 두면 `build_domain_centroids --calibrate`가 retrieval_questions.json의
+# 라우팅 점수 분포로 고른 값(센트로이드 파일의 calibration)을 사용하고, 보정값이 없으면
+# 라우팅을 confident로 보지 않음. e5 계열 코사인은 무관한 문장끼리도 높아 고정값(0.3 등)은 무의미
+DOMAIN_ROUTER_MIN_SCORE = float(os.environ['DOMAIN_ROUTER_MIN_SCORE']) if os.getenv('DOMAIN_ROUTER_MIN_SCORE') else None
+DOMAIN_ROUTER_MIN_MARGIN = float(os.environ['DOMAIN_ROUTER_MIN_MARGIN']) if os.getenv('DOMAIN_ROUTER_MIN_MARGIN') else None
+
+# 질의 임베딩 마이크로 배칭 (동시 요청을 모아 한 배치로 인코딩)
+EMBED_MICRO_BATCHING = os.getenv('EMBED_MICRO_BATCHING', 'true').lower() == 'true'
+EMBED_BATCH_MAX_SIZE = int(os.getenv('EMBED_BATCH_MAX_SIZE', 32))
+EMBED_BATCH_MAX_WAIT_MS = float(os.getenv('EMBED_BATCH_MAX_WAIT_MS', 5))
+
+# 모델 레지스트리: 서버 시작 시 워밍업 여부, 모델을 로딩하지 않는 관리 명령
+MODEL_WARMUP_ON_START = os.getenv('MODEL_WARMUP_ON_START', 'false').lower() == 'true'
+# false면 가중치만 로딩 (gunicorn preload 마스터에서 fork 전 추론 스레드 생성 방지)
+MODEL_WARMUP_ENCODE = os.getenv('MODEL_WARMUP_ENCODE', 'true').lower() == 'true'
+MODEL_FREE_COMMANDS = [
+    cmd.strip() for cmd in os.getenv(
+        'MODEL_FREE_COMMANDS',
+        'migrate,makemigrations,collectstatic,check,createsuperuser,showmigrations,'
+        'sqlmigrate,qdrant_init,qdrant_snapshot,qdrant_restore,build_domain_centroids'
+    ).split(',') if cmd.strip()
+]
+
 # S3 버킷 설정
 AWS_ACCESS_KEY_ID = os.getenv('AWS_ACCESS_KEY_ID')
 AWS_SECRET_ACCESS_KEY = os.getenv('AWS_SECRET_ACCESS_KEY')
@@ -137,6 +195,18 @@ AWS_STORAGE_BUCKET_NAME = os.getenv('AWS_STORAGE_BUCKET_NAME', AWS_S3_BUCKET_NAM
 # OpenAI 설정
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY', '')
 
+# 문서 카테고리 LLM 분류 (QdrantService): 여러 문서를 한 요청으로 분류하고 결과는 내용 해시로 캐시
+# CATEGORY_LLM_BASE_URL을 지정하면 OpenAI 호환 엔드포인트(로컬 스텁 등)로 요청
+CATEGORY_LLM_MODEL = os.getenv('CATEGORY_LLM_MODEL', 'gpt-4o')
+CATEGORY_LLM_BASE_URL = os.getenv('CATEGORY_LLM_BASE_URL', '')
+CATEGORY_LLM_BATCH_SIZE = int(os.getenv('CATEGORY_LLM_BATCH_SIZE', 10))
+
+# 전체 문서 인덱싱 백그라운드 작업 (qdrant.tasks): 한 태스크가 처리할 문서 수
+# 태스크를 짧게 나누어 워커 재시작/브로커 가시성 타임아웃에도 완료된 문서는 다시 처리하지 않음
+INGEST_JOB_CHUNK_DOCS = int(os.getenv('INGEST_JOB_CHUNK_DOCS', 8))
+# 이 시간(초) 동안 진행 기록이 없는 대기/실행 중 작업은 멈춘 것으로 보고 재개 허용
+INGEST_JOB_STALE_SECONDS = int(os.getenv('INGEST_JOB_STALE_SECONDS', 1800))
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',},
@@ -145,9 +215,9 @@ AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',},
 ]
 
-# Password hashers - Argon2 우선
+# Password hashers - Argon2 우선 (ARGON2_DEFAULT_* 설정을 적용하는 해셔)
 PASSWORD_HASHERS = [
-    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'authapp.hashers.BudgetedArgon2PasswordHasher',
     'django.contrib.auth.hashers.PBKDF2PasswordHasher',
     'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
     'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
@@ -155,7 +225,8 @@ PASSWORD_HASHERS = [
 ]
 ARGON2_DEFAULT_MEMORY_COST = 102400  # 100MB
 ARGON2_DEFAULT_TIME_COST = 2
-ARGON2_DEFAULT_PARALLELISM = 8
+# 해시 1건이 웹 워커의 스레드 예산을 넘지 않도록 (config/runtime.py)
+ARGON2_DEFAULT_PARALLELISM = int(os.getenv('ARGON2_PARALLELISM', 2))
 
 # i18n
 LANGUAGE_CODE = 'ko-kr'
@@ -1,5 +1,18 @@
 import os
-from django.core.wsgi import get_wsgi_application
+
+from config.runtime import apply_thread_budget, report_thread_budget
+
+# torch/numpy/OpenCV가 import되기 전에 스레드 예산(OMP/MKL 환경변수 등) 적용
+apply_thread_budget()
+
+from django.core.wsgi import get_wsgi_application  # noqa: E402
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 application = get_wsgi_application()
+
+# Django 로깅 설정 이후 적용된 예산 보고
+report_thread_budget()
+
+# 서버 시작 시 임베딩 모델 워밍업 (MODEL_WARMUP_ON_START)
+from chatbot.services.model_registry import warm_up_if_enabled  # noqa: E402
+warm_up_if_enabled()
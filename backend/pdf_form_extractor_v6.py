@@ -1,10 +1,11 @@
 import os
 import re
-import pdfplumber
 from PyPDF2 import PdfReader, PdfWriter
 from pathlib import Path
 import logging
 
+from chatbot.services.page_text_cache import load_pages, warm_page_cache
+
 # 로깅 설정
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -133,18 +134,18 @@ class PDFFormExtractorV6:
         return form_title
     
     def find_all_form_pages(self, pdf_path):
-        """PDF에서 모든 서식 페이지를 찾습니다."""
+        """PDF에서 모든 서식 페이지를 찾습니다. (페이지 텍스트 캐시 사용)
+
+        Returns:
+            [(페이지 인덱스, 페이지 텍스트)]
+        """
         try:
-            with pdfplumber.open(pdf_path) as pdf:
-                form_pages = []
-                
-                for page_num, page in enumerate(pdf.pages):
-                    text = page.extract_text()
-                    
-                    if self.is_form_page(text):
-                        form_pages.append(page_num)
-                
-                return form_pages
+            form_pages = []
+            for page in load_pages(pdf_path):
+                text = page['text']
+                if self.is_form_page(text):
+                    form_pages.append((page['page_no'] - 1, text))
+            return form_pages
         except Exception as e:
             logger.error(f"서식 페이지 찾기 실패: {str(e)}")
             return []
@@ -155,28 +156,25 @@ class PDFFormExtractorV6:
         logger.info(f"처리 중: {pdf_name}")
         
         try:
-            # 모든 서식 페이지 찾기
+            # 모든 서식 페이지 찾기 (텍스트는 캐시에서 한 번만 가져옴)
             form_pages = self.find_all_form_pages(pdf_path)
             
             if not form_pages:
                 logger.warning(f"  {pdf_name}: 서식 페이지를 찾을 수 없습니다.")
                 return
             
-            logger.info(f"  발견된 서식 페이지: {[p+1 for p in form_pages]}")
+            logger.info(f"  발견된 서식 페이지: {[p+1 for p, _ in form_pages]}")
             
             # PyPDF2로 페이지 분할
             pdf_reader = PdfReader(pdf_path)
             
             # 각 서식 페이지를 개별 파일로 저장
-            for page_num in form_pages:
+            for page_num, text in form_pages:
                 if page_num >= len(pdf_reader.pages):
                     continue
                 
                 # 서식 제목 추출
-                with pdfplumber.open(pdf_path) as pdf:
-                    form_page = pdf.pages[page_num]
-                    text = form_page.extract_text()
-                    form_title = self.extract_form_title(text)
+                form_title = self.extract_form_title(text)
                 
                 # 개별 PDF 생성
                 pdf_writer = PdfWriter()
@@ -210,6 +208,12 @@ class PDFFormExtractorV6:
         
         logger.info(f"총 {len(pdf_files)}개의 PDF 파일을 처리합니다.")
         
+        # 페이지 텍스트 추출은 프로세스 풀에서 파일 단위로 병렬 처리 (이미 추출한 PDF는 사이드카 사용)
+        warmed = warm_page_cache(pdf_files)
+        logger.info(f"페이지 텍스트: 새로 추출 {warmed['extracted']}개, 캐시 사용 {warmed['cached']}개")
+        for name, error in warmed['failed'].items():
+            logger.error(f"페이지 텍스트 추출 실패 {name}: {error}")
+        
         processed_count = 0
         for pdf_file in pdf_files:
             try:
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import DocumentVector
+from .models import CategoryClassification, DocumentVector, IngestionJob, IngestionJobDocument
 
 
 @admin.register(DocumentVector)
@@ -25,3 +25,31 @@ class DocumentVectorAdmin(admin.ModelAdmin):
     )
     
     list_per_page = 50
+
+
+@admin.register(CategoryClassification)
+class CategoryClassificationAdmin(admin.ModelAdmin):
+    """CategoryClassification 모델 관리자 (잘못 분류된 항목은 삭제하면 다음 추가 때 다시 분류)"""
+    list_display = ('document_name', 'category', 'classifier', 'content_sha256', 'created_at')
+    list_filter = ('category', 'classifier')
+    search_fields = ('document_name', 'content_sha256')
+    readonly_fields = ('created_at',)
+
+
+class IngestionJobDocumentInline(admin.TabularInline):
+    """작업의 문서별 체크포인트"""
+    model = IngestionJobDocument
+    fields = ('document_name', 'status', 'error_message', 'finished_at')
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+
+
+@admin.register(IngestionJob)
+class IngestionJobAdmin(admin.ModelAdmin):
+    """IngestionJob 모델 관리자"""
+    list_display = ('job_id', 'status', 'processed', 'failed', 'total', 'created_at', 'finished_at')
+    list_filter = ('status', 'created_at')
+    readonly_fields = ('job_id', 'created_at', 'updated_at', 'started_at', 'finished_at')
+    ordering = ('-created_at',)
+    inlines = [IngestionJobDocumentInline]
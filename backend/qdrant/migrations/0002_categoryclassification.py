@@ -0,0 +1,33 @@
+# Generated by Django 4.2.23 on 2026-10-18 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('qdrant', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryClassification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_sha256', models.CharField(max_length=64, verbose_name='내용 해시')),
+                ('classifier', models.CharField(max_length=100, verbose_name='분류기 (모델:프롬프트 버전)')),
+                ('category', models.CharField(max_length=100, verbose_name='카테고리')),
+                ('document_name', models.CharField(blank=True, max_length=255, verbose_name='문서명')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='생성일')),
+            ],
+            options={
+                'verbose_name': '카테고리 분류 캐시',
+                'verbose_name_plural': '카테고리 분류 캐시',
+                'db_table': 'category_classifications',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='categoryclassification',
+            constraint=models.UniqueConstraint(fields=('content_sha256', 'classifier'), name='uniq_category_content_classifier'),
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 4.2.23 on 2026-10-18 11:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('qdrant', '0002_categoryclassification'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IngestionJob',
+            fields=[
+                ('job_id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('source_dir', models.CharField(max_length=500, verbose_name='문서 폴더')),
+                ('batch_size', models.PositiveIntegerField(default=100, verbose_name='업서트 배치 크기')),
+                ('status', models.CharField(choices=[('QUEUED', 'Queued'), ('RUNNING', 'Running'), ('DONE', 'Done'), ('FAILED', 'Failed')], default='QUEUED', max_length=20)),
+                ('total', models.PositiveIntegerField(default=0, verbose_name='전체 문서 수')),
+                ('processed', models.PositiveIntegerField(default=0, verbose_name='완료 문서 수')),
+                ('failed', models.PositiveIntegerField(default=0, verbose_name='실패 문서 수')),
+                ('error_message', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'ingestion_jobs',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='IngestionJobDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('document_name', models.CharField(max_length=255)),
+                ('pdf_path', models.CharField(max_length=500)),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('RUNNING', 'Running'), ('DONE', 'Done'), ('FAILED', 'Failed')], default='PENDING', max_length=20)),
+                ('error_message', models.TextField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='documents', to='qdrant.ingestionjob')),
+            ],
+            options={
+                'db_table': 'ingestion_job_documents',
+                'ordering': ['id'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='ingestionjobdocument',
+            constraint=models.UniqueConstraint(fields=('job', 'pdf_path'), name='uniq_ingestion_job_document'),
+        ),
+    ]
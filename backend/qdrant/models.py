@@ -1,4 +1,5 @@
 from django.db import models
+import uuid
 
 
 class DocumentVector(models.Model):
@@ -26,3 +27,84 @@ class DocumentVector(models.Model):
         
     def __str__(self):
         return f"{self.document_name} - {self.category} ({self.vector_id})"
+
+
+class CategoryClassification(models.Model):
+    """문서 내용 해시별 LLM 카테고리 분류 결과 (같은 파일을 다시 추가할 때 재사용)"""
+
+    content_sha256 = models.CharField(max_length=64, verbose_name="내용 해시")
+    classifier = models.CharField(max_length=100, verbose_name="분류기 (모델:프롬프트 버전)")
+    category = models.CharField(max_length=100, verbose_name="카테고리")
+    document_name = models.CharField(max_length=255, verbose_name="문서명", blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="생성일")
+
+    class Meta:
+        db_table = 'category_classifications'
+        verbose_name = "카테고리 분류 캐시"
+        verbose_name_plural = "카테고리 분류 캐시"
+        constraints = [
+            models.UniqueConstraint(fields=['content_sha256', 'classifier'], name='uniq_category_content_classifier'),
+        ]
+
+    def __str__(self):
+        return f"{self.document_name} - {self.category} ({self.content_sha256[:12]})"
+
+
+class IngestionJob(models.Model):
+    """폴더 전체 문서 인덱싱 백그라운드 작업 (Celery)"""
+
+    class Status(models.TextChoices):
+        QUEUED = 'QUEUED', 'Queued'
+        RUNNING = 'RUNNING', 'Running'
+        DONE = 'DONE', 'Done'
+        FAILED = 'FAILED', 'Failed'
+
+    job_id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    source_dir = models.CharField(max_length=500, verbose_name="문서 폴더")
+    batch_size = models.PositiveIntegerField(default=100, verbose_name="업서트 배치 크기")
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.QUEUED)
+    total = models.PositiveIntegerField(default=0, verbose_name="전체 문서 수")
+    processed = models.PositiveIntegerField(default=0, verbose_name="완료 문서 수")
+    failed = models.PositiveIntegerField(default=0, verbose_name="실패 문서 수")
+    error_message = models.TextField(blank=True, null=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    # 재개할 때마다 갱신 (ETA는 이번 실행의 처리 속도로 계산)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        db_table = 'ingestion_jobs'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.job_id} ({self.status} {self.processed + self.failed}/{self.total})"
+
+
+class IngestionJobDocument(models.Model):
+    """인덱싱 작업의 문서별 체크포인트 (재개 시 DONE 문서는 건너뜀)"""
+
+    class Status(models.TextChoices):
+        PENDING = 'PENDING', 'Pending'
+        RUNNING = 'RUNNING', 'Running'
+        DONE = 'DONE', 'Done'
+        FAILED = 'FAILED', 'Failed'
+
+    job = models.ForeignKey(IngestionJob, on_delete=models.CASCADE, related_name='documents')
+    document_name = models.CharField(max_length=255)
+    pdf_path = models.CharField(max_length=500)
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
+    error_message = models.TextField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        db_table = 'ingestion_job_documents'
+        ordering = ['id']
+        constraints = [
+            models.UniqueConstraint(fields=['job', 'pdf_path'], name='uniq_ingestion_job_document'),
+        ]
+
+    def __str__(self):
+        return f"{self.document_name} ({self.status})"
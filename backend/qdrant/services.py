@@ -1,22 +1,79 @@
-import os
+import functools
+import json
 import re
-import uuid
-from typing import List, Dict, Any
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 from pathlib import Path
-from tqdm import tqdm
 
 from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams, PointStruct
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_community.embeddings import HuggingFaceEmbeddings
 from langchain_community.chat_models import ChatOpenAI
-from langchain.prompts import PromptTemplate
-import pypdf
 import logging
 from django.conf import settings
+from chatbot.services.search_cache import invalidate_collection
+from chatbot.services.collection_versions import current_target
+from chatbot.services.doc_retrieval import exclude_doc_level
+from chatbot.services.vector_projection import search_points
+from chatbot.services.model_registry import get_embedder
+from chatbot.services.document_parsing import clean_page_text, read_pdf_by_page
+from chatbot.services.index_manifest import file_sha256
+from chatbot.services.ingestion import (
+    IngestionEngine, classify_document, create_collection, normalize_payload,
+)
+from .models import CategoryClassification
 
 logger = logging.getLogger(__name__)
 
+# 분류 프롬프트나 카테고리 목록을 바꾸면 올려서 캐시된 분류를 무효화
+CATEGORY_PROMPT_VERSION = 2
+
+# 문서당 LLM에 보내는 본문 길이
+CATEGORY_TEXT_LIMIT = 1000
+
+CATEGORY_BATCH_PROMPT = """다음은 회사 규정 문서 {count}개의 앞부분입니다.
+각 문서가 아래 카테고리 중 어디에 해당하는지 분류하세요.
+
+{categories}
+
+{documents}
+
+문서 순서대로 카테고리 이름만 담은 JSON 배열 하나로만 답하세요.
+예: ["보안 규정", "여비 규정"]"""
+
+
+def read_head_text(pdf_path: Path, limit: int = CATEGORY_TEXT_LIMIT) -> str:
+    """분류용 본문 앞부분 (머리말 제거 후 limit자까지, 페이지 텍스트 캐시 사용)"""
+    raw = ""
+    text = ""
+    for _, page_text in read_pdf_by_page(pdf_path):
+        raw += page_text + "\n"
+        text = clean_page_text(raw)
+        if len(text) >= limit:
+            break
+    return text[:limit]
+
+
+def parse_category_response(response: str, count: int, categories: Iterable[str]) -> List[Optional[str]]:
+    """
+    배치 분류 응답(JSON 배열) 파싱
+
+    Args:
+        response: LLM 응답
+        count: 요청한 문서 수
+        categories: 허용 카테고리
+
+    Returns:
+        문서 순서대로 카테고리 (목록에 없는 값은 '기타', 응답 형식이 어긋나면 모두 None)
+    """
+    match = re.search(r"\[.*\]", response or "", re.DOTALL)
+    try:
+        values = json.loads(match.group(0)) if match else None
+    except ValueError:
+        values = None
+    if not isinstance(values, list) or len(values) != count:
+        logger.warning(f"카테고리 배치 응답 형식 오류 ({count}건 요청): {str(response)[:200]}")
+        return [None] * count
+    allowed = set(categories)
+    return [value.strip() if isinstance(value, str) and value.strip() in allowed else "기타" for value in values]
+
 
 class QdrantService:
     """Qdrant 벡터 데이터베이스 서비스 (고도화 버전)"""
@@ -28,10 +85,8 @@ class QdrantService:
         self.collection_name = getattr(settings, 'QDRANT_COLLECTION_NAME', 'kisa_documents')
         self.vector_size = getattr(settings, 'QDRANT_VECTOR_SIZE', 1024)  # KoE5 모델용
         
-        # 클라이언트 및 모델 초기화
+        # 클라이언트 초기화 (임베딩 모델은 처음 사용할 때 공유 레지스트리에서 가져옴)
         self.client = QdrantClient(host=self.host, port=self.port)
-        self.embedding_model = HuggingFaceEmbeddings(model_name="nlpai-lab/KoE5")
-        self.text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
         
         # 카테고리 키워드 정의
         self.category_keywords = {
@@ -47,163 +102,210 @@ class QdrantService:
             "회계팀 업무 가이드": ["회계팀", "세무", "회계업무"]
         }
         
-        # 카테고리 분류 프롬프트
-        self.category_prompt = PromptTemplate.from_template(
-            """다음 텍스트는 회사 규정 문서의 일부입니다.
-이 문서는 아래 카테고리 중 어디에 해당하나요?
-
-- 보안 규정
-- 복리후생 규정
-- 복무 규정
-- 안전보건관리 규정
-- 여비 규정
-- 인사 규정
-- 인사팀 업무 가이드
-- 전산팀 업무 가이드
-- 회계 규정
-- 회계팀 업무 가이드
-
-텍스트:
-{text}
-
-가장 관련 있는 카테고리 하나만 선택해서 정확히 출력하세요."""
-        )
-        
-        # OpenAI LLM (카테고리 분류용)
-        self.llm = ChatOpenAI(model="gpt-4o", temperature=0.0)
-        
+        # 카테고리 LLM 분류 (처음 필요할 때 생성, CATEGORY_LLM_BASE_URL로 스텁 엔드포인트 지정 가능)
+        self.llm_model = getattr(settings, 'CATEGORY_LLM_MODEL', 'gpt-4o')
+        self.llm_base_url = getattr(settings, 'CATEGORY_LLM_BASE_URL', '')
+        self.llm_batch_size = max(1, getattr(settings, 'CATEGORY_LLM_BATCH_SIZE', 10))
+        self._llm = None
+        self.llm_calls = 0
+
+    @property
+    def llm(self):
+        """카테고리 분류용 LLM (목록/검색 API에서는 생성하지 않음)"""
+        if self._llm is None:
+            kwargs = {'model': self.llm_model, 'temperature': 0.0}
+            if self.llm_base_url:
+                kwargs['openai_api_base'] = self.llm_base_url
+            self._llm = ChatOpenAI(**kwargs)
+        return self._llm
+
+    @property
+    def classifier_id(self) -> str:
+        """분류 캐시 키에 들어가는 분류기 식별자 (모델이나 프롬프트/카테고리가 바뀌면 다시 분류)"""
+        return f"{self.llm_model}:v{CATEGORY_PROMPT_VERSION}"
+
+    @property
+    def embedding_model(self):
+        """프로세스 공유 임베딩 모델 (목록/삭제 API에서는 로딩하지 않음)"""
+        return get_embedder()
+
     def create_collection(self):
         """컬렉션 생성"""
         try:
-            self.client.create_collection(
-                collection_name=self.collection_name,
-                vectors_config=VectorParams(
-                    size=self.vector_size,
-                    distance=Distance.COSINE
-                )
-            )
+            # 인덱싱 엔진과 같은 payload 인덱스로 생성
+            if not create_collection(self.client, self.collection_name, self.vector_size):
+                logger.info(f"컬렉션 '{self.collection_name}'이 이미 존재합니다")
+                return False
             logger.info(f"컬렉션 '{self.collection_name}' 생성 완료")
             return True
         except Exception as e:
             logger.warning(f"컬렉션 생성 실패 (이미 존재할 수 있음): {e}")
             return False
     
-    def extract_text_from_pdf(self, pdf_path: str) -> str:
-        """PDF에서 텍스트 추출"""
-        try:
-            with open(pdf_path, 'rb') as file:
-                pdf_reader = pypdf.PdfReader(file)
-                text = ""
-                for page in pdf_reader.pages:
-                    text += page.extract_text() + "\n"
-                return text
-        except Exception as e:
-            logger.error(f"PDF 텍스트 추출 실패: {e}")
-            return ""
-    
-    def strip_header(self, text: str) -> str:
-        """문서 헤더 제거 (제1장, 제1조 등)"""
-        match = re.search(r"제\s*\d+\s*[장|조]", text)
-        return text[match.start():] if match else text
-    
-    def extract_category(self, filename: str, content: str) -> str:
-        """파일명과 내용을 기반으로 카테고리 추출"""
-        # 파일명 기반 카테고리 추출
+    def category_from_filename(self, filename: str) -> Optional[str]:
+        """파일명 키워드 기반 카테고리 (없으면 None)"""
         for cat, keywords in self.category_keywords.items():
             if any(kw in filename for kw in keywords):
                 return cat
-        
-        # 내용 기반 카테고리 추출 (LLM 사용)
+        return None
+
+    def _classify_batch(self, texts: List[str]) -> List[Optional[str]]:
+        """여러 문서를 한 번의 LLM 요청으로 분류 (실패하면 모두 None)"""
+        documents = "\n\n".join(f"[문서 {i}]\n{text}" for i, text in enumerate(texts, start=1))
+        prompt = CATEGORY_BATCH_PROMPT.format(
+            count=len(texts),
+            categories="\n".join(f"- {cat}" for cat in self.category_keywords),
+            documents=documents,
+        )
         try:
-            response = self.llm.invoke(
-                self.category_prompt.format(text=content[:1000])
-            ).content.strip()
-            
-            if response in self.category_keywords.keys():
-                return response
+            self.llm_calls += 1
+            response = self.llm.invoke(prompt).content
         except Exception as e:
             logger.warning(f"LLM 카테고리 분류 실패: {e}")
-        
-        return "기타"
-    
-    def extract_register_date(self, filename: str) -> str:
-        """파일명에서 등록일 추출 (예: (240715))"""
-        match = re.search(r"\((\d{6})\)", filename)
-        return match.group(1) if match else "unknown"
-    
-    def add_document(self, pdf_path: str, document_name: str, batch_size: int = 100) -> bool:
-        """문서를 벡터화하여 Qdrant에 추가 (배치 처리)"""
-        try:
-            # PDF 텍스트 추출
-            text = self.extract_text_from_pdf(pdf_path)
-            if not text:
-                return False
-            
-            # 헤더 제거
-            main_text = self.strip_header(text)
-            
-            # 카테고리 및 메타데이터 추출
-            category = self.extract_category(document_name, main_text)
-            register_date = self.extract_register_date(document_name)
-            doc_title = document_name.replace(".pdf", "")
-            
-            # 텍스트 청킹
-            chunks = self.text_splitter.split_text(main_text)
-            
-            # 배치 처리
-            points = []
-            for i, chunk in enumerate(chunks):
+            return [None] * len(texts)
+        return parse_category_response(response, len(texts), self.category_keywords.keys())
+
+    def classify_documents(self, documents: List[Tuple[Path, str]]) -> Dict[str, str]:
+        """
+        문서 카테고리 분류
+
+        파일명 키워드로 정해지지 않는 문서만 내용 해시(sha256)로 분류 캐시를 조회하고,
+        캐시에 없는 문서는 CATEGORY_LLM_BATCH_SIZE개씩 묶어 한 요청으로 LLM에 분류를 맡깁니다.
+        변경 없는 문서를 다시 추가하면 LLM을 호출하지 않습니다.
+
+        Args:
+            documents: (PDF 경로, 파일명) 리스트
+
+        Returns:
+            파일명 → 카테고리 (분류 실패/읽기 실패 시 '기타', 실패 결과는 캐시하지 않음)
+        """
+        categories: Dict[str, str] = {}
+        pending: List[Tuple[Path, str, str]] = []
+        for path, file_name in documents:
+            category = self.category_from_filename(file_name)
+            if category:
+                categories[file_name] = category
+                continue
+            try:
+                pending.append((path, file_name, file_sha256(path)))
+            except OSError as e:
+                # 읽을 수 없는 파일은 인덱싱 엔진의 문서별 실패 처리에 맡김
+                logger.warning(f"카테고리 분류용 해시 실패 ({file_name}): {e}")
+                categories[file_name] = "기타"
+        if not pending:
+            return categories
+
+        classifier = self.classifier_id
+        cached = dict(
+            CategoryClassification.objects.filter(
+                classifier=classifier, content_sha256__in={sha for _, _, sha in pending}
+            ).values_list('content_sha256', 'category')
+        )
+
+        # 캐시에 없는 내용만 분류 (같은 내용의 파일은 한 번만)
+        misses: Dict[str, Tuple[Path, str]] = {}
+        for path, file_name, sha in pending:
+            if sha not in cached:
+                misses.setdefault(sha, (path, file_name))
+        calls_before = self.llm_calls
+        items = list(misses.items())
+        for start in range(0, len(items), self.llm_batch_size):
+            batch = []
+            texts = []
+            for sha, (path, file_name) in items[start:start + self.llm_batch_size]:
                 try:
-                    # 텍스트 임베딩
-                    embedding = self.embedding_model.embed_query(chunk)
-                    
-                    # 포인트 생성
-                    point = PointStruct(
-                        id=str(uuid.uuid4()),
-                        vector=embedding,
-                        payload={
-                            "text": chunk,
-                            "document_name": document_name,
-                            "chunk_index": i,
-                            "pdf_path": pdf_path,
-                            "category": category,
-                            "register_date": register_date,
-                            "doc_title": doc_title
-                        }
-                    )
-                    points.append(point)
-                    
-                    # 배치 크기에 도달하면 업로드
-                    if len(points) >= batch_size:
-                        self.client.upsert(
-                            collection_name=self.collection_name,
-                            points=points
-                        )
-                        points = []
-                        
+                    texts.append(read_head_text(path))
                 except Exception as e:
-                    logger.error(f"청크 {i} 처리 실패: {e}")
+                    # 암호화/손상 PDF 한 건 때문에 배치 전체가 실패하지 않도록 그 문서만 '기타'
+                    logger.warning(f"카테고리 분류용 본문 읽기 실패 ({file_name}): {e}")
                     continue
-            
-            # 남은 포인트 처리
-            if points:
-                self.client.upsert(
-                    collection_name=self.collection_name,
-                    points=points
+                batch.append((sha, (path, file_name)))
+            if not batch:
+                continue
+            results = self._classify_batch(texts)
+            classified = [
+                CategoryClassification(
+                    content_sha256=sha, classifier=classifier, category=category, document_name=file_name,
                 )
-            
-            logger.info(f"문서 '{document_name}' 추가 완료 ({len(chunks)}개 청크, 카테고리: {category})")
-            return True
-            
+                for (sha, (_, file_name)), category in zip(batch, results) if category
+            ]
+            CategoryClassification.objects.bulk_create(classified, ignore_conflicts=True)
+            cached.update({row.content_sha256: row.category for row in classified})
+
+        for _, file_name, sha in pending:
+            categories[file_name] = cached.get(sha, "기타")
+        logger.info(
+            f"카테고리 분류: {len(documents)}개 문서 (파일명 {len(documents) - len(pending)}, "
+            f"캐시 {len(pending) - len(misses)}, LLM {len(misses)}건/{self.llm_calls - calls_before}회 호출)"
+        )
+        return categories
+
+    def _classify(self, categories: Dict[str, str], document_name: str, parsed: Dict[str, Any]) -> Dict[str, Any]:
+        """인덱싱 엔진 분류 단계: 파일명 기반 도메인 + 미리 분류한 카테고리"""
+        return {
+            **classify_document(document_name, parsed),
+            "category": categories.get(document_name, "기타"),
+        }
+
+    def add_documents(self, documents: List[Tuple[str, str]], batch_size: int = 100) -> Dict[str, bool]:
+        """
+        여러 문서를 한 번의 인덱싱 실행으로 추가 (카테고리 분류는 LLM 배치 요청)
+
+        Args:
+            documents: (PDF 경로, 문서명) 리스트
+            batch_size: 업서트 배치 크기
+
+        Returns:
+            문서명 → 성공 여부
+        """
+        # embed_documents와 같은 doc_id/포인트 ID가 나오도록 파일명 기준으로 맞춤
+        targets: List[Tuple[Path, str, str]] = []
+        for pdf_path, document_name in documents:
+            file_name = document_name
+            if not file_name.lower().endswith(".pdf") and pdf_path.lower().endswith(".pdf"):
+                file_name += ".pdf"
+            targets.append((Path(pdf_path), document_name, file_name))
+        file_names = {path: file_name for path, _, file_name in targets}
+
+        try:
+            categories = self.classify_documents(list(file_names.items()))
+            engine = IngestionEngine(
+                self.client, self.embedding_model, self.collection_name,
+                classifier=functools.partial(self._classify, categories), batch_size=batch_size,
+                parse_workers=0, replace_existing=True,
+            )
+            result = engine.run(list(file_names), file_names=file_names)
         except Exception as e:
             logger.error(f"문서 추가 실패: {e}")
-            return False
+            return {document_name: False for _, document_name in documents}
+
+        # 검색 캐시 무효화 (컬렉션 버전 갱신)
+        invalidate_collection(self.collection_name)
+
+        outcome = {}
+        stats = result['embedding']
+        for _, document_name, file_name in targets:
+            ok = file_name in result['indexed']
+            outcome[document_name] = ok
+            if ok:
+                logger.info(
+                    f"문서 '{document_name}' 추가 완료 ({result['indexed'][file_name]}개 포인트, "
+                    f"카테고리: {categories.get(file_name)})"
+                )
+            else:
+                logger.error(f"문서 추가 실패 '{document_name}': {result['failed'].get(file_name, '본문 없음')}")
+        logger.info(f"임베딩 캐시 적중률 {stats['cache_hit_rate']:.1%} ({stats['chunks']}개 청크)")
+        return outcome
+
+    def add_document(self, pdf_path: str, document_name: str, batch_size: int = 100) -> bool:
+        """문서를 벡터화하여 Qdrant에 추가 (통합 인덱싱 엔진 사용, 같은 문서는 기존 포인트를 교체)"""
+        return self.add_documents([(pdf_path, document_name)], batch_size)[document_name]
     
     def search_similar(self, query: str, limit: int = 5, category: str = None) -> List[Dict[str, Any]]:
         """유사한 문서 검색 (카테고리 필터링 지원)"""
         try:
             # 쿼리 벡터화
-            query_vector = self.embedding_model.embed_query(query)
+            query_vector = self.embedding_model.encode([query])[0].tolist()
             
             # 검색 조건 설정
             search_params = {
@@ -213,8 +315,9 @@ class QdrantService:
             }
             
             # 카테고리 필터링
+            query_filter = None
             if category:
-                search_params["query_filter"] = {
+                query_filter = {
                     "must": [
                         {
                             "key": "category",
@@ -222,22 +325,25 @@ class QdrantService:
                         }
                     ]
                 }
+            # 문서 요약/조문 머리말 포인트는 본문 결과에서 제외
+            search_params["query_filter"] = exclude_doc_level(query_filter)
             
             # 유사도 검색
-            search_result = self.client.search(**search_params)
+            search_result = search_points(self.client, **search_params)
             
             # 결과 정리
             results = []
             for hit in search_result:
+                payload = normalize_payload(hit.payload)
                 results.append({
                     "score": hit.score,
-                    "text": hit.payload["text"],
-                    "document_name": hit.payload["document_name"],
-                    "chunk_index": hit.payload["chunk_index"],
-                    "pdf_path": hit.payload["pdf_path"],
-                    "category": hit.payload.get("category", "기타"),
-                    "register_date": hit.payload.get("register_date", "unknown"),
-                    "doc_title": hit.payload.get("doc_title", "")
+                    "text": payload.get("text", ""),
+                    "document_name": payload.get("file_name", ""),
+                    "chunk_index": payload["chunk_index"],
+                    "pdf_path": payload["file_path"],
+                    "category": payload.get("category", "기타"),
+                    "register_date": payload.get("register_date_iso") or "unknown",
+                    "doc_title": payload.get("doc_title", "")
                 })
             
             return results
@@ -264,9 +370,17 @@ class QdrantService:
         return list(self.category_keywords.keys())
     
     def delete_collection(self) -> bool:
-        """컬렉션 삭제"""
+        """컬렉션 삭제 (블루-그린 alias로 운영 중이면 서비스 중인 버전을 지우지 않음)"""
         try:
+            live = current_target(self.client, self.collection_name)
+            if live is not None:
+                logger.error(
+                    f"'{self.collection_name}'은 alias({live})로 운영 중이라 삭제하지 않습니다. "
+                    f"embed_documents.py --rollback/--blue-green으로 버전을 관리하세요"
+                )
+                return False
             self.client.delete_collection(self.collection_name)
+            invalidate_collection(self.collection_name)
             logger.info(f"컬렉션 '{self.collection_name}' 삭제 완료")
             return True
         except Exception as e:
@@ -0,0 +1,162 @@
+from celery import shared_task
+import logging
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from .models import IngestionJob, IngestionJobDocument
+from .services import QdrantService
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+
+def enqueue_ingestion_job(job: IngestionJob) -> None:
+    """작업을 대기 상태로 바꾸고 Celery 큐에 넣음 (트랜잭션 커밋 후 전송)"""
+    job.status = IngestionJob.Status.QUEUED
+    job.error_message = None
+    job.finished_at = None
+    job.save(update_fields=["status", "error_message", "finished_at", "updated_at"])
+    job_id = str(job.job_id)
+    transaction.on_commit(lambda: run_ingestion_job.delay(job_id))
+
+
+def _refresh_counts(job: IngestionJob) -> None:
+    """문서별 체크포인트에서 완료/실패 수를 다시 집계 (재시도/재개에도 중복 집계 없음)"""
+    documents = job.documents.all()
+    job.processed = documents.filter(status=IngestionJobDocument.Status.DONE).count()
+    job.failed = documents.filter(status=IngestionJobDocument.Status.FAILED).count()
+
+
+@shared_task(bind=True)
+def run_ingestion_job(self, job_id: str):
+    """
+    전체 문서 인덱싱 작업의 한 구간 처리
+
+    대기 중인 문서를 INGEST_JOB_CHUNK_DOCS개씩 가져와 인덱싱하고 문서별 결과를 기록한 뒤,
+    남은 문서가 있으면 같은 태스크를 다시 큐에 넣습니다. 한 태스크가 짧게 끝나므로
+    워커가 재시작되어도 이미 완료된 문서는 다시 처리하지 않습니다.
+    """
+    try:
+        job = IngestionJob.objects.get(job_id=job_id)
+    except IngestionJob.DoesNotExist:
+        logger.error(f"Ingestion job {job_id} not found")
+        return {"ok": False, "error": f"Job {job_id} not found"}
+
+    if job.status in (IngestionJob.Status.DONE, IngestionJob.Status.FAILED):
+        logger.info(f"Ingestion job {job_id} already {job.status}, skipping")
+        return {"ok": job.status == IngestionJob.Status.DONE, "job_id": job_id}
+
+    chunk_docs = max(1, getattr(settings, 'INGEST_JOB_CHUNK_DOCS', 8))
+    claimed_ids = []
+    try:
+        if job.status != IngestionJob.Status.RUNNING:
+            job.status = IngestionJob.Status.RUNNING
+            job.started_at = timezone.now()
+            job.save(update_fields=["status", "started_at", "updated_at"])
+            logger.info(f"Ingestion job {job_id} status updated to RUNNING")
+
+        # 1) 대기 중인 문서 구간 선점
+        with transaction.atomic():
+            claimed = list(
+                job.documents.select_for_update()
+                .filter(status=IngestionJobDocument.Status.PENDING)
+                .order_by("id")[:chunk_docs]
+            )
+            claimed_ids = [doc.id for doc in claimed]
+            IngestionJobDocument.objects.filter(id__in=claimed_ids).update(
+                status=IngestionJobDocument.Status.RUNNING
+            )
+
+        # 2) 인덱싱 (카테고리 분류 캐시/임베딩 캐시는 구간마다 공유)
+        if claimed:
+            qdrant_service = QdrantService()
+            qdrant_service.create_collection()
+            outcome = qdrant_service.add_documents(
+                [(doc.pdf_path, doc.document_name) for doc in claimed], job.batch_size
+            )
+
+            # 3) 문서별 체크포인트 기록
+            now = timezone.now()
+            with transaction.atomic():
+                for doc in claimed:
+                    ok = outcome.get(doc.document_name, False)
+                    doc.status = IngestionJobDocument.Status.DONE if ok else IngestionJobDocument.Status.FAILED
+                    doc.error_message = None if ok else "인덱싱 실패 (서버 로그 참고)"
+                    doc.finished_at = now
+                IngestionJobDocument.objects.bulk_update(claimed, ["status", "error_message", "finished_at"])
+                _refresh_counts(job)
+                job.save(update_fields=["processed", "failed", "updated_at"])
+            logger.info(
+                f"Ingestion job {job_id}: {job.processed + job.failed}/{job.total} "
+                f"(failed {job.failed})"
+            )
+
+        # 4) 남은 문서가 있으면 다음 구간 예약, 없으면 완료
+        if job.documents.filter(status=IngestionJobDocument.Status.PENDING).exists():
+            run_ingestion_job.delay(job_id)
+            return {"ok": True, "job_id": job_id, "continued": True}
+
+        job.status = IngestionJob.Status.DONE
+        job.finished_at = timezone.now()
+        job.save(update_fields=["status", "finished_at", "updated_at"])
+        logger.info(f"Ingestion job {job_id} completed ({job.processed} done, {job.failed} failed)")
+        return {"ok": True, "job_id": job_id}
+
+    except Exception as e:
+        logger.error(f"Error in ingestion job {job_id}: {e}")
+        try:
+            # 선점했던 문서는 재개할 때 다시 처리
+            IngestionJobDocument.objects.filter(
+                id__in=claimed_ids, status=IngestionJobDocument.Status.RUNNING
+            ).update(status=IngestionJobDocument.Status.PENDING)
+            job.status = IngestionJob.Status.FAILED
+            job.error_message = str(e)
+            job.finished_at = timezone.now()
+            job.save(update_fields=["status", "error_message", "finished_at", "updated_at"])
+            logger.error(f"Ingestion job {job_id} marked as FAILED")
+        except Exception as save_error:
+            logger.error(f"Failed to save error status for ingestion job {job_id}: {save_error}")
+        return {"ok": False, "error": str(e)}
+
+
+def is_resumable(job: IngestionJob) -> bool:
+    """
+    재개 가능 여부
+
+    실패한 작업, 실패 문서가 남은 완료 작업, 또는 INGEST_JOB_STALE_SECONDS 동안 진행 기록이
+    없는 대기/실행 중 작업(워커가 죽어 멈춘 작업)만 재개할 수 있습니다. 살아 있는 작업을
+    재개하면 같은 문서를 두 태스크 체인이 동시에 인덱싱하게 됩니다.
+    """
+    if job.status == IngestionJob.Status.FAILED:
+        return True
+    if job.status == IngestionJob.Status.DONE:
+        return job.failed > 0
+    stale_after = timedelta(seconds=getattr(settings, 'INGEST_JOB_STALE_SECONDS', 1800))
+    return job.updated_at is not None and timezone.now() - job.updated_at >= stale_after
+
+
+def resume_ingestion_job(job: IngestionJob) -> int:
+    """
+    중단/실패한 작업 재개
+
+    완료된 문서는 그대로 두고, 실행 중에 끊겼거나 실패한 문서만 다시 대기 상태로 돌립니다.
+
+    Returns:
+        다시 처리할 문서 수
+
+    Raises:
+        ValueError: 진행 중인 작업이라 재개할 수 없는 경우 (is_resumable 참고)
+    """
+    with transaction.atomic():
+        # 동시에 들어온 재개 요청이 둘 다 체인을 만들지 않도록 작업 행을 잠그고 다시 확인
+        job = IngestionJob.objects.select_for_update().get(pk=job.pk)
+        if not is_resumable(job):
+            raise ValueError(f"Ingestion job {job.job_id} is {job.status}, cannot resume")
+        job.documents.filter(
+            status__in=[IngestionJobDocument.Status.RUNNING, IngestionJobDocument.Status.FAILED]
+        ).update(status=IngestionJobDocument.Status.PENDING, error_message=None, finished_at=None)
+        _refresh_counts(job)
+        job.save(update_fields=["processed", "failed", "updated_at"])
+        enqueue_ingestion_job(job)
+    return job.documents.filter(status=IngestionJobDocument.Status.PENDING).count()
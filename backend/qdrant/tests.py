@@ -1,6 +1,14 @@
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock
+
 from django.test import TestCase
 from django.conf import settings
-from .models import DocumentVector
+from django.utils import timezone
+from .models import CategoryClassification, DocumentVector, IngestionJob, IngestionJobDocument
+from .services import QdrantService, parse_category_response
+from .tasks import is_resumable, resume_ingestion_job, run_ingestion_job
 
 
 class DocumentVectorModelTest(TestCase):
@@ -30,3 +38,114 @@ class DocumentVectorModelTest(TestCase):
         
         expected_string = "테스트 문서 - test_doc_001"
         self.assertEqual(str(document), expected_string)
+
+
+class CategoryClassificationTest(TestCase):
+    """카테고리 배치 분류 + 내용 해시 캐시 테스트"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.documents = []
+        for i in range(3):
+            path = Path(self.tmpdir.name) / f"문서{i}.pdf"
+            path.write_bytes(f"내용 {i}".encode('utf-8'))
+            self.documents.append((path, path.name))
+
+    def test_parse_category_response(self):
+        """JSON 배열 응답 파싱 (목록 밖 값은 기타, 개수가 다르면 None)"""
+        categories = ["보안 규정", "여비 규정"]
+        self.assertEqual(
+            parse_category_response('답: ["보안 규정", "없는 규정"]', 2, categories),
+            ["보안 규정", "기타"],
+        )
+        self.assertEqual(parse_category_response('["보안 규정"]', 2, categories), [None, None])
+        self.assertEqual(parse_category_response('분류 불가', 1, categories), [None])
+
+    @mock.patch('qdrant.services.read_head_text', return_value="본문")
+    def test_unchanged_documents_use_cache(self, _read_head_text):
+        """변경 없는 문서를 다시 분류하면 LLM을 호출하지 않음"""
+        service = QdrantService()
+        service.llm_batch_size = 2
+        with mock.patch.object(service, '_classify_batch', side_effect=lambda texts: ["보안 규정"] * len(texts)) as batch:
+            first = service.classify_documents(self.documents)
+            self.assertEqual(batch.call_count, 2)  # 3건을 2건씩 묶어 2회 요청
+            second = service.classify_documents(self.documents)
+            self.assertEqual(batch.call_count, 2)
+
+        self.assertEqual(first, second)
+        self.assertEqual(CategoryClassification.objects.count(), 3)
+
+    def test_unreadable_document_fails_alone(self):
+        """본문을 읽을 수 없는 문서만 '기타'(캐시하지 않음), 나머지는 정상 분류"""
+        broken = self.documents[1][0]
+
+        def read_head_text(path):
+            if path == broken:
+                raise ValueError("encrypted PDF")
+            return "본문"
+
+        service = QdrantService()
+        with mock.patch('qdrant.services.read_head_text', side_effect=read_head_text), \
+                mock.patch.object(service, '_classify_batch', side_effect=lambda texts: ["보안 규정"] * len(texts)):
+            categories = service.classify_documents(self.documents)
+
+        self.assertEqual(categories[broken.name], "기타")
+        self.assertEqual(
+            {name: category for name, category in categories.items() if name != broken.name},
+            {self.documents[0][1]: "보안 규정", self.documents[2][1]: "보안 규정"},
+        )
+        self.assertEqual(CategoryClassification.objects.count(), 2)
+
+
+class IngestionJobTest(TestCase):
+    """전체 문서 인덱싱 작업 체크포인트/재개 테스트"""
+
+    def setUp(self):
+        self.job = IngestionJob.objects.create(source_dir="/docs", total=3)
+        for name, doc_status in [("a", "DONE"), ("b", "FAILED"), ("c", "PENDING")]:
+            IngestionJobDocument.objects.create(
+                job=self.job, document_name=name, pdf_path=f"/docs/{name}.pdf", status=doc_status
+            )
+
+    @mock.patch.object(QdrantService, '__init__', return_value=None)
+    @mock.patch.object(QdrantService, 'create_collection')
+    @mock.patch.object(QdrantService, 'add_documents')
+    @mock.patch.object(run_ingestion_job, 'delay')
+    def test_resume_skips_done_documents(self, _delay, add_documents, _create, _init):
+        """재개하면 완료된 문서는 건너뛰고 실패/대기 문서만 처리"""
+        add_documents.side_effect = lambda documents, batch_size: {name: True for _, name in documents}
+        self.job.status = IngestionJob.Status.FAILED
+        self.job.save()
+
+        self.assertEqual(resume_ingestion_job(self.job), 2)
+        run_ingestion_job(str(self.job.job_id))
+
+        indexed = [name for _, name in add_documents.call_args[0][0]]
+        self.assertEqual(indexed, ["b", "c"])
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, IngestionJob.Status.DONE)
+        self.assertEqual((self.job.processed, self.job.failed), (3, 0))
+
+    @mock.patch.object(run_ingestion_job, 'delay')
+    def test_resume_rejects_active_job(self, delay):
+        """진행 중인 작업은 재개하지 않음 (두 태스크 체인이 같은 문서를 인덱싱하지 않도록)"""
+        self.job.status = IngestionJob.Status.RUNNING
+        self.job.save()
+        IngestionJobDocument.objects.filter(document_name="c").update(status="RUNNING")
+
+        self.assertFalse(is_resumable(self.job))
+        with self.assertRaises(ValueError):
+            resume_ingestion_job(self.job)
+        self.assertTrue(IngestionJobDocument.objects.filter(document_name="c", status="RUNNING").exists())
+        delay.assert_not_called()
+
+    @mock.patch.object(run_ingestion_job, 'delay')
+    def test_resume_allows_stale_job(self, _delay):
+        """진행 기록이 오래 없는 실행 중 작업(워커 중단)은 재개 허용"""
+        stale = timezone.now() - timedelta(seconds=settings.INGEST_JOB_STALE_SECONDS + 60)
+        IngestionJob.objects.filter(pk=self.job.pk).update(status=IngestionJob.Status.RUNNING, updated_at=stale)
+        self.job.refresh_from_db()
+
+        self.assertTrue(is_resumable(self.job))
+        self.assertEqual(resume_ingestion_job(self.job), 2)
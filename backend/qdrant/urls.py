@@ -8,6 +8,8 @@ urlpatterns = [
     path('search/', views.search_documents, name='search_documents'),
     path('collection-info/', views.collection_info, name='collection_info'),
     path('add-all-documents/', views.add_all_documents, name='add_all_documents'),
+    path('ingestion-jobs/<uuid:job_id>/', views.ingestion_job_status, name='ingestion_job_status'),
+    path('ingestion-jobs/<uuid:job_id>/resume/', views.resume_ingestion_job, name='resume_ingestion_job'),
     path('categories/', views.get_categories, name='get_categories'),
     path('delete-collection/', views.delete_collection, name='delete_collection'),
 ]
@@ -2,8 +2,12 @@ from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework import status
 from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
 import os
+from .models import IngestionJob, IngestionJobDocument
 from .services import QdrantService
+from .tasks import enqueue_ingestion_job, is_resumable, resume_ingestion_job as resume_job
 import logging
 
 logger = logging.getLogger(__name__)
@@ -167,15 +171,14 @@ def delete_collection(request):
 
 @api_view(['POST'])
 def add_all_documents(request):
-    """documents/kisa_pdf 폴더의 모든 PDF를 벡터화하여 추가"""
-    try:
-        batch_size = request.data.get('batch_size', 100)
-
-        # Qdrant 서비스 초기화
-        qdrant_service = QdrantService()
+    """
+    documents/kisa_pdf 폴더의 모든 PDF를 벡터화하는 백그라운드 작업 등록
 
-        # 컬렉션 생성
-        qdrant_service.create_collection()
+    문서별 체크포인트를 만든 뒤 Celery 작업으로 처리하고 작업 ID를 바로 반환합니다.
+    진행 상황은 ingestion-jobs/<job_id>/ 에서 조회합니다.
+    """
+    try:
+        batch_size = int(request.data.get('batch_size', 100))
 
         # PDF 폴더 경로
         pdf_folder = os.path.join(settings.BASE_DIR, '..', 'documents', 'kisa_pdf')
@@ -186,41 +189,126 @@ def add_all_documents(request):
             }, status=status.HTTP_404_NOT_FOUND)
 
         # PDF 파일 목록
-        pdf_files = [f for f in os.listdir(pdf_folder) if f.endswith('.pdf')]
+        pdf_files = sorted(f for f in os.listdir(pdf_folder) if f.endswith('.pdf'))
 
         if not pdf_files:
             return Response({
                 'error': 'PDF 파일이 없습니다.'
             }, status=status.HTTP_404_NOT_FOUND)
 
-        # 각 PDF 파일 처리
-        success_count = 0
-        failed_files = []
-
-        for pdf_file in pdf_files:
-            pdf_path = os.path.join(pdf_folder, pdf_file)
-            document_name = os.path.splitext(pdf_file)[0]
-
-            try:
-                success = qdrant_service.add_document(pdf_path, document_name, batch_size)
-                if success:
-                    success_count += 1
-                else:
-                    failed_files.append(pdf_file)
-            except Exception as e:
-                logger.error(f"파일 {pdf_file} 처리 실패: {e}")
-                failed_files.append(pdf_file)
-
-        return Response({
-            'message': f'처리 완료: {success_count}개 성공, {len(failed_files)}개 실패',
-            'success_count': success_count,
-            'failed_files': failed_files,
-            'total_files': len(pdf_files),
-            'batch_size': batch_size
-        }, status=status.HTTP_200_OK)
+        with transaction.atomic():
+            job = IngestionJob.objects.create(
+                source_dir=os.path.abspath(pdf_folder),
+                batch_size=batch_size,
+                total=len(pdf_files),
+            )
+            IngestionJobDocument.objects.bulk_create([
+                IngestionJobDocument(
+                    job=job,
+                    document_name=os.path.splitext(pdf_file)[0],
+                    pdf_path=os.path.join(pdf_folder, pdf_file),
+                )
+                for pdf_file in pdf_files
+            ])
+            enqueue_ingestion_job(job)
+
+        return Response({
+            'message': f'{len(pdf_files)}개 문서 인덱싱 작업이 등록되었습니다.',
+            **_job_progress(job),
+        }, status=status.HTTP_202_ACCEPTED)
 
     except Exception as e:
         logger.error(f"전체 문서 추가 중 오류: {e}")
         return Response({
             'error': f'서버 오류: {str(e)}'
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+def _job_progress(job: IngestionJob) -> dict:
+    """작업 진행 상황 (ETA는 이번 실행에서 끝난 문서의 평균 처리 시간 기준)"""
+    finished = job.processed + job.failed
+    remaining = max(job.total - finished, 0)
+    eta_seconds = None
+    if job.status == IngestionJob.Status.RUNNING and job.started_at and remaining:
+        finished_this_run = job.documents.filter(finished_at__gte=job.started_at).count()
+        if finished_this_run:
+            elapsed = (timezone.now() - job.started_at).total_seconds()
+            eta_seconds = round(elapsed / finished_this_run * remaining)
+    elif job.status == IngestionJob.Status.DONE:
+        eta_seconds = 0
+
+    return {
+        'job_id': str(job.job_id),
+        'status': job.status,
+        'total': job.total,
+        'processed': job.processed,
+        'failed': job.failed,
+        'remaining': remaining,
+        'progress': round(finished / job.total, 4) if job.total else 0.0,
+        'eta_seconds': eta_seconds,
+        'error_message': job.error_message,
+        'created_at': job.created_at,
+        'started_at': job.started_at,
+        'finished_at': job.finished_at,
+    }
+
+
+@api_view(['GET'])
+def ingestion_job_status(request, job_id):
+    """전체 문서 인덱싱 작업 진행 상황 조회 (완료/실패 수, ETA, 실패 문서 목록)"""
+    try:
+        job = IngestionJob.objects.get(job_id=job_id)
+    except IngestionJob.DoesNotExist:
+        return Response({
+            'error': '작업을 찾을 수 없습니다.'
+        }, status=status.HTTP_404_NOT_FOUND)
+
+    failed_files = list(
+        job.documents.filter(status=IngestionJobDocument.Status.FAILED).values_list('document_name', flat=True)
+    )
+    return Response({
+        **_job_progress(job),
+        'batch_size': job.batch_size,
+        'failed_files': failed_files,
+    }, status=status.HTTP_200_OK)
+
+
+@api_view(['POST'])
+def resume_ingestion_job(request, job_id):
+    """중단/실패한 인덱싱 작업 재개 (완료된 문서는 건너뛰고 나머지만 다시 처리)"""
+    try:
+        job = IngestionJob.objects.get(job_id=job_id)
+    except IngestionJob.DoesNotExist:
+        return Response({
+            'error': '작업을 찾을 수 없습니다.'
+        }, status=status.HTTP_404_NOT_FOUND)
+
+    if job.status == IngestionJob.Status.DONE and job.failed == 0:
+        return Response({
+            'message': '이미 모든 문서가 처리된 작업입니다.',
+            **_job_progress(job),
+        }, status=status.HTTP_200_OK)
+
+    if not is_resumable(job):
+        return Response({
+            'error': '작업이 아직 진행 중입니다. 실패하거나 멈춘 작업만 재개할 수 있습니다.',
+            **_job_progress(job),
+        }, status=status.HTTP_409_CONFLICT)
+
+    try:
+        pending = resume_job(job)
+        job.refresh_from_db()
+        return Response({
+            'message': f'{pending}개 문서를 다시 처리합니다.',
+            **_job_progress(job),
+        }, status=status.HTTP_202_ACCEPTED)
+    except ValueError:
+        # 확인 직후 다른 재개 요청이 먼저 작업을 다시 넣은 경우
+        return Response({
+            'error': '작업이 아직 진행 중입니다. 실패하거나 멈춘 작업만 재개할 수 있습니다.',
+        }, status=status.HTTP_409_CONFLICT)
+    except Exception as e:
+        logger.error(f"인덱싱 작업 재개 중 오류: {e}")
+        return Response({
+            'error': f'서버 오류: {str(e)}'
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+임베딩 백엔드 내보내기 / 패리티 검사 / 벤치마크 스크립트
+
+사용 예:
+    # ONNX 내보내기 + int8 양자화 (pip install -r requirements-onnx.txt 필요)
+    python scripts/embedding_benchmark.py --export
+
+    # PyTorch 대비 패리티 검사(코사인 ≥ 0.99) 및 단일/배치 성능 비교
+    python scripts/embedding_benchmark.py --parity --bench
+
+    # 코퍼스 인덱싱: 페이지 단위 인코딩 vs 길이 버킷 전역 배치 처리량(chunks/sec) 비교
+    python scripts/embedding_benchmark.py --bench-indexing /app/documents/kisa_pdf --max-files 10
+"""
+
+import argparse
+import json
+import logging
+import sys
+from pathlib import Path
+
+# backend 디렉토리를 import 경로에 추가 (Django 설정 불필요)
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from chatbot.services.embedding_backends import (
+    DEFAULT_MODEL_NAME,
+    PARITY_MIN_COSINE,
+    OnnxEmbeddingBackend,
+    TorchEmbeddingBackend,
+    benchmark_backend,
+    check_parity,
+    export_onnx,
+)
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# 질의/본문 길이가 섞이도록 구성한 기본 샘플 문장
+SAMPLE_SENTENCES = [
+    "연차휴가는 며칠까지 사용할 수 있나요?",
+    "출장비 정산 절차를 알려주세요.",
+    "개인정보 유출 사고 발생 시 보고 절차",
+    "육아휴직 신청서 서식",
+    "계약사무 처리 규정에서 수의계약이 가능한 경우는?",
+    "정보보안 서약서는 언제 제출해야 하나요?",
+    "제12조(연차휴가) ① 1년간 80퍼센트 이상 출근한 직원에게는 15일의 유급휴가를 주어야 한다. "
+    "② 계속하여 근로한 기간이 1년 미만인 직원에게는 1개월 개근 시 1일의 유급휴가를 주어야 한다.",
+    "제5조(예산의 집행) 예산은 성립된 목적 외에 사용할 수 없으며, 부득이한 경우 "
+    "원장의 승인을 받아 전용할 수 있다. 전용한 경우에는 그 내역을 회계연도 종료 후 보고하여야 한다.",
+    "제3조(적용범위) 이 지침은 원의 정보시스템을 운영·관리하는 모든 부서와 외부 용역업체 직원에게 적용한다.",
+    "별지 제1호 서식 출장명령서 소속 직위 성명 출장기간 출장지 출장목적 비고",
+]
+
+
+def _load_sentences(path: str) -> list:
+    """파일에서 문장 로드 (한 줄에 한 문장)"""
+    lines = Path(path).read_text(encoding='utf-8').splitlines()
+    return [line.strip() for line in lines if line.strip()]
+
+
+def _bench_indexing(args) -> dict:
+    """embed_documents와 같은 파싱/청크 결과로 기존 페이지 단위 인코딩과 버킷 배치 비교"""
+    from chatbot.services.embedding_backends import build_embedder
+    from chatbot.services.embedding_queue import compare_batching
+    from chatbot.services.document_parsing import parse_pdf_for_index
+
+    pdf_files = sorted(Path(args.bench_indexing).glob("*.pdf"))[:args.max_files]
+    pages = [
+        page["chunks"]
+        for pdf_path in pdf_files
+        for page in parse_pdf_for_index(pdf_path)["pages"]
+    ]
+    embedder = build_embedder(model_name=args.model)
+    return {
+        'files': len(pdf_files),
+        'pages': len(pages),
+        **embedder.describe(),
+        **compare_batching(embedder, pages, per_page_batch_size=args.batch_size),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='임베딩 백엔드 내보내기/패리티/벤치마크')
+    parser.add_argument('--model', default=DEFAULT_MODEL_NAME, help='원본 모델 이름')
+    parser.add_argument('--onnx-dir', default=None, help='ONNX 모델 디렉토리')
+    parser.add_argument('--export', action='store_true', help='ONNX 내보내기 실행')
+    parser.add_argument('--no-quantize', action='store_true', help='int8 양자화 생략')
+    parser.add_argument('--parity', action='store_true', help='PyTorch 대비 패리티 검사')
+    parser.add_argument('--bench', action='store_true', help='단일/배치 인코딩 벤치마크')
+    parser.add_argument('--sentences', default=None, help='문장 파일 (한 줄에 한 문장)')
+    parser.add_argument('--batch-size', type=int, default=32, help='배치 벤치마크 크기')
+    parser.add_argument('--min-cosine', type=float, default=PARITY_MIN_COSINE,
+                        help='패리티 허용 최소 코사인 유사도')
+    parser.add_argument('--bench-indexing', default=None, metavar='PDF_DIR',
+                        help='PDF 디렉토리로 페이지 단위/길이 버킷 인코딩 처리량 비교')
+    parser.add_argument('--max-files', type=int, default=10, help='인덱싱 벤치마크에 사용할 PDF 수')
+    args = parser.parse_args()
+
+    if args.export:
+        export_onnx(args.model, args.onnx_dir, quantize=not args.no_quantize)
+
+    if args.bench_indexing:
+        print(json.dumps(_bench_indexing(args), ensure_ascii=False, indent=2))
+
+    if not (args.parity or args.bench):
+        return 0
+
+    sentences = _load_sentences(args.sentences) if args.sentences else SAMPLE_SENTENCES
+
+    torch_backend = TorchEmbeddingBackend(args.model)
+    candidates = [OnnxEmbeddingBackend(args.onnx_dir, quantized=False)]
+    if not args.no_quantize:
+        candidates.append(OnnxEmbeddingBackend(args.onnx_dir, quantized=True))
+
+    report = {'parity': [], 'benchmark': []}
+    exit_code = 0
+
+    if args.parity:
+        for candidate in candidates:
+            result = {**candidate.describe(), **check_parity(
+                torch_backend, candidate, sentences, min_cosine=args.min_cosine
+            )}
+            report['parity'].append(result)
+            if not result['passed']:
+                logger.error(f"패리티 실패: {result}")
+                exit_code = 1
+
+    if args.bench:
+        for backend in [torch_backend] + candidates:
+            report['benchmark'].append(
+                benchmark_backend(backend, sentences, batch_size=args.batch_size)
+            )
+        base = report['benchmark'][0]
+        for row in report['benchmark']:
+            if base['batch_sentences_per_sec']:
+                row['batch_speedup'] = round(
+                    row['batch_sentences_per_sec'] / base['batch_sentences_per_sec'], 2
+                )
+            if row['single_p50_ms']:
+                row['single_speedup'] = round(base['single_p50_ms'] / row['single_p50_ms'], 2)
+
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    return exit_code
+
+
+if __name__ == "__main__":
+    exit_code = main()
+    sys.exit(exit_code)
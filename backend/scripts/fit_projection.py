@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+축소 보조 벡터용 PCA 투영 학습 + 재현율/지연 비교
+
+사용 예:
+    # 서비스 컬렉션의 전체 차원 벡터로 256차원 투영 학습 (index_state/projection.npz)
+    python scripts/fit_projection.py --collection regulations_final --dim 256
+
+    # 학습 후 INGEST_REDUCED_VECTORS=true로 블루-그린 재인덱싱하고 실제 컬렉션에서 비교
+    python scripts/fit_projection.py --collection regulations_final --live
+
+오프라인 비교는 학습에 쓰지 않은 벡터(--holdout)를 질의로 삼아, 전체 차원 정확 검색 top-k를
+정답으로 두고 축소 벡터 top-(k × oversampling) 후보를 전체 차원으로 재점수한 top-k가 얼마나
+겹치는지(recall@k)와 질의당 시간을 numpy로 잽니다. --live는 축소 보조 벡터가 있는 컬렉션에서
+search_points(prefetch + rescore)와 전체 차원 정확 검색(exact=True)을 같은 질의로 비교합니다.
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+# backend 디렉토리를 import 경로에 추가 (Django 설정 불필요)
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+from qdrant_client import QdrantClient
+from qdrant_client.models import SearchParams
+
+from chatbot.services.doc_retrieval import exclude_doc_level
+from chatbot.services.vector_projection import (
+    FULL_VECTOR, VectorProjection, default_oversampling, full_vector, projection_file,
+    search_points, vector_layout,
+)
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def sample_vectors(client: QdrantClient, collection_name: str, limit: int) -> np.ndarray:
+    """컬렉션 본문 청크의 전체 차원 벡터를 최대 limit개 조회"""
+    vectors: List[Any] = []
+    offset = None
+    while len(vectors) < limit:
+        points, offset = client.scroll(
+            collection_name=collection_name,
+            scroll_filter=exclude_doc_level(None),
+            limit=min(256, limit - len(vectors)),
+            offset=offset,
+            with_payload=False,
+            with_vectors=True,
+        )
+        vectors += [v for v in (full_vector(p.vector) for p in points) if v is not None]
+        if offset is None:
+            break
+    return np.asarray(vectors, dtype=np.float32)
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+
+def offline_benchmark(projection: VectorProjection, corpus: np.ndarray, queries: np.ndarray,
+                      top_k: int, oversampling: float) -> Dict[str, Any]:
+    """
+    numpy 전수 검색으로 축소 후보 + 전체 차원 재점수의 recall@k와 질의당 시간 측정
+
+    Args:
+        projection: 학습한 투영
+        corpus: (n, d) 검색 대상 벡터
+        queries: (q, d) 질의 벡터 (학습에 쓰지 않은 벡터)
+        top_k: 결과 수
+        oversampling: 축소 벡터 후보 배수
+
+    Returns:
+        {'queries', 'top_k', 'oversampling', 'recall', 'reduced_only_recall', 'full_ms', 'rescored_ms'}
+    """
+    corpus = _normalize(corpus)
+    queries = _normalize(queries)
+    reduced_corpus = projection.project(corpus)
+    candidates = min(max(int(top_k * oversampling), top_k), len(corpus))
+
+    started = time.perf_counter()
+    exact = np.argsort(-(queries @ corpus.T), axis=1)[:, :top_k]
+    full_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    reduced_scores = projection.project(queries) @ reduced_corpus.T
+    shortlist = np.argpartition(-reduced_scores, candidates - 1, axis=1)[:, :candidates]
+    rescored = []
+    for query, ids in zip(queries, shortlist):
+        order = np.argsort(-(corpus[ids] @ query))[:top_k]
+        rescored.append(ids[order])
+    rescored_seconds = time.perf_counter() - started
+    reduced_only = np.argsort(-reduced_scores, axis=1)[:, :top_k]
+
+    def recall(found) -> float:
+        return float(np.mean([len(set(f) & set(e)) / top_k for f, e in zip(found, exact)]))
+
+    total = len(queries) or 1
+    return {
+        'queries': len(queries),
+        'top_k': top_k,
+        'oversampling': oversampling,
+        'recall': round(recall(rescored), 4),
+        'reduced_only_recall': round(recall(reduced_only), 4),
+        'full_ms': round(full_seconds / total * 1000, 3),
+        'rescored_ms': round(rescored_seconds / total * 1000, 3),
+    }
+
+
+def live_benchmark(client: QdrantClient, collection_name: str, queries: np.ndarray,
+                   top_k: int, oversampling: float) -> Dict[str, Any]:
+    """
+    Qdrant에서 prefetch + rescore 검색과 전체 차원 정확 검색의 결과 겹침/지연 비교
+
+    Returns:
+        {'collection', 'queries', 'recall', 'exact_ms', 'rescored_ms'}
+    """
+    layout = vector_layout(client, collection_name)
+    if layout['projection'] is None:
+        raise ValueError(f"'{collection_name}'에 축소 보조 벡터/투영이 없습니다 "
+                         "(INGEST_REDUCED_VECTORS=true로 재인덱싱 필요)")
+    flt = exclude_doc_level(None)
+    overlap = 0.0
+    exact_seconds = rescored_seconds = 0.0
+    for query in queries.tolist():
+        started = time.perf_counter()
+        exact = client.search(
+            collection_name=collection_name,
+            query_vector=(FULL_VECTOR, query),
+            query_filter=flt,
+            limit=top_k,
+            with_payload=False,
+            search_params=SearchParams(exact=True),
+        )
+        exact_seconds += time.perf_counter() - started
+
+        started = time.perf_counter()
+        rescored = search_points(client, collection_name, query, query_filter=flt, limit=top_k,
+                                 oversampling=oversampling, with_payload=False)
+        rescored_seconds += time.perf_counter() - started
+        overlap += len({p.id for p in exact} & {p.id for p in rescored}) / top_k
+
+    total = len(queries) or 1
+    return {
+        'collection': layout['collection'],
+        'queries': len(queries),
+        'recall': round(overlap / total, 4),
+        'exact_ms': round(exact_seconds / total * 1000, 2),
+        'rescored_ms': round(rescored_seconds / total * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='축소 보조 벡터용 PCA 투영 학습')
+    parser.add_argument('--collection', default=os.getenv('COLLECTION_NAME', 'regulations_final'),
+                        help='학습 벡터를 읽을 컬렉션 (alias 가능)')
+    parser.add_argument('--dim', type=int, default=256, help='축소 차원')
+    parser.add_argument('--sample', type=int, default=50000, help='학습/평가에 읽을 최대 벡터 수')
+    parser.add_argument('--holdout', type=int, default=200, help='학습에서 빼고 질의로 쓸 벡터 수')
+    parser.add_argument('--top-k', type=int, default=10, help='recall@k의 k')
+    parser.add_argument('--oversampling', type=float, default=default_oversampling(),
+                        help='축소 벡터 후보 배수')
+    parser.add_argument('--output', default=None, help='투영 파일 (기본값: VECTOR_PROJECTION_FILE)')
+    parser.add_argument('--live', action='store_true',
+                        help='학습 대신 축소 보조 벡터가 있는 --collection에서 실제 검색 비교')
+    args = parser.parse_args()
+
+    client = QdrantClient(
+        host=os.getenv('QDRANT_HOST', 'localhost'),
+        port=int(os.getenv('QDRANT_PORT', '6333')),
+        timeout=600,
+    )
+    vectors = sample_vectors(client, args.collection, args.sample)
+    rng = np.random.RandomState(0)
+    order = rng.permutation(len(vectors))
+    queries = vectors[order[:args.holdout]]
+
+    if args.live:
+        report = live_benchmark(client, args.collection, queries, args.top_k, args.oversampling)
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+        return 0
+
+    train = vectors[order[args.holdout:]]
+    try:
+        projection = VectorProjection.fit(train, dim=args.dim, collection=args.collection)
+    except ValueError as e:
+        logger.error(str(e))
+        return 1
+    path = projection.save(Path(args.output) if args.output else projection_file())
+    report = {
+        'projection': {'path': str(path), **projection.describe()},
+        'offline': offline_benchmark(projection, train, queries, args.top_k, args.oversampling),
+    }
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+검색 인덱스 비교 스크립트 (준중복 청크 제거 전/후 크기와 재현율, 전체 vs 2단계 검색)
+
+사용 예:
+    # PDF 디렉토리로 임시 컬렉션 두 개(중복 제거 끔 / 켬)를 만들어 비교
+    python scripts/retrieval_benchmark.py --build /app/documents/kisa_pdf --max-files 25
+
+    # 이미 인덱싱된 두 컬렉션 비교 (첫 번째가 기준)
+    python scripts/retrieval_benchmark.py --collections regulations_nodedup regulations_final
+
+    # 비교 대상 컬렉션에서 전체 청크 검색 vs 문서 선택 후 청크 검색(2단계) 비교 추가
+    # (모든 질문 2단계 / 서비스와 같이 문서 이름을 포함한 질문만 2단계, 두 가지)
+    python scripts/retrieval_benchmark.py --collections regulations_nodedup regulations_final --two-stage
+
+질문 세트(retrieval_questions.json)는 {"question", "expected": [파일명 접두어]} 목록이며,
+top-k 결과의 file_name 또는 alt_sources(대표 청크에 합쳐진 중복 출처) 중 하나가
+expected 접두어로 시작하면 적중으로 셉니다.
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+# backend 디렉토리를 import 경로에 추가 (Django 설정 불필요)
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from qdrant_client import QdrantClient
+
+from chatbot.services.chunk_dedup import default_dedup_threshold
+from chatbot.services.collection_versions import hit_files
+from chatbot.services.doc_retrieval import exclude_doc_level, two_stage_search
+from chatbot.services.embedding_backends import build_embedder
+from chatbot.services.matcher import names_document
+from chatbot.services.ingestion import IngestionEngine, create_collection
+from chatbot.services.vector_projection import search_points
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUESTIONS = Path(__file__).resolve().parent / 'retrieval_questions.json'
+
+
+def evaluate(client: QdrantClient, embedder, collection_name: str,
+             questions: List[Dict[str, Any]], top_k: int, two_stage: bool = False,
+             top_m: int = 5, gated: bool = False) -> Dict[str, Any]:
+    """
+    질문 세트의 recall@k / precision@k / MRR / 평균 검색 지연 계산
+
+    Args:
+        client: QdrantClient
+        embedder: 질문 임베딩 백엔드 (인덱싱과 같은 모델)
+        collection_name: 평가할 컬렉션 (alias 가능)
+        questions: [{'question', 'expected'}]
+        top_k: 검색 결과 수
+        two_stage: 문서 요약/조문 머리말로 상위 top_m개 문서를 고른 뒤 청크 검색
+        top_m: 2단계 검색의 문서 수
+        gated: 문서 이름을 포함한 질문만 2단계 검색 (RagSearcher 기본 동작)
+
+    Returns:
+        {'collection', 'mode', 'points', 'two_stage_queries', 'recall', 'precision', 'mrr',
+         'distinct_docs', 'latency_ms', 'misses'}
+    """
+    def search(vector, query_filter, limit):
+        return search_points(
+            client,
+            collection_name,
+            vector,
+            query_filter=query_filter,
+            limit=limit,
+            with_payload=['file_name', 'alt_sources', 'doc_id', 'doc_type', 'article'],
+        )
+
+    vectors = embedder.encode([q['question'] for q in questions],
+                              batch_size=len(questions), show_progress_bar=False)
+    hits = 0
+    relevant = 0
+    returned = 0
+    reciprocal = 0.0
+    distinct = 0
+    elapsed = 0.0
+    misses = []
+    staged = 0
+    for item, vector in zip(questions, vectors):
+        vector = vector.tolist() if hasattr(vector, 'tolist') else list(vector)
+        use_two_stage = two_stage and (not gated or names_document(item['question']))
+        staged += use_two_stage
+        started = time.perf_counter()
+        if use_two_stage:
+            results, _ = two_stage_search(search, vector, None, top_k=top_k, top_m=top_m)
+        else:
+            results = search(vector, exclude_doc_level(None), top_k)
+        elapsed += time.perf_counter() - started
+
+        rank = None
+        for position, hit in enumerate(results, 1):
+            files = hit_files(hit.payload or {})
+            if any(f.startswith(prefix) for f in files for prefix in item['expected']):
+                relevant += 1
+                rank = rank or position
+        returned += len(results)
+        distinct += len({(hit.payload or {}).get('file_name') for hit in results})
+        if rank is None:
+            misses.append(item['question'])
+        else:
+            hits += 1
+            reciprocal += 1 / rank
+
+    total = len(questions) or 1
+    return {
+        'collection': collection_name,
+        'mode': ('two_stage_gated' if gated else 'two_stage') if two_stage else 'flat',
+        'points': client.count(collection_name=collection_name, exact=True).count,
+        'two_stage_queries': staged,
+        'recall': round(hits / total, 4),
+        'precision': round(relevant / returned, 4) if returned else 0.0,
+        'mrr': round(reciprocal / total, 4),
+        'distinct_docs': round(distinct / total, 2),
+        'latency_ms': round(elapsed / total * 1000, 2),
+        'misses': misses,
+    }
+
+
+def build_collections(client: QdrantClient, embedder, pdf_dir: str, max_files: int,
+                      threshold: float, dim: int) -> List[Dict[str, Any]]:
+    """같은 PDF로 중복 제거를 끈/켠 임시 컬렉션 생성 (두 번째 빌드는 임베딩 캐시로 재인코딩 없음)"""
+    pdf_files = sorted(Path(pdf_dir).glob("*.pdf"))[:max_files]
+    builds = []
+    existing = {c.name for c in client.get_collections().collections}
+    for name, dedup_threshold in (('bench_nodedup', 0.0), ('bench_dedup', threshold)):
+        if name in existing:
+            client.delete_collection(name)
+        create_collection(client, name, dim)
+        result = IngestionEngine(client, embedder, name, dedup_threshold=dedup_threshold).run(pdf_files)
+        logger.info(f"{name}: {sum(result['indexed'].values())} points, 실패 {len(result['failed'])}개")
+        builds.append({'collection': name, 'files': len(pdf_files), 'dedup': result['dedup']})
+    return builds
+
+
+def main():
+    parser = argparse.ArgumentParser(description='준중복 청크 제거 전/후 인덱스 크기와 재현율 비교')
+    parser.add_argument('--build', default=None, metavar='PDF_DIR',
+                        help='PDF 디렉토리로 비교용 임시 컬렉션 두 개 생성')
+    parser.add_argument('--collections', nargs=2, default=None, metavar=('BASELINE', 'CANDIDATE'),
+                        help='비교할 기존 컬렉션 (기준, 비교 대상)')
+    parser.add_argument('--max-files', type=int, default=25, help='--build에 사용할 PDF 수')
+    parser.add_argument('--threshold', type=float, default=default_dedup_threshold(),
+                        help='--build의 중복 판정 임계값')
+    parser.add_argument('--questions', default=str(DEFAULT_QUESTIONS), help='질문 세트 JSON')
+    parser.add_argument('--top-k', type=int, default=5, help='검색 결과 수')
+    parser.add_argument('--keep', action='store_true', help='--build로 만든 임시 컬렉션 유지')
+    parser.add_argument('--two-stage', action='store_true',
+                        help='비교 대상 컬렉션을 문서 선택 후 청크 검색(2단계)으로도 평가')
+    parser.add_argument('--top-m', type=int, default=5, help='2단계 검색에서 고를 문서 수')
+    args = parser.parse_args()
+
+    if not (args.build or args.collections):
+        parser.error('--build 또는 --collections 중 하나가 필요합니다')
+
+    client = QdrantClient(
+        host=os.getenv('QDRANT_HOST', 'localhost'),
+        port=int(os.getenv('QDRANT_PORT', '6333')),
+        timeout=600,
+    )
+    embedder = build_embedder(model_name=os.getenv('HF_MODEL', 'nlpai-lab/KoE5'))
+    questions = json.loads(Path(args.questions).read_text(encoding='utf-8'))
+
+    report: Dict[str, Any] = {'questions': len(questions), 'top_k': args.top_k}
+    if args.build:
+        report['builds'] = build_collections(
+            client, embedder, args.build, args.max_files, args.threshold,
+            int(os.getenv('EMBED_DIM', '1024')),
+        )
+        names = [build['collection'] for build in report['builds']]
+    else:
+        names = list(args.collections)
+
+    try:
+        baseline, candidate = (evaluate(client, embedder, name, questions, args.top_k) for name in names)
+        if args.two_stage:
+            report['two_stage'] = evaluate(
+                client, embedder, names[1], questions, args.top_k, two_stage=True, top_m=args.top_m
+            )
+            report['two_stage_gated'] = evaluate(
+                client, embedder, names[1], questions, args.top_k, two_stage=True, top_m=args.top_m,
+                gated=True,
+            )
+    finally:
+        if args.build and not args.keep:
+            for name in names:
+                client.delete_collection(name)
+
+    report['baseline'] = baseline
+    report['candidate'] = candidate
+    report['size_reduction'] = (
+        round(1 - candidate['points'] / baseline['points'], 4) if baseline['points'] else 0.0
+    )
+    report['recall_delta'] = round(candidate['recall'] - baseline['recall'], 4)
+    report['mrr_delta'] = round(candidate['mrr'] - baseline['mrr'], 4)
+    if args.two_stage:
+        for mode in ('two_stage', 'two_stage_gated'):
+            report[f'{mode}_delta'] = {
+                metric: round(report[mode][metric] - candidate[metric], 4)
+                for metric in ('recall', 'precision', 'mrr', 'latency_ms')
+            }
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -17,11 +17,11 @@ done
 echo "[django] migrate"
 python manage.py migrate --noinput
 
-echo "[qdrant] ensure collection"
+echo "[qdrant] ensure collection (restore matching snapshot if missing)"
 python manage.py qdrant_init
 
 echo "[django] collectstatic"
 python manage.py collectstatic --noinput
 
-echo "[uvicorn] start"
-uvicorn config.asgi:application --host 0.0.0.0 --port 8000 
\ No newline at end of file
+echo "[gunicorn] start"
+exec gunicorn -c config/gunicorn.conf.py config.asgi:application 
\ No newline at end of file
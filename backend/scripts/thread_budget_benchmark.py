@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+CPU 스레드 예산 벤치마크
+
+같은 노드에서 N개 프로세스가 동시에 CPU 작업을 수행할 때
+라이브러리 기본값(모든 코어 사용)과 config/runtime.py 예산 적용 시의
+처리량과 지연시간(p50/p95)을 비교합니다.
+
+사용 예:
+    # 웹 워커 4개가 동시에 질의 임베딩을 하는 상황
+    python scripts/thread_budget_benchmark.py --role web --workers 4 --workload embed
+
+    # Celery OCR 워커 4개가 동시에 영수증 전처리를 하는 상황
+    python scripts/thread_budget_benchmark.py --role celery --workers 4 --workload opencv
+"""
+
+import argparse
+import json
+import multiprocessing as mp
+import os
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = str(Path(__file__).resolve().parent.parent)
+sys.path.append(BACKEND_DIR)
+
+SAMPLE_QUERY = "연차휴가 사용 기간과 미사용 연차 수당 지급 기준을 알려주세요."
+
+
+def _make_workload(name: str):
+    """작업 함수 생성 (프로세스 안에서 호출, 라이브러리 import는 예산 적용 이후)"""
+    if name == 'embed':
+        from chatbot.services.model_registry import get_embedder
+        embedder = get_embedder()
+        return lambda: embedder.encode([SAMPLE_QUERY], batch_size=1)
+
+    if name == 'opencv':
+        import cv2
+        import numpy as np
+        image = (np.random.default_rng(0).random((1800, 1200)) * 255).astype('uint8')
+
+        def run():
+            blurred = cv2.GaussianBlur(image, (5, 5), 0)
+            cv2.adaptiveThreshold(
+                blurred, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 31, 10
+            )
+            cv2.Canny(blurred, 60, 180)
+        return run
+
+    # matmul: 모델 로딩 없이 KoE5 한 레이어 규모의 연산을 흉내냄
+    import torch
+    hidden = torch.randn(64, 1024)
+    weight = torch.randn(1024, 4096)
+    return lambda: torch.relu(hidden @ weight) @ weight.T
+
+
+def _worker(args):
+    """벤치마크 프로세스: 예산 적용(선택) → 워밍업 → duration 동안 반복 실행"""
+    workload, duration, role, workers, budgeted, start_at = args
+
+    if budgeted:
+        from config.runtime import apply_thread_budget
+        apply_thread_budget(role, workers)
+
+    run = _make_workload(workload)
+    run()  # 워밍업
+
+    # 모든 프로세스가 동시에 시작하도록 대기
+    while time.time() < start_at:
+        time.sleep(0.005)
+
+    latencies = []
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        run()
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+def _percentile(values, q):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run_case(workload: str, duration: float, role: str, workers: int, budgeted: bool,
+             warmup_seconds: float) -> dict:
+    """한 가지 설정으로 벤치마크 실행"""
+    # spawn: 자식이 깨끗한 상태에서 환경변수를 읽은 뒤 라이브러리를 import
+    ctx = mp.get_context('spawn')
+    env_backup = dict(os.environ)
+    if not budgeted:
+        for name in ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS',
+                     'NUMEXPR_NUM_THREADS', 'OPENCV_FOR_THREADS_NUM', 'EMBED_ONNX_THREADS'):
+            os.environ.pop(name, None)
+
+    start_at = time.time() + warmup_seconds
+    try:
+        with ctx.Pool(workers) as pool:
+            results = pool.map(
+                _worker, [(workload, duration, role, workers, budgeted, start_at)] * workers
+            )
+    finally:
+        os.environ.clear()
+        os.environ.update(env_backup)
+
+    latencies = [ms for worker_latencies in results for ms in worker_latencies]
+    return {
+        'mode': 'budget' if budgeted else 'default',
+        'ops': len(latencies),
+        'ops_per_sec': round(len(latencies) / duration, 1),
+        'p50_ms': round(_percentile(latencies, 50), 2),
+        'p95_ms': round(_percentile(latencies, 95), 2),
+        'p99_ms': round(_percentile(latencies, 99), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='CPU 스레드 예산 벤치마크')
+    parser.add_argument('--role', default='web', choices=['web', 'celery', 'indexer'])
+    parser.add_argument('--workers', type=int, default=4, help='동시 프로세스 수')
+    parser.add_argument('--workload', default='matmul', choices=['matmul', 'embed', 'opencv'])
+    parser.add_argument('--duration', type=float, default=15.0, help='측정 시간(초)')
+    parser.add_argument('--warmup', type=float, default=None,
+                        help='프로세스 준비 대기 시간(초, 기본값: embed 60 / 그 외 10)')
+    args = parser.parse_args()
+
+    from config.runtime import compute_thread_budget
+
+    warmup = args.warmup if args.warmup is not None else (60.0 if args.workload == 'embed' else 10.0)
+    report = {
+        'workload': args.workload,
+        'budget': compute_thread_budget(args.role, args.workers),
+        'results': [
+            run_case(args.workload, args.duration, args.role, args.workers, False, warmup),
+            run_case(args.workload, args.duration, args.role, args.workers, True, warmup),
+        ],
+    }
+    default, budgeted = report['results']
+    if default['ops_per_sec']:
+        report['throughput_gain'] = round(budgeted['ops_per_sec'] / default['ops_per_sec'], 2)
+    if budgeted['p95_ms']:
+        report['p95_improvement'] = round(default['p95_ms'] / budgeted['p95_ms'], 2)
+
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    exit_code = main()
+    sys.exit(exit_code)